@@ -0,0 +1,3 @@
+"""
+Performance benchmarks for the catalog, planner and template generators
+"""
@@ -0,0 +1,216 @@
+"""
+Benchmark runner for catalog load, planning, validation and export
+
+Usage:
+    python -m benchmarks.run --skus 1000 --workloads 10000 --output baseline.json
+    python -m benchmarks.run --skus 1000 --workloads 10000 --compare baseline.json
+
+With --compare the run exits non-zero when any benchmark's time per
+operation regresses by more than --threshold (default 20%).
+"""
+
+import argparse
+import itertools
+import json
+import platform
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import yaml
+
+from benchmarks.synthetic import synthetic_catalog, synthetic_workloads
+from src.catalog import CatalogService
+from src.planner import Planner
+from src.generator import BicepGenerator, ARMGenerator, TerraformGenerator
+
+GENERATORS = {
+    'bicep': BicepGenerator,
+    'arm': ARMGenerator,
+    'terraform': TerraformGenerator
+}
+
+
+@dataclass
+class BenchmarkResult:
+    """Timing for one benchmark case (best of the repeats)"""
+    name: str
+    ops: int
+    total_s: float
+    bytes: int = 0
+
+    @property
+    def per_op_us(self) -> float:
+        return self.total_s / self.ops * 1e6 if self.ops else 0.0
+
+    @property
+    def ops_per_sec(self) -> float:
+        return self.ops / self.total_s if self.total_s > 0 else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            'ops': self.ops,
+            'total_s': round(self.total_s, 6),
+            'per_op_us': round(self.per_op_us, 3),
+            'ops_per_sec': round(self.ops_per_sec, 1),
+            'bytes': self.bytes
+        }
+
+
+def _best_of(name: str, repeat: int, body: Callable[[], tuple]) -> BenchmarkResult:
+    """Run body repeat times and keep the fastest run; body returns (ops, bytes)"""
+    best: Optional[BenchmarkResult] = None
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        ops, nbytes = body()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best.total_s:
+            best = BenchmarkResult(name=name, ops=ops, total_s=elapsed, bytes=nbytes)
+    return best
+
+
+def run_suite(
+    sku_count: int,
+    workload_count: int,
+    repeat: int = 3,
+    sample: int = 1000,
+    seed: int = 0,
+    formats: Optional[List[str]] = None
+) -> Dict[str, BenchmarkResult]:
+    """
+    Run every benchmark case against a synthetic catalog and fleet.
+
+    Only the first `sample` plans are kept in memory; validation and export
+    cycle over them so memory stays bounded for 100k-workload fleets.
+    """
+    formats = formats or list(GENERATORS)
+    results: Dict[str, BenchmarkResult] = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog_path = Path(tmp) / 'skus.yaml'
+        with open(catalog_path, 'w') as f:
+            yaml.safe_dump(synthetic_catalog(sku_count, seed), f)
+
+        def load():
+            CatalogService(str(catalog_path))
+            return 1, 0
+        results['catalog_load'] = _best_of('catalog_load', repeat, load)
+
+        planner = Planner(CatalogService(str(catalog_path)))
+
+    plans = []
+
+    def plan():
+        plans.clear()
+        for i, workload in enumerate(synthetic_workloads(workload_count, seed)):
+            result = planner.create_plan(
+                workload=workload,
+                cluster_name=f'bench-{i:06d}',
+                resource_group='bench-rg',
+                location='eastus',
+                custom_location='bench-custom-location',
+                rack_count=(i % 4) + 1
+            )
+            if len(plans) < sample:
+                plans.append(result)
+        return workload_count, 0
+    results['plan'] = _best_of('plan', repeat, plan)
+
+    def validate():
+        for p in itertools.islice(itertools.cycle(plans), workload_count):
+            planner._validate_plan(p.cluster_config, p.workload_requirements)
+        return workload_count, 0
+    results['validate'] = _best_of('validate', repeat, validate)
+
+    for fmt in formats:
+        generator = GENERATORS[fmt]()
+
+        def export(generator=generator):
+            nbytes = 0
+            for p in itertools.islice(itertools.cycle(plans), workload_count):
+                nbytes += len(generator.generate(p))
+            return workload_count, nbytes
+        results[f'export_{fmt}'] = _best_of(f'export_{fmt}', repeat, export)
+
+    return results
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    """Return a message per benchmark slower than baseline by more than threshold"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous or not previous.get('per_op_us'):
+            continue
+        ratio = current['per_op_us'] / previous['per_op_us']
+        if ratio > 1 + threshold:
+            regressions.append(
+                f"{name}: {current['per_op_us']:.1f}us/op vs baseline "
+                f"{previous['per_op_us']:.1f}us/op (+{(ratio - 1) * 100:.0f}%)"
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--skus', type=int, default=100, help='SKUs in the synthetic catalog (10-10000)')
+    parser.add_argument('--workloads', type=int, default=1000, help='Workloads in the fleet (1-100000)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per benchmark (best is kept)')
+    parser.add_argument('--sample', type=int, default=1000, help='Plans kept for validate/export')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for synthetic data')
+    parser.add_argument('--formats', default='bicep,arm,terraform', help='Export formats to benchmark')
+    parser.add_argument('--output', type=Path, help='Write results as baseline JSON')
+    parser.add_argument('--compare', type=Path, help='Baseline JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed slowdown ratio (0.2 = 20%%)')
+    args = parser.parse_args(argv)
+
+    if not 10 <= args.skus <= 10000:
+        parser.error('--skus must be between 10 and 10000')
+    if not 1 <= args.workloads <= 100000:
+        parser.error('--workloads must be between 1 and 100000')
+    formats = [fmt.strip() for fmt in args.formats.split(',') if fmt.strip()]
+    unknown = [fmt for fmt in formats if fmt not in GENERATORS]
+    if unknown:
+        parser.error(f"unknown formats: {', '.join(unknown)}")
+
+    results = run_suite(args.skus, args.workloads, args.repeat, args.sample, args.seed, formats)
+    report = {
+        'meta': {
+            'skus': args.skus,
+            'workloads': args.workloads,
+            'python': platform.python_version(),
+            'timestamp': datetime.now().isoformat()
+        },
+        'results': {name: result.to_dict() for name, result in results.items()}
+    }
+
+    for name, result in results.items():
+        print(f"{name:<18} {result.ops:>8} ops  {result.per_op_us:>10.1f} us/op  "
+              f"{result.ops_per_sec:>12.1f} ops/s")
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"Baseline written to {args.output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        if baseline.get('meta', {}).get('skus') != args.skus or \
+                baseline.get('meta', {}).get('workloads') != args.workloads:
+            print("Warning: baseline was recorded with a different catalog or fleet size")
+        regressions = compare(report['results'], baseline.get('results', {}), args.threshold)
+        if regressions:
+            print("Regressions:")
+            for message in regressions:
+                print(f"  - {message}")
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
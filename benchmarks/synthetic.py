@@ -0,0 +1,92 @@
+"""
+Synthetic catalogs and workload fleets for benchmarking
+"""
+
+import random
+from datetime import datetime
+from typing import Dict, Iterator
+
+from src.models import WorkloadRequirements, WorkloadType
+
+WORKLOAD_TYPES = [
+    WorkloadType.GENERAL_PURPOSE,
+    WorkloadType.AI_INFERENCE,
+    WorkloadType.VIDEO_ANALYTICS,
+    WorkloadType.CUSTOM
+]
+
+
+def synthetic_catalog(sku_count: int, seed: int = 0) -> Dict:
+    """
+    Build a catalog with sku_count VM SKUs (about a fifth of them GPU SKUs).
+
+    The layout matches catalog/skus.yaml so it can be loaded by CatalogService.
+    """
+    rng = random.Random(seed)
+    gpu_count = max(1, sku_count // 5)
+    general_count = max(1, sku_count - gpu_count)
+
+    general = []
+    for i in range(general_count):
+        vcpus = rng.choice([2, 4, 8, 16, 32, 48, 64])
+        general.append({
+            'name': f'Standard_Synth{i}_v1',
+            'vcpus': vcpus,
+            'memory_gb': vcpus * rng.choice([2, 4, 8]),
+            'gpu': False
+        })
+
+    gpu = []
+    for i in range(gpu_count):
+        vcpus = rng.choice([4, 8, 16, 32])
+        gpu.append({
+            'name': f'Standard_NCSynth{i}',
+            'vcpus': vcpus,
+            'memory_gb': vcpus * 4,
+            'gpu': True,
+            'gpu_model': rng.choice(['A2', 'A16', 'Tesla T4']),
+            'gpu_count': rng.choice([1, 2])
+        })
+
+    return {
+        'metadata': {
+            'version': 'synthetic',
+            'last_updated': datetime.now().isoformat(),
+            'target': 'Azure Local 2511'
+        },
+        'kubernetes_versions': ['1.31.10', '1.30.14'],
+        'os_images': {
+            'linux': [{'name': 'Azure Linux 2.0', 'version': '2.0.20240101'}],
+            'windows': [{'name': 'Windows Server 2022', 'version': '20348.2227'}]
+        },
+        'vm_skus': {'general_purpose': general, 'gpu': gpu},
+        'limits': {
+            'control_plane_options': [1, 3, 5],
+            'max_nodes_per_pool': 100,
+            'max_pools_per_cluster': 10,
+            'max_nodes_per_cluster': 1000,
+            'max_racks': 16,
+            'min_nodes_per_rack': 1
+        }
+    }
+
+
+def synthetic_workloads(count: int, seed: int = 0) -> Iterator[WorkloadRequirements]:
+    """Yield count workloads with a realistic spread of sizes"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        workload_type = rng.choice(WORKLOAD_TYPES)
+        gpu_required = workload_type == WorkloadType.AI_INFERENCE or rng.random() < 0.1
+        workload = WorkloadRequirements(
+            workload_type=workload_type,
+            cpu_cores=rng.choice([4, 8, 16, 32, 64]),
+            memory_gb=rng.choice([16, 32, 64, 128, 256]),
+            gpu_required=gpu_required,
+            gpu_count=rng.randint(1, 4) if gpu_required else 0,
+            storage_gb=rng.choice([100, 500, 1000])
+        )
+        if workload_type == WorkloadType.VIDEO_ANALYTICS:
+            workload.cameras = rng.randint(4, 128)
+            workload.fps = rng.choice([10, 15, 30])
+            workload.retention_days = rng.choice([7, 14, 30])
+        yield workload
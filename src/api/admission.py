@@ -0,0 +1,120 @@
+"""
+Admission control for expensive API requests
+
+Bounds the work the API accepts so latency stays flat under bursts:
+
+- each client may hold a limited number of requests at once (429 beyond it);
+- at most max_concurrent computations run at a time;
+- up to max_queue more wait briefly for a slot;
+- anything beyond that, or waiting longer than queue_timeout, gets an
+  immediate 503.
+
+Rejections carry a Retry-After estimate based on recent service times.
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+
+class Rejected(Exception):
+    """Request refused by admission control"""
+
+    def __init__(self, status: int, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Per-client limits plus a bounded execution queue.
+
+    Args:
+        max_concurrent: Computations allowed to run at once
+        max_queue: Requests allowed to wait for a slot
+        per_client: Requests one client may have admitted at once
+        queue_timeout: Seconds a queued request waits before a 503
+    """
+
+    def __init__(self, max_concurrent: int = 8, max_queue: int = 32,
+                 per_client: int = 4, queue_timeout: float = 2.0):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.per_client = per_client
+        self.queue_timeout = queue_timeout
+        self._cond = threading.Condition()
+        self._running = 0
+        self._queued = 0
+        self._clients: Dict[str, int] = {}
+        self._service_time = 0.1  # EWMA of computation seconds
+
+    def _retry_after(self) -> int:
+        backlog = (self._running + self._queued) / max(1, self.max_concurrent)
+        return max(1, math.ceil(backlog * self._service_time))
+
+    @contextmanager
+    def client_slot(self, client_id: str) -> Iterator[None]:
+        """
+        Count a request against its client's limit.
+
+        Raises:
+            Rejected: 429 if the client already has per_client requests admitted
+        """
+        with self._cond:
+            active = self._clients.get(client_id, 0)
+            if active >= self.per_client:
+                raise Rejected(429, f"Too many concurrent requests for client {client_id}",
+                               self._retry_after())
+            self._clients[client_id] = active + 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                remaining = self._clients[client_id] - 1
+                if remaining:
+                    self._clients[client_id] = remaining
+                else:
+                    del self._clients[client_id]
+
+    @contextmanager
+    def execution_slot(self) -> Iterator[None]:
+        """
+        Hold one of max_concurrent execution slots, queueing briefly if needed.
+
+        Raises:
+            Rejected: 503 if the queue is full or the wait times out
+        """
+        with self._cond:
+            if self._running >= self.max_concurrent:
+                if self._queued >= self.max_queue:
+                    raise Rejected(503, "Server busy: request queue full", self._retry_after())
+                self._queued += 1
+                deadline = time.monotonic() + self.queue_timeout
+                try:
+                    while self._running >= self.max_concurrent:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise Rejected(503, "Server busy: timed out waiting in queue",
+                                           self._retry_after())
+                        self._cond.wait(remaining)
+                finally:
+                    self._queued -= 1
+            self._running += 1
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._cond:
+                self._running -= 1
+                self._service_time = 0.8 * self._service_time + 0.2 * elapsed
+                self._cond.notify()
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {'running': self._running, 'queued': self._queued, 'clients': len(self._clients)}
@@ -2,10 +2,25 @@
 Flask API for AKS Arc deployment tool
 """
 
-from flask import Flask, jsonify, request
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from functools import wraps
+from typing import Optional
+from flask import Flask, Response, g, jsonify, request, send_file, stream_with_context
 from flask_cors import CORS
+from src import metrics
+from src.api.admission import AdmissionController, Rejected
+from src.api.coalesce import SingleFlight, canonical_key
 from src.catalog import CatalogService
-from src.planner import Planner
+from src.cli.bulk import plan_record
+from src.jobs import JobQueue, WorkerPool
+from src.models import plan_from_dict, plan_to_dict
+from src.planner import Planner, PlanTable
+from src.repository import PlanRepository
 from src.generator import BicepGenerator, ARMGenerator, TerraformGenerator
 import logging
 
@@ -15,9 +30,94 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app)
 
+# Per-request profiling (?profile=cprofile|sample) is opt-in for the deployment
+app.config['ALLOW_PROFILING'] = os.environ.get('AKSARC_ALLOW_PROFILING') == '1'
+
+# Collect stage timings in-process for the /metrics endpoint
+metrics_sink = metrics.InMemorySink()
+metrics.set_sink(metrics_sink)
+
 # Initialize services
 catalog_service = CatalogService()
-planner = Planner(catalog_service)
+# Requests on a precomputed lattice skip planning while the table's catalog version is current
+plan_table = PlanTable(os.environ['AKSARC_PLAN_TABLE']) if os.environ.get('AKSARC_PLAN_TABLE') else None
+planner = Planner(catalog_service, plan_table)
+# Set by the pre-fork server (src.api.prefork) to share catalog refreshes between workers
+shared_catalog = None
+generators = {
+    'bicep': BicepGenerator(),
+    'arm': ARMGenerator(),
+    'terraform': TerraformGenerator()
+}
+
+# Identical concurrent plan/export bodies share one computation, and the
+# computations themselves are bounded so bursts get fast 429/503s
+single_flight = SingleFlight()
+admission = AdmissionController(
+    max_concurrent=int(os.environ.get('AKSARC_MAX_CONCURRENT', 8)),
+    max_queue=int(os.environ.get('AKSARC_MAX_QUEUE', 32)),
+    per_client=int(os.environ.get('AKSARC_MAX_PER_CLIENT', 4)),
+    queue_timeout=float(os.environ.get('AKSARC_QUEUE_TIMEOUT', 2.0))
+)
+
+
+def _client_id() -> str:
+    return request.headers.get('X-Client-Id') or request.remote_addr or 'unknown'
+
+
+def coalesced(func):
+    """
+    Run an expensive POST handler under admission control and coalescing.
+
+    The handler receives the parsed JSON body and returns a JSON-compatible
+    result. Requests to the same path with the same canonical body that
+    arrive while one is computing share its result. Only the request that
+    runs the computation counts against its client's limit; requests that
+    join it cost nothing extra.
+    """
+    @wraps(func)
+    def wrapper():
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be a JSON object'}), 400
+        client_id = _client_id()
+
+        def compute():
+            with admission.client_slot(client_id), admission.execution_slot():
+                return func(data)
+
+        try:
+            result, shared = single_flight.do(canonical_key(request.path, data), compute)
+        except Rejected as e:
+            metrics.increment(f"api.rejected.{e.status}")
+            response = jsonify({'error': e.reason})
+            response.headers['Retry-After'] = str(e.retry_after)
+            return response, e.status
+        except (KeyError, ValueError) as e:
+            return jsonify({'error': f"Invalid request: {e}"}), 400
+        except Exception as e:
+            logger.error(f"Error handling {request.path}: {e}")
+            return jsonify({'error': str(e)}), 500
+        if shared:
+            metrics.increment('api.coalesced')
+        return jsonify(result)
+    return wrapper
+
+
+def _plan_for(data):
+    """Use a serialized plan from the body, or plan the workload record it carries"""
+    if 'plan' in data:
+        return plan_from_dict(data['plan'])
+    return plan_record(planner, data)
+
+
+def _export(data, fmt: str):
+    plan = _plan_for(data)
+    return {
+        'format': fmt,
+        'cluster_name': plan.cluster_config.cluster_name,
+        'content': generators[fmt].generate(plan)
+    }
 
 
 @app.route('/')
@@ -32,11 +132,46 @@ def index():
             'plan': '/api/plan',
             'export_bicep': '/api/export/bicep',
             'export_arm': '/api/export/arm',
-            'export_terraform': '/api/export/terraform'
+            'export_terraform': '/api/export/terraform',
+            'jobs': '/api/jobs',
+            'plans': '/api/plans',
+            'metrics': '/metrics'
         }
     })
 
 
+@app.before_request
+def sync_catalog():
+    """Pick up a catalog refreshed by another pre-fork worker"""
+    global planner
+    if shared_catalog is not None and shared_catalog.sync():
+        planner = Planner(catalog_service, plan_table)
+
+
+@app.before_request
+def start_profile():
+    """Start a profiler for this request when requested and allowed"""
+    mode = request.args.get('profile')
+    if mode and app.config['ALLOW_PROFILING'] and mode in ('cprofile', 'sample'):
+        g.profiler = metrics.profile(mode)
+        g.profile_report = g.profiler.__enter__()
+
+
+@app.teardown_request
+def finish_profile(exc):
+    """Stop the request profiler and log its report, also when the request failed"""
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.__exit__(None, None, None)
+        logger.info(f"Profile for {request.method} {request.path}:\n{g.profile_report.text}")
+
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Stage timings and counters in Prometheus text format"""
+    return Response(metrics_sink.to_prometheus(), mimetype='text/plain; version=0.0.4')
+
+
 @app.route('/api/catalog', methods=['GET'])
 def get_catalog():
     """Get catalog data with versions, SKUs, and limits"""
@@ -63,8 +198,14 @@ def get_catalog():
 @app.route('/api/catalog/refresh', methods=['POST'])
 def refresh_catalog():
     """Refresh catalog from Azure APIs"""
+    global planner
     try:
+        before = catalog_service.version_id
         success = catalog_service.refresh()
+        if success and catalog_service.version_id != before:
+            planner = Planner(catalog_service, plan_table)
+            if shared_catalog is not None:
+                shared_catalog.publish()
         if success:
             return jsonify({
                 'success': True,
@@ -82,63 +223,232 @@ def refresh_catalog():
 
 
 @app.route('/api/plan', methods=['POST'])
-def create_plan():
+@coalesced
+def create_plan(data):
     """Create a deployment plan based on workload requirements"""
-    try:
-        data = request.get_json()
-        # TODO: Implement planner logic
-        return jsonify({
-            'message': 'Planner endpoint - coming soon',
-            'received': data
-        })
-    except Exception as e:
-        logger.error(f"Error creating plan: {e}")
-        return jsonify({'error': str(e)}), 500
+    return plan_to_dict(plan_record(planner, data))
 
 
 @app.route('/api/export/bicep', methods=['POST'])
-def export_bicep():
+@coalesced
+def export_bicep(data):
     """Export deployment plan as Bicep template"""
-    try:
-        data = request.get_json()
-        # TODO: Implement Bicep generator
-        return jsonify({
-            'message': 'Bicep export endpoint - coming soon',
-            'format': 'bicep'
-        })
-    except Exception as e:
-        logger.error(f"Error exporting Bicep: {e}")
-        return jsonify({'error': str(e)}), 500
+    return _export(data, 'bicep')
 
 
 @app.route('/api/export/arm', methods=['POST'])
-def export_arm():
+@coalesced
+def export_arm(data):
     """Export deployment plan as ARM template"""
-    try:
-        data = request.get_json()
-        # TODO: Implement ARM generator
-        return jsonify({
-            'message': 'ARM export endpoint - coming soon',
-            'format': 'arm'
-        })
-    except Exception as e:
-        logger.error(f"Error exporting ARM: {e}")
-        return jsonify({'error': str(e)}), 500
+    return _export(data, 'arm')
 
 
 @app.route('/api/export/terraform', methods=['POST'])
-def export_terraform():
+@coalesced
+def export_terraform(data):
     """Export deployment plan as Terraform configuration"""
+    return _export(data, 'terraform')
+
+
+# Stored plans, queryable by SKU, version, rack and validation state. The
+# database is opened on first use, so importing the app writes nothing.
+plan_db = os.environ.get('AKSARC_PLAN_DB', 'plans.db')
+_plan_repository: Optional[PlanRepository] = None
+_repository_lock = threading.Lock()
+
+
+def get_plan_repository() -> PlanRepository:
+    """The plan repository, opened on first use"""
+    global _plan_repository
+    if _plan_repository is None:
+        with _repository_lock:
+            if _plan_repository is None:
+                _plan_repository = PlanRepository(plan_db)
+    return _plan_repository
+
+
+def _optional_bool(name: str):
+    value = request.args.get(name)
+    if value is None:
+        return None
+    if value.lower() in ('1', 'true', 'yes'):
+        return True
+    if value.lower() in ('0', 'false', 'no'):
+        return False
+    raise ValueError(f"{name} must be true or false")
+
+
+@app.route('/api/plans', methods=['GET'])
+def query_plans():
+    """
+    Query stored plans (?vm_size=&kubernetes_version=&valid=&has_warnings=&rack=&location=&message=)
+
+    The total is only counted when the page is full; ?total=false skips
+    counting entirely and returns a null total.
+    """
     try:
-        data = request.get_json()
-        # TODO: Implement Terraform generator
-        return jsonify({
-            'message': 'Terraform export endpoint - coming soon',
-            'format': 'terraform'
+        filters = {
+            'vm_size': request.args.get('vm_size'),
+            'kubernetes_version': request.args.get('kubernetes_version'),
+            'is_valid': _optional_bool('valid'),
+            'has_warnings': _optional_bool('has_warnings'),
+            'rack': request.args.get('rack'),
+            'location': request.args.get('location'),
+            'message': request.args.get('message')
+        }
+        limit = min(int(request.args.get('limit', 100)), 10000)
+        offset = int(request.args.get('offset', 0))
+        with_total = _optional_bool('total') is not False
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    repository = get_plan_repository()
+    plans = repository.query(limit=limit, offset=offset, **filters)
+    total = None
+    if with_total:
+        # A short page past the first match already tells the total
+        short_page = len(plans) < limit and (plans or offset == 0)
+        total = offset + len(plans) if short_page else repository.count(**filters)
+    return jsonify({'total': total, 'plans': [summary.to_dict() for summary in plans]})
+
+
+@app.route('/api/plans', methods=['POST'])
+def store_plans():
+    """Store serialized plans ({'plans': [...]}) in the repository"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get('plans'), list):
+        return jsonify({'error': "Request body must be {'plans': [...]}"}), 400
+    try:
+        stored = get_plan_repository().save_many(plan_from_dict(plan) for plan in data['plans'])
+    except (KeyError, TypeError, ValueError, sqlite3.IntegrityError) as e:
+        return jsonify({'error': f"Invalid plan: {e}"}), 400
+    return jsonify({'stored': stored}), 201
+
+
+@app.route('/api/plans/<cluster_name>', methods=['GET'])
+def get_stored_plan(cluster_name):
+    """Full stored plan for a cluster"""
+    stored = get_plan_repository().get(cluster_name)
+    if stored is None:
+        return jsonify({'error': f"No stored plan for {cluster_name}"}), 404
+    return jsonify(plan_to_dict(stored))
+
+
+# Long-running fleet jobs: a SQLite queue in AKSARC_JOBS_DIR served by
+# AKSARC_JOB_WORKERS local processes (0 when workers run via `jobs-worker`).
+# The queue is opened on first use, so importing the app writes nothing.
+jobs_dir = os.environ.get('AKSARC_JOBS_DIR', 'jobs')
+job_workers = int(os.environ.get('AKSARC_JOB_WORKERS', 2))
+_job_queue: Optional[JobQueue] = None
+_worker_pool: Optional[WorkerPool] = None
+_jobs_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """The job queue, opened on first use"""
+    global _job_queue
+    if _job_queue is None:
+        with _jobs_lock:
+            if _job_queue is None:
+                _job_queue = JobQueue(jobs_dir)
+    return _job_queue
+
+
+def _ensure_workers() -> None:
+    """Start the local worker pool on first job submission"""
+    global _worker_pool
+    if job_workers <= 0:
+        return
+    directory = get_job_queue().directory
+    with _jobs_lock:
+        if _worker_pool is None:
+            _worker_pool = WorkerPool(directory, processes=job_workers)
+        if not _worker_pool.alive:
+            _worker_pool.stop(timeout=0)
+            _worker_pool.start()
+            atexit.register(_worker_pool.stop)
+
+
+def _job_links(job_id: str):
+    return {
+        'status': f"/api/jobs/{job_id}",
+        'events': f"/api/jobs/{job_id}/events",
+        'result': f"/api/jobs/{job_id}/result"
+    }
+
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """Queue a plan or export job for a batch of records"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    try:
+        job = get_job_queue().submit(data.get('kind', 'plan'), {
+            'records': data.get('records'),
+            'formats': data.get('formats')
         })
-    except Exception as e:
-        logger.error(f"Error exporting Terraform: {e}")
-        return jsonify({'error': str(e)}), 500
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    _ensure_workers()
+    return jsonify({**job.to_dict(), 'links': _job_links(job.id)}), 202
+
+
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    """List recent jobs, optionally filtered with ?status="""
+    try:
+        jobs = get_job_queue().list(request.args.get('status'), int(request.args.get('limit', 100)))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'jobs': [job.to_dict() for job in jobs]})
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Poll a job's status and progress"""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({'error': f"Job {job_id} not found"}), 404
+    return jsonify({**job.to_dict(), 'links': _job_links(job.id)})
+
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """Follow a job's progress as Server-Sent Events until it finishes"""
+    if get_job_queue().get(job_id) is None:
+        return jsonify({'error': f"Job {job_id} not found"}), 404
+
+    def events():
+        last = None
+        last_sent = time.monotonic()
+        while True:
+            job = get_job_queue().get(job_id)
+            state = job.to_dict()
+            if state != last:
+                event = 'done' if job.finished else 'progress'
+                yield f"event: {event}\ndata: {json.dumps(state)}\n\n"
+                last, last_sent = state, time.monotonic()
+                if job.finished:
+                    return
+            elif time.monotonic() - last_sent > 15:
+                # Keep proxies from closing an idle stream
+                yield ": keepalive\n\n"
+                last_sent = time.monotonic()
+            time.sleep(0.5)
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/api/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    """Download a finished job's plans (JSONL) or templates (zip)"""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({'error': f"Job {job_id} not found"}), 404
+    if job.result_path is None:
+        return jsonify({'error': f"Job {job_id} is {job.status.value}", 'status': job.status.value}), 409
+    return send_file(os.path.abspath(job.result_path), as_attachment=True)
 
 
 @app.route('/health', methods=['GET'])
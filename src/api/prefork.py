@@ -0,0 +1,274 @@
+"""
+Pre-fork API server with a shared, frozen catalog
+
+The master process imports the app, which loads the catalog once. It then
+builds the catalog's lookup indexes and moves every live object into the
+garbage collector's permanent generation (gc.freeze()) before forking the
+workers. The workers share those pages copy-on-write instead of each
+parsing and holding its own catalog, and the collector never writes to
+them.
+
+Catalog refreshes are published through CatalogSnapshots: the refreshed
+data is pickled to a snapshot file, then a generation counter in a small
+memory-mapped control file is bumped. Before each request, a worker
+compares that counter with the generation it holds. On a change it maps
+the new snapshot and unpickles it, which avoids parsing the YAML again.
+
+Job workers (AKSARC_JOB_WORKERS) are forked once by the master, next to
+the API workers, and restarted the same way when they die. The API workers
+never start a job pool of their own. Otherwise every API worker would start
+its own pool on its first job, and N API workers would run N times as many
+job processes.
+"""
+
+import fcntl
+import gc
+import mmap
+import os
+import pickle
+import shutil
+import signal
+import socket
+import struct
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+_COUNTER = struct.Struct('<Q')
+
+
+class CatalogSnapshots:
+    """
+    Generation-counted catalog snapshots shared between processes.
+
+    Args:
+        directory: Where snapshots and the control file live (a new
+            temporary directory by default)
+    """
+
+    def __init__(self, directory: Optional[Path] = None):
+        self._owned = directory is None
+        self.directory = Path(directory or tempfile.mkdtemp(prefix='aksarc-catalog-'))
+        self.directory.mkdir(parents=True, exist_ok=True)
+        control = self.directory / 'generation'
+        fd = os.open(control, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if os.fstat(fd).st_size < _COUNTER.size:
+                os.ftruncate(fd, _COUNTER.size)
+            self._control = mmap.mmap(fd, _COUNTER.size, mmap.MAP_SHARED)
+        finally:
+            os.close(fd)
+        self._lock_path = self.directory / 'publish.lock'
+
+    @property
+    def generation(self) -> int:
+        """Latest published generation (0 before the first publish)"""
+        # Re-read until two reads agree so a concurrent update is never seen torn
+        while True:
+            first = _COUNTER.unpack_from(self._control)[0]
+            if _COUNTER.unpack_from(self._control)[0] == first:
+                return first
+
+    def _path(self, generation: int) -> Path:
+        return self.directory / f"catalog-{generation}.snap"
+
+    def publish(self, catalog_data: Dict, presets_data: Dict) -> int:
+        """
+        Publish catalog data as the next generation.
+
+        The snapshot file is complete before the counter moves, so readers
+        never see a generation without its data. Snapshots older than the
+        previous generation are removed; readers holding them mapped keep
+        their copy.
+
+        Returns:
+            The new generation
+        """
+        payload = pickle.dumps((catalog_data, presets_data), protocol=pickle.HIGHEST_PROTOCOL)
+        with open(self._lock_path, 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            generation = _COUNTER.unpack_from(self._control)[0] + 1
+            path = self._path(generation)
+            temp = path.with_suffix('.tmp')
+            with open(temp, 'wb') as f:
+                f.write(payload)
+            os.replace(temp, path)
+            _COUNTER.pack_into(self._control, 0, generation)
+            self._control.flush()
+            stale = self._path(generation - 2)
+            if stale.exists():
+                stale.unlink()
+        logger.info(f"Published catalog generation {generation} ({len(payload)} bytes)")
+        return generation
+
+    def load(self, generation: int) -> Tuple[Dict, Dict]:
+        """Map and unpickle a published snapshot as (catalog_data, presets_data)"""
+        with open(self._path(generation), 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                return pickle.loads(view)
+
+    def close(self) -> None:
+        self._control.close()
+        if self._owned:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class SharedCatalog:
+    """
+    A process's CatalogService kept in step with the published snapshots.
+
+    Args:
+        snapshots: Snapshot store shared by all workers
+        service: The process's catalog service, updated in place
+    """
+
+    def __init__(self, snapshots: CatalogSnapshots, service):
+        self.snapshots = snapshots
+        self.service = service
+        self.generation = snapshots.generation
+
+    def sync(self) -> bool:
+        """Load the latest snapshot if another process published one; returns whether it did"""
+        while True:
+            generation = self.snapshots.generation
+            if generation == self.generation:
+                return False
+            try:
+                catalog_data, presets_data = self.snapshots.load(generation)
+                break
+            except FileNotFoundError:
+                continue  # Superseded twice while we looked; read the counter again
+        self.service.replace_data(catalog_data, presets_data)
+        self.generation = generation
+        logger.info(f"Worker {os.getpid()} switched to catalog generation {generation}")
+        return True
+
+    def publish(self) -> int:
+        """Publish this process's catalog (e.g. after a refresh) to every worker"""
+        self.generation = self.snapshots.publish(self.service.catalog_data, self.service.presets_data)
+        return self.generation
+
+
+class PreforkServer:
+    """
+    Serves the Flask app from several forked worker processes.
+
+    Args:
+        host: Interface to listen on
+        port: Port to listen on
+        workers: Number of worker processes
+        threads: Serve each worker's requests on threads
+        job_workers: Job worker processes (default: the app's AKSARC_JOB_WORKERS)
+    """
+
+    def __init__(self, host: str = '0.0.0.0', port: int = 5000, workers: int = 4, threads: bool = True,
+                 job_workers: Optional[int] = None):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.threads = threads
+        self.job_workers = job_workers
+        self._children: Dict[int, Tuple[str, int]] = {}
+        self._stopping = False
+
+    def _spawn_job_worker(self, slot: int, pool) -> None:
+        pid = os.fork()
+        if pid:
+            self._children[pid] = ('jobs', slot)
+            return
+        # Job worker: SIGTERM finishes the current job, then exits
+        code = 0
+        try:
+            stop = threading.Event()
+            signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            gc.enable()
+            pool.run_worker(stop)
+        except BaseException as e:
+            logger.error(f"Job worker {os.getpid()} exiting: {e}")
+            code = 1
+        finally:
+            os._exit(code)
+
+    def _spawn(self, slot: int, app, sock: socket.socket) -> None:
+        pid = os.fork()
+        if pid:
+            self._children[pid] = ('api', slot)
+            return
+        # Worker: objects created from here on are collected normally
+        code = 0
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            gc.enable()
+            from werkzeug.serving import make_server
+
+            server = make_server(self.host, self.port, app, threaded=self.threads, fd=sock.fileno())
+            server.serve_forever()
+        except BaseException as e:
+            logger.error(f"Worker {os.getpid()} exiting: {e}")
+            code = 1
+        finally:
+            os._exit(code)
+
+    def serve_forever(self) -> None:
+        """Load the app and catalog once, fork the workers and restart any that die"""
+        gc.disable()
+        from src.api import app as api
+
+        api.catalog_service.warm()
+        snapshots = CatalogSnapshots()
+        api.shared_catalog = SharedCatalog(snapshots, api.catalog_service)
+        api.shared_catalog.publish()
+
+        job_workers = api.job_workers if self.job_workers is None else self.job_workers
+        api.job_workers = 0
+        pool = None
+        if job_workers > 0:
+            from src.jobs import WorkerPool
+
+            pool = WorkerPool(api.get_job_queue().directory, processes=job_workers)
+
+        sock = socket.create_server((self.host, self.port), backlog=1024)
+        sock.set_inheritable(True)
+        gc.freeze()
+        logger.info(f"Pre-fork server on {self.host}:{self.port} with {self.workers} workers "
+                    f"and {job_workers} job workers ({gc.get_freeze_count()} objects frozen)")
+
+        def stop(signum, frame):
+            self._stopping = True
+            for pid in list(self._children):
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        try:
+            for slot in range(self.workers):
+                self._spawn(slot, api.app, sock)
+            for slot in range(job_workers):
+                self._spawn_job_worker(slot, pool)
+            while self._children:
+                try:
+                    pid, status = os.wait()
+                except ChildProcessError:
+                    break
+                except InterruptedError:
+                    continue
+                child = self._children.pop(pid, None)
+                if child is not None and not self._stopping:
+                    kind, slot = child
+                    logger.warning(f"Worker {pid} ({kind}) exited with status {status}; restarting")
+                    if kind == 'jobs':
+                        self._spawn_job_worker(slot, pool)
+                    else:
+                        self._spawn(slot, api.app, sock)
+        finally:
+            sock.close()
+            snapshots.close()
@@ -3,5 +3,11 @@ Catalog module for managing AKS versions, OS images, and VM SKUs
 """
 
 from .service import CatalogService
+from .refresh import CatalogSource, HTTPCatalogSource, RefreshPipeline, RefreshReport
+from .history import CatalogHistory
+from .presets import EnvironmentPreset, WorkloadPreset
 
-__all__ = ['CatalogService']
+__all__ = [
+    'CatalogService', 'CatalogSource', 'HTTPCatalogSource', 'RefreshPipeline', 'RefreshReport',
+    'CatalogHistory', 'EnvironmentPreset', 'WorkloadPreset'
+]
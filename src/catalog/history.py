@@ -0,0 +1,225 @@
+"""
+Append-only catalog version history
+
+Every catalog version is stored as a compact delta against its predecessor,
+with a full checkpoint every few versions. Records live in an append-only
+log; a fixed-width index maps version IDs to log offsets, so loading any
+version reads one checkpoint plus at most checkpoint_interval - 1 deltas.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import struct
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+FULL = 0
+DELTA = 1
+
+# offset (u64), length (u32), kind (u8), version id (16 ascii hex chars)
+_INDEX_ENTRY = struct.Struct('<QIB16s')
+
+
+# Metadata a refresh rewrites without changing what the catalog offers
+VOLATILE_METADATA = ('last_updated', 'sources')
+
+
+def catalog_digest(data: Dict) -> str:
+    """Content-derived version ID for a catalog, ignoring VOLATILE_METADATA"""
+    metadata = data.get('metadata')
+    if isinstance(metadata, dict) and any(key in metadata for key in VOLATILE_METADATA):
+        data = {**data, 'metadata': {k: v for k, v in metadata.items() if k not in VOLATILE_METADATA}}
+    canonical = json.dumps(data, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def compute_delta(old: Any, new: Any, path: Tuple = ()) -> Dict[str, list]:
+    """
+    Diff two catalogs into {'set': [[path, value], ...], 'del': [path, ...]}.
+
+    Dicts are diffed key by key; any other changed value (including lists)
+    is replaced whole at its path.
+    """
+    delta: Dict[str, list] = {'set': [], 'del': []}
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old.keys() - new.keys():
+            delta['del'].append(list(path + (key,)))
+        for key, value in new.items():
+            if key not in old:
+                delta['set'].append([list(path + (key,)), value])
+            elif old[key] != value:
+                child = compute_delta(old[key], value, path + (key,))
+                delta['set'].extend(child['set'])
+                delta['del'].extend(child['del'])
+    elif old != new:
+        delta['set'].append([list(path), new])
+    return delta
+
+
+def apply_delta(data: Any, delta: Dict[str, list]) -> Any:
+    """Apply a delta from compute_delta in place and return the result"""
+    for path in delta.get('del', []):
+        parent = data
+        for key in path[:-1]:
+            parent = parent[key]
+        parent.pop(path[-1], None)
+    for path, value in delta.get('set', []):
+        if not path:
+            data = copy.deepcopy(value)
+            continue
+        parent = data
+        for key in path[:-1]:
+            parent = parent.setdefault(key, {})
+        parent[path[-1]] = copy.deepcopy(value)
+    return data
+
+
+class CatalogHistory:
+    """
+    Versioned catalog store.
+
+    Args:
+        path: Directory holding history.log and history.idx
+        checkpoint_interval: Write a full copy every N versions
+        cache_size: Number of materialized versions kept in memory
+    """
+
+    def __init__(self, path: str, checkpoint_interval: int = 10, cache_size: int = 8):
+        self.path = Path(path)
+        self.checkpoint_interval = max(1, checkpoint_interval)
+        self.cache_size = cache_size
+        self._log_path = self.path / 'history.log'
+        self._idx_path = self.path / 'history.idx'
+        self._lock = threading.Lock()
+        self._entries: List[Tuple[int, int, int, str]] = []
+        self._positions: Dict[str, int] = {}
+        self._cache: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._head_data: Optional[Dict] = None
+        self._load_index()
+
+    def _load_index(self) -> None:
+        """Read the index, dropping entries past the end of the log (torn appends)"""
+        if not self._idx_path.exists():
+            return
+        log_size = self._log_path.stat().st_size if self._log_path.exists() else 0
+        raw = self._idx_path.read_bytes()
+        usable = len(raw) - len(raw) % _INDEX_ENTRY.size
+        for start in range(0, usable, _INDEX_ENTRY.size):
+            offset, length, kind, version = _INDEX_ENTRY.unpack_from(raw, start)
+            if offset + length > log_size:
+                logger.warning(f"Ignoring truncated catalog history entries in {self.path}")
+                break
+            version_id = version.decode('ascii')
+            self._positions[version_id] = len(self._entries)
+            self._entries.append((offset, length, kind, version_id))
+        if len(self._entries) * _INDEX_ENTRY.size != len(raw):
+            with open(self._idx_path, 'r+b') as f:
+                f.truncate(len(self._entries) * _INDEX_ENTRY.size)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, version_id: str) -> bool:
+        return version_id in self._positions
+
+    @property
+    def latest_id(self) -> Optional[str]:
+        return self._entries[-1][3] if self._entries else None
+
+    def versions(self) -> List[Dict[str, Any]]:
+        """List stored versions oldest first"""
+        return [
+            {'id': version_id, 'sequence': seq, 'kind': 'full' if kind == FULL else 'delta', 'bytes': length}
+            for seq, (_, length, kind, version_id) in enumerate(self._entries)
+        ]
+
+    def _read_record(self, seq: int) -> Dict:
+        offset, length, _, _ = self._entries[seq]
+        with open(self._log_path, 'rb') as f:
+            f.seek(offset)
+            return json.loads(f.read(length))
+
+    def append(self, catalog_data: Dict) -> str:
+        """
+        Record a catalog version.
+
+        Returns:
+            The version ID; appending the current head again is a no-op
+        """
+        version_id = catalog_digest(catalog_data)
+        with self._lock:
+            if self.latest_id == version_id:
+                return version_id
+
+            seq = len(self._entries)
+            if seq % self.checkpoint_interval == 0:
+                record = {'id': version_id, 'kind': 'full', 'data': catalog_data}
+                kind = FULL
+            else:
+                previous = self._head_data if self._head_data is not None else self._materialize(seq - 1)
+                record = {
+                    'id': version_id,
+                    'kind': 'delta',
+                    'parent': self._entries[-1][3],
+                    'delta': compute_delta(previous, catalog_data)
+                }
+                kind = DELTA
+
+            payload = json.dumps(record, separators=(',', ':'), default=str).encode('utf-8') + b'\n'
+            self.path.mkdir(parents=True, exist_ok=True)
+            with open(self._log_path, 'ab') as log:
+                offset = log.tell()
+                log.write(payload)
+                log.flush()
+                os.fsync(log.fileno())
+            with open(self._idx_path, 'ab') as idx:
+                idx.write(_INDEX_ENTRY.pack(offset, len(payload), kind, version_id.encode('ascii')))
+                idx.flush()
+                os.fsync(idx.fileno())
+
+            self._positions[version_id] = seq
+            self._entries.append((offset, len(payload), kind, version_id))
+            self._head_data = copy.deepcopy(catalog_data)
+            logger.info(f"Recorded catalog version {version_id} ({'full' if kind == FULL else 'delta'})")
+            return version_id
+
+    def _materialize(self, seq: int) -> Dict:
+        version_id = self._entries[seq][3]
+        cached = self._cache.get(version_id)
+        if cached is not None:
+            self._cache.move_to_end(version_id)
+            return cached
+
+        checkpoint = seq
+        while self._entries[checkpoint][2] != FULL:
+            checkpoint -= 1
+        data = self._read_record(checkpoint)['data']
+        for delta_seq in range(checkpoint + 1, seq + 1):
+            data = apply_delta(data, self._read_record(delta_seq)['delta'])
+
+        self._cache[version_id] = data
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return data
+
+    def load(self, version_id: str) -> Dict:
+        """
+        Load a historical catalog.
+
+        The returned dict is shared with the cache and must be treated as
+        read-only.
+
+        Raises:
+            KeyError: If the version is not in the history
+        """
+        with self._lock:
+            if version_id not in self._positions:
+                raise KeyError(f"Unknown catalog version: {version_id}")
+            return self._materialize(self._positions[version_id])
@@ -0,0 +1,90 @@
+"""
+Compiled planning presets
+
+Environment templates and workload presets from data/catalog.json are
+turned into frozen objects once when the catalog loads. Planning requests
+then read plain attributes instead of looking up and copying dicts.
+"""
+
+from dataclasses import dataclass, replace
+from types import MappingProxyType
+from typing import Dict, Mapping, Tuple
+from src.models import WorkloadRequirements
+
+
+@dataclass(frozen=True)
+class EnvironmentPreset:
+    """Cluster shape for an environment template (poc, pilot, production)"""
+    key: str
+    name: str
+    control_plane_count: int
+    min_nodes: int
+    max_nodes: int
+    enable_auto_scaling: bool
+    enable_monitoring: bool = False
+    warnings: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_template(cls, key: str, template: Dict) -> 'EnvironmentPreset':
+        min_nodes = int(template.get('min_nodes', 1))
+        return cls(
+            key=key,
+            name=template.get('name', key),
+            control_plane_count=int(template.get('control_plane_count', 1)),
+            min_nodes=min_nodes,
+            max_nodes=max(min_nodes, int(template.get('max_nodes', min_nodes))),
+            enable_auto_scaling=bool(template.get('enable_auto_scaling', False)),
+            enable_monitoring=bool(template.get('enable_monitoring', False)),
+            warnings=tuple(template.get('warnings', ()))
+        )
+
+
+@dataclass(frozen=True)
+class WorkloadPreset:
+    """Default resource requirements for a workload type"""
+    key: str
+    name: str
+    cpu_cores: int = 0
+    memory_gb: int = 0
+    gpu_required: bool = False
+    gpu_count: int = 0
+    storage_gb: int = 0
+
+    @classmethod
+    def from_preset(cls, key: str, preset: Dict) -> 'WorkloadPreset':
+        return cls(
+            key=key,
+            name=preset.get('name', key),
+            cpu_cores=int(preset.get('cpu_cores', 0)),
+            memory_gb=int(preset.get('memory_gb', 0)),
+            gpu_required=bool(preset.get('gpu_required', False)),
+            gpu_count=int(preset.get('gpu_count', 0)),
+            storage_gb=int(preset.get('storage_gb', 0))
+        )
+
+    def apply(self, workload: WorkloadRequirements) -> WorkloadRequirements:
+        """Fill in preset sizing when the workload specifies no CPU or memory"""
+        if workload.cpu_cores or workload.memory_gb:
+            return workload
+        return replace(
+            workload,
+            cpu_cores=self.cpu_cores,
+            memory_gb=self.memory_gb,
+            gpu_required=workload.gpu_required or self.gpu_required,
+            gpu_count=workload.gpu_count or self.gpu_count,
+            storage_gb=workload.storage_gb or self.storage_gb
+        )
+
+
+def compile_environment_presets(templates: Dict[str, Dict]) -> Mapping[str, EnvironmentPreset]:
+    """Compile the environment_templates section into a read-only mapping"""
+    return MappingProxyType({
+        key: EnvironmentPreset.from_template(key, template) for key, template in templates.items()
+    })
+
+
+def compile_workload_presets(presets: Dict[str, Dict]) -> Mapping[str, WorkloadPreset]:
+    """Compile the workload_presets section into a read-only mapping"""
+    return MappingProxyType({
+        key: WorkloadPreset.from_preset(key, preset) for key, preset in presets.items()
+    })
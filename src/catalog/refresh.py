@@ -0,0 +1,232 @@
+"""
+Concurrent, conditional catalog refresh pipeline
+
+Each catalog section (Kubernetes versions, OS images, VM SKUs) is fetched
+from a pluggable source in parallel. Sources answer conditional requests
+(ETag / If-Modified-Since), so unchanged sections cost a round trip and no
+parsing, and refresh time is bounded by the slowest section.
+"""
+
+import copy
+import json
+import queue
+import time
+import http.client
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+import logging
+
+logger = logging.getLogger(__name__)
+
+SECTIONS = ('kubernetes_versions', 'os_images', 'vm_skus')
+
+CHANGED = 'changed'
+UNCHANGED = 'unchanged'
+FAILED = 'failed'
+
+
+@dataclass
+class SectionResult:
+    """Outcome of fetching one catalog section"""
+    section: str
+    status: str
+    data: Any = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+
+@dataclass
+class RefreshReport:
+    """Summary of a refresh run"""
+    results: List[SectionResult] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def changed(self) -> List[str]:
+        return [r.section for r in self.results if r.status == CHANGED]
+
+    @property
+    def unchanged(self) -> List[str]:
+        return [r.section for r in self.results if r.status == UNCHANGED]
+
+    @property
+    def failed(self) -> List[str]:
+        return [r.section for r in self.results if r.status == FAILED]
+
+
+class CatalogSource(ABC):
+    """Source of catalog sections; subclasses implement fetch()"""
+
+    @abstractmethod
+    def fetch(self, section: str, etag: Optional[str] = None,
+              last_modified: Optional[str] = None) -> SectionResult:
+        """Fetch a section, returning UNCHANGED if the validators still match"""
+
+    def close(self) -> None:
+        """Release any pooled resources"""
+
+
+class _ConnectionPool:
+    """Keep-alive HTTP connections to a single host, shared across threads"""
+
+    def __init__(self, scheme: str, host: str, port: Optional[int], size: int, timeout: float):
+        self._factory = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        self._host = host
+        self._port = port
+        self._timeout = timeout
+        self._idle: queue.LifoQueue = queue.LifoQueue(maxsize=size)
+
+    def connect(self) -> http.client.HTTPConnection:
+        return self._factory(self._host, self._port, timeout=self._timeout)
+
+    def acquire(self) -> http.client.HTTPConnection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self.connect()
+
+    def release(self, conn: http.client.HTTPConnection) -> None:
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class HTTPCatalogSource(CatalogSource):
+    """
+    Fetches sections as JSON from <base_url>/<section> over pooled connections.
+
+    Responses should carry ETag and/or Last-Modified headers; the validators
+    are sent back on the next refresh and a 304 marks the section unchanged.
+    """
+
+    def __init__(self, base_url: str, timeout: float = 10.0, pool_size: int = len(SECTIONS)):
+        parts = urlsplit(base_url)
+        self.base_path = parts.path.rstrip('/')
+        self._pool = _ConnectionPool(parts.scheme, parts.hostname, parts.port, pool_size, timeout)
+
+    def fetch(self, section: str, etag: Optional[str] = None,
+              last_modified: Optional[str] = None) -> SectionResult:
+        headers = {'Accept': 'application/json'}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        # A pooled keep-alive connection may have been closed by the server
+        # since its last use, so retry once on a fresh connection
+        for attempt in range(2):
+            conn = self._pool.acquire() if attempt == 0 else self._pool.connect()
+            try:
+                conn.request('GET', f"{self.base_path}/{section}", headers=headers)
+                response = conn.getresponse()
+                body = response.read()
+                break
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                if attempt == 1:
+                    return SectionResult(section, FAILED, error=str(e))
+
+        if response.will_close:
+            conn.close()
+        else:
+            self._pool.release(conn)
+
+        new_etag = response.getheader('ETag') or etag
+        new_modified = response.getheader('Last-Modified') or last_modified
+        if response.status == 304:
+            return SectionResult(section, UNCHANGED, etag=new_etag, last_modified=new_modified)
+        if response.status != 200:
+            return SectionResult(section, FAILED, error=f"HTTP {response.status}")
+        try:
+            data = json.loads(body)
+        except ValueError as e:
+            return SectionResult(section, FAILED, error=f"Invalid JSON: {e}")
+        return SectionResult(section, CHANGED, data=data, etag=new_etag, last_modified=new_modified)
+
+    def close(self) -> None:
+        self._pool.close()
+
+
+def merge_section(current: Any, incoming: Any) -> Any:
+    """
+    Merge a fetched section into the current one.
+
+    Dict sections (os_images, vm_skus) are merged per category so a source
+    may return only the categories it knows about; anything else is replaced.
+    """
+    if isinstance(current, dict) and isinstance(incoming, dict):
+        merged = dict(current)
+        merged.update(incoming)
+        return merged
+    return incoming
+
+
+class RefreshPipeline:
+    """Fetches all sections concurrently and merges the changed ones"""
+
+    def __init__(self, source: CatalogSource, sections: Sequence[str] = SECTIONS,
+                 max_workers: Optional[int] = None):
+        self.source = source
+        self.sections = tuple(sections)
+        self.max_workers = max_workers or len(self.sections)
+
+    def _fetch(self, section: str, validators: Dict[str, str]) -> SectionResult:
+        start = time.perf_counter()
+        try:
+            result = self.source.fetch(section, validators.get('etag'), validators.get('last_modified'))
+        except Exception as e:
+            result = SectionResult(section, FAILED, error=str(e))
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def run(self, catalog_data: Dict) -> Tuple[Dict, RefreshReport]:
+        """
+        Refresh a catalog.
+
+        Args:
+            catalog_data: Current catalog; left untouched
+
+        Returns:
+            (new catalog data, RefreshReport). The new catalog shares no
+            mutable state with the input.
+        """
+        start = time.perf_counter()
+        sources = catalog_data.get('metadata', {}).get('sources', {})
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [
+                pool.submit(self._fetch, section, sources.get(section, {}))
+                for section in self.sections
+            ]
+            results = [future.result() for future in futures]
+
+        updated = copy.deepcopy(catalog_data)
+        metadata = updated.setdefault('metadata', {})
+        new_sources = metadata.setdefault('sources', {})
+        for result in results:
+            if result.status == FAILED:
+                logger.warning(f"Refresh of {result.section} failed: {result.error}")
+                continue
+            if result.status == CHANGED:
+                updated[result.section] = merge_section(updated.get(result.section), result.data)
+                logger.info(f"Catalog section {result.section} changed")
+            validators = {}
+            if result.etag:
+                validators['etag'] = result.etag
+            if result.last_modified:
+                validators['last_modified'] = result.last_modified
+            new_sources[result.section] = validators
+
+        return updated, RefreshReport(results=results, elapsed=time.perf_counter() - start)
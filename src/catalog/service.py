@@ -3,11 +3,19 @@ Catalog service for AKS versions, OS images, and VM SKUs
 """
 
 import os
+import json
+import tempfile
 import yaml
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Mapping, Optional
 from pathlib import Path
 import logging
+from src import metrics
+from src.catalog.refresh import CatalogSource, HTTPCatalogSource, RefreshPipeline, RefreshReport
+from src.catalog.history import CatalogHistory, catalog_digest
+from src.catalog.presets import (
+    EnvironmentPreset, WorkloadPreset, compile_environment_presets, compile_workload_presets
+)
 
 logger = logging.getLogger(__name__)
 
@@ -18,25 +26,97 @@ class CatalogService:
     Supports refresh from Azure APIs and local cache fallback.
     """
     
-    def __init__(self, catalog_path: Optional[str] = None):
-        """Initialize catalog service with optional custom path"""
+    def __init__(
+        self,
+        catalog_path: Optional[str] = None,
+        presets_path: Optional[str] = None,
+        source: Optional[CatalogSource] = None,
+        history_path: Optional[str] = None
+    ):
+        """
+        Initialize catalog service with optional custom paths and refresh source.
+        
+        Every saved catalog is recorded in a version history stored next to
+        the catalog file (catalog/history by default).
+        """
         if catalog_path is None:
             catalog_path = Path(__file__).parent.parent.parent / "catalog" / "skus.yaml"
+        if presets_path is None:
+            presets_path = Path(__file__).parent.parent.parent / "data" / "catalog.json"
         self.catalog_path = Path(catalog_path)
+        self.presets_path = Path(presets_path)
         self.catalog_data: Optional[Dict] = None
+        self.presets_data: Dict = {}
+        self.environment_presets: Mapping[str, EnvironmentPreset] = {}
+        self.workload_preset_objects: Mapping[str, WorkloadPreset] = {}
         self.last_refresh: Optional[datetime] = None
+        self.last_refresh_report: Optional[RefreshReport] = None
+        if source is None and os.environ.get('AKSARC_CATALOG_URL'):
+            source = HTTPCatalogSource(os.environ['AKSARC_CATALOG_URL'])
+        self.source = source
+        if history_path is None:
+            history_path = self.catalog_path.parent / "history"
+        self.history: Optional[CatalogHistory] = CatalogHistory(history_path)
+        self._version_id: Optional[str] = None
+        self._sku_index: Optional[Dict[str, Dict]] = None
+        self._snapshots: Dict[str, 'CatalogService'] = {}
         self._load_catalog()
+        self._load_presets()
+    
+    @classmethod
+    def from_data(cls, catalog_data: Dict, presets_data: Optional[Dict] = None) -> 'CatalogService':
+        """Build a read-only service around in-memory catalog data (no file access)"""
+        service = cls.__new__(cls)
+        service.catalog_path = None
+        service.presets_path = None
+        service.catalog_data = catalog_data
+        service.presets_data = presets_data or {}
+        service._compile_presets()
+        service.last_refresh = None
+        service.last_refresh_report = None
+        service.source = None
+        service.history = None
+        service._version_id = None
+        service._sku_index = None
+        service._snapshots = {}
+        service._parse_last_updated()
+        return service
     
+    def replace_data(self, catalog_data: Dict, presets_data: Dict) -> None:
+        """
+        Swap in catalog and preset data loaded elsewhere (e.g. a shared snapshot).
+        
+        Paths, source and history are kept, so the service can still refresh
+        and save; derived indexes are rebuilt on next use.
+        """
+        self.catalog_data = catalog_data
+        self.presets_data = presets_data
+        self._compile_presets()
+        self._version_id = None
+        self._sku_index = None
+        self._snapshots = {}
+        self._parse_last_updated()
+    
+    def warm(self) -> None:
+        """Build lazily derived indexes now (e.g. before forking workers)"""
+        self.get_vm_sku('')
+        _ = self.version_id
+    
+    def _parse_last_updated(self) -> None:
+        """Set last_refresh from the catalog metadata"""
+        if self.catalog_data and 'metadata' in self.catalog_data:
+            last_updated_str = self.catalog_data['metadata'].get('last_updated')
+            if last_updated_str:
+                self.last_refresh = datetime.fromisoformat(str(last_updated_str))
+    
+    @metrics.timed('catalog.load')
     def _load_catalog(self) -> None:
         """Load catalog from YAML file"""
         try:
             if self.catalog_path.exists():
                 with open(self.catalog_path, 'r') as f:
                     self.catalog_data = yaml.safe_load(f)
-                    if self.catalog_data and 'metadata' in self.catalog_data:
-                        last_updated_str = self.catalog_data['metadata'].get('last_updated')
-                        if last_updated_str:
-                            self.last_refresh = datetime.fromisoformat(last_updated_str)
+                    self._parse_last_updated()
                 logger.info(f"Loaded catalog from {self.catalog_path}")
             else:
                 logger.warning(f"Catalog file not found at {self.catalog_path}")
@@ -46,15 +126,55 @@ class CatalogService:
             logger.error(f"Error loading catalog: {e}")
             self.catalog_data = self._default_catalog()
     
+    def _load_presets(self) -> None:
+        """Load workload presets and templates from the web catalog JSON"""
+        try:
+            if self.presets_path.exists():
+                with open(self.presets_path, 'r', encoding='utf-8') as f:
+                    self.presets_data = json.load(f)
+                logger.info(f"Loaded presets from {self.presets_path}")
+            else:
+                logger.warning(f"Presets file not found at {self.presets_path}")
+                self.presets_data = {}
+        except Exception as e:
+            logger.error(f"Error loading presets: {e}")
+            self.presets_data = {}
+        self._compile_presets()
+    
+    def _compile_presets(self) -> None:
+        """Precompile environment templates and workload presets into frozen objects"""
+        self.environment_presets = compile_environment_presets(
+            self.presets_data.get('environment_templates', {})
+        )
+        self.workload_preset_objects = compile_workload_presets(
+            self.presets_data.get('workload_presets', {})
+        )
+    
     def _save_catalog(self) -> None:
-        """Save catalog to YAML file"""
+        """Save catalog to YAML file atomically (write temp file, then rename)"""
+        if self.catalog_path is None:
+            return
+        self._version_id = None
+        self._sku_index = None
+        tmp_path = None
         try:
             self.catalog_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.catalog_path, 'w') as f:
+            fd, tmp_path = tempfile.mkstemp(
+                dir=self.catalog_path.parent, prefix=f".{self.catalog_path.name}.", suffix='.tmp'
+            )
+            with os.fdopen(fd, 'w') as f:
                 yaml.dump(self.catalog_data, f, default_flow_style=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.catalog_path)
+            tmp_path = None
             logger.info(f"Saved catalog to {self.catalog_path}")
+            self.record_version()
         except Exception as e:
             logger.error(f"Error saving catalog: {e}")
+        finally:
+            if tmp_path and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
     
     def _default_catalog(self) -> Dict:
         """Return default catalog structure for Azure Local 2511"""
@@ -118,12 +238,47 @@ class CatalogService:
             return self.catalog_data['vm_skus'].get(category, [])
         return []
     
+    def get_vm_sku(self, name: str) -> Optional[Dict]:
+        """Look up a VM SKU by name across all categories"""
+        if self._sku_index is None:
+            index: Dict[str, Dict] = {}
+            for skus in (self.catalog_data or {}).get('vm_skus', {}).values():
+                for sku in skus:
+                    index.setdefault(sku['name'], sku)
+            self._sku_index = index
+        return self._sku_index.get(name)
+    
     def get_limits(self) -> Dict:
         """Get Azure Local 2511 limits"""
         if self.catalog_data:
             return self.catalog_data.get('limits', {})
         return {}
     
+    def get_workload_presets(self) -> Dict[str, Dict]:
+        """Get workload presets keyed by workload type (e.g. 'video-analytics')"""
+        return self.presets_data.get('workload_presets', {})
+    
+    def get_environment_preset(self, name: str) -> EnvironmentPreset:
+        """
+        Get a compiled environment template (e.g. 'poc', 'pilot', 'production').
+        
+        Raises:
+            ValueError: If the template does not exist
+        """
+        preset = self.environment_presets.get(name)
+        if preset is None:
+            available = ', '.join(sorted(self.environment_presets)) or 'none'
+            raise ValueError(f"Unknown environment template '{name}' (available: {available})")
+        return preset
+    
+    def get_workload_preset(self, workload_type: str) -> Optional[WorkloadPreset]:
+        """Get the compiled preset for a workload type, if the catalog defines one"""
+        return self.workload_preset_objects.get(workload_type)
+    
+    def get_arc_extensions(self) -> Dict[str, Dict]:
+        """Get Arc extension definitions keyed by extension ID"""
+        return self.presets_data.get('arc_extensions', {})
+    
     def is_outdated(self, days: int = 30) -> bool:
         """Check if catalog is older than specified days"""
         if self.last_refresh is None:
@@ -131,33 +286,88 @@ class CatalogService:
         age = datetime.now() - self.last_refresh
         return age > timedelta(days=days)
     
-    def refresh(self) -> bool:
+    @metrics.timed('catalog.refresh')
+    def refresh(self, source: Optional[CatalogSource] = None) -> bool:
         """
-        Refresh catalog from Azure APIs.
-        TODO: Implement actual Azure API calls
+        Refresh catalog sections from a source.
+        
+        Sections are fetched concurrently with conditional requests. Changed
+        sections are merged and the catalog is written once. When nothing
+        changed, or no source is configured, the catalog file and version
+        history are left alone.
+        
+        Args:
+            source: Source to refresh from (defaults to the service's source)
         """
+        source = source or self.source
         try:
-            # Placeholder for Azure API integration
-            # In production, this would call Azure CLI or SDK to get latest data
-            logger.info("Refreshing catalog from Azure APIs...")
-            
-            # For now, just update the timestamp
-            if self.catalog_data and 'metadata' in self.catalog_data:
-                self.catalog_data['metadata']['last_updated'] = datetime.now().isoformat()
-                self.last_refresh = datetime.now()
-                self._save_catalog()
+            if self.catalog_data is None:
+                return False
+            if source is None:
+                logger.info("No catalog source configured; nothing to refresh")
                 return True
             
-            return False
+            logger.info("Refreshing catalog from Azure APIs...")
+            updated, report = RefreshPipeline(source).run(self.catalog_data)
+            self.last_refresh_report = report
+            if report.failed and not (report.changed or report.unchanged):
+                return False
+            self.last_refresh = datetime.now()
+            if report.changed:
+                # Keep the predecessor so plans made against it stay reproducible
+                self.record_version()
+                updated['metadata']['last_updated'] = self.last_refresh.isoformat()
+                self.catalog_data = updated
+                self._save_catalog()
+            logger.info(
+                f"Refresh finished in {report.elapsed:.2f}s: changed={report.changed} "
+                f"unchanged={report.unchanged} failed={report.failed}"
+            )
+            return not report.failed
         except Exception as e:
             logger.error(f"Error refreshing catalog: {e}")
             return False
     
+    @property
+    def version_id(self) -> Optional[str]:
+        """Content-derived ID of the loaded catalog"""
+        if self._version_id is None and self.catalog_data is not None:
+            self._version_id = catalog_digest(self.catalog_data)
+        return self._version_id
+    
+    def record_version(self) -> Optional[str]:
+        """Record the loaded catalog in the version history"""
+        if self.history is None or self.catalog_data is None:
+            return None
+        try:
+            return self.history.append(self.catalog_data)
+        except Exception as e:
+            logger.error(f"Error recording catalog version: {e}")
+            return None
+    
+    def at_version(self, version_id: str) -> 'CatalogService':
+        """
+        Get a read-only catalog pinned to a historical version.
+        
+        Raises:
+            KeyError: If the version is not in the history
+        """
+        if version_id == self.version_id:
+            return self
+        snapshot = self._snapshots.get(version_id)
+        if snapshot is None:
+            if self.history is None:
+                raise KeyError(f"Unknown catalog version: {version_id}")
+            snapshot = CatalogService.from_data(self.history.load(version_id), self.presets_data)
+            self._snapshots[version_id] = snapshot
+        return snapshot
+    
     def get_catalog_info(self) -> Dict:
         """Get catalog metadata and status"""
         return {
             'last_updated': self.last_refresh.isoformat() if self.last_refresh else None,
             'is_outdated': self.is_outdated(),
             'version': self.catalog_data.get('metadata', {}).get('version') if self.catalog_data else None,
-            'target': self.catalog_data.get('metadata', {}).get('target') if self.catalog_data else None
+            'target': self.catalog_data.get('metadata', {}).get('target') if self.catalog_data else None,
+            'version_id': self.version_id
         }
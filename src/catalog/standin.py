@@ -0,0 +1,118 @@
+"""
+Local HTTP stand-in for the catalog refresh source
+
+Serves catalog sections as JSON at /<section> with ETag and Last-Modified
+validators and honours conditional requests, so the refresh pipeline can be
+exercised without Azure access.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self) -> None:
+        server: 'StandInCatalogServer' = self.server.owner
+        server.request_count += 1
+        section = self.path.strip('/').split('/')[-1]
+        entry = server.get_entry(section)
+        if entry is None:
+            self._send(404, b'{"error": "unknown section"}')
+            return
+
+        if server.delay:
+            time.sleep(server.delay)
+
+        body, etag, modified, modified_ts = entry
+        if_none_match = self.headers.get('If-None-Match')
+        if_modified_since = self.headers.get('If-Modified-Since')
+        not_modified = False
+        if if_none_match is not None:
+            not_modified = if_none_match == etag
+        elif if_modified_since is not None:
+            try:
+                not_modified = parsedate_to_datetime(if_modified_since).timestamp() >= int(modified_ts)
+            except (TypeError, ValueError):
+                not_modified = False
+
+        headers = {'ETag': etag, 'Last-Modified': modified}
+        if not_modified:
+            self._send(304, b'', headers)
+        else:
+            self._send(200, body, headers)
+
+    def _send(self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class StandInCatalogServer:
+    """
+    In-process HTTP server publishing catalog sections.
+
+    Args:
+        sections: Initial section payloads keyed by section name
+        delay: Artificial per-request latency in seconds
+    """
+
+    def __init__(self, sections: Dict[str, Any], delay: float = 0.0,
+                 host: str = '127.0.0.1', port: int = 0):
+        self.delay = delay
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._entries: Dict[str, tuple] = {}
+        for name, data in sections.items():
+            self.update(name, data)
+        self._httpd = ThreadingHTTPServer((host, port), _StandInHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.owner = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def update(self, section: str, data: Any) -> None:
+        """Publish a new payload for a section, changing its validators"""
+        body = json.dumps(data, sort_keys=True).encode('utf-8')
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        now = time.time()
+        with self._lock:
+            self._entries[section] = (body, etag, formatdate(now, usegmt=True), now)
+
+    def get_entry(self, section: str) -> Optional[tuple]:
+        with self._lock:
+            return self._entries.get(section)
+
+    def start(self) -> 'StandInCatalogServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> 'StandInCatalogServer':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
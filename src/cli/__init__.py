@@ -2,6 +2,13 @@
 CLI module for AKS Arc deployment tool
 """
 
-from .main import cli
-
 __all__ = ['cli']
+
+
+def __getattr__(name):
+    # Resolve the click group on first use so importing src.cli.daemon
+    # (the daemon client) does not pay for click and the CLI commands
+    if name == 'cli':
+        from .main import cli
+        return cli
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,244 @@
+"""
+Streaming JSONL plan and export pipeline for the CLI
+
+Records flow one at a time from the input file through planning and
+template generation to the output, so memory stays bounded by a single
+plan regardless of fleet size.
+"""
+
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Output file name per export format, written under <out-dir>/<cluster_name>/
+EXPORT_FILENAMES = {
+    'bicep': 'main.bicep',
+    'arm': 'azuredeploy.json',
+    'terraform': 'main.tf'
+}
+
+DEFAULT_BUFFER_SIZE = 1 << 20
+
+
+@dataclass
+class BulkStats:
+    """Throughput counters for a bulk run"""
+    records: int = 0
+    files_written: int = 0
+    bytes_written: int = 0
+    errors: List[str] = field(default_factory=list)
+    started: float = field(default_factory=time.perf_counter)
+    finished: Optional[float] = None
+    sync: Optional[Any] = None  # SyncStats when the export was synced
+
+    @property
+    def elapsed(self) -> float:
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return end - self.started
+
+    @property
+    def plans_per_sec(self) -> float:
+        return self.records / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        """One-line human readable throughput summary"""
+        text = (
+            f"{self.records} plans in {self.elapsed:.2f}s "
+            f"({self.plans_per_sec:.1f} plans/sec), "
+            f"{self.bytes_written} bytes written"
+        )
+        if self.files_written:
+            text += f" to {self.files_written} files"
+        if self.sync is not None:
+            text += f" ({self.sync.summary()})"
+        if self.errors:
+            text += f", {len(self.errors)} errors"
+        return text
+
+
+def _skip(errors: List[str], line_no: int, error: Exception) -> None:
+    errors.append(f"line {line_no}: {error}")
+    logger.warning(f"Skipping line {line_no}: {error}")
+
+
+def iter_jsonl(path: Path, errors: Optional[List[str]] = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Yield (line number, record) for each non-blank line of a JSONL file.
+
+    Lines that are not valid JSON raise, or are reported in errors and
+    skipped when an errors list is given.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                if errors is None:
+                    raise
+                _skip(errors, line_no, e)
+                continue
+            yield line_no, record
+
+
+def plan_record(planner, record: Dict[str, Any]):
+    """
+    Plan one workload record.
+
+    Records carry cluster fields at the top level and workload fields either
+    nested under 'workload' or inline next to them.
+    """
+    from src.models import workload_from_dict
+
+    return planner.create_plan(
+        workload=workload_from_dict(record.get('workload', record)),
+        cluster_name=record['cluster_name'],
+        resource_group=record['resource_group'],
+        location=record.get('location', 'eastus'),
+        custom_location=record['custom_location'],
+        enable_rack_awareness=record.get('enable_rack_awareness', True),
+        rack_count=record.get('rack_count'),
+        catalog_version=record.get('catalog_version'),
+        extensions=record.get('extensions'),
+        environment=record.get('environment')
+    )
+
+
+def run_bulk_plan(
+    input_path: Path,
+    output_path: Path,
+    planner,
+    buffer_size: int = DEFAULT_BUFFER_SIZE
+) -> BulkStats:
+    """
+    Plan every workload in a JSONL file and write one plan per line.
+
+    Args:
+        input_path: JSONL file of workload records
+        output_path: JSONL file to write serialized plans to
+        planner: Planner used for every record
+        buffer_size: Write buffer size in bytes
+
+    Returns:
+        BulkStats for the run
+    """
+    from src.models import plan_to_dict
+
+    stats = BulkStats()
+    with open(output_path, 'wb', buffering=buffer_size) as out:
+        for line_no, record in iter_jsonl(Path(input_path), stats.errors):
+            try:
+                plan = plan_record(planner, record)
+            except (KeyError, ValueError, TypeError) as e:
+                _skip(stats.errors, line_no, e)
+                continue
+            data = json.dumps(plan_to_dict(plan), separators=(',', ':')).encode('utf-8') + b'\n'
+            out.write(data)
+            stats.records += 1
+            stats.bytes_written += len(data)
+    stats.finished = time.perf_counter()
+    return stats
+
+
+def iter_plans(
+    input_path: Path,
+    planner_factory: Optional[Callable[[], Any]] = None,
+    errors: Optional[List[str]] = None
+) -> Iterator[Tuple[int, Any]]:
+    """
+    Yield deployment plans from a JSONL file.
+
+    Lines holding serialized plans are rebuilt as-is; workload records are
+    planned on the fly with a planner built by planner_factory on first use.
+    When an errors list is given, bad records are reported in it and
+    skipped, as in run_bulk_plan; otherwise the first one raises.
+    """
+    from src.models import plan_from_dict
+
+    planner = None
+    for line_no, record in iter_jsonl(Path(input_path), errors):
+        if 'cluster_config' not in record and planner is None:
+            if planner_factory is None:
+                raise ValueError(f"line {line_no}: workload record requires a planner")
+            planner = planner_factory()
+        try:
+            if 'cluster_config' in record:
+                plan = plan_from_dict(record)
+            else:
+                plan = plan_record(planner, record)
+        except (KeyError, ValueError, TypeError, AttributeError) as e:
+            if errors is None:
+                raise
+            _skip(errors, line_no, e)
+            continue
+        yield line_no, plan
+
+
+def run_bulk_export(
+    plans: Iterable[Tuple[int, Any]],
+    out_dir: Path,
+    formats: List[str],
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    sync: bool = False,
+    errors: Optional[List[str]] = None
+) -> BulkStats:
+    """
+    Render each plan in the requested formats under out_dir/<cluster_name>/.
+
+    Args:
+        plans: (line number, DeploymentPlan) pairs, typically from iter_plans
+        out_dir: Root output directory
+        formats: Export formats (bicep, arm, terraform)
+        buffer_size: Write buffer size in bytes
+        sync: Only rewrite changed files and delete files of clusters no
+            longer exported (see SyncWriter)
+        errors: The errors list given to iter_plans. Skipped records are
+            reported in the stats, and a sync run with skipped records
+            does not delete anything
+
+    Returns:
+        BulkStats for the run
+    """
+    from src.generator import BicepGenerator, ARMGenerator, TerraformGenerator
+    from src.generator.sync import SyncWriter
+
+    available = {'bicep': BicepGenerator, 'arm': ARMGenerator, 'terraform': TerraformGenerator}
+    unknown = [fmt for fmt in formats if fmt not in available]
+    if unknown:
+        raise ValueError(f"Unknown export formats: {', '.join(unknown)}")
+    generators = [(available[fmt](), EXPORT_FILENAMES[fmt]) for fmt in formats]
+
+    out_dir = Path(out_dir)
+    stats = BulkStats(errors=errors if errors is not None else [])
+    writer = SyncWriter(out_dir) if sync else None
+    try:
+        for line_no, plan in plans:
+            name = plan.cluster_config.cluster_name
+            if writer is None:
+                (out_dir / name).mkdir(parents=True, exist_ok=True)
+            for generator, filename in generators:
+                data = generator.generate(plan).encode('utf-8')
+                if writer is not None:
+                    if not writer.write(f"{name}/{filename}", data):
+                        continue
+                else:
+                    with open(out_dir / name / filename, 'wb', buffering=buffer_size) as f:
+                        f.write(data)
+                stats.files_written += 1
+                stats.bytes_written += len(data)
+            stats.records += 1
+    except BaseException:
+        if writer is not None:
+            writer.finish(prune=False)
+        raise
+    if writer is not None:
+        # A skipped record's cluster is not orphaned, so keep its files
+        stats.sync = writer.finish(prune=not stats.errors)
+    stats.finished = time.perf_counter()
+    return stats
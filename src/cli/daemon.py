@@ -0,0 +1,137 @@
+"""
+Warm planning daemon for the CLI
+
+Keeps a loaded CatalogService and Planner behind a Unix socket so repeated
+CLI invocations skip catalog parsing and heavy imports. The client side of
+this module only depends on the standard library so that talking to the
+daemon stays cheap.
+"""
+
+import os
+import json
+import socket
+import socketserver
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+SOCKET_ENV_VAR = 'AKSARC_DAEMON_SOCKET'
+
+
+class DaemonUnavailable(ConnectionError):
+    """Raised when no daemon is listening on the socket"""
+
+
+def default_socket_path() -> Path:
+    """Socket path from AKSARC_DAEMON_SOCKET, or a per-user temp path"""
+    env_path = os.environ.get(SOCKET_ENV_VAR)
+    if env_path:
+        return Path(env_path)
+    uid = os.getuid() if hasattr(os, 'getuid') else 0
+    return Path(tempfile.gettempdir()) / f"aksarc-{uid}.sock"
+
+
+def request(op: str, args: Optional[Dict[str, Any]] = None,
+            socket_path: Optional[Path] = None, timeout: float = 30.0) -> Dict[str, Any]:
+    """
+    Send one request to the daemon and return its decoded response.
+
+    Raises:
+        DaemonUnavailable: If the socket is missing or nobody is listening
+    """
+    path = Path(socket_path) if socket_path else default_socket_path()
+    if not path.exists():
+        raise DaemonUnavailable(f"No daemon socket at {path}")
+
+    payload = json.dumps({'op': op, 'args': args or {}}).encode('utf-8') + b'\n'
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(path))
+            sock.sendall(payload)
+            with sock.makefile('rb') as stream:
+                line = stream.readline()
+    except (ConnectionRefusedError, FileNotFoundError) as e:
+        raise DaemonUnavailable(f"Daemon not listening on {path}: {e}") from e
+
+    if not line:
+        raise DaemonUnavailable(f"Daemon on {path} closed the connection")
+    return json.loads(line)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Handles newline-delimited JSON requests"""
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                message = json.loads(line)
+                response = self.server.dispatch(message.get('op'), message.get('args') or {})
+            except Exception as e:
+                logger.error(f"Daemon request failed: {e}")
+                response = {'ok': False, 'error': str(e)}
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+class PlanningDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server holding a warm catalog and planner"""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: Optional[Path] = None, catalog_path: Optional[str] = None):
+        from src.catalog import CatalogService
+        from src.planner import Planner
+
+        self.socket_path = Path(socket_path) if socket_path else default_socket_path()
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+        self.catalog = CatalogService(catalog_path)
+        self.planner = Planner(self.catalog)
+        self._lock = threading.Lock()
+        super().__init__(str(self.socket_path), _RequestHandler)
+
+    def dispatch(self, op: Optional[str], args: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute one operation against the warm services"""
+        from src.models import plan_to_dict, workload_from_dict
+
+        if op == 'ping':
+            return {'ok': True, 'pid': os.getpid()}
+        if op == 'plan':
+            plan = self.planner.create_plan(
+                workload=workload_from_dict(args['workload']),
+                cluster_name=args['cluster_name'],
+                resource_group=args['resource_group'],
+                location=args['location'],
+                custom_location=args['custom_location'],
+                enable_rack_awareness=args.get('enable_rack_awareness', True),
+                rack_count=args.get('rack_count'),
+                catalog_version=args.get('catalog_version'),
+                extensions=args.get('extensions'),
+                environment=args.get('environment')
+            )
+            return {'ok': True, 'plan': plan_to_dict(plan)}
+        if op == 'catalog_info':
+            return {'ok': True, 'info': self.catalog.get_catalog_info()}
+        if op == 'reload':
+            from src.catalog import CatalogService
+            from src.planner import Planner
+            with self._lock:
+                self.catalog = CatalogService(str(self.catalog.catalog_path))
+                self.planner = Planner(self.catalog)
+            return {'ok': True, 'info': self.catalog.get_catalog_info()}
+        if op == 'shutdown':
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {'ok': True}
+        return {'ok': False, 'error': f"Unknown operation: {op}"}
+
+    def server_close(self) -> None:
+        super().server_close()
+        if self.socket_path.exists():
+            self.socket_path.unlink()
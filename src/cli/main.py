@@ -3,19 +3,42 @@ CLI interface for AKS Arc deployment tool
 """
 
 import click
-import json
-from pathlib import Path
-from src.catalog import CatalogService
-from src.planner import Planner
-from src.models import WorkloadRequirements, WorkloadType
-from src.generator import BicepGenerator, ARMGenerator, TerraformGenerator
+
+# Heavy imports (yaml, catalog, planner, generators) are deferred to the
+# commands that need them, so short-lived invocations start quickly.
 
 
 @click.group()
 @click.version_option(version='0.1.0')
-def cli():
+@click.option('--metrics-json', type=click.Path(dir_okay=False),
+              help='Write stage timings and counters to a JSON file')
+@click.option('--profile', type=click.Choice(['cprofile', 'sample']),
+              help='Profile the command and print the report to stderr')
+@click.pass_context
+def cli(ctx, metrics_json, profile):
     """AKS Arc Deployment Tool CLI"""
-    pass
+    if not (metrics_json or profile):
+        return
+    
+    from src import metrics
+    
+    if metrics_json:
+        sink = metrics.InMemorySink()
+        metrics.set_sink(sink)
+        
+        def dump_metrics():
+            import json
+            from pathlib import Path
+            Path(metrics_json).write_text(json.dumps(sink.snapshot(), indent=2))
+        
+        ctx.call_on_close(dump_metrics)
+    
+    if profile:
+        # Close callbacks run last-in first-out, so registering the printer
+        # before entering the profiler prints the report after it is filled in
+        holder = {}
+        ctx.call_on_close(lambda: click.echo(holder['report'].text, err=True))
+        holder['report'] = ctx.with_resource(metrics.profile(profile))
 
 
 @cli.command()
@@ -24,35 +47,120 @@ def cli():
 @click.option('--cpu', type=int, default=8, help='CPU cores required')
 @click.option('--memory', type=int, default=32, help='Memory in GB')
 @click.option('--gpu/--no-gpu', default=False, help='Require GPU')
-@click.option('--cluster-name', required=True, help='Name of the AKS cluster')
-@click.option('--resource-group', required=True, help='Azure resource group')
+@click.option('--gpu-count', type=int, default=0, help='GPU pods to run (implies --gpu)')
+@click.option('--gpu-model', help='Only use GPU SKUs with this GPU model (e.g. A2, T4)')
+@click.option('--gpu-sharing', type=click.Choice(['time-slicing', 'fractional']),
+              help='Share GPUs between pods instead of one pod per GPU')
+@click.option('--gpu-sharing-ratio', type=float,
+              help='Pods per GPU with time-slicing, or the GPU fraction per pod with fractional sharing')
+@click.option('--cameras', type=int, help='Camera count (video-analytics sizing)')
+@click.option('--fps', type=int, help='Frames per second per camera')
+@click.option('--retention-days', type=int, help='Recording retention in days')
+@click.option('--cluster-name', help='Name of the AKS cluster')
+@click.option('--resource-group', help='Azure resource group')
 @click.option('--location', default='eastus', help='Azure region')
-@click.option('--custom-location', required=True, help='Azure Arc custom location')
-@click.option('--output', type=click.Path(), help='Output file path')
-def plan(workload, cpu, memory, gpu, cluster_name, resource_group, location, custom_location, output):
+@click.option('--custom-location', help='Azure Arc custom location')
+@click.option('--input', 'input_path', type=click.Path(exists=True, dir_okay=False),
+              help='JSONL file of workload records to plan in bulk')
+@click.option('--output', type=click.Path(), help='Output file path (JSONL with --input)')
+@click.option('--catalog-version', help='Plan against a historical catalog version ID')
+@click.option('--extension', 'extensions', multiple=True,
+              help='Arc extension to install (repeatable); sizing includes its overhead')
+@click.option('--environment', help='Environment template (poc, pilot, production)')
+@click.option('--rack-count', type=int, help='Racks available per cluster')
+@click.option('--partition', is_flag=True,
+              help='Split workloads that exceed cluster limits across several clusters')
+@click.option('--daemon/--no-daemon', 'use_daemon', default=True,
+              help='Use a running serve-daemon if available')
+@click.option('--repository', type=click.Path(dir_okay=False),
+              help='Also store the plan(s) in this plan repository database')
+@click.option('--plan-table', type=click.Path(exists=True, dir_okay=False), envvar='AKSARC_PLAN_TABLE',
+              help='Serve requests on this precomputed plan table (see plan-table) from it')
+def plan(workload, cpu, memory, gpu, gpu_count, gpu_model, gpu_sharing, gpu_sharing_ratio, cameras, fps,
+         retention_days, cluster_name, resource_group, location, custom_location, input_path, output,
+         catalog_version, extensions, environment, rack_count, partition, use_daemon, repository, plan_table):
     """Create a deployment plan"""
+    if input_path:
+        if not output:
+            raise click.UsageError("--output is required with --input")
+        _bulk_plan(input_path, output, repository, plan_table)
+        return
+    
+    missing = [name for name, value in (('--cluster-name', cluster_name),
+                                        ('--resource-group', resource_group),
+                                        ('--custom-location', custom_location)) if not value]
+    if missing:
+        raise click.UsageError(f"Missing option(s): {', '.join(missing)}")
+    
+    from src.models import plan_from_dict
+    
     click.echo(f"Creating deployment plan for {workload}...")
     
-    # Create workload requirements
-    workload_req = WorkloadRequirements(
-        workload_type=WorkloadType(workload.replace('-', '_').lower() if workload != 'custom' else 'custom'),
-        cpu_cores=cpu,
-        memory_gb=memory,
-        gpu_required=gpu
-    )
+    workload_args = {
+        'workload_type': workload,
+        'cpu_cores': cpu,
+        'memory_gb': memory,
+        'gpu_required': gpu or gpu_count > 0,
+        'gpu_count': gpu_count,
+        'gpu_model': gpu_model,
+        'gpu_sharing': gpu_sharing,
+        'gpu_sharing_ratio': gpu_sharing_ratio,
+        'cameras': cameras,
+        'fps': fps,
+        'retention_days': retention_days
+    }
+    if partition:
+        _partitioned_plan(workload_args, cluster_name, resource_group, location, custom_location,
+                          rack_count, extensions, environment, output, repository)
+        return
     
-    # Initialize services
-    catalog = CatalogService()
-    planner = Planner(catalog)
-    
-    # Create plan
-    deployment_plan = planner.create_plan(
-        workload=workload_req,
-        cluster_name=cluster_name,
-        resource_group=resource_group,
-        location=location,
-        custom_location=custom_location
-    )
+    plan_args = {
+        'workload': workload_args,
+        'cluster_name': cluster_name,
+        'resource_group': resource_group,
+        'location': location,
+        'custom_location': custom_location,
+        'catalog_version': catalog_version,
+        'rack_count': rack_count,
+        'extensions': list(extensions),
+        'environment': environment
+    }
+    
+    deployment_plan = None
+    if use_daemon and not plan_table:
+        from src.cli.daemon import request, DaemonUnavailable
+        try:
+            response = request('plan', plan_args)
+            if response.get('ok'):
+                deployment_plan = plan_from_dict(response['plan'])
+            else:
+                click.echo(click.style(f"Daemon error: {response.get('error')}", fg='yellow'))
+        except DaemonUnavailable:
+            pass
+    
+    if deployment_plan is None:
+        from src.catalog import CatalogService
+        from src.planner import Planner, PlanTable
+        from src.models import workload_from_dict
+        
+        planner = Planner(CatalogService(), PlanTable(plan_table) if plan_table else None)
+        try:
+            deployment_plan = planner.create_plan(
+                workload=workload_from_dict(workload_args),
+                cluster_name=cluster_name,
+                resource_group=resource_group,
+                location=location,
+                custom_location=custom_location,
+                catalog_version=catalog_version,
+                rack_count=rack_count,
+                extensions=extensions,
+                environment=environment
+            )
+        except ValueError as e:
+            raise click.ClickException(str(e))
+    
+    if deployment_plan.cluster_config.extensions:
+        click.echo(f"Arc extensions (install order): {', '.join(deployment_plan.cluster_config.extensions)}")
     
     # Display validation results
     validation = deployment_plan.validation_result
@@ -73,6 +181,9 @@ def plan(workload, cpu, memory, gpu, cluster_name, resource_group, location, cus
                 click.echo(f"  - {rec}")
     
     if output:
+        import json
+        from pathlib import Path
+        
         output_path = Path(output)
         output_path.write_text(json.dumps({
             'cluster': {
@@ -92,12 +203,439 @@ def plan(workload, cpu, memory, gpu, cluster_name, resource_group, location, cus
         }, indent=2))
         click.echo(f"Plan saved to {output}")
     
+    if repository:
+        from src.repository import PlanRepository
+        
+        PlanRepository(repository).save(deployment_plan)
+        click.echo(f"Plan stored in {repository}")
+    
     click.echo(click.style("✓ Plan created successfully!", fg='green'))
 
 
+def _partitioned_plan(workload_args, cluster_name, resource_group, location, custom_location,
+                      rack_count, extensions, environment, output, repository=None):
+    """Plan a workload as one or more clusters within the catalog limits"""
+    import json
+    from src.catalog import CatalogService
+    from src.planner import Planner, ClusterPartitioner
+    from src.models import plan_to_dict, workload_from_dict
+    
+    partitioner = ClusterPartitioner(Planner(CatalogService()))
+    try:
+        plans = partitioner.partition(
+            workload=workload_from_dict(workload_args),
+            cluster_name=cluster_name,
+            resource_group=resource_group,
+            location=location,
+            custom_location=custom_location,
+            rack_count=rack_count,
+            extensions=extensions,
+            environment=environment
+        )
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    
+    for deployment_plan in plans:
+        config = deployment_plan.cluster_config
+        pools = ', '.join(f"{p.name}={p.node_count}x{p.vm_size}" for p in config.node_pools)
+        status = click.style('valid', fg='green') if deployment_plan.validation_result.is_valid \
+            else click.style('invalid', fg='red')
+        click.echo(f"  {config.cluster_name} [{status}]: {pools}")
+    
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            for deployment_plan in plans:
+                f.write(json.dumps(plan_to_dict(deployment_plan), separators=(',', ':')) + '\n')
+        click.echo(f"Plans saved to {output}")
+    if repository:
+        from src.repository import PlanRepository
+        
+        PlanRepository(repository).save_many(plans)
+        click.echo(f"Plans stored in {repository}")
+    click.echo(click.style(f"✓ Planned {len(plans)} cluster(s)", fg='green'))
+
+
+def _bulk_plan(input_path, output, repository=None, plan_table=None):
+    """Stream workload records from a JSONL file through the planner"""
+    from src.catalog import CatalogService
+    from src.planner import Planner, PlanTable
+    from src.cli.bulk import run_bulk_plan, iter_plans
+    
+    click.echo(f"Planning workloads from {input_path}...")
+    planner = Planner(CatalogService(), PlanTable(plan_table) if plan_table else None)
+    stats = run_bulk_plan(input_path, output, planner)
+    for error in stats.errors:
+        click.echo(click.style(f"  - {error}", fg='yellow'))
+    if repository:
+        from src.repository import PlanRepository
+        
+        stored = PlanRepository(repository).save_many(plan for _, plan in iter_plans(output))
+        click.echo(f"{stored} plans stored in {repository}")
+    click.echo(click.style(f"✓ {stats.summary()}", fg='green'))
+
+
+@cli.command()
+@click.option('--input', 'input_path', type=click.Path(exists=True, dir_okay=False), required=True,
+              help='JSONL file of plans (from plan --input) or workload records')
+@click.option('--format', 'formats',
+              help='Comma-separated export formats: bicep, arm, terraform (default: all; '
+                   'bicep, terraform with --fleet)')
+@click.option('--out-dir', type=click.Path(file_okay=False), required=True,
+              help='Directory to write one sub-directory per cluster into')
+@click.option('--fleet', is_flag=True,
+              help='Write one shared template per plan shape plus per-site parameter files')
+@click.option('--sync', is_flag=True,
+              help='Only rewrite changed files and delete outputs of plans no longer exported')
+def export(input_path, formats, out_dir, fleet, sync):
+    """Export templates for every plan in a JSONL file"""
+    from src.cli.bulk import run_bulk_export, iter_plans, EXPORT_FILENAMES
+    
+    if formats:
+        format_list = [fmt.strip().lower() for fmt in formats.split(',') if fmt.strip()]
+    else:
+        format_list = ['bicep', 'terraform'] if fleet else ['bicep', 'arm', 'terraform']
+    unknown = [fmt for fmt in format_list if fmt not in EXPORT_FILENAMES]
+    if unknown:
+        raise click.BadParameter(f"Unknown format(s): {', '.join(unknown)}", param_hint='--format')
+    
+    def planner_factory():
+        from src.catalog import CatalogService
+        from src.planner import Planner
+        return Planner(CatalogService())
+    
+    click.echo(f"Exporting {', '.join(format_list)} templates to {out_dir}...")
+    errors = []
+    plans = iter_plans(input_path, planner_factory, errors)
+    if fleet:
+        from src.generator import FleetExporter
+        
+        try:
+            exporter = FleetExporter(format_list)
+            stats = exporter.export((plan for _, plan in plans), out_dir, sync=sync, errors=errors)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        click.echo(f"{stats.records} sites share {len(exporter.shapes)} template shape(s)")
+    else:
+        stats = run_bulk_export(plans, out_dir, format_list, sync=sync, errors=errors)
+    for error in stats.errors:
+        click.echo(click.style(f"  - {error}", fg='yellow'))
+    click.echo(click.style(f"✓ {stats.summary()}", fg='green'))
+
+
+@cli.command()
+@click.argument('old_plans', type=click.Path(exists=True, dir_okay=False))
+@click.argument('new_plans', type=click.Path(exists=True, dir_okay=False))
+@click.option('--json', 'as_json', is_flag=True, help='Emit one JSON record per changed cluster')
+@click.option('--all', 'show_all', is_flag=True, help='Also list unchanged clusters')
+def diff(old_plans, new_plans, as_json, show_all):
+    """Diff two JSONL plan files (from plan --input) by cluster name"""
+    import json
+    from collections import Counter
+    from src.planner.diff import diff_plan_files
+    
+    counts = Counter()
+    for name, status, plan_diff in diff_plan_files(old_plans, new_plans):
+        counts[status] += 1
+        if status == 'unchanged' and not show_all:
+            continue
+        if as_json:
+            record = {'cluster': name, 'status': status}
+            if plan_diff is not None:
+                record['changes'] = plan_diff.to_dict()
+            click.echo(json.dumps(record, default=str))
+            continue
+        color = {'added': 'green', 'removed': 'red', 'changed': 'yellow'}.get(status)
+        click.echo(click.style(f"{status.upper():<9} {name}", fg=color))
+        if plan_diff is not None:
+            for change in plan_diff.changes:
+                click.echo(f"    {change}")
+    
+    if not as_json:
+        click.echo(
+            f"{sum(counts.values())} clusters: {counts['changed']} changed, {counts['added']} added, "
+            f"{counts['removed']} removed, {counts['unchanged']} unchanged"
+        )
+
+
+@cli.command()
+@click.option('--input', 'input_path', type=click.Path(exists=True, dir_okay=False), required=True,
+              help='JSONL file of plans (from plan --input)')
+@click.option('--defender/--no-defender', default=False, help='Include Microsoft Defender for Containers')
+@click.option('--azure-monitor/--no-azure-monitor', default=False, help='Include Azure Monitor')
+@click.option('--prometheus/--no-prometheus', default=False, help='Include Prometheus storage')
+@click.option('--extension', 'extensions', multiple=True,
+              help="Arc extension ID to price on top of each plan's own extensions (repeatable)")
+@click.option('--batch-size', type=int, default=100000, help='Plans priced per batch')
+def cost(input_path, defender, azure_monitor, prometheus, extensions, batch_size):
+    """Estimate monthly cost for every plan in a JSONL file"""
+    import itertools
+    from src.catalog import CatalogService
+    from src.cli.bulk import iter_jsonl
+    from src.planner.cost import CostEngine, CostOptions
+    
+    engine = CostEngine(CatalogService())
+    options = CostOptions(enable_defender=defender, enable_azure_monitor=azure_monitor,
+                          enable_prometheus=prometheus)
+    # Fleets share a handful of extension sets, so each set is priced once
+    extension_costs = {}
+    
+    def extension_cost(record):
+        selected = tuple(dict.fromkeys([*record['cluster_config'].get('extensions', []), *extensions]))
+        if selected not in extension_costs:
+            extension_costs[selected] = engine.extensions_cost(selected, options)
+        return extension_costs[selected]
+    
+    totals = {'compute': 0.0, 'defender': 0.0, 'monitoring': 0.0, 'extensions': 0.0, 'monthly': 0.0}
+    count = 0
+    records = (record for _, record in iter_jsonl(input_path))
+    while True:
+        chunk = list(itertools.islice(records, batch_size))
+        if not chunk:
+            break
+        vcores, nodes = engine.usage_columns(chunk)
+        n = len(chunk)
+        batch = engine.price_batch(vcores, nodes, [defender] * n, [azure_monitor] * n,
+                                   [prometheus] * n, [extension_cost(record) for record in chunk])
+        for key in totals:
+            totals[key] += sum(getattr(batch, key))
+        count += n
+    
+    click.echo(f"Fleet cost estimate for {count} plans (USD/month):")
+    for key in ('compute', 'defender', 'monitoring', 'extensions'):
+        click.echo(f"  {key.capitalize():<11} {totals[key]:>14,.2f}")
+    click.echo(f"  {'Total':<11} {totals['monthly']:>14,.2f}  ({totals['monthly'] * 12:,.2f}/year)")
+
+
+@cli.command()
+@click.option('--input', 'input_paths', type=click.Path(exists=True, dir_okay=False), multiple=True,
+              required=True, help='CSV or JSONL usage export, optionally gzipped (repeatable)')
+@click.option('--label-column', default='workload', show_default=True,
+              help='Column holding the workload label to group samples by')
+@click.option('--quantile', type=click.FloatRange(0, 1), default=0.95, show_default=True,
+              help='Usage quantile to size each workload at')
+@click.option('--headroom', type=float, default=1.0, show_default=True,
+              help='Multiplier applied to the quantile (e.g. 1.2 for 20%% headroom)')
+@click.option('--workers', type=int, help='Processes to read shards with (default: CPU count)')
+@click.option('--output', type=click.Path(dir_okay=False),
+              help='Write one workload record per label as JSONL (input for plan --input)')
+@click.option('--resource-group', help='Resource group to put in the output records')
+@click.option('--custom-location', help='Custom location to put in the output records')
+@click.option('--location', default='eastus', help='Azure region to put in the output records')
+def size_from_usage(input_paths, label_column, quantile, headroom, workers, output, resource_group,
+                    custom_location, location):
+    """Derive workload requirements from per-pod usage exports"""
+    import json
+    from dataclasses import asdict
+    from src.telemetry import UsageIngester
+    
+    ingester = UsageIngester(label_column=label_column, workers=workers)
+    try:
+        usage = ingester.ingest(input_paths)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    
+    records = []
+    for label, summary in usage.items():
+        workload = summary.to_requirements(quantile, headroom)
+        p50, p95, peak = summary.cpu.quantiles([0.5, 0.95, 1.0])
+        m50, m95, mpeak = summary.memory_gb.quantiles([0.5, 0.95, 1.0])
+        click.echo(f"  {label}: {summary.samples} samples, CPU p50/p95/max {p50:.2f}/{p95:.2f}/{peak:.2f}, "
+                   f"memory {m50:.1f}/{m95:.1f}/{mpeak:.1f} GB -> {workload.cpu_cores} cores, "
+                   f"{workload.memory_gb} GB" + (f", {workload.gpu_count} GPU" if workload.gpu_required else ''))
+        record = {'cluster_name': label, 'location': location,
+                  'workload': {**asdict(workload), 'workload_type': workload.workload_type.value}}
+        if resource_group:
+            record['resource_group'] = resource_group
+        if custom_location:
+            record['custom_location'] = custom_location
+        records.append(record)
+    
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, separators=(',', ':')) + '\n')
+        click.echo(f"Workload records saved to {output}")
+    click.echo(click.style(f"✓ {len(records)} workloads from {ingester.stats.summary()}", fg='green'))
+
+
+@cli.command()
+@click.option('--plans', 'plans_path', type=click.Path(exists=True, dir_okay=False), required=True,
+              help='JSONL file of plans (from plan --input)')
+@click.option('--trace', 'trace_path', type=click.Path(exists=True, dir_okay=False), required=True,
+              help='CSV with timestamp, cpu and memory_gb columns')
+@click.option('--cluster-name', help='Plan to simulate (default: first plan in the file)')
+@click.option('--pool', help='Node pool to simulate (default: first untainted pool)')
+@click.option('--scale-down-delay', type=float, default=600, help='Seconds before idle nodes are removed')
+@click.option('--scale-up-delay', type=float, default=0, help='Seconds for new nodes to become ready')
+@click.option('--json', 'as_json', is_flag=True, help='Emit the result as JSON')
+def simulate_autoscaler(plans_path, trace_path, cluster_name, pool, scale_down_delay, scale_up_delay, as_json):
+    """Replay a demand trace against a plan's node pool"""
+    import json
+    from src.catalog import CatalogService
+    from src.cli.bulk import iter_jsonl
+    from src.models import plan_from_dict
+    from src.simulation import AutoscalerSimulator, AutoscalerSettings, DemandTrace
+    
+    record = next((r for _, r in iter_jsonl(plans_path)
+                   if cluster_name is None or r['cluster_config']['cluster_name'] == cluster_name), None)
+    if record is None:
+        raise click.UsageError(f"No plan for cluster '{cluster_name}' in {plans_path}")
+    
+    simulator = AutoscalerSimulator(
+        CatalogService(),
+        AutoscalerSettings(scale_down_delay=scale_down_delay, scale_up_delay=scale_up_delay)
+    )
+    try:
+        result = simulator.simulate_plan(plan_from_dict(record), DemandTrace.from_csv(trace_path), pool)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    
+    if as_json:
+        click.echo(json.dumps(result.to_dict()))
+        return
+    click.echo(f"Pool {result.pool} ({result.vm_size}), {result.samples} samples")
+    click.echo(f"  Node-hours:       {result.node_hours:,.1f} (peak {result.peak_nodes} nodes)")
+    click.echo(f"  Unmet demand:     {result.unmet_cpu_core_hours:,.1f} core-hours, "
+               f"{result.unmet_memory_gb_hours:,.1f} GB-hours in {result.unmet_samples} samples")
+    click.echo(f"  Scale events:     {result.scale_up_events} up, {result.scale_down_events} down")
+    click.echo(f"  Min/max:          current {result.current_min}/{result.current_max}, "
+               f"recommended {result.recommended_min}/{result.recommended_max}")
+
+
+@cli.command()
+@click.option('--plans', 'plans_path', type=click.Path(exists=True, dir_okay=False), required=True,
+              help='JSONL file of plans (from plan --input)')
+@click.option('--cluster-name', help='Plan to simulate (default: first plan in the file)')
+@click.option('--pods', 'pods_path', type=click.Path(exists=True, dir_okay=False),
+              help='JSON list of pod specs (default: one spread deployment per pool)')
+@click.option('--replicas', type=int, default=100, help='Replicas per pool for the default pod set')
+@click.option('--json', 'as_json', is_flag=True, help='Emit the report as JSON')
+def simulate_scheduling(plans_path, cluster_name, pods_path, replicas, as_json):
+    """Check that a pod set can be scheduled onto a plan's nodes and racks"""
+    import json
+    from src.catalog import CatalogService
+    from src.cli.bulk import iter_jsonl
+    from src.models import plan_from_dict
+    from src.simulation import SchedulingSimulator, PodSpec, synthetic_pods
+    
+    record = next((r for _, r in iter_jsonl(plans_path)
+                   if cluster_name is None or r['cluster_config']['cluster_name'] == cluster_name), None)
+    if record is None:
+        raise click.UsageError(f"No plan for cluster '{cluster_name}' in {plans_path}")
+    deployment_plan = plan_from_dict(record)
+    
+    if pods_path:
+        with open(pods_path, 'r', encoding='utf-8') as f:
+            specs = [PodSpec(**spec) for spec in json.load(f)]
+    else:
+        specs = synthetic_pods(deployment_plan, replicas=replicas)
+    
+    try:
+        report = SchedulingSimulator.from_plan(deployment_plan, CatalogService()).schedule(specs)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    
+    if as_json:
+        click.echo(json.dumps(report.to_dict()))
+        return
+    click.echo(f"Scheduled {report.scheduled} pods in {report.elapsed:.2f}s")
+    if report.all_scheduled:
+        click.echo(click.style("✓ All pods schedulable", fg='green'))
+        return
+    click.echo(click.style(f"{report.unschedulable} pods unschedulable:", fg='red'))
+    for spec_name, count in report.unschedulable_by_spec.most_common():
+        click.echo(f"  - {spec_name}: {count}")
+    for reason, count in report.reasons.most_common():
+        click.echo(f"    {reason}: {count}")
+
+
+@cli.command()
+@click.option('--plans', 'plans_path', type=click.Path(exists=True, dir_okay=False), required=True,
+              help='JSONL file of plans holding each cluster\'s current Kubernetes version')
+@click.option('--target', help='Kubernetes version to upgrade to (default: newest in the catalog)')
+@click.option('--max-clusters', type=int, default=10, show_default=True,
+              help='Clusters upgrading in the same wave')
+@click.option('--max-per-location', type=int, help='Clusters per region upgrading in the same wave')
+@click.option('--max-minor-step', type=int, default=1, show_default=True,
+              help='Minor versions a single upgrade may advance')
+@click.option('--json', 'as_json', is_flag=True, help='Emit the rollout as JSON')
+def upgrade_plan(plans_path, target, max_clusters, max_per_location, max_minor_step, as_json):
+    """Plan Kubernetes upgrade paths and rollout waves for a fleet"""
+    import json
+    from src.catalog import CatalogService
+    from src.cli.bulk import iter_plans
+    from src.planner import UpgradePlanner
+    
+    try:
+        planner = UpgradePlanner(CatalogService(), max_minor_step=max_minor_step)
+        rollout = planner.plan_fleet((plan for _, plan in iter_plans(plans_path)), target=target,
+                                     max_clusters_per_wave=max_clusters, max_per_location=max_per_location)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    
+    if as_json:
+        click.echo(json.dumps(rollout.to_dict()))
+        return
+    routes = {}
+    for name, path in rollout.paths.items():
+        if len(path) > 1:
+            routes.setdefault(' -> '.join(path), []).append(name)
+    for route, clusters in sorted(routes.items()):
+        click.echo(f"  {route}: {len(clusters)} cluster(s)")
+    for i, wave in enumerate(rollout.waves, start=1):
+        steps = ', '.join(f"{step.cluster_name}/{step.fault_domain}" for step in wave[:5])
+        more = f" and {len(wave) - 5} more" if len(wave) > 5 else ''
+        click.echo(f"  Wave {i}: {steps}{more}")
+    for name, version in rollout.unreachable.items():
+        click.echo(click.style(f"  - {name} ({version}) has no upgrade path to {rollout.target}", fg='yellow'))
+    click.echo(click.style(f"✓ {len(rollout.paths) - len(rollout.up_to_date)} cluster(s) to upgrade to "
+                           f"{rollout.target} in {len(rollout.waves)} wave(s), "
+                           f"{len(rollout.up_to_date)} already current", fg='green'))
+
+
+@cli.command()
+@click.option('--input', 'input_path', type=click.Path(exists=True, dir_okay=False), required=True,
+              help='JSONL file of plans (from plan --input)')
+@click.option('--output', type=click.Path(dir_okay=False), required=True,
+              help='JSONL file for plans with node/pod CIDRs assigned')
+@click.option('--supernet', required=True, help='Address space for node subnets, e.g. 10.0.0.0/8')
+@click.option('--pod-supernet', help='Separate address space for overlay pod CIDRs')
+@click.option('--reserved', multiple=True, help='CIDR already in use (repeatable)')
+def ipam(input_path, output, supernet, pod_supernet, reserved):
+    """Allocate non-overlapping node and pod CIDRs for a fleet of plans"""
+    import json
+    import time
+    from src.cli.bulk import iter_jsonl
+    from src.models import plan_from_dict
+    from src.network import allocate_fleet, cluster_ip_demand
+    
+    start = time.perf_counter()
+    # First pass keeps only the demand per cluster; plans are rewritten in a second pass
+    demands = [cluster_ip_demand(plan_from_dict(record).cluster_config)
+               for _, record in iter_jsonl(input_path)]
+    try:
+        allocations = allocate_fleet(demands, supernet, pod_supernet, reserved)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    
+    with open(output, 'w', encoding='utf-8') as out:
+        for _, record in iter_jsonl(input_path):
+            cluster = record['cluster_config']
+            cluster['node_cidr'], cluster['pod_cidr'] = allocations[cluster['cluster_name']]
+            out.write(json.dumps(record, separators=(',', ':')) + '\n')
+    
+    node_ips = sum(d.node_ips for d in demands)
+    pod_ips = sum(d.pod_ips for d in demands)
+    click.echo(f"Allocated {len(demands)} clusters ({node_ips:,} node IPs, {pod_ips:,} pod IPs) "
+               f"in {time.perf_counter() - start:.2f}s")
+    click.echo(click.style(f"✓ Plans with CIDRs written to {output}", fg='green'))
+
+
 @cli.command()
 def catalog_info():
     """Show catalog information"""
+    from src.catalog import CatalogService
+    
     catalog = CatalogService()
     info = catalog.get_catalog_info()
     
@@ -112,17 +650,225 @@ def catalog_info():
 
 
 @cli.command()
-def catalog_refresh():
+def catalog_versions():
+    """List recorded catalog versions"""
+    from src.catalog import CatalogService
+    
+    catalog = CatalogService()
+    versions = catalog.history.versions() if catalog.history else []
+    current = catalog.version_id
+    if not versions:
+        click.echo("No catalog versions recorded yet")
+    for version in versions:
+        marker = '*' if version['id'] == current else ' '
+        click.echo(f"{marker} {version['sequence']:>5}  {version['id']}  {version['kind']:<5}  {version['bytes']} bytes")
+
+
+@cli.command()
+@click.option('--output', type=click.Path(dir_okay=False), default='plan_table.bin', show_default=True,
+              help='Plan table file to write')
+@click.option('--lattice', 'lattice_path', type=click.Path(exists=True, dir_okay=False),
+              help='YAML file of lattice axes (workload_types, cpu_cores, memory_gb, gpu_required, '
+                   'gpu_count, rack_count, enable_rack_awareness); missing axes use the defaults')
+@click.option('--catalog-version', help='Build the table for a historical catalog version ID')
+def plan_table(output, lattice_path, catalog_version):
+    """Precompute plans for a lattice of common requests"""
+    import time
+    import yaml
+    from src.catalog import CatalogService
+    from src.planner import PlanLattice, PlanTable
+    
+    lattice_data = {}
+    if lattice_path:
+        with open(lattice_path, 'r', encoding='utf-8') as f:
+            lattice_data = yaml.safe_load(f) or {}
+    try:
+        lattice = PlanLattice.from_dict(lattice_data)
+    except (TypeError, ValueError) as e:
+        raise click.BadParameter(str(e), param_hint='--lattice')
+    
+    catalog = CatalogService()
+    if catalog_version:
+        try:
+            catalog = catalog.at_version(catalog_version)
+        except KeyError as e:
+            raise click.BadParameter(str(e), param_hint='--catalog-version')
+    click.echo(f"Planning {lattice.size()} lattice points against catalog {catalog.version_id}...")
+    start = time.perf_counter()
+    table = PlanTable.build(catalog, lattice, output)
+    click.echo(click.style(f"✓ Wrote {output}: {table.template_count} distinct plans "
+                           f"({time.perf_counter() - start:.2f}s)", fg='green'))
+
+
+@cli.command()
+@click.option('--source-url', envvar='AKSARC_CATALOG_URL',
+              help='Base URL serving catalog sections (defaults to $AKSARC_CATALOG_URL)')
+def catalog_refresh(source_url):
     """Refresh catalog from Azure APIs"""
+    from src.catalog import CatalogService, HTTPCatalogSource
+    
     click.echo("Refreshing catalog...")
-    catalog = CatalogService()
+    source = HTTPCatalogSource(source_url) if source_url else None
+    catalog = CatalogService(source=source)
     success = catalog.refresh()
     
+    report = catalog.last_refresh_report
+    if report:
+        click.echo(f"  Changed: {', '.join(report.changed) or 'none'}")
+        click.echo(f"  Unchanged: {', '.join(report.unchanged) or 'none'}")
+        if report.failed:
+            click.echo(click.style(f"  Failed: {', '.join(report.failed)}", fg='yellow'))
+        click.echo(f"  Elapsed: {report.elapsed:.2f}s")
+    
     if success:
         click.echo(click.style("✓ Catalog refreshed successfully!", fg='green'))
     else:
         click.echo(click.style("✗ Failed to refresh catalog", fg='red'))
 
 
+@cli.command()
+@click.option('--socket', 'socket_path', type=click.Path(), help='Unix socket path')
+@click.option('--stop', is_flag=True, help='Stop a running daemon')
+def serve_daemon(socket_path, stop):
+    """Serve a warm catalog and planner over a Unix socket"""
+    from src.cli.daemon import PlanningDaemon, DaemonUnavailable, request
+    
+    if stop:
+        try:
+            request('shutdown', socket_path=socket_path)
+            click.echo(click.style("✓ Daemon stopped", fg='green'))
+        except DaemonUnavailable:
+            click.echo(click.style("✗ No daemon running", fg='red'))
+        return
+    
+    server = PlanningDaemon(socket_path)
+    click.echo(f"Planning daemon listening on {server.socket_path} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+@cli.command()
+@click.option('--input', 'input_path', type=click.Path(exists=True, dir_okay=False), required=True,
+              help='JSONL file of plans (from plan --input) or workload records')
+@click.option('--repository', type=click.Path(dir_okay=False), envvar='AKSARC_PLAN_DB',
+              default='plans.db', show_default=True, help='Plan repository database')
+@click.option('--batch-size', type=int, default=5000, show_default=True, help='Plans per transaction')
+def plans_import(input_path, repository, batch_size):
+    """Store plans from a JSONL file in the plan repository"""
+    import time
+    from src.cli.bulk import iter_plans
+    from src.repository import PlanRepository
+    
+    def planner_factory():
+        from src.catalog import CatalogService
+        from src.planner import Planner
+        return Planner(CatalogService())
+    
+    start = time.perf_counter()
+    stored = PlanRepository(repository).save_many(
+        (plan for _, plan in iter_plans(input_path, planner_factory)), batch_size=batch_size)
+    click.echo(click.style(f"✓ Stored {stored} plans in {repository} "
+                           f"({time.perf_counter() - start:.2f}s)", fg='green'))
+
+
+@cli.command()
+@click.option('--repository', type=click.Path(exists=True, dir_okay=False), envvar='AKSARC_PLAN_DB',
+              default='plans.db', show_default=True, help='Plan repository database')
+@click.option('--vm-size', help='Sites with a node pool of this VM size')
+@click.option('--k8s-version', help='Kubernetes version, exact (1.30.4) or any patch (1.30.x)')
+@click.option('--valid/--invalid', 'is_valid', default=None, help='Filter on validation result')
+@click.option('--warnings/--no-warnings', 'has_warnings', default=None, help='Filter on validation warnings')
+@click.option('--rack', help='Sites with this rack ID or fault domain')
+@click.option('--location', help='Azure region')
+@click.option('--message', help='Sites with an error or warning containing this text')
+@click.option('--limit', type=int, default=100, show_default=True, help='Maximum sites listed')
+@click.option('--count', 'count_only', is_flag=True, help='Only print the number of matching sites')
+@click.option('--json', 'as_json', is_flag=True, help='Emit one JSON record per site')
+def plans_query(repository, vm_size, k8s_version, is_valid, has_warnings, rack, location, message,
+                limit, count_only, as_json):
+    """Query stored plans by SKU, version, rack and validation state"""
+    import json
+    from src.repository import PlanRepository
+    
+    repo = PlanRepository(repository)
+    filters = {
+        'vm_size': vm_size,
+        'kubernetes_version': k8s_version,
+        'is_valid': is_valid,
+        'has_warnings': has_warnings,
+        'rack': rack,
+        'location': location,
+        'message': message
+    }
+    total = repo.count(**filters)
+    if count_only:
+        click.echo(total)
+        return
+    
+    for summary in repo.query(limit=limit, **filters):
+        if as_json:
+            click.echo(json.dumps(summary.to_dict()))
+            continue
+        status = click.style('valid', fg='green') if summary.is_valid else click.style('invalid', fg='red')
+        notes = f", {summary.warning_count} warning(s)" if summary.warning_count else ''
+        click.echo(f"  {summary.cluster_name} [{status}{notes}] k8s {summary.kubernetes_version}, "
+                   f"{summary.node_count} nodes: {', '.join(summary.vm_sizes)}")
+    if not as_json:
+        click.echo(f"{total} matching site(s)")
+
+
+@cli.command()
+@click.option('--jobs-dir', type=click.Path(file_okay=False), default='jobs', show_default=True,
+              help='Job queue directory shared with the API (AKSARC_JOBS_DIR)')
+@click.option('--workers', type=int, default=2, show_default=True, help='Worker processes')
+@click.option('--lease', type=float, default=60, show_default=True,
+              help='Seconds before a silent worker\'s job is handed to another')
+@click.option('--drain', is_flag=True, help='Process queued jobs in this process, then exit')
+def jobs_worker(jobs_dir, workers, lease, drain):
+    """Run job workers for queued plan and export jobs"""
+    import os
+    import time
+    from src.jobs import JobQueue, WorkerPool, work
+    
+    if drain:
+        queue = JobQueue(jobs_dir, lease_seconds=lease)
+        processed = work(queue, f"cli:{os.getpid()}", drain=True)
+        click.echo(click.style(f"✓ Processed {processed} job(s)", fg='green'))
+        return
+    
+    pool = WorkerPool(jobs_dir, processes=workers, lease_seconds=lease)
+    pool.start()
+    click.echo(f"{workers} job worker(s) polling {jobs_dir} (Ctrl+C to stop)")
+    try:
+        while pool.alive:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.stop()
+
+
+@cli.command()
+@click.option('--host', default='0.0.0.0', show_default=True, help='Interface to listen on')
+@click.option('--port', type=int, default=5000, show_default=True, help='Port to listen on')
+@click.option('--workers', type=int, default=4, show_default=True,
+              help='Pre-forked worker processes sharing one frozen catalog (1 = single process)')
+def serve_api(host, port, workers):
+    """Serve the REST API"""
+    if workers <= 1:
+        from src.api.app import app
+        app.run(host=host, port=port, threaded=True)
+        return
+    
+    from src.api.prefork import PreforkServer
+    
+    click.echo(f"Serving API on {host}:{port} with {workers} pre-forked workers (Ctrl+C to stop)")
+    PreforkServer(host, port, workers).serve_forever()
+
+
 if __name__ == '__main__':
     cli()
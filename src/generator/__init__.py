@@ -5,5 +5,11 @@ Template generators for Bicep, ARM, and Terraform
 from .bicep_generator import BicepGenerator
 from .arm_generator import ARMGenerator
 from .terraform_generator import TerraformGenerator
+from .fleet import FleetExporter, FleetShape, plan_shape, shape_id
+from .sync import SyncWriter, SyncStats
 
-__all__ = ['BicepGenerator', 'ARMGenerator', 'TerraformGenerator']
+__all__ = [
+    'BicepGenerator', 'ARMGenerator', 'TerraformGenerator',
+    'FleetExporter', 'FleetShape', 'plan_shape', 'shape_id',
+    'SyncWriter', 'SyncStats'
+]
@@ -4,12 +4,14 @@ ARM template generator for AKS Arc deployments
 
 import json
 from typing import Dict
+from src import metrics
 from src.models import DeploymentPlan
 
 
 class ARMGenerator:
     """Generate ARM (Azure Resource Manager) templates for AKS Arc clusters"""
     
+    @metrics.timed('generator.arm')
     def generate(self, plan: DeploymentPlan) -> str:
         """
         Generate an ARM template from deployment plan.
@@ -78,6 +80,27 @@ class ARMGenerator:
             }
         }
         
+        # Address space from IP planning
+        if cluster.node_cidr:
+            template["parameters"]["nodeCidr"] = {
+                "type": "string",
+                "defaultValue": cluster.node_cidr,
+                "metadata": {
+                    "description": "Node subnet address prefix"
+                }
+            }
+        if cluster.pod_cidr:
+            template["parameters"]["podCidr"] = {
+                "type": "string",
+                "defaultValue": cluster.pod_cidr,
+                "metadata": {
+                    "description": "Pod CIDR"
+                }
+            }
+            template["resources"][0]["properties"]["networkProfile"] = {
+                "podCidr": "[parameters('podCidr')]"
+            }
+        
         # Add node pools as resources
         for i, pool in enumerate(cluster.node_pools):
             pool_resource = {
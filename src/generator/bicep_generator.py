@@ -3,12 +3,22 @@ Bicep template generator for AKS Arc deployments
 """
 
 from typing import Dict
+from src import metrics
 from src.models import DeploymentPlan
 
 
 class BicepGenerator:
     """Generate Bicep templates for AKS Arc clusters"""
     
+    # Parameters that differ between sites sharing a fleet shape, by ClusterConfig field
+    SITE_PARAMS = {
+        'clusterName': 'cluster_name',
+        'location': 'location',
+        'nodeCidr': 'node_cidr',
+        'podCidr': 'pod_cidr'
+    }
+    
+    @metrics.timed('generator.bicep')
     def generate(self, plan: DeploymentPlan) -> str:
         """
         Generate a Bicep template from deployment plan.
@@ -19,26 +29,72 @@ class BicepGenerator:
         Returns:
             Bicep template as string
         """
+        return self._render(plan, site_defaults=True)
+    
+    @metrics.timed('generator.bicep_module')
+    def generate_module(self, plan: DeploymentPlan) -> str:
+        """
+        Generate a template shared by every site with this plan's shape.
+        
+        Site parameters (name, location, CIDRs) have no defaults and are
+        supplied per site by generate_bicepparam.
+        """
+        return self._render(plan, site_defaults=False)
+    
+    def generate_bicepparam(self, plan: DeploymentPlan, template_path: str = '../main.bicep') -> str:
+        """Generate the per-site parameter file for a shape template"""
+        cluster = plan.cluster_config
+        lines = [
+            f"using '{template_path}'",
+            '',
+            f"// Deploy to resource group: {cluster.resource_group}"
+        ]
+        lines += [f"param {name} = '{value}'" for name, value in self._site_values(cluster).items()]
+        return '\n'.join(lines) + '\n'
+    
+    def _site_values(self, cluster) -> Dict[str, str]:
+        values = {param: getattr(cluster, field) for param, field in self.SITE_PARAMS.items()}
+        return {param: value for param, value in values.items() if value is not None}
+    
+    def _params(self, cluster, site_defaults: bool) -> str:
+        site_values = self._site_values(cluster)
+        params = [
+            ('clusterName', 'string', 'Name of the AKS Arc cluster', f"'{cluster.cluster_name}'"),
+            ('location', 'string', 'Azure region', f"'{cluster.location}'"),
+            ('kubernetesVersion', 'string', 'Kubernetes version', f"'{cluster.kubernetes_version}'"),
+            ('controlPlaneCount', 'int', 'Control plane node count', str(cluster.control_plane_count)),
+            ('nodeCidr', 'string', 'Node subnet address prefix', f"'{cluster.node_cidr}'"),
+            ('podCidr', 'string', 'Pod CIDR', f"'{cluster.pod_cidr}'")
+        ]
+        blocks = []
+        for name, param_type, description, default in params:
+            if name in self.SITE_PARAMS and name not in site_values:
+                continue
+            declaration = f"@description('{description}')\nparam {name} {param_type}"
+            if site_defaults or name not in self.SITE_PARAMS:
+                declaration += f" = {default}"
+            blocks.append(declaration + '\n')
+        return '\n'.join(blocks)
+    
+    def _render(self, plan: DeploymentPlan, site_defaults: bool) -> str:
         cluster = plan.cluster_config
         
+        network_profile = ''
+        if cluster.pod_cidr:
+            network_profile = """    networkProfile: {
+      podCidr: podCidr
+    }
+"""
+        
+        heading = "// AKS Arc Cluster Deployment" if site_defaults else \
+            "// AKS Arc fleet shape: shared by every site with this node pool layout"
         # TODO: Use Azure Verified Modules for AKS
-        template = f"""// AKS Arc Cluster Deployment
+        template = f"""{heading}
 // Generated by AKS Arc Deployment Tool
 
 targetScope = 'resourceGroup'
 
-@description('Name of the AKS Arc cluster')
-param clusterName string = '{cluster.cluster_name}'
-
-@description('Azure region')
-param location string = '{cluster.location}'
-
-@description('Kubernetes version')
-param kubernetesVersion string = '{cluster.kubernetes_version}'
-
-@description('Control plane node count')
-param controlPlaneCount int = {cluster.control_plane_count}
-
+{self._params(cluster, site_defaults)}
 // TODO: Add Arc custom location reference
 // TODO: Add node pool configurations
 // TODO: Add rack-awareness labels and constraints
@@ -48,7 +104,7 @@ resource aksCluster 'Microsoft.Kubernetes/connectedClusters@2024-01-01' = {{
   location: location
   properties: {{
     agentPublicKeyCertificate: ''
-    // Additional properties for Azure Arc-enabled Kubernetes
+{network_profile}    // Additional properties for Azure Arc-enabled Kubernetes
   }}
 }}
 
@@ -0,0 +1,185 @@
+"""
+Fleet export: one template per plan shape
+
+Sites in a fleet usually differ only in name, resource group, location and
+address ranges. The fleet exporter groups plans by everything the templates
+render apart from those site values: Kubernetes version, control plane
+size, node pools with their labels and taints, and which network ranges are
+set. Each shape is rendered once as a parameterized Terraform configuration
+and Bicep template, and each site only gets a few-line variable file:
+
+    terraform/<shape>/main.tf
+    terraform/<shape>/sites/<cluster>.tfvars
+    bicep/<shape>/main.bicep
+    bicep/<shape>/sites/<cluster>.bicepparam
+    fleet.json                       shape -> sites index
+"""
+
+import hashlib
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import logging
+from src.models import DeploymentPlan
+from .bicep_generator import BicepGenerator
+from .terraform_generator import TerraformGenerator
+
+logger = logging.getLogger(__name__)
+
+FLEET_FORMATS = ('terraform', 'bicep')
+
+
+def plan_shape(plan: DeploymentPlan) -> Dict[str, Any]:
+    """Everything the fleet templates render except per-site values"""
+    cluster = plan.cluster_config
+    return {
+        'kubernetes_version': cluster.kubernetes_version,
+        'control_plane_count': cluster.control_plane_count,
+        'node_cidr': cluster.node_cidr is not None,
+        'pod_cidr': cluster.pod_cidr is not None,
+        'node_pools': [
+            {
+                'name': pool.name,
+                'vm_size': pool.vm_size,
+                'node_count': pool.node_count,
+                'os_type': getattr(pool.os_type, 'value', pool.os_type),
+                'labels': pool.labels,
+                'taints': pool.taints,
+                'max_pods': pool.max_pods,
+                'enable_auto_scaling': pool.enable_auto_scaling,
+                'min_count': pool.min_count,
+                'max_count': pool.max_count
+            }
+            for pool in cluster.node_pools
+        ]
+    }
+
+
+def shape_id(plan: DeploymentPlan) -> str:
+    """Stable identifier of a plan's shape"""
+    encoded = json.dumps(plan_shape(plan), sort_keys=True, separators=(',', ':'))
+    return f"shape-{hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:12]}"
+
+
+@dataclass
+class FleetShape:
+    """Sites sharing one rendered template"""
+    shape_id: str
+    plan: DeploymentPlan  # first site seen; renders the shared template
+    sites: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        cluster = self.plan.cluster_config
+        return {
+            'kubernetes_version': cluster.kubernetes_version,
+            'node_pools': [f"{p.name}={p.node_count}x{p.vm_size}" for p in cluster.node_pools],
+            'sites': self.sites
+        }
+
+
+class FleetExporter:
+    """
+    Renders a fleet as shared shape templates plus per-site parameter files.
+
+    Args:
+        formats: Any of 'terraform' and 'bicep'
+    """
+
+    def __init__(self, formats: Sequence[str] = FLEET_FORMATS):
+        unknown = [fmt for fmt in formats if fmt not in FLEET_FORMATS]
+        if unknown:
+            raise ValueError(f"Fleet export supports {', '.join(FLEET_FORMATS)}, not {', '.join(unknown)}")
+        self.formats = list(formats)
+        self.terraform = TerraformGenerator()
+        self.bicep = BicepGenerator()
+        self.shapes: Dict[str, FleetShape] = {}
+
+    def _shape_files(self, shape: FleetShape) -> Iterator[Tuple[str, str]]:
+        if 'terraform' in self.formats:
+            yield f"terraform/{shape.shape_id}/main.tf", self.terraform.generate_module(shape.plan)
+        if 'bicep' in self.formats:
+            yield f"bicep/{shape.shape_id}/main.bicep", self.bicep.generate_module(shape.plan)
+
+    def _site_files(self, shape: FleetShape, plan: DeploymentPlan) -> Iterator[Tuple[str, str]]:
+        name = plan.cluster_config.cluster_name
+        if 'terraform' in self.formats:
+            yield f"terraform/{shape.shape_id}/sites/{name}.tfvars", self.terraform.generate_tfvars(plan)
+        if 'bicep' in self.formats:
+            yield f"bicep/{shape.shape_id}/sites/{name}.bicepparam", self.bicep.generate_bicepparam(plan)
+
+    def render(self, plans: Iterable[DeploymentPlan]) -> Iterator[Tuple[str, str]]:
+        """
+        Yield (relative path, content) for every output file.
+
+        Plans are consumed one at a time; only one representative plan per
+        shape is kept. Shape templates are yielded when a shape is first
+        seen and fleet.json comes last.
+
+        Raises:
+            ValueError: If a cluster name repeats
+        """
+        self.shapes = {}
+        seen = set()
+        for plan in plans:
+            name = plan.cluster_config.cluster_name
+            if name in seen:
+                raise ValueError(f"Cluster name '{name}' appears more than once in the fleet")
+            seen.add(name)
+
+            key = shape_id(plan)
+            shape = self.shapes.get(key)
+            if shape is None:
+                shape = self.shapes[key] = FleetShape(key, plan)
+                yield from self._shape_files(shape)
+            shape.sites.append(name)
+            yield from self._site_files(shape, plan)
+
+        index = {key: shape.to_dict() for key, shape in self.shapes.items()}
+        yield 'fleet.json', json.dumps({'shapes': index}, indent=2) + '\n'
+        logger.info(f"Fleet of {len(seen)} sites rendered as {len(self.shapes)} shapes")
+
+    def export(self, plans: Iterable[DeploymentPlan], out_dir: Path, sync: bool = False,
+               errors: Optional[List[str]] = None):
+        """
+        Write the fleet layout under out_dir.
+
+        With sync, unchanged files are skipped and files of sites or shapes
+        that disappeared from the fleet are deleted (see SyncWriter).
+        errors is the list given to iter_plans; while it holds skipped
+        records nothing is deleted.
+
+        Returns:
+            BulkStats with one record per site
+        """
+        from src.cli.bulk import BulkStats
+        from .sync import SyncWriter
+
+        out_dir = Path(out_dir)
+        stats = BulkStats(errors=errors if errors is not None else [])
+        writer = SyncWriter(out_dir) if sync else None
+        created = set()
+        try:
+            for relative, content in self.render(plans):
+                data = content.encode('utf-8')
+                if writer is not None:
+                    if not writer.write(relative, data):
+                        continue
+                else:
+                    path = out_dir / relative
+                    if path.parent not in created:
+                        path.parent.mkdir(parents=True, exist_ok=True)
+                        created.add(path.parent)
+                    path.write_bytes(data)
+                stats.files_written += 1
+                stats.bytes_written += len(data)
+        except BaseException:
+            if writer is not None:
+                writer.finish(prune=False)
+            raise
+        if writer is not None:
+            stats.sync = writer.finish(prune=not stats.errors)
+        stats.records = sum(len(shape.sites) for shape in self.shapes.values())
+        stats.finished = time.perf_counter()
+        return stats
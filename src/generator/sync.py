@@ -0,0 +1,191 @@
+"""
+Incremental output directory sync for exports
+
+Re-running an export usually produces mostly identical files. SyncWriter
+keeps a manifest of content hashes in the output directory. Files whose
+content has not changed are left untouched, so their mtimes and any
+downstream build caches stay valid. Changed files are written to a
+temporary name, fsynced and renamed into place. Each touched directory is
+fsynced once when the run finishes, not once per file. Files the previous
+run wrote that this run did not are deleted. Files the writer never wrote
+are never touched.
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Set, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = '.aksarc-manifest.json'
+
+
+@dataclass
+class SyncStats:
+    """What a sync run did to the output directory"""
+    added: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    bytes_written: int = 0
+
+    def summary(self) -> str:
+        return (f"{self.added} added, {self.changed} changed, "
+                f"{self.unchanged} unchanged, {self.removed} removed")
+
+
+def _fsync_dir(path: Path) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return  # Directories cannot be opened on every platform
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class SyncWriter:
+    """
+    Writes an export into a directory, skipping files that did not change.
+
+    Use as a context manager, or call finish() once every file is written.
+    Orphans are only pruned after a run that completed without error.
+
+    Args:
+        out_dir: Output root; the manifest lives at out_dir/.aksarc-manifest.json
+        fsync: Flush file data before each rename (disable for scratch output)
+    """
+
+    def __init__(self, out_dir: Path, fsync: bool = True):
+        self.out_dir = Path(out_dir)
+        self.fsync = fsync
+        self.manifest_path = self.out_dir / MANIFEST_NAME
+        self._previous: Dict[str, list] = self._load_manifest()
+        self._current: Dict[str, list] = {}
+        self._dirty_dirs: Set[Path] = set()
+        self._created_dirs: Set[Path] = set()
+        self.stats = SyncStats()
+
+    def _load_manifest(self) -> Dict[str, list]:
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('files', {})
+        except FileNotFoundError:
+            return {}
+        except (ValueError, OSError) as e:
+            logger.warning(f"Ignoring unreadable export manifest {self.manifest_path}: {e}")
+            return {}
+
+    def _unchanged(self, relative: str, path: Path, digest: str, size: int) -> Optional[os.stat_result]:
+        """The file's stat if it already holds this content, else None"""
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        if stat.st_size != size:
+            return None
+        entry = self._previous.get(relative)
+        if entry and entry[0] == digest and entry[1:] == [stat.st_size, stat.st_mtime_ns]:
+            return stat
+        # Not in the manifest or touched since: compare the content itself
+        with open(path, 'rb') as f:
+            return stat if hashlib.sha256(f.read()).hexdigest() == digest else None
+
+    def write(self, relative: str, content: Union[str, bytes]) -> bool:
+        """
+        Write one file, relative to out_dir, if its content changed.
+
+        Returns:
+            True if the file was written
+        """
+        data = content.encode('utf-8') if isinstance(content, str) else content
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.out_dir / relative
+
+        stat = self._unchanged(relative, path, digest, len(data))
+        if stat is not None:
+            self._current[relative] = [digest, stat.st_size, stat.st_mtime_ns]
+            self.stats.unchanged += 1
+            return False
+
+        existed = path.exists()
+        if path.parent not in self._created_dirs:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(path.parent)
+        temp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(temp, 'wb') as f:
+            f.write(data)
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp, path)
+        self._dirty_dirs.add(path.parent)
+
+        stat = path.stat()
+        self._current[relative] = [digest, stat.st_size, stat.st_mtime_ns]
+        self.stats.bytes_written += len(data)
+        if existed:
+            self.stats.changed += 1
+        else:
+            self.stats.added += 1
+        return True
+
+    def _prune(self) -> None:
+        """Delete files from the previous run that this run did not write"""
+        for relative in self._previous.keys() - self._current.keys():
+            path = self.out_dir / relative
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                continue
+            self.stats.removed += 1
+            self._dirty_dirs.add(path.parent)
+            # Remove directories the export emptied, up to the output root
+            parent = path.parent
+            while parent != self.out_dir and not any(parent.iterdir()):
+                parent.rmdir()
+                self._dirty_dirs.discard(parent)
+                self._dirty_dirs.add(parent.parent)
+                parent = parent.parent
+
+    def finish(self, prune: bool = True) -> SyncStats:
+        """
+        Prune orphans, fsync touched directories and save the manifest.
+
+        With prune=False (an interrupted run), files from the previous run
+        stay in the manifest so a later complete run can still prune them.
+        """
+        if prune:
+            self._prune()
+            files = self._current
+        else:
+            files = {**self._previous, **self._current}
+
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        temp = self.manifest_path.with_name(self.manifest_path.name + '.tmp')
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump({'version': 1, 'files': files}, f, separators=(',', ':'), sort_keys=True)
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp, self.manifest_path)
+        self._dirty_dirs.add(self.out_dir)
+
+        if self.fsync:
+            for directory in self._dirty_dirs:
+                _fsync_dir(directory)
+        self._dirty_dirs.clear()
+        logger.info(f"Synced {self.out_dir}: {self.stats.summary()}")
+        return self.stats
+
+    def __enter__(self) -> 'SyncWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.finish(prune=exc_type is None)
+        return False
@@ -3,12 +3,27 @@ Terraform generator for AKS Arc deployments using AzAPI provider
 """
 
 from typing import Dict
+from src import metrics
 from src.models import DeploymentPlan
 
+# Template variables in declaration order
+_VARIABLES = {
+    'cluster_name': 'Name of the AKS Arc cluster',
+    'resource_group': 'Resource group name',
+    'location': 'Azure region',
+    'kubernetes_version': 'Kubernetes version',
+    'node_cidr': 'Node subnet address prefix',
+    'pod_cidr': 'Pod CIDR'
+}
+
 
 class TerraformGenerator:
     """Generate Terraform configurations for AKS Arc clusters"""
     
+    # Variables that differ between sites sharing a fleet shape
+    SITE_VARIABLES = ('cluster_name', 'resource_group', 'location', 'node_cidr', 'pod_cidr')
+    
+    @metrics.timed('generator.terraform')
     def generate(self, plan: DeploymentPlan) -> str:
         """
         Generate a Terraform configuration from deployment plan.
@@ -19,9 +34,60 @@ class TerraformGenerator:
         Returns:
             Terraform configuration as string
         """
+        return self._render(plan, site_defaults=True)
+    
+    @metrics.timed('generator.terraform_module')
+    def generate_module(self, plan: DeploymentPlan) -> str:
+        """
+        Generate a configuration shared by every site with this plan's shape.
+        
+        Site variables (name, resource group, location, CIDRs) have no
+        defaults and are supplied per site by generate_tfvars.
+        """
+        return self._render(plan, site_defaults=False)
+    
+    def generate_tfvars(self, plan: DeploymentPlan) -> str:
+        """Generate the per-site variable file for a shape module"""
+        values = self._site_values(plan.cluster_config)
+        width = max(len(name) for name in values)
+        lines = [f'{name.ljust(width)} = "{value}"' for name, value in values.items()]
+        return '\n'.join(lines) + '\n'
+    
+    def _site_values(self, cluster) -> Dict[str, str]:
+        # Site variables are named after their ClusterConfig fields
+        values = {name: getattr(cluster, name) for name in self.SITE_VARIABLES}
+        return {name: value for name, value in values.items() if value is not None}
+    
+    def _variables(self, cluster, site_defaults: bool) -> str:
+        values = {**self._site_values(cluster), 'kubernetes_version': cluster.kubernetes_version}
+        blocks = ''
+        for name, description in _VARIABLES.items():
+            if name not in values:
+                continue
+            default = ''
+            if site_defaults or name not in self.SITE_VARIABLES:
+                default = f'  default     = "{values[name]}"\n'
+            blocks += f"""variable "{name}" {{
+  type        = string
+{default}  description = "{description}"
+}}
+
+"""
+        return blocks
+    
+    def _render(self, plan: DeploymentPlan, site_defaults: bool) -> str:
         cluster = plan.cluster_config
         
-        template = f"""# AKS Arc Cluster Deployment
+        network_profile = ''
+        if cluster.pod_cidr:
+            network_profile = """      networkProfile = {
+        podCidr = var.pod_cidr
+      }
+"""
+        
+        heading = "# AKS Arc Cluster Deployment" if site_defaults else \
+            "# AKS Arc fleet shape: shared by every site with this node pool layout"
+        template = f"""{heading}
 # Generated by AKS Arc Deployment Tool
 
 terraform {{
@@ -45,31 +111,7 @@ provider "azurerm" {{
 
 provider "azapi" {{}}
 
-variable "cluster_name" {{
-  type        = string
-  default     = "{cluster.cluster_name}"
-  description = "Name of the AKS Arc cluster"
-}}
-
-variable "resource_group" {{
-  type        = string
-  default     = "{cluster.resource_group}"
-  description = "Resource group name"
-}}
-
-variable "location" {{
-  type        = string
-  default     = "{cluster.location}"
-  description = "Azure region"
-}}
-
-variable "kubernetes_version" {{
-  type        = string
-  default     = "{cluster.kubernetes_version}"
-  description = "Kubernetes version"
-}}
-
-# Azure Arc-enabled Kubernetes Cluster
+{self._variables(cluster, site_defaults)}# Azure Arc-enabled Kubernetes Cluster
 resource "azapi_resource" "aks_arc_cluster" {{
   type      = "Microsoft.Kubernetes/connectedClusters@2024-01-01"
   name      = var.cluster_name
@@ -79,7 +121,7 @@ resource "azapi_resource" "aks_arc_cluster" {{
   body = jsonencode({{
     properties = {{
       agentPublicKeyCertificate = ""
-      # Additional Arc-specific properties
+{network_profile}      # Additional Arc-specific properties
     }}
   }})
 }}
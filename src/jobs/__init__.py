@@ -0,0 +1,8 @@
+"""
+Asynchronous job queue for long-running fleet plans and exports
+"""
+
+from .queue import Job, JobQueue, JobStatus, LeaseLost
+from .worker import WorkerPool, run_job, work
+
+__all__ = ['Job', 'JobQueue', 'JobStatus', 'LeaseLost', 'WorkerPool', 'run_job', 'work']
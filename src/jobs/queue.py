@@ -0,0 +1,279 @@
+"""
+SQLite-backed job queue for long-running plan and export jobs
+
+Jobs are rows in a local SQLite database (WAL mode, so readers never block
+the workers). A worker claims a job by taking a time-limited lease and
+renews it as it reports progress. If a worker crashes, its lease expires
+and the job is handed to another worker, up to max_attempts claims. Job
+results are files under the results directory; the database only stores
+their paths.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import logging
+from src.cli.bulk import EXPORT_FILENAMES
+
+logger = logging.getLogger(__name__)
+
+JOB_KINDS = ('plan', 'export')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    progress INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    errors TEXT NOT NULL DEFAULT '[]',
+    error TEXT,
+    result_path TEXT,
+    lease_owner TEXT,
+    lease_expires REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, created_at);
+"""
+
+
+class JobStatus(str, Enum):
+    """Lifecycle states of a job"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+TERMINAL_STATUSES = (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+
+class LeaseLost(RuntimeError):
+    """Raised when a worker no longer holds the lease on its job"""
+
+
+@dataclass
+class Job:
+    """A queued or processed job"""
+    id: str
+    kind: str
+    payload: Dict[str, Any]
+    status: JobStatus
+    progress: int = 0
+    total: int = 0
+    attempts: int = 0
+    errors: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    result_path: Optional[str] = None
+    created_at: float = 0.0
+    updated_at: float = 0.0
+
+    @property
+    def finished(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Status summary without the payload"""
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status.value,
+            'progress': self.progress,
+            'total': self.total,
+            'attempts': self.attempts,
+            'errors': self.errors,
+            'error': self.error,
+            'has_result': self.result_path is not None,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
+        }
+
+
+class JobQueue:
+    """
+    Persistent job queue shared by the API and worker processes.
+
+    Args:
+        directory: Directory holding jobs.db and the results/ directory
+        lease_seconds: How long a claim lasts without a heartbeat
+        max_attempts: Claims allowed before a job whose worker keeps
+            disappearing is marked failed
+    """
+
+    def __init__(self, directory: Path, lease_seconds: float = 60.0, max_attempts: int = 3):
+        self.directory = Path(directory)
+        self.results_dir = self.directory / 'results'
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.directory / 'jobs.db'
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+        self._connect().executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """One connection per thread and process (connections are not fork-safe)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Job:
+        return Job(
+            id=row['id'],
+            kind=row['kind'],
+            payload=json.loads(row['payload']),
+            status=JobStatus(row['status']),
+            progress=row['progress'],
+            total=row['total'],
+            attempts=row['attempts'],
+            errors=json.loads(row['errors']),
+            error=row['error'],
+            result_path=row['result_path'],
+            created_at=row['created_at'],
+            updated_at=row['updated_at']
+        )
+
+    def submit(self, kind: str, payload: Dict[str, Any]) -> Job:
+        """
+        Queue a new job.
+
+        The payload holds 'records' (workload records or serialized plans)
+        and, for export jobs, optional 'formats'.
+
+        Raises:
+            ValueError: If the kind or a format is unknown, or there are no records
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind '{kind}' (expected one of {', '.join(JOB_KINDS)})")
+        records = payload.get('records')
+        if not isinstance(records, list) or not records:
+            raise ValueError("Job payload needs a non-empty 'records' list")
+        unknown = [fmt for fmt in payload.get('formats') or [] if fmt not in EXPORT_FILENAMES]
+        if kind == 'export' and unknown:
+            raise ValueError(f"Unknown export formats: {', '.join(unknown)}")
+
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        self._connect().execute(
+            "INSERT INTO jobs (id, kind, payload, status, total, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job_id, kind, json.dumps(payload), JobStatus.QUEUED.value, len(records), now, now)
+        )
+        logger.info(f"Queued {kind} job {job_id} with {len(records)} records")
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        row = self._connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def list(self, status: Optional[JobStatus] = None, limit: int = 100) -> List[Job]:
+        """Most recent jobs first, optionally filtered by status"""
+        if status is None:
+            rows = self._connect().execute(
+                "SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,))
+        else:
+            rows = self._connect().execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY created_at DESC LIMIT ?",
+                (JobStatus(status).value, limit))
+        return [self._row_to_job(row) for row in rows]
+
+    def claim(self, worker_id: str) -> Optional[Job]:
+        """
+        Lease the oldest runnable job to a worker.
+
+        Runnable jobs are queued ones and running ones whose lease expired
+        (their worker died). The claim is a single write transaction, so
+        two workers never get the same job.
+        """
+        conn = self._connect()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            while True:
+                row = conn.execute(
+                    "SELECT id, status, attempts FROM jobs "
+                    "WHERE status = ? OR (status = ? AND lease_expires < ?) "
+                    "ORDER BY created_at LIMIT 1",
+                    (JobStatus.QUEUED.value, JobStatus.RUNNING.value, now)
+                ).fetchone()
+                if row is None:
+                    conn.execute('COMMIT')
+                    return None
+                if row['attempts'] >= self.max_attempts:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, error = ?, lease_owner = NULL, updated_at = ? "
+                        "WHERE id = ?",
+                        (JobStatus.FAILED.value,
+                         f"Worker lost after {row['attempts']} attempts", now, row['id'])
+                    )
+                    continue
+                if row['status'] == JobStatus.RUNNING.value:
+                    logger.warning(f"Recovering job {row['id']} from an expired lease")
+                conn.execute(
+                    "UPDATE jobs SET status = ?, lease_owner = ?, lease_expires = ?, "
+                    "attempts = attempts + 1, progress = 0, errors = '[]', updated_at = ? WHERE id = ?",
+                    (JobStatus.RUNNING.value, worker_id, now + self.lease_seconds, now, row['id'])
+                )
+                conn.execute('COMMIT')
+                return self.get(row['id'])
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def _update_leased(self, job_id: str, worker_id: str, assignments: str, params: tuple) -> None:
+        cursor = self._connect().execute(
+            f"UPDATE jobs SET {assignments}, updated_at = ? "
+            "WHERE id = ? AND lease_owner = ? AND status = ?",
+            (*params, time.time(), job_id, worker_id, JobStatus.RUNNING.value)
+        )
+        if cursor.rowcount != 1:
+            raise LeaseLost(f"Worker {worker_id} no longer holds job {job_id}")
+
+    def heartbeat(self, job_id: str, worker_id: str, progress: int, errors: List[str]) -> None:
+        """
+        Record progress and renew the lease.
+
+        Raises:
+            LeaseLost: If the lease expired and the job moved on
+        """
+        self._update_leased(
+            job_id, worker_id, "progress = ?, errors = ?, lease_expires = ?",
+            (progress, json.dumps(errors), time.time() + self.lease_seconds)
+        )
+
+    def complete(self, job_id: str, worker_id: str, result_path: Path,
+                 progress: int, errors: List[str]) -> None:
+        """Mark a leased job succeeded with its result file"""
+        self._update_leased(
+            job_id, worker_id,
+            "status = ?, result_path = ?, progress = ?, errors = ?, lease_owner = NULL",
+            (JobStatus.SUCCEEDED.value, str(result_path), progress, json.dumps(errors))
+        )
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> None:
+        """Mark a leased job failed"""
+        self._update_leased(
+            job_id, worker_id, "status = ?, error = ?, lease_owner = NULL",
+            (JobStatus.FAILED.value, error)
+        )
+
+    def result_path(self, job_id: str, suffix: str) -> Path:
+        """Where a job's result file lives"""
+        return self.results_dir / f"{job_id}{suffix}"
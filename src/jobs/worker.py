@@ -0,0 +1,266 @@
+"""
+Job workers
+
+Each worker process owns one warm Planner and loops claiming jobs from the
+JobQueue. Plan jobs produce a JSONL file of serialized plans. Export jobs
+produce a zip of the rendered templates, laid out like the bulk export
+(<cluster_name>/main.bicep, ...). Results are written under a temporary
+name and moved into place, so a crashed worker never leaves a result that
+looks complete.
+"""
+
+import json
+import multiprocessing
+import os
+import shutil
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, List, Tuple
+import logging
+from src.jobs.queue import Job, JobQueue, LeaseLost
+
+logger = logging.getLogger(__name__)
+
+
+def default_planner():
+    """Planner over the bundled catalog"""
+    from src.catalog import CatalogService
+    from src.planner import Planner
+
+    return Planner(CatalogService())
+
+
+def _job_plans(job: Job, get_planner: Callable[[], Any], errors: List[str],
+               on_record: Callable[[int], None]) -> Iterator[Tuple[int, Any]]:
+    """
+    Yield (record number, plan) for a job's records.
+
+    Records are workload records (planned here) or serialized plans. Bad
+    records are reported in errors and skipped, as in the bulk pipeline.
+    """
+    from src.cli.bulk import plan_record
+    from src.models import plan_from_dict
+
+    for number, record in enumerate(job.payload['records'], start=1):
+        try:
+            if 'cluster_config' in record:
+                plan = plan_from_dict(record)
+            else:
+                plan = plan_record(get_planner(), record)
+        except (KeyError, ValueError, TypeError) as e:
+            errors.append(f"record {number}: {e}")
+            plan = None
+        if plan is not None:
+            yield number, plan
+        on_record(number)
+
+
+@contextmanager
+def _lease_renewed(queue: JobQueue, job: Job, worker_id: str, progress: int,
+                   errors: List[str], interval: float) -> Iterator[None]:
+    """
+    Keep a job's lease renewed from a background thread during a long step.
+
+    Raises:
+        LeaseLost: If a renewal found the job taken over
+    """
+    queue.heartbeat(job.id, worker_id, progress, errors)
+    stop = threading.Event()
+    lost: List[LeaseLost] = []
+
+    def renew() -> None:
+        while not stop.wait(interval):
+            try:
+                queue.heartbeat(job.id, worker_id, progress, errors)
+            except LeaseLost as e:
+                lost.append(e)
+                return
+
+    thread = threading.Thread(target=renew, name=f"lease-{job.id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+    if lost:
+        raise lost[0]
+
+
+def run_job(queue: JobQueue, job: Job, worker_id: str, get_planner: Callable[[], Any],
+            heartbeat_interval: float = 1.0) -> Path:
+    """
+    Process one leased job and mark it succeeded.
+
+    Progress is written at most once per heartbeat_interval, which also
+    renews the lease. The lease is renewed on the same interval while an
+    export is archived.
+
+    Returns:
+        Path of the result file
+
+    Raises:
+        LeaseLost: If another worker took the job over
+    """
+    from src.cli.bulk import run_bulk_export
+    from src.models import plan_to_dict
+
+    errors: List[str] = []
+    last_beat = time.monotonic()
+    done = 0
+
+    def on_record(number: int) -> None:
+        nonlocal last_beat, done
+        done = number
+        if time.monotonic() - last_beat >= heartbeat_interval:
+            queue.heartbeat(job.id, worker_id, number, errors)
+            last_beat = time.monotonic()
+
+    plans = _job_plans(job, get_planner, errors, on_record)
+    if job.kind == 'plan':
+        result = queue.result_path(job.id, '.jsonl')
+        partial = result.with_name(result.name + '.part')
+        with open(partial, 'w', encoding='utf-8') as out:
+            for _, plan in plans:
+                out.write(json.dumps(plan_to_dict(plan), separators=(',', ':')) + '\n')
+        os.replace(partial, result)
+    else:
+        result = queue.result_path(job.id, '.zip')
+        staging = queue.results_dir / f"{job.id}.staging"
+        shutil.rmtree(staging, ignore_errors=True)
+        try:
+            run_bulk_export(plans, staging, job.payload.get('formats') or ['bicep', 'arm', 'terraform'])
+            # Archiving reports no progress, so renew the lease while it runs
+            with _lease_renewed(queue, job, worker_id, done, errors, heartbeat_interval):
+                archive = shutil.make_archive(str(staging), 'zip', staging)
+                os.replace(archive, result)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    queue.complete(job.id, worker_id, result, done, errors)
+    logger.info(f"Job {job.id} finished: {done} records, {len(errors)} errors")
+    return result
+
+
+def work(
+    queue: JobQueue,
+    worker_id: str,
+    planner_factory: Callable[[], Any] = default_planner,
+    stop_event=None,
+    poll_interval: float = 0.5,
+    drain: bool = False
+) -> int:
+    """
+    Claim and run jobs until stopped.
+
+    Args:
+        queue: Queue to work on
+        worker_id: Lease owner name, unique per worker
+        planner_factory: Builds the worker's planner on first use
+        stop_event: Event that ends the loop when set
+        poll_interval: Seconds to wait when the queue is empty
+        drain: Return as soon as the queue is empty instead of polling
+
+    Returns:
+        Number of jobs processed
+    """
+    planner = None
+
+    def get_planner():
+        nonlocal planner
+        if planner is None:
+            planner = planner_factory()
+        return planner
+
+    processed = 0
+    while stop_event is None or not stop_event.is_set():
+        job = queue.claim(worker_id)
+        if job is None:
+            if drain:
+                break
+            if stop_event is not None:
+                stop_event.wait(poll_interval)
+            else:
+                time.sleep(poll_interval)
+            continue
+        try:
+            run_job(queue, job, worker_id, get_planner)
+        except LeaseLost as e:
+            logger.warning(str(e))
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {e}")
+            try:
+                queue.fail(job.id, worker_id, str(e))
+            except LeaseLost:
+                pass
+        processed += 1
+    return processed
+
+
+def _worker_main(directory: str, stop_event, lease_seconds: float, poll_interval: float) -> None:
+    queue = JobQueue(Path(directory), lease_seconds=lease_seconds)
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    logger.info(f"Job worker {worker_id} started")
+    work(queue, worker_id, default_planner, stop_event, poll_interval)
+
+
+class WorkerPool:
+    """
+    A set of worker processes sharing one job directory.
+
+    Args:
+        directory: Job directory (see JobQueue)
+        processes: Number of worker processes
+        lease_seconds: Lease length for claimed jobs
+        poll_interval: Seconds between polls of an empty queue
+    """
+
+    def __init__(self, directory: Path, processes: int = 2,
+                 lease_seconds: float = 60.0, poll_interval: float = 0.5):
+        self.directory = Path(directory)
+        self.processes = processes
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self._context = multiprocessing.get_context()
+        self._stop = None
+        self._workers: List[multiprocessing.Process] = []
+
+    @property
+    def alive(self) -> int:
+        return sum(1 for p in self._workers if p.is_alive())
+
+    def start(self) -> None:
+        """Start the worker processes (no-op if already running)"""
+        if self._workers:
+            return
+        # Create the schema once before workers race to do it
+        JobQueue(self.directory, lease_seconds=self.lease_seconds)
+        self._stop = self._context.Event()
+        for _ in range(self.processes):
+            process = self._context.Process(
+                target=_worker_main,
+                args=(str(self.directory), self._stop, self.lease_seconds, self.poll_interval),
+                daemon=True
+            )
+            process.start()
+            self._workers.append(process)
+
+    def run_worker(self, stop_event=None) -> None:
+        """Run one worker in the calling process, for servers that fork their own"""
+        _worker_main(str(self.directory), stop_event, self.lease_seconds, self.poll_interval)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Ask workers to finish their current job and exit; terminate stragglers"""
+        if not self._workers:
+            return
+        self._stop.set()
+        deadline = time.monotonic() + timeout
+        for process in self._workers:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self._workers = []
@@ -0,0 +1,252 @@
+"""
+Lightweight instrumentation for planning, export and catalog hot paths
+
+Stage timers and counters are recorded into a pluggable sink. With no sink
+installed (the default) every timer is a shared no-op, so instrumented code
+pays only a global lookup per stage.
+"""
+
+import functools
+import io
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsSink(ABC):
+    """Receives stage timings and counter increments"""
+
+    @abstractmethod
+    def record_timing(self, name: str, seconds: float) -> None:
+        """Record one timed run of a stage"""
+
+    @abstractmethod
+    def increment(self, name: str, value: int = 1) -> None:
+        """Add value to a counter"""
+
+
+class InMemorySink(MetricsSink):
+    """Thread-safe in-process aggregation of timings and counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timings: Dict[str, list] = {}
+        self._counters: Dict[str, int] = {}
+
+    def record_timing(self, name: str, seconds: float) -> None:
+        with self._lock:
+            stats = self._timings.get(name)
+            if stats is None:
+                self._timings[name] = [1, seconds, seconds, seconds]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+                if seconds < stats[2]:
+                    stats[2] = seconds
+                if seconds > stats[3]:
+                    stats[3] = seconds
+
+    def increment(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def snapshot(self) -> Dict:
+        """Return timings (count/total/min/max/mean seconds) and counters"""
+        with self._lock:
+            timings = {
+                name: {
+                    'count': count,
+                    'total_s': total,
+                    'min_s': low,
+                    'max_s': high,
+                    'mean_s': total / count
+                }
+                for name, (count, total, low, high) in self._timings.items()
+            }
+            return {'timings': timings, 'counters': dict(self._counters)}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._timings.clear()
+            self._counters.clear()
+
+    def to_prometheus(self, prefix: str = 'aksarc') -> str:
+        """Render the snapshot in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_stage_seconds Time spent per instrumented stage",
+            f"# TYPE {prefix}_stage_seconds summary"
+        ]
+        for name, stats in sorted(snapshot['timings'].items()):
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {stats["total_s"]:.9f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {stats["count"]}')
+        lines.append(f"# HELP {prefix}_events_total Instrumented event counters")
+        lines.append(f"# TYPE {prefix}_events_total counter")
+        for name, value in sorted(snapshot['counters'].items()):
+            lines.append(f'{prefix}_events_total{{name="{name}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+_sink: Optional[MetricsSink] = None
+
+
+def set_sink(sink: Optional[MetricsSink]) -> None:
+    """Install a sink, or None to disable instrumentation"""
+    global _sink
+    _sink = sink
+
+
+def get_sink() -> Optional[MetricsSink]:
+    """Return the installed sink, if any"""
+    return _sink
+
+
+class _NoopTimer:
+    """Shared timer used while instrumentation is disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+
+_NOOP_TIMER = _NoopTimer()
+
+
+class _StageTimer:
+    __slots__ = ('_sink', '_name', '_start')
+
+    def __init__(self, sink: MetricsSink, name: str):
+        self._sink = sink
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        self._sink.record_timing(self._name, time.perf_counter() - self._start)
+        return False
+
+
+def timer(name: str):
+    """Context manager timing a stage; a no-op when no sink is installed"""
+    sink = _sink
+    if sink is None:
+        return _NOOP_TIMER
+    return _StageTimer(sink, name)
+
+
+def increment(name: str, value: int = 1) -> None:
+    """Increment a counter; a no-op when no sink is installed"""
+    sink = _sink
+    if sink is not None:
+        sink.increment(name, value)
+
+
+def timed(name: str) -> Callable:
+    """Decorator timing every call of the wrapped function as a stage"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            sink = _sink
+            if sink is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                sink.record_timing(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+class ProfileReport:
+    """Holds the text report produced by profile() once the block exits"""
+
+    def __init__(self, mode: Optional[str]):
+        self.mode = mode
+        self.text = ''
+
+
+class _Sampler(threading.Thread):
+    """Samples one thread's stack at a fixed interval"""
+
+    def __init__(self, target_ident: int, interval: float):
+        super().__init__(daemon=True)
+        self.target_ident = target_ident
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.target_ident)
+            if frame is None:
+                continue
+            code = frame.f_code
+            self.samples[f"{code.co_filename}:{frame.f_lineno} ({code.co_name})"] += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+@contextmanager
+def profile(mode: Optional[str] = None, limit: int = 30,
+            interval: float = 0.001) -> Iterator[ProfileReport]:
+    """
+    Profile the enclosed block.
+
+    Args:
+        mode: 'cprofile' for deterministic profiling, 'sample' for a stack
+            sampler on the current thread, or None to do nothing
+        limit: Number of entries to keep in the report
+        interval: Sampling interval in seconds for 'sample' mode
+
+    Yields:
+        ProfileReport whose text is filled in when the block exits
+    """
+    report = ProfileReport(mode)
+    if mode is None:
+        yield report
+        return
+    if mode not in ('cprofile', 'sample'):
+        raise ValueError(f"Unknown profile mode: {mode}")
+
+    if mode == 'cprofile':
+        import cProfile
+        import pstats
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield report
+        finally:
+            profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(limit)
+            report.text = out.getvalue()
+        return
+
+    sampler = _Sampler(threading.get_ident(), interval)
+    sampler.start()
+    try:
+        yield report
+    finally:
+        sampler.stop()
+        total = sum(sampler.samples.values())
+        lines = [f"{total} samples every {interval * 1000:.1f}ms"]
+        for location, count in sampler.samples.most_common(limit):
+            lines.append(f"{count:>8} {count / total:6.1%}  {location}")
+        report.text = '\n'.join(lines) + '\n'
@@ -2,8 +2,8 @@
 Data models for AKS Arc deployment configurations
 """
 
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, List, Optional
 from enum import Enum
 
 
@@ -49,6 +49,11 @@ class WorkloadRequirements:
     fps: Optional[int] = None
     retention_days: Optional[int] = None
     description: Optional[str] = None
+    gpu_model: Optional[str] = None  # Only use GPU SKUs with this GPU model
+    gpu_sharing: Optional[str] = None  # 'time-slicing' or 'fractional'; None is one pod per GPU
+    gpu_sharing_ratio: Optional[float] = None  # Pods per GPU (time-slicing) or GPU fraction per pod
+    gpu_pod_cpu: Optional[float] = None  # CPU cores per GPU pod
+    gpu_pod_memory_gb: Optional[float] = None  # Memory per GPU pod
 
 
 @dataclass
@@ -82,6 +87,9 @@ class ClusterConfig:
     tags: Dict[str, str] = field(default_factory=dict)
     network_plugin: str = "azure"
     load_balancer_sku: str = "Standard"
+    extensions: List[str] = field(default_factory=list)  # Arc extensions in install order
+    node_cidr: Optional[str] = None  # Node subnet (logical network) address prefix
+    pod_cidr: Optional[str] = None  # Overlay pod address range
 
 
 @dataclass
@@ -111,3 +119,48 @@ class DeploymentPlan:
     validation_result: Optional[ValidationResult] = None
     estimated_cost: Optional[float] = None
     rationale: Optional[str] = None
+    catalog_version: Optional[str] = None
+
+
+def _enum_values(value: Any) -> Any:
+    """Recursively replace enum members with their plain values"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, dict):
+        return {k: _enum_values(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_enum_values(v) for v in value]
+    return value
+
+
+def plan_to_dict(plan: DeploymentPlan) -> Dict[str, Any]:
+    """Serialize a deployment plan to JSON-compatible primitives"""
+    return _enum_values(asdict(plan))
+
+
+def workload_from_dict(data: Dict[str, Any]) -> WorkloadRequirements:
+    """Build workload requirements from a dict, ignoring unknown keys"""
+    known = WorkloadRequirements.__dataclass_fields__
+    values = {k: v for k, v in data.items() if k in known}
+    values['workload_type'] = WorkloadType(values.get('workload_type', 'custom'))
+    return WorkloadRequirements(**values)
+
+
+def plan_from_dict(data: Dict[str, Any]) -> DeploymentPlan:
+    """Rebuild a deployment plan serialized with plan_to_dict"""
+    cluster = dict(data['cluster_config'])
+    cluster['node_pools'] = [
+        NodePoolConfig(**{**pool, 'os_type': OSType(pool['os_type'])})
+        for pool in cluster.get('node_pools', [])
+    ]
+    rack_topology = data.get('rack_topology')
+    validation = data.get('validation_result')
+    return DeploymentPlan(
+        cluster_config=ClusterConfig(**cluster),
+        workload_requirements=workload_from_dict(data['workload_requirements']),
+        rack_topology=[RackTopology(**rack) for rack in rack_topology] if rack_topology is not None else None,
+        validation_result=ValidationResult(**validation) if validation is not None else None,
+        estimated_cost=data.get('estimated_cost'),
+        rationale=data.get('rationale'),
+        catalog_version=data.get('catalog_version')
+    )
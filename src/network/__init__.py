@@ -0,0 +1,7 @@
+"""
+Network module for IP address planning
+"""
+
+from .ipam import IPDemand, CIDRAllocator, AddressSpaceExhausted, cluster_ip_demand, allocate_fleet
+
+__all__ = ['IPDemand', 'CIDRAllocator', 'AddressSpaceExhausted', 'cluster_ip_demand', 'allocate_fleet']
@@ -0,0 +1,240 @@
+"""
+IP address planning for clusters and fleets
+
+Works out how many node and pod addresses a cluster needs from its node
+pools, network plugin and max_pods. It then hands out non-overlapping CIDR
+blocks for a whole fleet from a supernet.
+
+Every allocation is an aligned power-of-two block, so the allocator is a
+buddy allocator: it keeps free blocks in one min-heap per prefix length and
+splits larger blocks on demand. Allocating a block costs at most one heap
+operation per prefix bit. Blocks are handed out lowest address first, so
+the same fleet always gets the same addresses.
+"""
+
+import heapq
+import ipaddress
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+from src.models import ClusterConfig
+
+logger = logging.getLogger(__name__)
+
+# Azure reserves the first four and the last address of every subnet
+AZURE_RESERVED_IPS = 5
+
+# Extra addresses for the control plane: API server VIP plus one upgrade surge node
+CONTROL_PLANE_EXTRA_IPS = 2
+
+# Per-node pod block for kubenet; other overlay plugins size the block from max_pods
+KUBENET_NODE_BLOCK = 256
+
+
+class AddressSpaceExhausted(ValueError):
+    """Raised when a supernet has no free block large enough"""
+
+
+def prefix_for(count: int, max_prefixlen: int = 32) -> int:
+    """Longest prefix whose block holds at least count addresses"""
+    return max_prefixlen - max(0, (count - 1).bit_length())
+
+
+def _pow2_at_least(value: int) -> int:
+    return 1 << max(0, (value - 1).bit_length())
+
+
+@dataclass(frozen=True)
+class IPDemand:
+    """Address requirements of one cluster"""
+    cluster_name: str
+    max_nodes: int
+    node_ips: int
+    pod_ips: int
+    node_prefix: int
+    pod_prefix: Optional[int]
+
+
+def cluster_ip_demand(cluster: ClusterConfig) -> IPDemand:
+    """
+    Compute the address demand of a cluster at its largest scale.
+
+    Pools are counted at max_count when autoscaling, plus one surge node per
+    pool for rolling upgrades. With the azure plugin, pods take addresses
+    from the node subnet. With overlay plugins (kubenet, calico, ...) each
+    node gets its own pod block from a separate pod CIDR.
+    """
+    max_nodes = 0
+    pod_ips_in_subnet = 0
+    overlay_pod_ips = 0
+    azure_cni = cluster.network_plugin == 'azure'
+    for pool in cluster.node_pools:
+        nodes = (pool.max_count if pool.enable_auto_scaling and pool.max_count else pool.node_count) + 1
+        max_nodes += nodes
+        if azure_cni:
+            pod_ips_in_subnet += nodes * pool.max_pods
+        elif cluster.network_plugin == 'kubenet':
+            overlay_pod_ips += nodes * KUBENET_NODE_BLOCK
+        else:
+            overlay_pod_ips += nodes * _pow2_at_least(pool.max_pods)
+
+    node_ips = (max_nodes + cluster.control_plane_count + CONTROL_PLANE_EXTRA_IPS
+                + pod_ips_in_subnet + AZURE_RESERVED_IPS)
+    return IPDemand(
+        cluster_name=cluster.cluster_name,
+        max_nodes=max_nodes,
+        node_ips=node_ips,
+        pod_ips=overlay_pod_ips,
+        node_prefix=prefix_for(node_ips),
+        pod_prefix=prefix_for(overlay_pod_ips) if overlay_pod_ips else None
+    )
+
+
+class CIDRAllocator:
+    """
+    Allocates aligned, non-overlapping CIDR blocks from a supernet.
+
+    Args:
+        supernet: Address space to allocate from, e.g. '10.0.0.0/8'
+        reserved: CIDRs already in use inside the supernet
+    """
+
+    def __init__(self, supernet: str, reserved: Iterable[str] = ()):
+        self.supernet = ipaddress.ip_network(supernet)
+        self._network_class = type(self.supernet)
+        self._bits = self.supernet.max_prefixlen
+        self._base_prefix = self.supernet.prefixlen
+        self._free: Dict[int, List[int]] = {
+            prefix: [] for prefix in range(self._base_prefix, self._bits + 1)
+        }
+        self._free[self._base_prefix].append(int(self.supernet.network_address))
+        self.allocated = 0
+        for cidr in reserved:
+            self.reserve(cidr)
+
+    @property
+    def free_addresses(self) -> int:
+        return sum(len(blocks) << (self._bits - prefix) for prefix, blocks in self._free.items())
+
+    def _format(self, start: int, prefix: int) -> str:
+        return str(self._network_class((start, prefix)))
+
+    def allocate(self, prefix: int) -> str:
+        """
+        Allocate the lowest free block of the given prefix length.
+
+        Raises:
+            AddressSpaceExhausted: If no free block is large enough
+        """
+        if prefix < self._base_prefix or prefix > self._bits:
+            raise AddressSpaceExhausted(f"/{prefix} does not fit in {self.supernet}")
+        for size_prefix in range(prefix, self._base_prefix - 1, -1):
+            if self._free[size_prefix]:
+                start = heapq.heappop(self._free[size_prefix])
+                break
+        else:
+            raise AddressSpaceExhausted(f"No free /{prefix} left in {self.supernet}")
+
+        # Split down to the requested size, freeing the upper buddy at each step
+        while size_prefix < prefix:
+            size_prefix += 1
+            heapq.heappush(self._free[size_prefix], start + (1 << (self._bits - size_prefix)))
+        self.allocated += 1
+        return self._format(start, prefix)
+
+    def reserve(self, cidr: str) -> None:
+        """
+        Mark a CIDR as in use so it is never allocated.
+
+        Raises:
+            ValueError: If the CIDR lies outside the supernet
+        """
+        network = ipaddress.ip_network(cidr)
+        if not network.subnet_of(self.supernet):
+            raise ValueError(f"{cidr} is not inside {self.supernet}")
+        r_start, r_prefix = int(network.network_address), network.prefixlen
+        r_end = r_start + (1 << (self._bits - r_prefix))
+
+        for prefix, blocks in self._free.items():
+            size = 1 << (self._bits - prefix)
+            overlapping = [start for start in blocks if start < r_end and r_start < start + size]
+            if not overlapping:
+                continue
+            taken = set(overlapping)
+            self._free[prefix] = [start for start in blocks if start not in taken]
+            heapq.heapify(self._free[prefix])
+            for start in overlapping:
+                # Aligned blocks are either nested or disjoint; split any block
+                # that contains the reservation and free the other halves
+                block_prefix = prefix
+                while block_prefix < r_prefix:
+                    block_prefix += 1
+                    half = 1 << (self._bits - block_prefix)
+                    if r_start >= start + half:
+                        heapq.heappush(self._free[block_prefix], start)
+                        start += half
+                    else:
+                        heapq.heappush(self._free[block_prefix], start + half)
+
+
+def allocate_fleet(
+    demands: Iterable[IPDemand],
+    supernet: str,
+    pod_supernet: Optional[str] = None,
+    reserved: Iterable[str] = ()
+) -> Dict[str, Tuple[str, Optional[str]]]:
+    """
+    Allocate node and pod CIDRs for a fleet.
+
+    Largest blocks are placed first to keep fragmentation low. Pod CIDRs
+    come from pod_supernet when given, otherwise from the same supernet.
+
+    Returns:
+        {cluster name: (node CIDR, pod CIDR or None)}
+
+    Raises:
+        AddressSpaceExhausted: If the fleet does not fit
+        ValueError: If a supernet is not IPv4 or cluster names repeat
+    """
+    for net in (supernet, pod_supernet):
+        if net and ipaddress.ip_network(net).version != 4:
+            raise ValueError(f"Fleet allocation needs an IPv4 supernet, got {net}")
+    reserved = list(reserved)
+    node_allocator = CIDRAllocator(supernet, _clip(reserved, supernet))
+    pod_allocator = node_allocator
+    if pod_supernet:
+        pod_allocator = CIDRAllocator(pod_supernet, _clip(reserved, pod_supernet))
+
+    demands = list(demands)
+    if len({d.cluster_name for d in demands}) != len(demands):
+        raise ValueError("Cluster names must be unique across the fleet")
+    requests = [(d.node_prefix, d.cluster_name, 'node') for d in demands]
+    requests += [(d.pod_prefix, d.cluster_name, 'pod') for d in demands if d.pod_prefix is not None]
+    # Sort on prefix only; the sort is stable, so equal sizes keep fleet order
+    requests.sort(key=lambda r: r[0])
+
+    node_cidrs: Dict[str, str] = {}
+    pod_cidrs: Dict[str, str] = {}
+    for prefix, name, kind in requests:
+        if kind == 'node':
+            node_cidrs[name] = node_allocator.allocate(prefix)
+        else:
+            pod_cidrs[name] = pod_allocator.allocate(prefix)
+
+    logger.info(f"Allocated address space for {len(demands)} clusters from {supernet}")
+    return {d.cluster_name: (node_cidrs[d.cluster_name], pod_cidrs.get(d.cluster_name)) for d in demands}
+
+
+def _clip(reserved: List[str], supernet: str) -> List[str]:
+    """Reservations overlapping the supernet; one covering it reserves all of it"""
+    parent = ipaddress.ip_network(supernet)
+    clipped = []
+    for cidr in reserved:
+        network = ipaddress.ip_network(cidr)
+        if network.version != parent.version:
+            continue
+        if network.subnet_of(parent):
+            clipped.append(cidr)
+        elif parent.subnet_of(network):
+            clipped.append(str(parent))
+    return clipped
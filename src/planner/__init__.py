@@ -3,5 +3,20 @@ Planner module for AKS Arc deployment planning
 """
 
 from .planner import Planner
+from .video_sizing import VideoAnalyticsSizer, VideoSizingFactors, VideoSizingBatch
+from .diff import PlanDiff, PlanHashTree, diff_plans, plan_hash_tree
+from .cost import CostEngine, CostOptions, CostPricing, CostBreakdown, CostBatch
+from .extensions import ExtensionResolver, ExtensionOverhead, ResolvedExtensions
+from .partitioner import ClusterPartitioner
+from .plan_table import PlanLattice, PlanTable
+from .gpu_sizing import GpuSizer, GpuSizingFactors, GpuSizing
+from .upgrade import UpgradePlanner, UpgradeRollout, UpgradeStep, VersionGraph
 
-__all__ = ['Planner']
+__all__ = [
+    'Planner', 'VideoAnalyticsSizer', 'VideoSizingFactors', 'VideoSizingBatch',
+    'PlanDiff', 'PlanHashTree', 'diff_plans', 'plan_hash_tree',
+    'CostEngine', 'CostOptions', 'CostPricing', 'CostBreakdown', 'CostBatch',
+    'ExtensionResolver', 'ExtensionOverhead', 'ResolvedExtensions',
+    'ClusterPartitioner', 'PlanLattice', 'PlanTable', 'GpuSizer', 'GpuSizingFactors', 'GpuSizing',
+    'UpgradePlanner', 'UpgradeRollout', 'UpgradeStep', 'VersionGraph'
+]
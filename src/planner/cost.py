@@ -0,0 +1,208 @@
+"""
+Cost engine - monthly cost estimates for deployment plans
+
+Python port of js/cost-calculator.js, extended with Arc extension costs
+from the catalog and a columnar batch mode for fleet-wide reports.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+from src.catalog import CatalogService
+from src.models import DeploymentPlan
+
+logger = logging.getLogger(__name__)
+
+# Extensions priced by the Defender / Azure Monitor formulas instead of monthlyCost
+DEFENDER_EXTENSION = 'defender-containers'
+MONITOR_EXTENSION = 'azure-monitor'
+
+
+@dataclass(frozen=True)
+class CostPricing:
+    """Unit prices in USD per month (approximate, matches the web calculator)"""
+    compute_per_vcore: float = 15.0
+    defender_per_vcore: float = 6.87
+    monitoring_base: float = 30.0
+    monitoring_per_node: float = 10.0
+    log_ingestion_per_gb: float = 2.76
+    estimated_log_gb_per_node: float = 5.0
+    prometheus_storage: float = 20.0
+
+
+@dataclass
+class CostOptions:
+    """Optional services to price on top of compute"""
+    enable_defender: bool = False
+    enable_azure_monitor: bool = False
+    enable_prometheus: bool = False
+    extensions: List[str] = field(default_factory=list)
+
+
+@dataclass
+class CostBreakdown:
+    """Monthly cost of one plan"""
+    compute: float
+    defender: float
+    monitoring: float
+    extensions: float
+    vcores: int
+    nodes: int
+
+    @property
+    def monthly(self) -> float:
+        return self.compute + self.defender + self.monitoring + self.extensions
+
+    @property
+    def annual(self) -> float:
+        return self.monthly * 12
+
+
+@dataclass
+class CostBatch:
+    """Columnar monthly costs, one entry per plan"""
+    compute: List[float] = field(default_factory=list)
+    defender: List[float] = field(default_factory=list)
+    monitoring: List[float] = field(default_factory=list)
+    extensions: List[float] = field(default_factory=list)
+    monthly: List[float] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.monthly)
+
+    @property
+    def total_monthly(self) -> float:
+        return sum(self.monthly)
+
+
+class CostEngine:
+    """
+    Prices plans using catalog SKU sizes and Arc extension monthly costs.
+    """
+
+    def __init__(self, catalog: CatalogService, pricing: Optional[CostPricing] = None):
+        self.pricing = pricing or CostPricing()
+        self.extension_costs = {
+            key: float(ext.get('monthlyCost', 0) or 0)
+            for key, ext in catalog.get_arc_extensions().items()
+        }
+        self.sku_vcpus: Dict[str, int] = {}
+        for skus in (catalog.catalog_data or {}).get('vm_skus', {}).values():
+            for sku in skus:
+                self.sku_vcpus[sku['name']] = sku['vcpus']
+
+    def extensions_cost(self, extensions: Iterable[str], options: CostOptions) -> float:
+        """Monthly cost of selected extensions not already priced by a formula"""
+        total = 0.0
+        for key in extensions:
+            if key == DEFENDER_EXTENSION and options.enable_defender:
+                continue
+            if key == MONITOR_EXTENSION and options.enable_azure_monitor:
+                continue
+            if key not in self.extension_costs:
+                logger.warning(f"Unknown Arc extension '{key}' priced at 0")
+            total += self.extension_costs.get(key, 0.0)
+        return total
+
+    def plan_usage(self, plan: DeploymentPlan) -> Tuple[int, int]:
+        """Return (worker vCores, worker nodes) for a plan"""
+        vcores = 0
+        nodes = 0
+        for pool in plan.cluster_config.node_pools:
+            vcores += pool.node_count * self.sku_vcpus.get(pool.vm_size, 0)
+            nodes += pool.node_count
+        return vcores, nodes
+
+    def plan_cost(self, plan: DeploymentPlan, options: Optional[CostOptions] = None) -> CostBreakdown:
+        """Price a single plan"""
+        options = options or CostOptions()
+        vcores, nodes = self.plan_usage(plan)
+        batch = self.price_batch(
+            [vcores], [nodes],
+            defender=[options.enable_defender],
+            azure_monitor=[options.enable_azure_monitor],
+            prometheus=[options.enable_prometheus],
+            extension_cost=[self.extensions_cost(options.extensions, options)]
+        )
+        return CostBreakdown(
+            compute=batch.compute[0],
+            defender=batch.defender[0],
+            monitoring=batch.monitoring[0],
+            extensions=batch.extensions[0],
+            vcores=vcores,
+            nodes=nodes
+        )
+
+    def price_batch(
+        self,
+        vcores: Sequence[int],
+        nodes: Sequence[int],
+        defender: Optional[Sequence[bool]] = None,
+        azure_monitor: Optional[Sequence[bool]] = None,
+        prometheus: Optional[Sequence[bool]] = None,
+        extension_cost: Optional[Sequence[float]] = None
+    ) -> CostBatch:
+        """
+        Price many plans at once from columnar inputs.
+
+        Args:
+            vcores: Worker vCores per plan
+            nodes: Worker nodes per plan
+            defender: Defender enabled per plan (default off)
+            azure_monitor: Azure Monitor enabled per plan (default off)
+            prometheus: Prometheus enabled per plan (default off)
+            extension_cost: Pre-summed extension cost per plan (default 0)
+
+        Returns:
+            CostBatch with one value per plan in each column
+        """
+        n = len(vcores)
+        columns = [nodes, defender, azure_monitor, prometheus, extension_cost]
+        if any(col is not None and len(col) != n for col in columns):
+            raise ValueError("All cost columns must have the same length")
+        off = [False] * n
+        defender = defender if defender is not None else off
+        azure_monitor = azure_monitor if azure_monitor is not None else off
+        prometheus = prometheus if prometheus is not None else off
+        extension_cost = extension_cost if extension_cost is not None else [0.0] * n
+
+        p = self.pricing
+        compute_rate = p.compute_per_vcore
+        defender_rate = p.defender_per_vcore
+        monitor_base = p.monitoring_base
+        monitor_node_rate = p.monitoring_per_node + p.estimated_log_gb_per_node * p.log_ingestion_per_gb
+        prometheus_cost = p.prometheus_storage
+
+        compute = [v * compute_rate for v in vcores]
+        defender_cost = [v * defender_rate if on else 0.0 for v, on in zip(vcores, defender)]
+        monitoring = [
+            (monitor_base + k * monitor_node_rate if mon else 0.0) + (prometheus_cost if prom else 0.0)
+            for k, mon, prom in zip(nodes, azure_monitor, prometheus)
+        ]
+        extensions = [float(x) for x in extension_cost]
+        monthly = [a + b + c + d for a, b, c, d in zip(compute, defender_cost, monitoring, extensions)]
+        return CostBatch(
+            compute=compute,
+            defender=defender_cost,
+            monitoring=monitoring,
+            extensions=extensions,
+            monthly=monthly
+        )
+
+    def usage_columns(self, plans: Iterable[Dict[str, Any]]) -> Tuple[List[int], List[int]]:
+        """
+        Extract (vcores, nodes) columns from serialized plans (plan_to_dict output)
+        without rebuilding dataclasses.
+        """
+        vcores: List[int] = []
+        nodes: List[int] = []
+        sku_vcpus = self.sku_vcpus
+        for plan in plans:
+            v = k = 0
+            for pool in plan['cluster_config']['node_pools']:
+                count = pool['node_count']
+                v += count * sku_vcpus.get(pool['vm_size'], 0)
+                k += count
+            vcores.append(v)
+            nodes.append(k)
+        return vcores, nodes
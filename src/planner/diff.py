@@ -0,0 +1,220 @@
+"""
+Structural plan diff with Merkle hashing of plan subtrees
+
+Each node pool, rack and the cluster scalars are hashed separately and
+combined into a root hash. Diffs compare hashes top-down and only descend
+into subtrees whose hashes differ, so unchanged plans and unchanged pools
+are skipped without field-by-field comparison.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from src.models import DeploymentPlan, plan_to_dict
+
+PlanLike = Union[DeploymentPlan, Dict[str, Any]]
+
+# Cluster fields compared as scalars; node pools and topology are hashed separately
+_CLUSTER_SKIP = ('node_pools',)
+
+
+def _digest(value: Any) -> str:
+    encoded = json.dumps(value, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8')
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+def _as_dict(plan: PlanLike) -> Dict[str, Any]:
+    return plan if isinstance(plan, dict) else plan_to_dict(plan)
+
+
+@dataclass
+class PlanHashTree:
+    """Merkle hashes for one plan"""
+    root: str
+    cluster: str
+    cluster_fields: str
+    workload: str
+    topology: str
+    pools: Dict[str, str] = field(default_factory=dict)
+    racks: Dict[str, str] = field(default_factory=dict)
+
+
+def plan_hash_tree(plan: PlanLike) -> PlanHashTree:
+    """Compute the Merkle hash tree of a plan (object or plan_to_dict output)"""
+    data = _as_dict(plan)
+    cluster = data['cluster_config']
+    pools = {pool['name']: _digest(pool) for pool in cluster.get('node_pools', [])}
+    cluster_fields = _digest({k: v for k, v in cluster.items() if k not in _CLUSTER_SKIP})
+    cluster_hash = _digest([cluster_fields, sorted(pools.items())])
+    racks = {rack['rack_id']: _digest(rack) for rack in data.get('rack_topology') or []}
+    topology = _digest(sorted(racks.items()))
+    workload = _digest(data.get('workload_requirements'))
+    return PlanHashTree(
+        root=_digest([cluster_hash, topology, workload]),
+        cluster=cluster_hash,
+        cluster_fields=cluster_fields,
+        workload=workload,
+        topology=topology,
+        pools=pools,
+        racks=racks
+    )
+
+
+@dataclass
+class Change:
+    """One difference between two plans"""
+    path: str
+    kind: str  # 'added', 'removed' or 'changed'
+    old: Any = None
+    new: Any = None
+
+    def __str__(self) -> str:
+        if self.kind == 'added':
+            return f"+ {self.path}: {self.new}"
+        if self.kind == 'removed':
+            return f"- {self.path}: {self.old}"
+        return f"~ {self.path}: {self.old} -> {self.new}"
+
+
+@dataclass
+class PlanDiff:
+    """Differences between an old and a new plan"""
+    changes: List[Change] = field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.changes
+
+    def to_dict(self) -> List[Dict[str, Any]]:
+        return [{'path': c.path, 'kind': c.kind, 'old': c.old, 'new': c.new} for c in self.changes]
+
+
+def _diff_fields(prefix: str, old: Dict[str, Any], new: Dict[str, Any], changes: List[Change]) -> None:
+    """Field-level diff; labels-style dicts and taints-style lists are diffed per entry"""
+    for key in sorted(old.keys() | new.keys()):
+        path = f"{prefix}.{key}"
+        if key not in new:
+            changes.append(Change(path, 'removed', old=old[key]))
+        elif key not in old:
+            changes.append(Change(path, 'added', new=new[key]))
+        elif old[key] != new[key]:
+            before, after = old[key], new[key]
+            if isinstance(before, dict) and isinstance(after, dict):
+                _diff_fields(path, before, after, changes)
+            elif isinstance(before, list) and isinstance(after, list) and \
+                    all(isinstance(v, str) for v in before + after):
+                for item in sorted(set(before) - set(after)):
+                    changes.append(Change(path, 'removed', old=item))
+                for item in sorted(set(after) - set(before)):
+                    changes.append(Change(path, 'added', new=item))
+            else:
+                changes.append(Change(path, 'changed', old=before, new=after))
+
+
+def _diff_keyed(prefix: str, old_hashes: Dict[str, str], new_hashes: Dict[str, str],
+                old_items: Dict[str, Dict], new_items: Dict[str, Dict], changes: List[Change]) -> None:
+    for name in sorted(old_hashes.keys() | new_hashes.keys()):
+        path = f"{prefix}[{name}]"
+        if name not in new_hashes:
+            changes.append(Change(path, 'removed', old=old_items[name]))
+        elif name not in old_hashes:
+            changes.append(Change(path, 'added', new=new_items[name]))
+        elif old_hashes[name] != new_hashes[name]:
+            _diff_fields(path, old_items[name], new_items[name], changes)
+
+
+def diff_plans(
+    old: PlanLike,
+    new: PlanLike,
+    old_tree: Optional[PlanHashTree] = None,
+    new_tree: Optional[PlanHashTree] = None
+) -> PlanDiff:
+    """
+    Diff two plans down to node pool, label, taint and rack level.
+
+    Precomputed hash trees may be passed in; identical roots return an
+    empty diff immediately.
+    """
+    old_data, new_data = _as_dict(old), _as_dict(new)
+    old_tree = old_tree or plan_hash_tree(old_data)
+    new_tree = new_tree or plan_hash_tree(new_data)
+    diff = PlanDiff()
+    if old_tree.root == new_tree.root:
+        return diff
+
+    changes = diff.changes
+    if old_tree.cluster != new_tree.cluster:
+        old_cluster, new_cluster = old_data['cluster_config'], new_data['cluster_config']
+        if old_tree.cluster_fields != new_tree.cluster_fields:
+            _diff_fields(
+                'cluster',
+                {k: v for k, v in old_cluster.items() if k not in _CLUSTER_SKIP},
+                {k: v for k, v in new_cluster.items() if k not in _CLUSTER_SKIP},
+                changes
+            )
+        _diff_keyed(
+            'node_pools', old_tree.pools, new_tree.pools,
+            {p['name']: p for p in old_cluster.get('node_pools', [])},
+            {p['name']: p for p in new_cluster.get('node_pools', [])},
+            changes
+        )
+
+    if old_tree.topology != new_tree.topology:
+        _diff_keyed(
+            'racks', old_tree.racks, new_tree.racks,
+            {r['rack_id']: r for r in old_data.get('rack_topology') or []},
+            {r['rack_id']: r for r in new_data.get('rack_topology') or []},
+            changes
+        )
+
+    if old_tree.workload != new_tree.workload:
+        _diff_fields('workload', old_data['workload_requirements'] or {},
+                     new_data['workload_requirements'] or {}, changes)
+
+    return diff
+
+
+def diff_plan_files(old_path: Path, new_path: Path) -> Iterator[Tuple[str, str, Optional[PlanDiff]]]:
+    """
+    Diff two JSONL files of plans, pairing them by cluster name.
+
+    Only hash trees and file offsets of the old plans are held in memory;
+    an old plan is re-read from disk only when its root hash differs.
+
+    Yields:
+        (cluster name, status, diff) with status 'changed', 'unchanged',
+        'added' or 'removed'; diff is None unless the plan changed
+    """
+    index: Dict[str, Tuple[str, int]] = {}
+    with open(old_path, 'rb') as f:
+        offset = f.tell()
+        for line in iter(f.readline, b''):
+            if line.strip():
+                data = json.loads(line)
+                index[data['cluster_config']['cluster_name']] = (plan_hash_tree(data), offset)
+            offset = f.tell()
+
+    seen = set()
+    with open(old_path, 'rb') as old_file, open(new_path, 'rb') as new_file:
+        for line in new_file:
+            if not line.strip():
+                continue
+            new_data = json.loads(line)
+            name = new_data['cluster_config']['cluster_name']
+            seen.add(name)
+            if name not in index:
+                yield name, 'added', None
+                continue
+            old_tree, old_offset = index[name]
+            new_tree = plan_hash_tree(new_data)
+            if old_tree.root == new_tree.root:
+                yield name, 'unchanged', None
+                continue
+            old_file.seek(old_offset)
+            old_data = json.loads(old_file.readline())
+            yield name, 'changed', diff_plans(old_data, new_data, old_tree, new_tree)
+
+    for name in index.keys() - seen:
+        yield name, 'removed', None
@@ -0,0 +1,136 @@
+"""
+Arc extension resolution and resource overhead
+
+Extensions marked requiredFor "all" in the catalog are installed before any
+other extension, and an extension may list further prerequisites in
+dependsOn. The resolver orders a selection topologically and sums the CPU and
+memory each extension reserves, per node and per cluster. Resolutions are
+cached per selection set, so repeated plans with the same extensions skip the
+graph walk.
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+import logging
+from src.catalog import CatalogService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ExtensionOverhead:
+    """CPU cores and memory (GB) reserved by installed extensions"""
+    node_cpu: float = 0.0
+    node_memory_gb: float = 0.0
+    cluster_cpu: float = 0.0
+    cluster_memory_gb: float = 0.0
+
+    @classmethod
+    def from_resources(cls, resources: Dict) -> 'ExtensionOverhead':
+        per_node = resources.get('per_node', {})
+        per_cluster = resources.get('per_cluster', {})
+        return cls(
+            node_cpu=float(per_node.get('cpu', 0)),
+            node_memory_gb=float(per_node.get('memory_gb', 0)),
+            cluster_cpu=float(per_cluster.get('cpu', 0)),
+            cluster_memory_gb=float(per_cluster.get('memory_gb', 0))
+        )
+
+    def __add__(self, other: 'ExtensionOverhead') -> 'ExtensionOverhead':
+        return ExtensionOverhead(
+            node_cpu=self.node_cpu + other.node_cpu,
+            node_memory_gb=self.node_memory_gb + other.node_memory_gb,
+            cluster_cpu=self.cluster_cpu + other.cluster_cpu,
+            cluster_memory_gb=self.cluster_memory_gb + other.cluster_memory_gb
+        )
+
+
+@dataclass(frozen=True)
+class ResolvedExtensions:
+    """Extensions in install order with their combined overhead"""
+    order: Tuple[str, ...] = ()
+    overhead: ExtensionOverhead = ExtensionOverhead()
+
+
+class ExtensionResolver:
+    """
+    Resolves extension selections into a dependency-ordered install list.
+
+    Args:
+        extensions: The catalog's arc_extensions section
+    """
+
+    def __init__(self, extensions: Dict[str, Dict]):
+        baseline = sorted(key for key, ext in extensions.items() if 'all' in ext.get('requiredFor', []))
+        self.baseline: Tuple[str, ...] = tuple(baseline)
+        self._overheads = {
+            key: ExtensionOverhead.from_resources(ext.get('resources', {}))
+            for key, ext in extensions.items()
+        }
+        self._dependencies: Dict[str, Tuple[str, ...]] = {}
+        for key, ext in extensions.items():
+            deps = set(ext.get('dependsOn', []))
+            if key not in self.baseline:
+                deps.update(self.baseline)
+            self._dependencies[key] = tuple(sorted(deps))
+        self._cache: Dict[FrozenSet[str], ResolvedExtensions] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_catalog(cls, catalog: CatalogService) -> 'ExtensionResolver':
+        return cls(catalog.get_arc_extensions())
+
+    def resolve(self, selection: Iterable[str]) -> ResolvedExtensions:
+        """
+        Resolve selected extensions and their prerequisites.
+
+        Args:
+            selection: Extension IDs from the catalog
+
+        Returns:
+            ResolvedExtensions; prerequisites always come before dependents
+
+        Raises:
+            ValueError: If an extension is unknown or dependencies form a cycle
+        """
+        key = frozenset(selection)
+        resolved = self._cache.get(key)
+        if resolved is None:
+            resolved = self._resolve(key)
+            with self._lock:
+                self._cache[key] = resolved
+        return resolved
+
+    def _resolve(self, selection: FrozenSet[str]) -> ResolvedExtensions:
+        unknown = sorted(selection - self._dependencies.keys())
+        if unknown:
+            raise ValueError(f"Unknown Arc extension(s): {', '.join(unknown)}")
+
+        order: List[str] = []
+        done = set()
+        visiting = set()
+
+        def visit(name: str, chain: Tuple[str, ...]) -> None:
+            if name in done:
+                return
+            if name in visiting:
+                cycle = ' -> '.join(chain[chain.index(name):] + (name,))
+                raise ValueError(f"Arc extension dependency cycle: {cycle}")
+            visiting.add(name)
+            for dep in self._dependencies.get(name, ()):
+                if dep not in self._dependencies:
+                    raise ValueError(f"Arc extension '{name}' depends on unknown extension '{dep}'")
+                visit(dep, chain + (name,))
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in sorted(selection):
+            visit(name, ())
+
+        overhead = ExtensionOverhead()
+        for name in order:
+            overhead = overhead + self._overheads[name]
+        logger.debug(f"Resolved Arc extensions {sorted(selection)} -> {order}")
+        return ResolvedExtensions(order=tuple(order), overhead=overhead)
@@ -0,0 +1,151 @@
+"""
+GPU pool sizing - packs GPU pods onto GPU SKUs
+
+A workload's gpu_count is the number of GPU pods it runs. Each pod takes one
+GPU exclusively unless the workload shares GPUs:
+
+- time-slicing: gpu_sharing_ratio pods take turns on one GPU;
+- fractional: each pod gets gpu_sharing_ratio of a GPU (e.g. 0.25, a MIG
+  slice), so floor(1 / ratio) pods fit on one GPU.
+
+A GPU pod also needs CPU and memory on its node. How many pods a node holds
+is the smallest of its GPU, CPU and memory capacity, after the per-node
+extension agents are reserved. Every GPU SKU in the catalog is evaluated.
+The one needing the fewest nodes is chosen; ties go to the SKU with the
+fewest total vCPUs and then the fewest GPUs, the cheaper hosts.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+import logging
+from src.models import WorkloadRequirements
+
+logger = logging.getLogger(__name__)
+
+GPU_SHARING_MODES = ('time-slicing', 'fractional')
+
+
+@dataclass(frozen=True)
+class GpuSizingFactors:
+    """Defaults for GPU pods that do not state their own CPU and memory"""
+    pod_cpu: float = 1.0
+    pod_memory_gb: float = 4.0
+
+
+@dataclass
+class GpuSizing:
+    """Chosen GPU SKU and node count for a workload's GPU pods"""
+    vm_size: str
+    gpu_model: Optional[str]
+    node_count: int
+    gpus_per_node: int
+    pods_per_node: int
+    pods: int
+    limited_by: str  # 'gpu', 'cpu' or 'memory': what caps pods per node
+
+    @property
+    def gpus(self) -> int:
+        return self.node_count * self.gpus_per_node
+
+
+def pods_per_gpu(workload: WorkloadRequirements) -> int:
+    """
+    GPU pods one physical GPU holds under the workload's sharing mode.
+
+    Raises:
+        ValueError: If the sharing mode or ratio is invalid
+    """
+    mode, ratio = workload.gpu_sharing, workload.gpu_sharing_ratio
+    if mode is None:
+        return 1
+    if mode not in GPU_SHARING_MODES:
+        raise ValueError(f"GPU sharing must be one of {', '.join(GPU_SHARING_MODES)}, not '{mode}'")
+    if ratio is None:
+        raise ValueError(f"GPU sharing '{mode}' needs gpu_sharing_ratio")
+    if mode == 'time-slicing':
+        if ratio < 1 or ratio != int(ratio):
+            raise ValueError("Time-slicing gpu_sharing_ratio is the whole number of pods per GPU")
+        return int(ratio)
+    if not 0 < ratio <= 1:
+        raise ValueError("Fractional gpu_sharing_ratio is the fraction of a GPU per pod (0 < ratio <= 1)")
+    # Guard against 1/0.1 evaluating to 9.999...
+    return int(math.floor(1 / ratio + 1e-9))
+
+
+class GpuSizer:
+    """
+    Chooses a GPU SKU and node count for a workload's GPU pods.
+
+    Args:
+        factors: Per-pod CPU and memory used when the workload gives none
+    """
+
+    def __init__(self, factors: Optional[GpuSizingFactors] = None):
+        self.factors = factors or GpuSizingFactors()
+
+    def pod_resources(self, workload: WorkloadRequirements) -> Tuple[float, float]:
+        """CPU cores and memory GB of one GPU pod"""
+        cpu = workload.gpu_pod_cpu if workload.gpu_pod_cpu is not None else self.factors.pod_cpu
+        memory = workload.gpu_pod_memory_gb if workload.gpu_pod_memory_gb is not None \
+            else self.factors.pod_memory_gb
+        return cpu, memory
+
+    def candidates(self, workload: WorkloadRequirements, gpu_skus: Sequence[Dict],
+                   node_cpu_reserved: float = 0.0, node_memory_reserved: float = 0.0) -> List[GpuSizing]:
+        """
+        Every GPU SKU able to host the workload's pods, best first.
+
+        Raises:
+            ValueError: If the sharing settings are invalid
+        """
+        pods = max(1, workload.gpu_count)
+        per_gpu = pods_per_gpu(workload)
+        pod_cpu, pod_memory = self.pod_resources(workload)
+
+        options = []
+        for sku in gpu_skus:
+            if workload.gpu_model and sku.get('gpu_model') != workload.gpu_model:
+                continue
+            gpus = int(sku.get('gpu_count', 1))
+            limits = {'gpu': gpus * per_gpu}
+            if pod_cpu > 0:
+                limits['cpu'] = math.floor((sku['vcpus'] - node_cpu_reserved) / pod_cpu)
+            if pod_memory > 0:
+                limits['memory'] = math.floor((sku['memory_gb'] - node_memory_reserved) / pod_memory)
+            limited_by = min(limits, key=limits.get)
+            per_node = limits[limited_by]
+            if per_node < 1:
+                continue
+            options.append(GpuSizing(
+                vm_size=sku['name'],
+                gpu_model=sku.get('gpu_model'),
+                node_count=math.ceil(pods / per_node),
+                gpus_per_node=gpus,
+                pods_per_node=per_node,
+                pods=pods,
+                limited_by=limited_by
+            ))
+        skus = {sku['name']: sku for sku in gpu_skus}
+        options.sort(key=lambda o: (o.node_count, o.node_count * skus[o.vm_size]['vcpus'], o.gpus, o.vm_size))
+        return options
+
+    def size(self, workload: WorkloadRequirements, gpu_skus: Sequence[Dict],
+             node_cpu_reserved: float = 0.0, node_memory_reserved: float = 0.0) -> GpuSizing:
+        """
+        Size the GPU pool with the fewest nodes.
+
+        Raises:
+            ValueError: If no GPU SKU (of the requested model) can host a pod
+        """
+        options = self.candidates(workload, gpu_skus, node_cpu_reserved, node_memory_reserved)
+        if not options:
+            model = f" {workload.gpu_model}" if workload.gpu_model else ''
+            cpu, memory = self.pod_resources(workload)
+            raise ValueError(f"No{model} GPU SKU can host a GPU pod needing {cpu:g} cores and {memory:g} GB")
+        best = options[0]
+        logger.info(
+            f"GPU pool: {best.pods} pods on {best.node_count}x {best.vm_size} "
+            f"({best.pods_per_node} pods per node, limited by {best.limited_by})"
+        )
+        return best
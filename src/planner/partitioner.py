@@ -0,0 +1,252 @@
+"""
+Multi-cluster partitioning for workloads that exceed cluster limits
+
+The partitioner sizes a workload in nodes of the largest SKU. It then finds
+the smallest number of clusters that satisfies max_nodes_per_cluster,
+max_nodes_per_pool and max_pools_per_cluster. The search starts at the
+lower bound implied by the limits, and each candidate count is checked
+arithmetically by dealing nodes evenly across clusters and pools. No
+cluster is ever replanned to test a candidate.
+"""
+
+import copy
+import math
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, List, Optional, Sequence
+import logging
+from src.models import DeploymentPlan, NodePoolConfig, WorkloadRequirements
+from src.planner.planner import Planner
+
+logger = logging.getLogger(__name__)
+
+# Planner minimum for the primary pool of every cluster
+MIN_CLUSTER_NODES = 3
+
+
+def split_evenly(total: int, parts: int) -> List[int]:
+    """Split total into parts that differ by at most one, largest first"""
+    base, extra = divmod(total, parts)
+    return [base + 1 if i < extra else base for i in range(parts)]
+
+
+@dataclass
+class ClusterShard:
+    """Node counts assigned to one cluster of a partition"""
+    cpu_pools: List[int]
+    gpu_pools: List[int]
+
+    @property
+    def cpu_nodes(self) -> int:
+        return sum(self.cpu_pools)
+
+    @property
+    def gpu_nodes(self) -> int:
+        return sum(self.gpu_pools)
+
+
+class ClusterPartitioner:
+    """
+    Splits oversized workloads across the minimum number of clusters.
+
+    Args:
+        planner: Planner whose catalog, limits and extensions are used
+    """
+
+    def __init__(self, planner: Planner):
+        self.planner = planner
+        self.catalog = planner.catalog
+
+    def _pool_sizes(self, nodes: int, max_per_pool: int, rack_count: Optional[int]) -> List[int]:
+        """
+        Balanced pool sizes for a node count.
+
+        When racks are planned, sizes are rounded up to a multiple of the
+        rack count if the pool limit allows it, so every rack gets the same
+        number of nodes from each pool.
+        """
+        if nodes <= 0:
+            return []
+        sizes = split_evenly(nodes, math.ceil(nodes / max_per_pool))
+        if rack_count and rack_count > 1:
+            rounded = [math.ceil(size / rack_count) * rack_count for size in sizes]
+            sizes = [r if r <= max_per_pool else size for r, size in zip(rounded, sizes)]
+        return sizes
+
+    def layout(
+        self,
+        cpu_nodes_for: Callable[[int], int],
+        gpu_nodes: int,
+        limits: Dict,
+        rack_count: Optional[int] = None,
+        max_per_cluster: Optional[int] = None
+    ) -> List[ClusterShard]:
+        """
+        Find the smallest cluster count whose even split meets the limits.
+
+        Args:
+            cpu_nodes_for: Returns total CPU nodes needed for a given
+                cluster count (per-cluster overhead grows with the count)
+            gpu_nodes: Total GPU nodes needed
+            limits: Catalog limits
+            rack_count: Racks per cluster, for rack-balanced pool sizes
+            max_per_cluster: Optional tighter per-cluster node cap, such
+                as an environment template's max_nodes
+
+        Returns:
+            One ClusterShard per cluster
+        """
+        max_cluster = min(limits.get('max_nodes_per_cluster', 1000), max_per_cluster or math.inf)
+        max_pool = min(limits.get('max_nodes_per_pool', 100), max_cluster)
+        max_pools = limits.get('max_pools_per_cluster', 10)
+
+        cpu_total = cpu_nodes_for(1)
+        lower = max(
+            1,
+            math.ceil((cpu_total + gpu_nodes) / max_cluster),
+            math.ceil((math.ceil(cpu_total / max_pool) + math.ceil(gpu_nodes / max_pool)) / max_pools)
+        )
+        upper = max(lower, cpu_total + gpu_nodes)
+        for clusters in range(lower, upper + 1):
+            cpu_total = max(cpu_nodes_for(clusters), MIN_CLUSTER_NODES * clusters)
+            shards = [
+                ClusterShard(self._pool_sizes(cpu, max_pool, rack_count),
+                             self._pool_sizes(gpu, max_pool, rack_count))
+                for cpu, gpu in zip(split_evenly(cpu_total, clusters), split_evenly(gpu_nodes, clusters))
+            ]
+            if all(len(s.cpu_pools) + len(s.gpu_pools) <= max_pools
+                   and s.cpu_nodes + s.gpu_nodes <= max_cluster for s in shards):
+                return shards
+        raise ValueError("Workload cannot be partitioned within the catalog and environment limits")
+
+    def partition(
+        self,
+        workload: WorkloadRequirements,
+        cluster_name: str,
+        resource_group: str,
+        location: str,
+        custom_location: str,
+        enable_rack_awareness: bool = True,
+        rack_count: Optional[int] = None,
+        extensions: Optional[Sequence[str]] = None,
+        environment: Optional[str] = None
+    ) -> List[DeploymentPlan]:
+        """
+        Plan a workload as one or more clusters.
+
+        Workloads that fit one cluster come back as the planner's single
+        plan. Otherwise clusters are named <cluster_name>-01, -02, ... and
+        each receives an even share of the nodes and of the workload.
+
+        Returns:
+            List of DeploymentPlans
+        """
+        base = self.planner.create_plan(
+            workload=workload,
+            cluster_name=cluster_name,
+            resource_group=resource_group,
+            location=location,
+            custom_location=custom_location,
+            enable_rack_awareness=enable_rack_awareness,
+            rack_count=rack_count,
+            extensions=extensions,
+            environment=environment
+        )
+        sized = base.workload_requirements
+        overhead = self.planner.extension_resolver.resolve(base.cluster_config.extensions).overhead
+        limits = self.catalog.get_limits()
+
+        cpu_skus = self.catalog.get_vm_skus('general_purpose')
+        largest = max(cpu_skus, key=lambda s: (s['vcpus'], s['memory_gb'])) if cpu_skus else None
+        if not largest:
+            return [base]
+        node_cpu = largest['vcpus'] - overhead.node_cpu
+        node_memory = largest['memory_gb'] - overhead.node_memory_gb
+
+        def cpu_nodes_for(clusters: int) -> int:
+            # Cluster-wide extension services run once per cluster
+            cpu = sized.cpu_cores + overhead.cluster_cpu * clusters
+            memory = sized.memory_gb + overhead.cluster_memory_gb * clusters
+            return max(math.ceil(cpu / node_cpu), math.ceil(memory / node_memory))
+
+        gpu_pool = next((p for p in base.cluster_config.node_pools if p.taints), None)
+        gpu_nodes = 0
+        if sized.gpu_required and gpu_pool:
+            # The planner already packed the GPU pods onto the pool's SKU
+            gpu_nodes = gpu_pool.node_count
+
+        env_preset = self.catalog.get_environment_preset(environment) if environment else None
+        shards = self.layout(
+            cpu_nodes_for, gpu_nodes, limits,
+            rack_count=rack_count if enable_rack_awareness else None,
+            max_per_cluster=env_preset.max_nodes if env_preset else None
+        )
+        if len(shards) == 1 and base.validation_result.is_valid and \
+                self._fits(base, overhead, gpu_pool, gpu_nodes):
+            return [base]
+
+        logger.info(f"Partitioning {cluster_name} into {len(shards)} clusters")
+        primary = base.cluster_config.node_pools[0]
+        max_pool = min(limits.get('max_nodes_per_pool', 100), env_preset.max_nodes if env_preset else math.inf)
+        warnings = list(env_preset.warnings) if env_preset else []
+        total_nodes = sum(s.cpu_nodes + s.gpu_nodes for s in shards)
+        plans = []
+        for i, shard in enumerate(shards):
+            name = f"{cluster_name}-{i + 1:02d}" if len(shards) > 1 else cluster_name
+            pools = [
+                self._pool_like(primary, n, largest['name'], size, max_pool)
+                for n, size in enumerate(shard.cpu_pools)
+            ]
+            if gpu_pool:
+                pools += [
+                    self._pool_like(gpu_pool, n, gpu_pool.vm_size, size, max_pool)
+                    for n, size in enumerate(shard.gpu_pools)
+                ]
+
+            cluster_config = copy.deepcopy(base.cluster_config)
+            cluster_config.cluster_name = name
+            cluster_config.node_pools = pools
+            if len(shards) > 1:
+                cluster_config.tags['partition'] = f"{i + 1}/{len(shards)}"
+
+            share = (shard.cpu_nodes + shard.gpu_nodes) / total_nodes
+            shard_workload = replace(
+                sized,
+                cpu_cores=math.ceil(sized.cpu_cores * share),
+                memory_gb=math.ceil(sized.memory_gb * share),
+                gpu_count=math.ceil(max(1, sized.gpu_count) * shard.gpu_nodes / gpu_nodes) if gpu_nodes else 0,
+                storage_gb=math.ceil(sized.storage_gb * share)
+            )
+            plans.append(self.planner._assemble_plan(cluster_config, shard_workload, warnings))
+        return plans
+
+    def _fits(self, plan: DeploymentPlan, overhead, gpu_pool: Optional[NodePoolConfig], gpu_nodes: int) -> bool:
+        """Whether a plan's pools already hold the workload and extension overhead"""
+        cpu = memory = 0.0
+        for pool in plan.cluster_config.node_pools:
+            if pool is gpu_pool:
+                continue
+            sku = self.catalog.get_vm_sku(pool.vm_size)
+            if not sku:
+                return False
+            cpu += pool.node_count * (sku['vcpus'] - overhead.node_cpu)
+            memory += pool.node_count * (sku['memory_gb'] - overhead.node_memory_gb)
+        workload = plan.workload_requirements
+        return (
+            cpu >= workload.cpu_cores + overhead.cluster_cpu
+            and memory >= workload.memory_gb + overhead.cluster_memory_gb
+            and (gpu_pool.node_count if gpu_pool else 0) >= gpu_nodes
+        )
+
+    @staticmethod
+    def _pool_like(template: NodePoolConfig, index: int, vm_size: str,
+                   node_count: int, max_pool: int) -> NodePoolConfig:
+        """Copy a planned pool; extra pools are numbered after the template's name"""
+        pool = copy.deepcopy(template)
+        if index:
+            pool.name = f"{template.name.rstrip('0123456789')}{index + 1}"
+        pool.vm_size = vm_size
+        pool.node_count = node_count
+        if pool.enable_auto_scaling:
+            pool.min_count = min(pool.min_count or 1, node_count)
+            pool.max_count = min(max_pool, max(node_count, min(pool.max_count or node_count, node_count * 2)))
+        return pool
@@ -0,0 +1,323 @@
+"""
+Precomputed plan lookup tables
+
+Most planning requests fall on a small lattice of workload type, CPU,
+memory, GPU and rack values. A plan table is built offline by running the
+planner over every point of such a lattice for one catalog version. The
+resulting plans, minus the cluster identity and workload, are stored as
+deduplicated templates. The file is memory-mapped and laid out as:
+
+    magic  header length (u32)  header JSON
+    cell -> template index      u32 per lattice point, row-major over the axes
+    template offsets            u64 per template, plus the end offset
+    templates                   JSON, one after another
+
+Looking a request up is a direct index computation. No search or parse of
+the whole file is needed. A template is decoded the first time it is hit.
+Every hit gets a fresh copy carrying the request's cluster identity and
+workload, so callers may modify the plan they receive.
+"""
+
+import json
+import mmap
+import os
+import struct
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import logging
+from src.models import (
+    ClusterConfig, DeploymentPlan, NodePoolConfig, RackTopology, ValidationResult,
+    WorkloadRequirements, WorkloadType, plan_from_dict, plan_to_dict
+)
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'AKSPLT01'
+_HEADER_LEN = struct.Struct('<I')
+_CELL = struct.Struct('<I')
+_OFFSET = struct.Struct('<Q')
+_IDENTITY = ('cluster_name', 'resource_group', 'location', 'custom_location')
+
+
+@dataclass
+class PlanLattice:
+    """
+    Input values a plan table covers; every combination is precomputed.
+
+    A rack count of None means no rack count was given.
+    """
+    workload_types: List[str] = field(default_factory=lambda: [t.value for t in WorkloadType])
+    cpu_cores: List[int] = field(default_factory=lambda: [4, 8, 16, 32, 64])
+    memory_gb: List[int] = field(default_factory=lambda: [8, 16, 32, 64, 128, 256])
+    gpu_required: List[bool] = field(default_factory=lambda: [False, True])
+    gpu_count: List[int] = field(default_factory=lambda: [0, 1, 2, 4])
+    rack_count: List[Optional[int]] = field(default_factory=lambda: [None, 1, 2, 3, 4])
+    enable_rack_awareness: List[bool] = field(default_factory=lambda: [True])
+
+    def __post_init__(self):
+        for value in self.workload_types:
+            WorkloadType(value)
+        # Zero CPU and memory would pick up workload preset sizing instead
+        if any(v <= 0 for v in self.cpu_cores) or any(v <= 0 for v in self.memory_gb):
+            raise ValueError("Plan table CPU and memory values must be positive")
+        for axis in self.axes():
+            if len(set(axis)) != len(axis):
+                raise ValueError(f"Plan table axis has duplicate values: {axis}")
+            if not axis:
+                raise ValueError("Plan table axes must not be empty")
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'PlanLattice':
+        """Build a lattice from a config mapping; missing axes use the defaults"""
+        known = {f.name for f in fields(cls)}
+        unknown = sorted(set(data) - known)
+        if unknown:
+            raise ValueError(f"Unknown plan table axis: {', '.join(unknown)}")
+        return cls(**{key: list(value) for key, value in data.items()})
+
+    def to_dict(self) -> Dict[str, list]:
+        return {f.name: list(getattr(self, f.name)) for f in fields(self)}
+
+    def axes(self) -> List[list]:
+        return [getattr(self, f.name) for f in fields(self)]
+
+    def size(self) -> int:
+        total = 1
+        for axis in self.axes():
+            total *= len(axis)
+        return total
+
+    def points(self):
+        """Every lattice point as a tuple in row-major cell order"""
+        def expand(axes):
+            if not axes:
+                yield ()
+                return
+            for value in axes[0]:
+                for rest in expand(axes[1:]):
+                    yield (value,) + rest
+        return expand(self.axes())
+
+
+def _serialize_template(plan: DeploymentPlan) -> str:
+    """Serialized plan without the per-request cluster identity and workload"""
+    data = plan_to_dict(plan)
+    del data['workload_requirements']
+    for key in _IDENTITY:
+        del data['cluster_config'][key]
+    return json.dumps(data, sort_keys=True, separators=(',', ':'))
+
+
+def _instantiate(template: DeploymentPlan, workload: WorkloadRequirements, cluster_name: str,
+                 resource_group: str, location: str, custom_location: str) -> DeploymentPlan:
+    """A copy of a decoded template that shares no mutable state with it"""
+    config = template.cluster_config
+    cluster = ClusterConfig(
+        cluster_name=cluster_name,
+        resource_group=resource_group,
+        location=location,
+        custom_location=custom_location,
+        kubernetes_version=config.kubernetes_version,
+        control_plane_count=config.control_plane_count,
+        node_pools=[
+            NodePoolConfig(
+                name=pool.name,
+                vm_size=pool.vm_size,
+                node_count=pool.node_count,
+                os_type=pool.os_type,
+                labels=dict(pool.labels),
+                taints=list(pool.taints),
+                zones=list(pool.zones),
+                max_pods=pool.max_pods,
+                enable_auto_scaling=pool.enable_auto_scaling,
+                min_count=pool.min_count,
+                max_count=pool.max_count
+            )
+            for pool in config.node_pools
+        ],
+        enable_rack_awareness=config.enable_rack_awareness,
+        rack_count=config.rack_count,
+        tags=dict(config.tags),
+        network_plugin=config.network_plugin,
+        load_balancer_sku=config.load_balancer_sku,
+        extensions=list(config.extensions),
+        node_cidr=config.node_cidr,
+        pod_cidr=config.pod_cidr
+    )
+    racks = template.rack_topology
+    if racks is not None:
+        racks = [
+            RackTopology(
+                rack_id=rack.rack_id,
+                fault_domain=rack.fault_domain,
+                node_labels=dict(rack.node_labels),
+                spread_constraints=[dict(constraint) for constraint in rack.spread_constraints]
+            )
+            for rack in racks
+        ]
+    validation = template.validation_result
+    if validation is not None:
+        validation = ValidationResult(
+            is_valid=validation.is_valid,
+            errors=list(validation.errors),
+            warnings=list(validation.warnings),
+            recommendations=list(validation.recommendations)
+        )
+    return DeploymentPlan(
+        cluster_config=cluster,
+        workload_requirements=workload,
+        rack_topology=racks,
+        validation_result=validation,
+        estimated_cost=template.estimated_cost,
+        rationale=template.rationale,
+        catalog_version=template.catalog_version
+    )
+
+
+class PlanTable:
+    """
+    Read-only, memory-mapped plan table for one catalog version.
+
+    Args:
+        path: Table file written by PlanTable.build
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            self._map.close()
+            raise ValueError(f"{self.path} is not a plan table")
+        header_len = _HEADER_LEN.unpack_from(self._map, len(MAGIC))[0]
+        start = len(MAGIC) + _HEADER_LEN.size
+        header = json.loads(self._map[start:start + header_len])
+
+        self.catalog_version: Optional[str] = header['catalog_version']
+        self.lattice = PlanLattice.from_dict(header['lattice'])
+        self.template_count: int = header['templates']
+        self._index = [{value: i for i, value in enumerate(axis)} for axis in self.lattice.axes()]
+        self._strides = []
+        stride = 1
+        for axis in reversed(self.lattice.axes()):
+            self._strides.insert(0, stride)
+            stride *= len(axis)
+        self._cells = start + header_len
+        self._offsets = self._cells + _CELL.size * self.lattice.size()
+        self._blob = self._offsets + _OFFSET.size * (self.template_count + 1)
+        self._decoded: Dict[int, DeploymentPlan] = {}
+
+    @classmethod
+    def build(cls, catalog_service, lattice: PlanLattice, path: Path) -> 'PlanTable':
+        """
+        Plan every lattice point against a catalog and write the table.
+
+        The file is written to a temporary name and renamed into place, so
+        processes holding the previous table mapped are unaffected.
+
+        Returns:
+            The new table, opened
+        """
+        from .planner import Planner
+
+        planner = Planner(catalog_service)
+        templates: Dict[str, int] = {}
+        cells: List[int] = []
+        for workload_type, cpu, memory, gpu_required, gpu_count, racks, rack_aware in lattice.points():
+            plan = planner.create_plan(
+                workload=WorkloadRequirements(
+                    workload_type=WorkloadType(workload_type),
+                    cpu_cores=cpu,
+                    memory_gb=memory,
+                    gpu_required=gpu_required,
+                    gpu_count=gpu_count
+                ),
+                cluster_name='', resource_group='', location='', custom_location='',
+                enable_rack_awareness=rack_aware,
+                rack_count=racks
+            )
+            cells.append(templates.setdefault(_serialize_template(plan), len(templates)))
+
+        header = json.dumps({
+            'catalog_version': catalog_service.version_id,
+            'lattice': lattice.to_dict(),
+            'templates': len(templates)
+        }, sort_keys=True).encode('utf-8')
+        blobs = [template.encode('utf-8') for template in templates]
+
+        path = Path(path)
+        temp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(temp, 'wb') as f:
+            f.write(MAGIC + _HEADER_LEN.pack(len(header)) + header)
+            f.write(b''.join(_CELL.pack(cell) for cell in cells))
+            offset = 0
+            for blob in blobs:
+                f.write(_OFFSET.pack(offset))
+                offset += len(blob)
+            f.write(_OFFSET.pack(offset))
+            f.write(b''.join(blobs))
+        os.replace(temp, path)
+        logger.info(f"Plan table {path}: {len(cells)} lattice points, {len(templates)} distinct plans, "
+                    f"{path.stat().st_size} bytes")
+        return cls(path)
+
+    def _cell(self, key: Sequence) -> Optional[int]:
+        cell = 0
+        for index, stride, value in zip(self._index, self._strides, key):
+            position = index.get(value)
+            if position is None:
+                return None
+            cell += position * stride
+        return cell
+
+    def _template(self, index: int) -> DeploymentPlan:
+        """Decode a template once; it is only ever copied from afterwards"""
+        plan = self._decoded.get(index)
+        if plan is None:
+            start, end = struct.unpack_from('<QQ', self._map, self._offsets + _OFFSET.size * index)
+            data = json.loads(self._map[self._blob + start:self._blob + end])
+            data['cluster_config'].update(dict.fromkeys(_IDENTITY, ''))
+            data['workload_requirements'] = {}
+            plan = self._decoded.setdefault(index, plan_from_dict(data))
+        return plan
+
+    def lookup(
+        self,
+        workload: WorkloadRequirements,
+        cluster_name: str,
+        resource_group: str,
+        location: str,
+        custom_location: str,
+        enable_rack_awareness: bool = True,
+        rack_count: Optional[int] = None
+    ) -> Optional[DeploymentPlan]:
+        """
+        The precomputed plan for a request, or None if it is off the lattice.
+
+        Video analytics workloads sized from cameras and workloads with GPU
+        model, sharing or per-pod settings are never on the lattice.
+        """
+        if workload.cameras or workload.gpu_model or workload.gpu_sharing \
+                or workload.gpu_pod_cpu is not None or workload.gpu_pod_memory_gb is not None:
+            return None
+        # True == 1 as a dict key; only exact types may hit their axes
+        if type(workload.cpu_cores) is not int or type(workload.memory_gb) is not int \
+                or type(workload.gpu_required) is not bool or type(enable_rack_awareness) is not bool:
+            return None
+        key: Tuple = (
+            workload.workload_type.value, workload.cpu_cores, workload.memory_gb,
+            workload.gpu_required, workload.gpu_count, rack_count, enable_rack_awareness
+        )
+        cell = self._cell(key)
+        if cell is None:
+            return None
+
+        template = self._template(_CELL.unpack_from(self._map, self._cells + _CELL.size * cell)[0])
+        return _instantiate(template, workload, cluster_name, resource_group, location, custom_location)
+
+    def __len__(self) -> int:
+        return self.lattice.size()
+
+    def close(self) -> None:
+        self._map.close()
@@ -2,13 +2,20 @@
 Planner module - rack-aware deployment planning
 """
 
-from typing import Dict, List, Optional
+import math
+from typing import Dict, List, Optional, Sequence
 import logging
-from src.catalog import CatalogService
+from src import metrics
+from src.catalog import CatalogService, EnvironmentPreset
 from src.models import (
     WorkloadRequirements, ClusterConfig, NodePoolConfig,
-    DeploymentPlan, ValidationResult, RackTopology, OSType
+    DeploymentPlan, ValidationResult, RackTopology, OSType, WorkloadType
 )
+from src.planner.video_sizing import VideoAnalyticsSizer
+from src.planner.cost import CostEngine, CostOptions
+from src.planner.extensions import ExtensionResolver, ExtensionOverhead
+from src.planner.gpu_sizing import GpuSizer
+from src.planner.plan_table import PlanTable
 
 logger = logging.getLogger(__name__)
 
@@ -19,9 +26,16 @@ class Planner:
     Handles bin-packing, node placement, and topology constraints.
     """
     
-    def __init__(self, catalog_service: CatalogService):
+    def __init__(self, catalog_service: CatalogService, plan_table: Optional['PlanTable'] = None):
         self.catalog = catalog_service
+        self.plan_table = plan_table
+        self.video_sizer = VideoAnalyticsSizer.from_catalog(catalog_service)
+        self.cost_engine = CostEngine(catalog_service)
+        self.extension_resolver = ExtensionResolver.from_catalog(catalog_service)
+        self.gpu_sizer = GpuSizer()
+        self._pinned_planners: Dict[str, 'Planner'] = {}
     
+    @metrics.timed('planner.create_plan')
     def create_plan(
         self,
         workload: WorkloadRequirements,
@@ -30,11 +44,18 @@ class Planner:
         location: str,
         custom_location: str,
         enable_rack_awareness: bool = True,
-        rack_count: Optional[int] = None
+        rack_count: Optional[int] = None,
+        catalog_version: Optional[str] = None,
+        extensions: Optional[Sequence[str]] = None,
+        environment: Optional[str] = None
     ) -> DeploymentPlan:
         """
         Create a deployment plan based on workload requirements.
         
+        Requests on the plan table's lattice, without extensions or an
+        environment template, are served from the table when it was built
+        for the current catalog version.
+        
         Args:
             workload: Workload resource requirements
             cluster_name: Name of the AKS cluster
@@ -43,18 +64,62 @@ class Planner:
             custom_location: Azure Arc custom location
             enable_rack_awareness: Enable rack-aware placement
             rack_count: Number of racks available
+            catalog_version: Plan against this historical catalog version
+                instead of the live catalog
+            extensions: Arc extensions to install; prerequisites are added
+                and their CPU/memory reservations are included in sizing
+            environment: Environment template ('poc', 'pilot', 'production')
+                supplying control plane count, node bounds and autoscaling
             
         Returns:
             DeploymentPlan with cluster configuration and validation
         """
+        if catalog_version and catalog_version != self.catalog.version_id:
+            return self._pinned_planner(catalog_version).create_plan(
+                workload=workload,
+                cluster_name=cluster_name,
+                resource_group=resource_group,
+                location=location,
+                custom_location=custom_location,
+                enable_rack_awareness=enable_rack_awareness,
+                rack_count=rack_count,
+                extensions=extensions,
+                environment=environment
+            )
+        
+        if self.plan_table is not None and not extensions and not environment:
+            plan = self._table_plan(workload, cluster_name, resource_group, location, custom_location,
+                                    enable_rack_awareness, rack_count)
+            if plan is not None:
+                return plan
+        
         logger.info(f"Creating deployment plan for {workload.workload_type}")
         
+        env_preset = self.catalog.get_environment_preset(environment) if environment else None
+        
+        # Derive compute, GPU and storage from camera feeds
+        if workload.workload_type == WorkloadType.VIDEO_ANALYTICS and workload.cameras:
+            with metrics.timer('planner.sizing'):
+                workload = self.video_sizer.apply(workload)
+        
+        # Fall back to the workload preset when no sizing was given
+        workload_preset = self.catalog.get_workload_preset(workload.workload_type.value)
+        if workload_preset:
+            workload = workload_preset.apply(workload)
+        
+        # Resolve Arc extensions and their resource reservations
+        resolved = self.extension_resolver.resolve(extensions or ())
+        
         # Get latest Kubernetes version
-        k8s_versions = self.catalog.get_kubernetes_versions()
-        k8s_version = k8s_versions[0] if k8s_versions else '1.29.2'
+        with metrics.timer('planner.catalog_access'):
+            k8s_versions = self.catalog.get_kubernetes_versions()
+            k8s_version = k8s_versions[0] if k8s_versions else '1.29.2'
         
         # Determine control plane count (1 for dev, 3 for prod)
-        control_plane_count = 3 if workload.cpu_cores >= 16 else 1
+        if env_preset:
+            control_plane_count = env_preset.control_plane_count
+        else:
+            control_plane_count = 3 if workload.cpu_cores >= 16 else 1
         
         # Create cluster configuration
         cluster_config = ClusterConfig(
@@ -65,45 +130,111 @@ class Planner:
             kubernetes_version=k8s_version,
             control_plane_count=control_plane_count,
             enable_rack_awareness=enable_rack_awareness,
-            rack_count=rack_count
+            rack_count=rack_count,
+            extensions=list(resolved.order)
         )
+        if env_preset:
+            cluster_config.tags['environment'] = env_preset.key
         
         # Plan node pools based on workload
-        node_pools = self._plan_node_pools(workload)
+        with metrics.timer('planner.node_pools'):
+            node_pools = self._plan_node_pools(workload, resolved.overhead)
+            env_warning = self._apply_environment(node_pools[0], env_preset) if env_preset else None
         cluster_config.node_pools = node_pools
         
+        warnings: List[str] = []
+        if env_preset:
+            if env_warning:
+                warnings.append(env_warning)
+            warnings.extend(env_preset.warnings)
+        return self._assemble_plan(cluster_config, workload, warnings)
+    
+    def _assemble_plan(
+        self,
+        cluster_config: ClusterConfig,
+        workload: WorkloadRequirements,
+        warnings: Sequence[str] = ()
+    ) -> DeploymentPlan:
+        """Add rack topology, validation and a cost estimate to a sized cluster"""
         # Generate rack topology if enabled
         rack_topology = None
-        if enable_rack_awareness and rack_count:
-            rack_topology = self._generate_rack_topology(rack_count, node_pools)
+        if cluster_config.enable_rack_awareness and cluster_config.rack_count:
+            with metrics.timer('planner.topology'):
+                rack_topology = self._generate_rack_topology(cluster_config.rack_count, cluster_config.node_pools)
         
         # Validate the plan
-        validation = self._validate_plan(cluster_config, workload)
+        with metrics.timer('planner.validation'):
+            validation = self._validate_plan(cluster_config, workload)
+            validation.warnings.extend(warnings)
+        metrics.increment('planner.plans')
         
         # Create deployment plan
         plan = DeploymentPlan(
             cluster_config=cluster_config,
             workload_requirements=workload,
             rack_topology=rack_topology,
-            validation_result=validation
+            validation_result=validation,
+            catalog_version=self.catalog.version_id
         )
         
+        # Estimate monthly cost of compute and installed extensions
+        with metrics.timer('planner.cost'):
+            options = CostOptions(extensions=cluster_config.extensions)
+            plan.estimated_cost = round(self.cost_engine.plan_cost(plan, options).monthly, 2)
+        
+        return plan
+    
+    def _table_plan(
+        self,
+        workload: WorkloadRequirements,
+        cluster_name: str,
+        resource_group: str,
+        location: str,
+        custom_location: str,
+        enable_rack_awareness: bool,
+        rack_count: Optional[int]
+    ) -> Optional[DeploymentPlan]:
+        """The plan table's plan for this request, or None to plan it in full"""
+        if self.plan_table.catalog_version != self.catalog.version_id:
+            metrics.increment('planner.table_stale')
+            return None
+        plan = self.plan_table.lookup(workload, cluster_name, resource_group, location, custom_location,
+                                      enable_rack_awareness, rack_count)
+        metrics.increment('planner.table_hits' if plan is not None else 'planner.table_misses')
         return plan
     
-    def _plan_node_pools(self, workload: WorkloadRequirements) -> List[NodePoolConfig]:
-        """Plan node pools based on workload requirements"""
+    def _pinned_planner(self, catalog_version: str) -> 'Planner':
+        """Planner bound to a historical catalog, cached per version"""
+        planner = self._pinned_planners.get(catalog_version)
+        if planner is None:
+            planner = Planner(self.catalog.at_version(catalog_version), self.plan_table)
+            self._pinned_planners[catalog_version] = planner
+        return planner
+    
+    def _plan_node_pools(
+        self,
+        workload: WorkloadRequirements,
+        overhead: Optional[ExtensionOverhead] = None
+    ) -> List[NodePoolConfig]:
+        """Plan node pools based on workload requirements and extension overhead"""
         node_pools = []
+        overhead = overhead or ExtensionOverhead()
+        
+        # A node must fit the workload, cluster-wide extension services
+        # and the per-node extension agents
+        cpu_needed = math.ceil(workload.cpu_cores + overhead.cluster_cpu + overhead.node_cpu)
+        memory_needed = math.ceil(workload.memory_gb + overhead.cluster_memory_gb + overhead.node_memory_gb)
         
         # Determine VM SKU based on requirements
         if workload.gpu_required:
             vm_skus = self.catalog.get_vm_skus('gpu')
-            vm_size = self._select_vm_sku(vm_skus, workload.cpu_cores, workload.memory_gb)
+            vm_size = self._select_vm_sku(vm_skus, cpu_needed, memory_needed)
         else:
             vm_skus = self.catalog.get_vm_skus('general_purpose')
-            vm_size = self._select_vm_sku(vm_skus, workload.cpu_cores, workload.memory_gb)
+            vm_size = self._select_vm_sku(vm_skus, cpu_needed, memory_needed)
         
         # Calculate node count (simple bin-packing)
-        node_count = max(3, self._calculate_node_count(workload, vm_size))
+        node_count = max(3, self._calculate_node_count(workload, vm_size, overhead))
         
         # Create Linux node pool
         linux_pool = NodePoolConfig(
@@ -118,15 +249,20 @@ class Planner:
         )
         node_pools.append(linux_pool)
         
-        # Add GPU pool if needed
+        # Add GPU pool if needed, packing GPU pods onto the SKU needing the fewest nodes
         if workload.gpu_required:
             gpu_vm_skus = self.catalog.get_vm_skus('gpu')
-            gpu_vm_size = gpu_vm_skus[0]['name'] if gpu_vm_skus else 'Standard_NC4as_T4_v3'
+            if gpu_vm_skus:
+                with metrics.timer('planner.gpu_sizing'):
+                    sizing = self.gpu_sizer.size(workload, gpu_vm_skus, overhead.node_cpu, overhead.node_memory_gb)
+                gpu_vm_size, gpu_nodes = sizing.vm_size, sizing.node_count
+            else:
+                gpu_vm_size, gpu_nodes = 'Standard_NC4as_T4_v3', max(1, workload.gpu_count)
             
             gpu_pool = NodePoolConfig(
                 name='gpupool',
                 vm_size=gpu_vm_size,
-                node_count=max(1, workload.gpu_count),
+                node_count=gpu_nodes,
                 os_type=OSType.LINUX,
                 labels={'workload': 'gpu', 'gpu': 'true'},
                 taints=['nvidia.com/gpu=present:NoSchedule']
@@ -135,6 +271,30 @@ class Planner:
         
         return node_pools
     
+    def _apply_environment(self, pool: NodePoolConfig, preset: EnvironmentPreset) -> Optional[str]:
+        """
+        Apply an environment template's node bounds and autoscaling to a pool.
+        
+        Returns:
+            A warning if the sized node count had to be capped at max_nodes
+        """
+        required = pool.node_count
+        pool.node_count = min(max(required, preset.min_nodes), preset.max_nodes)
+        pool.enable_auto_scaling = preset.enable_auto_scaling
+        if preset.enable_auto_scaling:
+            pool.min_count = preset.min_nodes
+            pool.max_count = preset.max_nodes
+        else:
+            pool.min_count = None
+            pool.max_count = None
+        if required > preset.max_nodes:
+            return (
+                f"Workload sizing needs {required} nodes in pool '{pool.name}' but the "
+                f"{preset.key} template allows at most {preset.max_nodes}"
+            )
+        return None
+    
+    @metrics.timed('planner.sku_selection')
     def _select_vm_sku(self, vm_skus: List[Dict], cpu_cores: int, memory_gb: int) -> str:
         """Select appropriate VM SKU based on requirements"""
         for sku in sorted(vm_skus, key=lambda x: (x['vcpus'], x['memory_gb'])):
@@ -144,15 +304,38 @@ class Planner:
         # Return largest if none fit
         return vm_skus[-1]['name'] if vm_skus else 'Standard_D4s_v5'
     
-    def _calculate_node_count(self, workload: WorkloadRequirements, vm_size: str) -> int:
+    def _calculate_node_count(
+        self,
+        workload: WorkloadRequirements,
+        vm_size: str,
+        overhead: Optional[ExtensionOverhead] = None
+    ) -> int:
         """Calculate required node count"""
         # Simple calculation - in production, this would be more sophisticated
         if workload.cpu_cores <= 8:
-            return 3
+            count = 3
         elif workload.cpu_cores <= 32:
-            return 5
+            count = 5
         else:
-            return 10
+            count = 10
+        
+        if not overhead or overhead == ExtensionOverhead():
+            return count
+        
+        # Capacity check: per-node agents shrink what each node can offer,
+        # cluster-wide extension services add to the demand
+        sku = self.catalog.get_vm_sku(vm_size)
+        if not sku:
+            return count
+        allocatable_cpu = sku['vcpus'] - overhead.node_cpu
+        allocatable_memory = sku['memory_gb'] - overhead.node_memory_gb
+        if allocatable_cpu <= 0 or allocatable_memory <= 0:
+            return count
+        needed = max(
+            math.ceil((workload.cpu_cores + overhead.cluster_cpu) / allocatable_cpu),
+            math.ceil((workload.memory_gb + overhead.cluster_memory_gb) / allocatable_memory)
+        )
+        return max(count, needed)
     
     def _generate_rack_topology(
         self,
@@ -213,6 +396,15 @@ class Planner:
                 f"Total nodes ({total_nodes}) exceeds maximum ({max_nodes})"
             )
         
+        # Check per-pool node limit
+        max_pool_nodes = limits.get('max_nodes_per_pool')
+        if max_pool_nodes:
+            for pool in cluster_config.node_pools:
+                if pool.node_count > max_pool_nodes:
+                    errors.append(
+                        f"Pool '{pool.name}' has {pool.node_count} nodes, exceeding maximum ({max_pool_nodes})"
+                    )
+        
         # Check pool count
         max_pools = limits.get('max_pools_per_cluster', 10)
         if len(cluster_config.node_pools) > max_pools:
@@ -0,0 +1,247 @@
+"""
+Kubernetes upgrade-path planning
+
+The catalog's kubernetes_versions form a version graph. An upgrade hop
+goes from a version to any newer supported version of the same major that
+is at most max_minor_step minor versions ahead (one by default, as
+Kubernetes does not support skipping minors). Patch-only hops are allowed.
+A cluster's current version does not have to be in the catalog. It only
+needs a hop into it.
+
+Shortest paths are found breadth-first and memoized per (source, target).
+A fleet of hundreds of clusters usually shares a handful of current
+versions, so each distinct path is searched once.
+
+Fleet rollouts are scheduled in waves. Every wave moves a cluster one step
+forward, where a step is one hop applied to one fault domain of the
+cluster. Only one fault domain of a cluster is upgraded at a time, so the
+rest keep serving, and the next hop starts once every domain is done. The
+number of clusters per wave, and per location, can be capped. Clusters
+with the most remaining steps are scheduled first, which keeps the total
+number of waves close to the longest single cluster's step count.
+"""
+
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+from src.models import DeploymentPlan
+
+logger = logging.getLogger(__name__)
+
+_VERSION = re.compile(r'^v?(\d+)\.(\d+)\.(\d+)$')
+
+
+def parse_version(version: str) -> Tuple[int, int, int]:
+    """
+    Parse 'major.minor.patch' (an optional leading 'v' is allowed).
+
+    Raises:
+        ValueError: If the version is not in that form
+    """
+    match = _VERSION.match(version.strip())
+    if not match:
+        raise ValueError(f"Invalid Kubernetes version: '{version}'")
+    return tuple(int(part) for part in match.groups())
+
+
+def latest_version(versions: Iterable[str]) -> str:
+    """Newest of the versions, compared numerically"""
+    return max(versions, key=parse_version)
+
+
+class VersionGraph:
+    """
+    Upgrade hops between supported Kubernetes versions.
+
+    Args:
+        versions: Supported versions (any order)
+        max_minor_step: Minor versions a single hop may advance
+    """
+
+    def __init__(self, versions: Sequence[str], max_minor_step: int = 1):
+        if max_minor_step < 1:
+            raise ValueError("max_minor_step must be at least 1")
+        self.max_minor_step = max_minor_step
+        # Newest first, so searches try the largest allowed hop first
+        self.versions = sorted(set(versions), key=parse_version, reverse=True)
+        self._parsed = {version: parse_version(version) for version in self.versions}
+        self._paths: Dict[Tuple[str, str], Optional[List[str]]] = {}
+
+    def hops(self, source: str) -> List[str]:
+        """Supported versions reachable from source in one hop, newest first"""
+        s = parse_version(source)
+        return [
+            version for version, t in self._parsed.items()
+            if s[0] == t[0] and t > s and t[1] - s[1] <= self.max_minor_step
+        ]
+
+    def path(self, source: str, target: str) -> Optional[List[str]]:
+        """
+        Fewest-hop upgrade path from source to target, both included.
+
+        Returns:
+            [source] if already at the target, None if the target cannot be
+            reached (it is older, another major, or a gap in the catalog)
+
+        Raises:
+            ValueError: If the target is not a supported version
+        """
+        if target not in self._parsed:
+            raise ValueError(f"Target version {target} is not in the catalog")
+        key = (source, target)
+        if key in self._paths:
+            return self._paths[key]
+
+        parse_version(source)
+        parents: Dict[str, Optional[str]] = {source: None}
+        queue = deque([source])
+        while queue and target not in parents:
+            version = queue.popleft()
+            for nxt in self.hops(version):
+                if nxt not in parents and self._parsed[nxt] <= self._parsed[target]:
+                    parents[nxt] = version
+                    queue.append(nxt)
+
+        path = None
+        if target in parents:
+            path = [target]
+            while parents[path[-1]] is not None:
+                path.append(parents[path[-1]])
+            path.reverse()
+        self._paths[key] = path
+        return path
+
+
+@dataclass
+class UpgradeStep:
+    """One hop applied to one fault domain of a cluster"""
+    cluster_name: str
+    from_version: str
+    to_version: str
+    fault_domain: str
+
+    def to_dict(self) -> Dict[str, str]:
+        return dict(self.__dict__)
+
+
+@dataclass
+class UpgradeRollout:
+    """Upgrade paths for a fleet and the waves that apply them"""
+    target: str
+    paths: Dict[str, List[str]] = field(default_factory=dict)
+    unreachable: Dict[str, str] = field(default_factory=dict)  # cluster -> current version
+    waves: List[List[UpgradeStep]] = field(default_factory=list)
+
+    @property
+    def up_to_date(self) -> List[str]:
+        return [name for name, path in self.paths.items() if len(path) == 1]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'target': self.target,
+            'paths': self.paths,
+            'unreachable': self.unreachable,
+            'waves': [[step.to_dict() for step in wave] for wave in self.waves]
+        }
+
+
+def _fault_domains(plan: DeploymentPlan) -> List[str]:
+    racks = plan.rack_topology or []
+    domains = list(dict.fromkeys(rack.fault_domain for rack in racks))
+    return domains or ['cluster']
+
+
+class UpgradePlanner:
+    """
+    Plans Kubernetes upgrades for single clusters and whole fleets.
+
+    Args:
+        catalog: Catalog supplying the supported kubernetes_versions
+        max_minor_step: Minor versions a single hop may advance
+    """
+
+    def __init__(self, catalog, max_minor_step: int = 1):
+        self.catalog = catalog
+        self.graph = VersionGraph(catalog.get_kubernetes_versions(), max_minor_step)
+
+    def path(self, current: str, target: Optional[str] = None) -> Optional[List[str]]:
+        """Shortest upgrade path to the target (default: newest supported version)"""
+        return self.graph.path(current, target or latest_version(self.graph.versions))
+
+    def plan_fleet(
+        self,
+        plans: Iterable[DeploymentPlan],
+        target: Optional[str] = None,
+        max_clusters_per_wave: int = 10,
+        max_per_location: Optional[int] = None
+    ) -> UpgradeRollout:
+        """
+        Plan the upgrade of every cluster to the target in batched waves.
+
+        Args:
+            plans: One plan per cluster, carrying its current version
+            target: Version to reach (default: newest supported version)
+            max_clusters_per_wave: Clusters upgrading at the same time
+            max_per_location: Clusters per Azure region upgrading at the
+                same time (no limit by default)
+
+        Returns:
+            UpgradeRollout; clusters with no path (or an unparseable
+            version) are listed as unreachable
+
+        Raises:
+            ValueError: If the target is unsupported, a limit is below 1 or
+                a cluster name repeats
+        """
+        if max_clusters_per_wave < 1 or (max_per_location is not None and max_per_location < 1):
+            raise ValueError("Wave limits must be at least 1")
+        target = target or latest_version(self.graph.versions)
+        self.graph.path(target, target)  # Rejects unsupported targets up front
+        rollout = UpgradeRollout(target=target)
+
+        pending: Dict[str, deque] = {}
+        locations: Dict[str, str] = {}
+        for plan in plans:
+            cluster = plan.cluster_config
+            if cluster.cluster_name in rollout.paths or cluster.cluster_name in rollout.unreachable:
+                raise ValueError(f"Cluster name '{cluster.cluster_name}' appears more than once in the fleet")
+            try:
+                path = self.graph.path(cluster.kubernetes_version, target)
+            except ValueError:
+                path = None  # Unparseable current version
+            if path is None:
+                rollout.unreachable[cluster.cluster_name] = cluster.kubernetes_version
+                continue
+            rollout.paths[cluster.cluster_name] = path
+            steps = deque(
+                UpgradeStep(cluster.cluster_name, source, destination, domain)
+                for source, destination in zip(path, path[1:])
+                for domain in _fault_domains(plan)
+            )
+            if steps:
+                pending[cluster.cluster_name] = steps
+                locations[cluster.cluster_name] = cluster.location
+
+        while pending:
+            wave: List[UpgradeStep] = []
+            per_location: Dict[str, int] = {}
+            # Longest remaining work first, then by name for a stable order
+            for name in sorted(pending, key=lambda n: (-len(pending[n]), n)):
+                if len(wave) == max_clusters_per_wave:
+                    break
+                location = locations[name]
+                if max_per_location is not None and per_location.get(location, 0) >= max_per_location:
+                    continue
+                per_location[location] = per_location.get(location, 0) + 1
+                wave.append(pending[name].popleft())
+                if not pending[name]:
+                    del pending[name]
+            rollout.waves.append(wave)
+
+        logger.info(
+            f"Upgrade to {target}: {len(rollout.paths) - len(rollout.up_to_date)} clusters in "
+            f"{len(rollout.waves)} waves, {len(rollout.unreachable)} unreachable"
+        )
+        return rollout
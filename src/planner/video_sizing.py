@@ -0,0 +1,149 @@
+"""
+Video analytics sizing - derives compute, GPU and storage from camera feeds
+"""
+
+import math
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Sequence
+import logging
+from src.catalog import CatalogService
+from src.models import WorkloadRequirements
+
+logger = logging.getLogger(__name__)
+
+# 1 Mbps sustained for one day, in GB (86400 s / 8 bits / 1000 MB)
+GB_PER_MBPS_DAY = 10.8
+
+
+@dataclass(frozen=True)
+class VideoSizingFactors:
+    """Per-stream sizing factors for the video-analytics preset"""
+    reference_fps: int = 15
+    default_fps: int = 15
+    default_retention_days: int = 30
+    cpu_cores_per_stream: float = 0.5
+    memory_gb_per_stream: float = 1.0
+    streams_per_gpu: int = 16
+    bitrate_mbps_per_stream: float = 4.0
+    base_cpu_cores: int = 4
+    base_memory_gb: int = 16
+    base_storage_gb: int = 100
+    headroom: float = 1.2
+
+    @classmethod
+    def from_preset(cls, preset: Dict) -> 'VideoSizingFactors':
+        """Build factors from a workload preset's 'sizing' section"""
+        sizing = preset.get('sizing', {}) if preset else {}
+        known = {name for name in cls.__dataclass_fields__}
+        return cls(**{k: v for k, v in sizing.items() if k in known})
+
+
+@dataclass
+class VideoSizingBatch:
+    """Columnar sizing results, one entry per site"""
+    cpu_cores: List[int] = field(default_factory=list)
+    memory_gb: List[int] = field(default_factory=list)
+    gpu_count: List[int] = field(default_factory=list)
+    storage_gb: List[int] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.cpu_cores)
+
+
+class VideoAnalyticsSizer:
+    """
+    Sizes video-analytics sites from camera count, frame rate and retention.
+
+    Load is expressed in reference streams (cameras * fps / reference_fps),
+    so a 30 fps camera costs twice as much decode and CPU as a 15 fps one.
+    """
+
+    def __init__(self, factors: Optional[VideoSizingFactors] = None):
+        self.factors = factors or VideoSizingFactors()
+        f = self.factors
+        # Fold per-stream factors into per-(camera * fps) coefficients once,
+        # so batch sizing is a single multiply-add per column
+        self._cpu_base = f.base_cpu_cores * f.headroom
+        self._cpu_coef = f.cpu_cores_per_stream * f.headroom / f.reference_fps
+        self._mem_base = f.base_memory_gb * f.headroom
+        self._mem_coef = f.memory_gb_per_stream * f.headroom / f.reference_fps
+        self._gpu_coef = 1.0 / (f.streams_per_gpu * f.reference_fps)
+        self._storage_coef = (
+            f.bitrate_mbps_per_stream * GB_PER_MBPS_DAY * f.headroom / f.reference_fps
+        )
+
+    @classmethod
+    def from_catalog(cls, catalog: CatalogService) -> 'VideoAnalyticsSizer':
+        """Create a sizer using the catalog's video-analytics preset factors"""
+        preset = catalog.get_workload_presets().get('video-analytics', {})
+        return cls(VideoSizingFactors.from_preset(preset))
+
+    def size_batch(
+        self,
+        cameras: Sequence[int],
+        fps: Optional[Sequence[Optional[int]]] = None,
+        retention_days: Optional[Sequence[Optional[int]]] = None
+    ) -> VideoSizingBatch:
+        """
+        Size many sites at once from columnar inputs.
+
+        Args:
+            cameras: Camera count per site
+            fps: Frame rate per site (None entries use the preset default)
+            retention_days: Recording retention per site (None uses the default)
+
+        Returns:
+            VideoSizingBatch with one value per site in each column
+        """
+        n = len(cameras)
+        f = self.factors
+        fps = fps if fps is not None else [None] * n
+        retention_days = retention_days if retention_days is not None else [None] * n
+        if len(fps) != n or len(retention_days) != n:
+            raise ValueError("cameras, fps and retention_days must have the same length")
+
+        ceil = math.ceil
+        default_fps = f.default_fps
+        default_retention = f.default_retention_days
+        frames = [c * (r if r is not None else default_fps) for c, r in zip(cameras, fps)]
+        retention = [d if d is not None else default_retention for d in retention_days]
+
+        cpu_base, cpu_coef = self._cpu_base, self._cpu_coef
+        mem_base, mem_coef = self._mem_base, self._mem_coef
+        gpu_coef, storage_coef = self._gpu_coef, self._storage_coef
+        base_storage = f.base_storage_gb
+
+        return VideoSizingBatch(
+            cpu_cores=[ceil(cpu_base + cpu_coef * x) for x in frames],
+            memory_gb=[ceil(mem_base + mem_coef * x) for x in frames],
+            gpu_count=[ceil(gpu_coef * x) for x in frames],
+            storage_gb=[
+                ceil(base_storage + storage_coef * x * d) for x, d in zip(frames, retention)
+            ]
+        )
+
+    def apply(self, workload: WorkloadRequirements) -> WorkloadRequirements:
+        """
+        Return a copy of the workload with requirements derived from its cameras.
+
+        Explicit cpu/memory/gpu/storage values are kept when they exceed the
+        derived ones, so they act as a floor rather than being discarded.
+        """
+        if not workload.cameras:
+            return workload
+
+        sized = self.size_batch([workload.cameras], [workload.fps], [workload.retention_days])
+        gpu_count = max(workload.gpu_count, sized.gpu_count[0])
+        logger.info(
+            f"Sized {workload.cameras} cameras: {sized.cpu_cores[0]} cores, "
+            f"{sized.memory_gb[0]} GB memory, {sized.gpu_count[0]} GPUs, "
+            f"{sized.storage_gb[0]} GB storage"
+        )
+        return replace(
+            workload,
+            cpu_cores=max(workload.cpu_cores, sized.cpu_cores[0]),
+            memory_gb=max(workload.memory_gb, sized.memory_gb[0]),
+            gpu_required=workload.gpu_required or gpu_count > 0,
+            gpu_count=gpu_count,
+            storage_gb=max(workload.storage_gb, sized.storage_gb[0])
+        )
@@ -0,0 +1,7 @@
+"""
+Persistent, queryable storage for deployment plans
+"""
+
+from .plans import PlanRepository, PlanSummary
+
+__all__ = ['PlanRepository', 'PlanSummary']
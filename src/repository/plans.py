@@ -0,0 +1,324 @@
+"""
+Persistent plan repository
+
+Stores deployment plans in an embedded SQLite database so fleets can be
+queried by SKU, rack, Kubernetes version and validation state. Each plan is
+split into normalized rows (clusters, node pools, racks, validation
+messages) that carry the secondary indexes the queries filter on. Indexes
+on the plans table list cluster_name right after the filtered column and
+end with the warning and validity columns, so a filtered page is read in
+order from the index alone and stops at the page limit. The full
+plan is also kept as compressed JSON, so a stored plan can be rebuilt
+without loss.
+
+Plans are keyed by cluster name: saving a plan for an existing cluster
+replaces the previous one.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import logging
+from src.models import DeploymentPlan, plan_from_dict, plan_to_dict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 5000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS plans (
+    id INTEGER PRIMARY KEY,
+    cluster_name TEXT NOT NULL UNIQUE,
+    resource_group TEXT NOT NULL,
+    location TEXT NOT NULL,
+    custom_location TEXT NOT NULL,
+    kubernetes_version TEXT NOT NULL,
+    kubernetes_minor TEXT NOT NULL,
+    catalog_version TEXT,
+    control_plane_count INTEGER NOT NULL,
+    node_count INTEGER NOT NULL,
+    is_valid INTEGER NOT NULL,
+    error_count INTEGER NOT NULL,
+    warning_count INTEGER NOT NULL,
+    estimated_cost REAL,
+    stored_at REAL NOT NULL,
+    plan BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS node_pools (
+    plan_id INTEGER NOT NULL REFERENCES plans (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    vm_size TEXT NOT NULL,
+    node_count INTEGER NOT NULL,
+    os_type TEXT NOT NULL,
+    min_count INTEGER,
+    max_count INTEGER,
+    PRIMARY KEY (plan_id, name)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS racks (
+    plan_id INTEGER NOT NULL REFERENCES plans (id) ON DELETE CASCADE,
+    rack_id TEXT NOT NULL,
+    fault_domain TEXT NOT NULL,
+    PRIMARY KEY (plan_id, rack_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS validation_messages (
+    plan_id INTEGER NOT NULL REFERENCES plans (id) ON DELETE CASCADE,
+    severity TEXT NOT NULL,
+    message TEXT NOT NULL
+);
+DROP INDEX IF EXISTS plans_by_version;
+DROP INDEX IF EXISTS plans_by_validity;
+DROP INDEX IF EXISTS plans_by_location;
+CREATE INDEX IF NOT EXISTS plans_by_minor_name ON plans (kubernetes_minor, cluster_name, warning_count, is_valid);
+CREATE INDEX IF NOT EXISTS plans_by_version_name ON plans (kubernetes_version, cluster_name, warning_count, is_valid);
+CREATE INDEX IF NOT EXISTS plans_by_validity_name ON plans (is_valid, cluster_name, warning_count);
+CREATE INDEX IF NOT EXISTS plans_by_location_name ON plans (location, cluster_name, warning_count, is_valid);
+CREATE INDEX IF NOT EXISTS node_pools_by_sku ON node_pools (vm_size, plan_id);
+CREATE INDEX IF NOT EXISTS racks_by_id ON racks (rack_id, plan_id);
+CREATE INDEX IF NOT EXISTS racks_by_fault_domain ON racks (fault_domain, plan_id);
+CREATE INDEX IF NOT EXISTS messages_by_plan ON validation_messages (plan_id, severity);
+"""
+
+
+def version_filter(version: str) -> Tuple[str, str]:
+    """
+    Column and value to match a Kubernetes version pattern.
+
+    '1.30.x', '1.30.*' and '1.30' match any patch of 1.30; '1.30.4' is exact.
+    """
+    parts = version.lstrip('v').split('.')
+    if len(parts) >= 3 and parts[2] not in ('x', '*', ''):
+        return 'kubernetes_version', '.'.join(parts[:3])
+    return 'kubernetes_minor', '.'.join(parts[:2])
+
+
+@dataclass
+class PlanSummary:
+    """One row of a repository query"""
+    cluster_name: str
+    location: str
+    kubernetes_version: str
+    node_count: int
+    is_valid: bool
+    error_count: int
+    warning_count: int
+    vm_sizes: List[str] = field(default_factory=list)
+    estimated_cost: Optional[float] = None
+    catalog_version: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'cluster_name': self.cluster_name,
+            'location': self.location,
+            'kubernetes_version': self.kubernetes_version,
+            'node_count': self.node_count,
+            'is_valid': self.is_valid,
+            'error_count': self.error_count,
+            'warning_count': self.warning_count,
+            'vm_sizes': self.vm_sizes,
+            'estimated_cost': self.estimated_cost,
+            'catalog_version': self.catalog_version
+        }
+
+
+class PlanRepository:
+    """
+    SQLite-backed store of deployment plans.
+
+    Args:
+        path: Database file (created if missing)
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._connect().executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """One connection per thread and process"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA foreign_keys=ON')
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def save(self, plan: DeploymentPlan) -> None:
+        """Store one plan, replacing any plan for the same cluster"""
+        self.save_many([plan])
+
+    def save_many(self, plans: Iterable[DeploymentPlan], batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        """
+        Store plans in transactions of batch_size plans each.
+
+        Returns:
+            Number of plans stored
+        """
+        conn = self._connect()
+        stored = 0
+        batch: List[DeploymentPlan] = []
+        for plan in plans:
+            batch.append(plan)
+            if len(batch) >= batch_size:
+                stored += self._insert_batch(conn, batch)
+                batch = []
+        if batch:
+            stored += self._insert_batch(conn, batch)
+        logger.info(f"Stored {stored} plans in {self.path}")
+        return stored
+
+    def _insert_batch(self, conn: sqlite3.Connection, plans: List[DeploymentPlan]) -> int:
+        # Child rows are inserted after the loop, so a cluster repeated within
+        # the batch keeps only its last plan
+        latest = {plan.cluster_config.cluster_name: plan for plan in plans}
+        now = time.time()
+        pools, racks, messages = [], [], []
+        conn.execute('BEGIN')
+        try:
+            for plan in latest.values():
+                config = plan.cluster_config
+                validation = plan.validation_result
+                errors = validation.errors if validation else []
+                warnings = validation.warnings if validation else []
+                minor = '.'.join(config.kubernetes_version.lstrip('v').split('.')[:2])
+                blob = zlib.compress(json.dumps(plan_to_dict(plan), separators=(',', ':')).encode('utf-8'), 1)
+
+                conn.execute("DELETE FROM plans WHERE cluster_name = ?", (config.cluster_name,))
+                plan_id = conn.execute(
+                    "INSERT INTO plans (cluster_name, resource_group, location, custom_location, "
+                    "kubernetes_version, kubernetes_minor, catalog_version, control_plane_count, "
+                    "node_count, is_valid, error_count, warning_count, estimated_cost, stored_at, plan) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (config.cluster_name, config.resource_group, config.location, config.custom_location,
+                     config.kubernetes_version, minor, plan.catalog_version, config.control_plane_count,
+                     sum(p.node_count for p in config.node_pools),
+                     int(validation.is_valid if validation else True), len(errors), len(warnings),
+                     plan.estimated_cost, now, blob)
+                ).lastrowid
+
+                pools += [(plan_id, p.name, p.vm_size, p.node_count, getattr(p.os_type, 'value', p.os_type),
+                           p.min_count, p.max_count) for p in config.node_pools]
+                racks += [(plan_id, r.rack_id, r.fault_domain) for r in plan.rack_topology or []]
+                messages += [(plan_id, 'error', m) for m in errors]
+                messages += [(plan_id, 'warning', m) for m in warnings]
+
+            conn.executemany("INSERT INTO node_pools VALUES (?, ?, ?, ?, ?, ?, ?)", pools)
+            conn.executemany("INSERT INTO racks VALUES (?, ?, ?)", racks)
+            conn.executemany("INSERT INTO validation_messages VALUES (?, ?, ?)", messages)
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return len(latest)
+
+    @staticmethod
+    def _where(
+        vm_size: Optional[str] = None,
+        kubernetes_version: Optional[str] = None,
+        is_valid: Optional[bool] = None,
+        has_warnings: Optional[bool] = None,
+        rack: Optional[str] = None,
+        location: Optional[str] = None,
+        message: Optional[str] = None
+    ) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        if vm_size:
+            clauses.append("p.id IN (SELECT plan_id FROM node_pools WHERE vm_size = ?)")
+            params.append(vm_size)
+        if kubernetes_version:
+            column, value = version_filter(kubernetes_version)
+            clauses.append(f"p.{column} = ?")
+            params.append(value)
+        if is_valid is not None:
+            clauses.append("p.is_valid = ?")
+            params.append(int(is_valid))
+        if has_warnings is not None:
+            clauses.append("p.warning_count > 0" if has_warnings else "p.warning_count = 0")
+        if rack:
+            clauses.append("p.id IN (SELECT plan_id FROM racks WHERE rack_id = ? "
+                           "UNION ALL SELECT plan_id FROM racks WHERE fault_domain = ?)")
+            params += [rack, rack]
+        if location:
+            clauses.append("p.location = ?")
+            params.append(location)
+        if message:
+            clauses.append("p.id IN (SELECT plan_id FROM validation_messages WHERE message LIKE ?)")
+            params.append(f"%{message}%")
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, limit: int = 1000, offset: int = 0, **filters) -> List[PlanSummary]:
+        """
+        Find plans matching every given filter.
+
+        Args:
+            limit: Maximum summaries returned
+            offset: Summaries to skip, for paging
+            **filters: vm_size, kubernetes_version ('1.30.x' or exact),
+                is_valid, has_warnings, rack (rack ID or fault domain),
+                location, message (substring of an error or warning)
+
+        Returns:
+            PlanSummary list ordered by cluster name
+        """
+        where, params = self._where(**filters)
+        rows = self._connect().execute(
+            "SELECT p.cluster_name, p.location, p.kubernetes_version, p.node_count, p.is_valid, "
+            "p.error_count, p.warning_count, p.estimated_cost, p.catalog_version, "
+            "(SELECT group_concat(DISTINCT vm_size) FROM node_pools WHERE plan_id = p.id) AS vm_sizes "
+            f"FROM plans p{where} ORDER BY p.cluster_name LIMIT ? OFFSET ?",
+            (*params, limit, offset)
+        )
+        return [
+            PlanSummary(
+                cluster_name=row['cluster_name'],
+                location=row['location'],
+                kubernetes_version=row['kubernetes_version'],
+                node_count=row['node_count'],
+                is_valid=bool(row['is_valid']),
+                error_count=row['error_count'],
+                warning_count=row['warning_count'],
+                vm_sizes=sorted(row['vm_sizes'].split(',')) if row['vm_sizes'] else [],
+                estimated_cost=row['estimated_cost'],
+                catalog_version=row['catalog_version']
+            )
+            for row in rows
+        ]
+
+    def count(self, **filters) -> int:
+        """Number of plans matching the filters (see query)"""
+        where, params = self._where(**filters)
+        return self._connect().execute(f"SELECT count(*) FROM plans p{where}", params).fetchone()[0]
+
+    def get(self, cluster_name: str) -> Optional[DeploymentPlan]:
+        """Rebuild the stored plan for a cluster"""
+        row = self._connect().execute(
+            "SELECT plan FROM plans WHERE cluster_name = ?", (cluster_name,)).fetchone()
+        if row is None:
+            return None
+        return plan_from_dict(json.loads(zlib.decompress(row['plan'])))
+
+    def delete(self, cluster_name: str) -> bool:
+        """Remove a cluster's plan; returns whether one was stored"""
+        cursor = self._connect().execute("DELETE FROM plans WHERE cluster_name = ?", (cluster_name,))
+        return cursor.rowcount > 0
+
+    def sku_counts(self, **filters) -> Dict[str, int]:
+        """Number of matching plans using each VM size"""
+        where, params = self._where(**filters)
+        rows = self._connect().execute(
+            "SELECT np.vm_size, count(DISTINCT np.plan_id) FROM node_pools np "
+            f"WHERE np.plan_id IN (SELECT p.id FROM plans p{where}) GROUP BY np.vm_size",
+            params
+        )
+        return {vm_size: count for vm_size, count in rows}
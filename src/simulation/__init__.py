@@ -0,0 +1,11 @@
+"""
+Simulation module for replaying workloads against deployment plans
+"""
+
+from .autoscaler import AutoscalerSimulator, AutoscalerSettings, DemandTrace, SimulationResult
+from .scheduler import SchedulingSimulator, SchedulingReport, PodSpec, SimNode, synthetic_pods
+
+__all__ = [
+    'AutoscalerSimulator', 'AutoscalerSettings', 'DemandTrace', 'SimulationResult',
+    'SchedulingSimulator', 'SchedulingReport', 'PodSpec', 'SimNode', 'synthetic_pods'
+]
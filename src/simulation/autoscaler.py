@@ -0,0 +1,277 @@
+"""
+Cluster-autoscaler trace replay
+
+Replays a recorded CPU/memory demand time series against a node pool with a
+simple cluster-autoscaler model:
+
+- the pool needs enough nodes to hold the demand at the target utilization;
+- it scales down only after demand has stayed low for scale_down_delay;
+- new nodes become usable scale_up_delay after they are requested;
+- the node count is always clamped to the pool's min/max.
+
+The replay works on whole columns rather than per-sample objects. Both
+delays are sliding-window extremes computed with monotonic deques, so a
+year of minute-level samples replays in a few passes over the data.
+"""
+
+import csv
+import math
+from array import array
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+import logging
+from src.catalog import CatalogService
+from src.models import DeploymentPlan, NodePoolConfig
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DemandTrace:
+    """Columnar demand samples: timestamp (epoch seconds), CPU cores, memory GB"""
+    timestamps: array = field(default_factory=lambda: array('d'))
+    cpu: array = field(default_factory=lambda: array('d'))
+    memory_gb: array = field(default_factory=lambda: array('d'))
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @classmethod
+    def from_columns(cls, timestamps: Sequence[float], cpu: Sequence[float],
+                     memory_gb: Sequence[float]) -> 'DemandTrace':
+        if not len(timestamps) == len(cpu) == len(memory_gb):
+            raise ValueError("Trace columns must have the same length")
+        return cls(array('d', timestamps), array('d', cpu), array('d', memory_gb))
+
+    @classmethod
+    def from_csv(cls, path: Path) -> 'DemandTrace':
+        """
+        Load a CSV with columns timestamp, cpu and memory_gb.
+
+        Timestamps may be epoch seconds or ISO 8601. Rows must be in time order.
+        """
+        trace = cls()
+        append_ts, append_cpu, append_mem = trace.timestamps.append, trace.cpu.append, trace.memory_gb.append
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            header = [name.strip().lower() for name in next(reader)]
+            try:
+                ts_col = header.index('timestamp')
+                cpu_col = header.index('cpu')
+                mem_col = header.index('memory_gb') if 'memory_gb' in header else header.index('memory')
+            except ValueError as e:
+                raise ValueError(f"{path}: expected timestamp, cpu and memory_gb columns") from e
+            for row in reader:
+                if not row:
+                    continue
+                raw_ts = row[ts_col]
+                try:
+                    append_ts(float(raw_ts))
+                except ValueError:
+                    append_ts(datetime.fromisoformat(raw_ts).timestamp())
+                append_cpu(float(row[cpu_col]))
+                append_mem(float(row[mem_col]))
+        return trace
+
+
+@dataclass
+class AutoscalerSettings:
+    """Autoscaler model parameters"""
+    scale_down_delay: float = 600.0    # seconds demand must stay low before removing nodes
+    scale_up_delay: float = 0.0        # seconds for a requested node to become ready
+    target_utilization: float = 1.0    # fraction of node capacity usable by workloads
+    min_percentile: float = 0.05       # demand percentile used for the recommended min
+
+
+@dataclass
+class SimulationResult:
+    """Outcome of replaying a trace against one node pool"""
+    pool: str
+    vm_size: str
+    samples: int
+    node_hours: float
+    unmet_cpu_core_hours: float
+    unmet_memory_gb_hours: float
+    unmet_samples: int
+    scale_up_events: int
+    scale_down_events: int
+    peak_nodes: int
+    current_min: int
+    current_max: int
+    recommended_min: int
+    recommended_max: int
+
+    def to_dict(self) -> Dict:
+        return dict(self.__dict__)
+
+
+def sliding_max(values: Sequence[int], timestamps: Sequence[float], window: float) -> List[int]:
+    """Max of values over [t - window, t] for each sample, using a monotonic deque"""
+    out = [0] * len(values)
+    window_idx: deque = deque()
+    for i, value in enumerate(values):
+        while window_idx and values[window_idx[-1]] <= value:
+            window_idx.pop()
+        window_idx.append(i)
+        cutoff = timestamps[i] - window
+        while timestamps[window_idx[0]] < cutoff:
+            window_idx.popleft()
+        out[i] = values[window_idx[0]]
+    return out
+
+
+def sliding_min(values: Sequence[int], timestamps: Sequence[float], window: float) -> List[int]:
+    """Min of values over [t - window, t] for each sample, using a monotonic deque"""
+    out = [0] * len(values)
+    window_idx: deque = deque()
+    for i, value in enumerate(values):
+        while window_idx and values[window_idx[-1]] >= value:
+            window_idx.pop()
+        window_idx.append(i)
+        cutoff = timestamps[i] - window
+        while timestamps[window_idx[0]] < cutoff:
+            window_idx.popleft()
+        out[i] = values[window_idx[0]]
+    return out
+
+
+def _sample_durations(timestamps: Sequence[float]) -> List[float]:
+    """Seconds each sample is held for; the last sample repeats the previous interval"""
+    n = len(timestamps)
+    if n < 2:
+        return [60.0] * n
+    durations = [b - a for a, b in zip(timestamps, timestamps[1:])]
+    durations.append(durations[-1])
+    return durations
+
+
+def _percentile(counts: Counter, total: int, fraction: float) -> int:
+    """Percentile of small non-negative integers from their counts"""
+    rank = max(1, math.ceil(fraction * total))
+    seen = 0
+    for value in sorted(counts):
+        seen += counts[value]
+        if seen >= rank:
+            return value
+    return 0
+
+
+class AutoscalerSimulator:
+    """
+    Replays demand traces against a plan's node pools.
+
+    Args:
+        catalog: Catalog used to look up VM SKU capacity
+        settings: Autoscaler model parameters
+    """
+
+    def __init__(self, catalog: CatalogService, settings: Optional[AutoscalerSettings] = None):
+        self.catalog = catalog
+        self.settings = settings or AutoscalerSettings()
+
+    def _node_capacity(self, pool: NodePoolConfig) -> Tuple[float, float]:
+        sku = self.catalog.get_vm_sku(pool.vm_size)
+        if not sku:
+            raise ValueError(f"Unknown VM size '{pool.vm_size}' for pool '{pool.name}'")
+        utilization = self.settings.target_utilization
+        return sku['vcpus'] * utilization, sku['memory_gb'] * utilization
+
+    def required_nodes(self, trace: DemandTrace, pool: NodePoolConfig) -> List[int]:
+        """Nodes needed to hold each sample's demand, ignoring pool bounds"""
+        node_cpu, node_mem = self._node_capacity(pool)
+        ceil = math.ceil
+        return [
+            max(ceil(c / node_cpu), ceil(m / node_mem))
+            for c, m in zip(trace.cpu, trace.memory_gb)
+        ]
+
+    def simulate(self, trace: DemandTrace, pool: NodePoolConfig) -> SimulationResult:
+        """
+        Replay a trace against one pool.
+
+        Pools without autoscaling are held at node_count; otherwise the
+        node count moves between min_count and max_count.
+        """
+        if not len(trace):
+            raise ValueError("Demand trace is empty")
+        settings = self.settings
+        timestamps = trace.timestamps
+        node_cpu, node_mem = self._node_capacity(pool)
+        required = self.required_nodes(trace, pool)
+
+        if pool.enable_auto_scaling:
+            low = pool.min_count if pool.min_count is not None else 1
+            high = pool.max_count if pool.max_count is not None else max(pool.node_count, low)
+            held = sliding_max(required, timestamps, settings.scale_down_delay)
+            target = [min(max(n, low), high) for n in held]
+            if settings.scale_up_delay > 0:
+                nodes = sliding_min(target, timestamps, settings.scale_up_delay)
+            else:
+                nodes = target
+        else:
+            low = high = pool.node_count
+            nodes = [pool.node_count] * len(required)
+
+        durations = _sample_durations(timestamps)
+        node_seconds = sum(n * d for n, d in zip(nodes, durations))
+        unmet_cpu = unmet_mem = 0.0
+        unmet_samples = 0
+        for c, m, n, d in zip(trace.cpu, trace.memory_gb, nodes, durations):
+            short_cpu = c - n * node_cpu
+            short_mem = m - n * node_mem
+            if short_cpu > 0 or short_mem > 0:
+                unmet_samples += 1
+                if short_cpu > 0:
+                    unmet_cpu += short_cpu * d
+                if short_mem > 0:
+                    unmet_mem += short_mem * d
+
+        ups = downs = 0
+        for before, after in zip(nodes, nodes[1:]):
+            if after > before:
+                ups += 1
+            elif after < before:
+                downs += 1
+
+        counts = Counter(required)
+        recommended_min = max(1, _percentile(counts, len(required), settings.min_percentile))
+        recommended_max = max(recommended_min, max(required))
+
+        return SimulationResult(
+            pool=pool.name,
+            vm_size=pool.vm_size,
+            samples=len(required),
+            node_hours=node_seconds / 3600,
+            unmet_cpu_core_hours=unmet_cpu / 3600,
+            unmet_memory_gb_hours=unmet_mem / 3600,
+            unmet_samples=unmet_samples,
+            scale_up_events=ups,
+            scale_down_events=downs,
+            peak_nodes=max(nodes),
+            current_min=low,
+            current_max=high,
+            recommended_min=recommended_min,
+            recommended_max=recommended_max
+        )
+
+    def simulate_plan(self, plan: DeploymentPlan, trace: DemandTrace,
+                      pool_name: Optional[str] = None) -> SimulationResult:
+        """
+        Replay a trace against a plan's pool.
+
+        Defaults to the first pool without taints, since tainted pools
+        (such as GPU pools) only take dedicated workloads.
+        """
+        pools = plan.cluster_config.node_pools
+        if pool_name:
+            pool = next((p for p in pools if p.name == pool_name), None)
+            if pool is None:
+                raise ValueError(f"Plan has no node pool named '{pool_name}'")
+        else:
+            pool = next((p for p in pools if not p.taints), None)
+            if pool is None:
+                raise ValueError("Plan has no untainted node pool to simulate")
+        return self.simulate(trace, pool)
@@ -0,0 +1,310 @@
+"""
+Pod scheduling simulator
+
+Places a synthetic pod set onto a plan's nodes and racks, honoring resource
+requests, each pool's max_pods, node selectors, taints/tolerations and
+topology spread constraints, and reports the pods that cannot be scheduled.
+
+Nodes are expanded from the plan's pools and grouped into classes that
+share labels and taints. Feasibility is worked out once per (class, pod
+spec) instead of once per (node, pod). Placement keeps, per spec, a heap of
+topology domains ordered by pod count and a first-fit cursor per domain.
+Node capacity only ever shrinks, so a cursor never moves backwards and
+placing a pod is amortized O(log domains).
+"""
+
+import heapq
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+import logging
+from src.catalog import CatalogService
+from src.models import DeploymentPlan
+
+logger = logging.getLogger(__name__)
+
+HOSTNAME_LABEL = 'kubernetes.io/hostname'
+POOL_LABEL = 'agentpool'
+
+# Reasons reported for unschedulable pods
+NO_MATCHING_NODE = 'no node matches selector/tolerations'
+INSUFFICIENT_RESOURCES = 'insufficient resources'
+SPREAD_VIOLATION = 'topology spread constraint'
+
+_BLOCKING_EFFECTS = ('NoSchedule', 'NoExecute')
+
+
+def parse_taint(taint: str) -> Tuple[str, Optional[str], Optional[str]]:
+    """Split 'key=value:Effect' (value and effect optional) into its parts"""
+    rest, _, effect = taint.partition(':')
+    key, sep, value = rest.partition('=')
+    return key, (value if sep else None), (effect or None)
+
+
+def tolerates(tolerations: Sequence[str], taint: str) -> bool:
+    """
+    Whether any toleration matches a taint.
+
+    Tolerations use the taint syntax; an omitted value or effect matches
+    any value or effect for that key.
+    """
+    key, value, effect = parse_taint(taint)
+    for toleration in tolerations:
+        t_key, t_value, t_effect = parse_taint(toleration)
+        if t_key == key and t_value in (None, value) and t_effect in (None, effect):
+            return True
+    return False
+
+
+@dataclass
+class PodSpec:
+    """
+    A group of identical pods.
+
+    spread uses the RackTopology.spread_constraints format
+    ({'maxSkew': '1', 'topologyKey': ..., 'whenUnsatisfiable': ...}) and is
+    evaluated across the replicas of this spec.
+    """
+    name: str
+    cpu: float
+    memory_gb: float
+    gpu: int = 0
+    replicas: int = 1
+    node_selector: Dict[str, str] = field(default_factory=dict)
+    tolerations: List[str] = field(default_factory=list)
+    spread: Optional[Dict[str, str]] = None
+
+
+@dataclass
+class SimNode:
+    """A planned node with its remaining capacity"""
+    name: str
+    pool: str
+    labels: Dict[str, str]
+    taints: Tuple[str, ...]
+    cpu: float
+    memory_gb: float
+    gpu: int
+    max_pods: int = 110
+    pods: int = 0
+
+
+@dataclass
+class SchedulingReport:
+    """Outcome of a scheduling simulation"""
+    scheduled: int = 0
+    unschedulable: int = 0
+    reasons: Counter = field(default_factory=Counter)
+    unschedulable_by_spec: Counter = field(default_factory=Counter)
+    pods_by_domain: Dict[str, Counter] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    @property
+    def all_scheduled(self) -> bool:
+        return self.unschedulable == 0
+
+    def to_dict(self) -> Dict:
+        return {
+            'scheduled': self.scheduled,
+            'unschedulable': self.unschedulable,
+            'reasons': dict(self.reasons),
+            'unschedulable_by_spec': dict(self.unschedulable_by_spec),
+            'pods_by_domain': {spec: dict(counts) for spec, counts in self.pods_by_domain.items()},
+            'elapsed': self.elapsed
+        }
+
+
+class SchedulingSimulator:
+    """
+    Simulates pod placement on a fixed set of nodes.
+
+    Args:
+        nodes: Nodes to schedule onto; their capacity is consumed in place
+    """
+
+    def __init__(self, nodes: List[SimNode]):
+        self.nodes = nodes
+        # Node classes: nodes sharing labels and taints have identical feasibility
+        self._classes: Dict[Tuple[FrozenSet, Tuple[str, ...]], List[int]] = {}
+        for idx, node in enumerate(nodes):
+            labels = frozenset((k, v) for k, v in node.labels.items() if k != HOSTNAME_LABEL)
+            self._classes.setdefault((labels, node.taints), []).append(idx)
+        self._feasible_cache: Dict[Tuple, List[int]] = {}
+
+    @classmethod
+    def from_plan(cls, plan: DeploymentPlan, catalog: CatalogService) -> 'SchedulingSimulator':
+        """
+        Expand a plan's pools into nodes.
+
+        Nodes are spread round-robin over the plan's racks and carry the
+        rack's node labels alongside the pool labels.
+        """
+        racks = plan.rack_topology or []
+        nodes = []
+        for pool in plan.cluster_config.node_pools:
+            sku = catalog.get_vm_sku(pool.vm_size)
+            if not sku:
+                raise ValueError(f"Unknown VM size '{pool.vm_size}' for pool '{pool.name}'")
+            for i in range(pool.node_count):
+                name = f"{pool.name}-{i}"
+                labels = {**pool.labels, POOL_LABEL: pool.name, HOSTNAME_LABEL: name}
+                if racks:
+                    labels.update(racks[i % len(racks)].node_labels)
+                nodes.append(SimNode(
+                    name=name,
+                    pool=pool.name,
+                    labels=labels,
+                    taints=tuple(pool.taints),
+                    cpu=float(sku['vcpus']),
+                    memory_gb=float(sku['memory_gb']),
+                    gpu=int(sku.get('gpu_count', 0)),
+                    max_pods=pool.max_pods
+                ))
+        return cls(nodes)
+
+    def _feasible(self, spec: PodSpec, topology_key: Optional[str]) -> List[int]:
+        """Indices of nodes whose labels and taints admit the spec, cached per signature"""
+        signature = (
+            frozenset(spec.node_selector.items()),
+            frozenset(spec.tolerations),
+            topology_key
+        )
+        cached = self._feasible_cache.get(signature)
+        if cached is not None:
+            return cached
+
+        selector = spec.node_selector.items()
+        feasible: List[int] = []
+        for (labels, taints), members in self._classes.items():
+            label_map = dict(labels)
+            if any(label_map.get(k) != v for k, v in selector if k != HOSTNAME_LABEL):
+                continue
+            if any(parse_taint(t)[2] in _BLOCKING_EFFECTS and not tolerates(spec.tolerations, t)
+                   for t in taints):
+                continue
+            for idx in members:
+                node = self.nodes[idx]
+                if HOSTNAME_LABEL in spec.node_selector and \
+                        node.labels[HOSTNAME_LABEL] != spec.node_selector[HOSTNAME_LABEL]:
+                    continue
+                if topology_key and topology_key not in node.labels:
+                    continue
+                feasible.append(idx)
+        feasible.sort()
+        self._feasible_cache[signature] = feasible
+        return feasible
+
+    def schedule(self, specs: Sequence[PodSpec]) -> SchedulingReport:
+        """Place every replica of every spec, in order"""
+        start = time.perf_counter()
+        report = SchedulingReport()
+        nodes = self.nodes
+
+        for spec in specs:
+            spread = spec.spread or {}
+            topology_key = spread.get('topologyKey')
+            max_skew = int(spread.get('maxSkew', 1)) if topology_key else None
+            hard = spread.get('whenUnsatisfiable', 'DoNotSchedule') == 'DoNotSchedule'
+            feasible = self._feasible(spec, topology_key)
+            if not feasible:
+                report.unschedulable += spec.replicas
+                report.reasons[NO_MATCHING_NODE] += spec.replicas
+                report.unschedulable_by_spec[spec.name] += spec.replicas
+                continue
+
+            # Group feasible nodes by topology domain (a single domain without spread)
+            domain_names: List[str] = []
+            domain_nodes: List[List[int]] = []
+            positions: Dict[str, int] = {}
+            for idx in feasible:
+                domain = nodes[idx].labels[topology_key] if topology_key else ''
+                pos = positions.get(domain)
+                if pos is None:
+                    pos = positions[domain] = len(domain_names)
+                    domain_names.append(domain)
+                    domain_nodes.append([])
+                domain_nodes[pos].append(idx)
+
+            counts = [0] * len(domain_names)
+            cursors = [0] * len(domain_names)
+            live = [(0, pos) for pos in range(len(domain_names))]
+            dead_min: Optional[int] = None
+            cpu, memory, gpu = spec.cpu, spec.memory_gb, spec.gpu
+
+            for _ in range(spec.replicas):
+                placed = False
+                skew_blocked = False
+                while live:
+                    count, pos = live[0]
+                    members = domain_nodes[pos]
+                    cursor = cursors[pos]
+                    while cursor < len(members):
+                        node = nodes[members[cursor]]
+                        if node.cpu >= cpu and node.memory_gb >= memory and node.gpu >= gpu \
+                                and node.pods < node.max_pods:
+                            break
+                        cursor += 1
+                    cursors[pos] = cursor
+                    if cursor == len(members):
+                        # Domain is full for this spec; it still counts towards skew
+                        heapq.heappop(live)
+                        dead_min = count if dead_min is None else min(dead_min, count)
+                        continue
+
+                    if max_skew is not None and hard and dead_min is not None \
+                            and count + 1 - dead_min > max_skew:
+                        skew_blocked = True
+                        break
+
+                    node.cpu -= cpu
+                    node.memory_gb -= memory
+                    node.gpu -= gpu
+                    node.pods += 1
+                    counts[pos] = count + 1
+                    heapq.heapreplace(live, (count + 1, pos))
+                    placed = True
+                    break
+
+                if placed:
+                    report.scheduled += 1
+                    continue
+                report.unschedulable += 1
+                report.unschedulable_by_spec[spec.name] += 1
+                report.reasons[SPREAD_VIOLATION if skew_blocked else INSUFFICIENT_RESOURCES] += 1
+
+            if topology_key:
+                report.pods_by_domain[spec.name] = Counter({
+                    domain_names[pos]: counts[pos] for pos in range(len(domain_names))
+                })
+
+        report.elapsed = time.perf_counter() - start
+        if report.unschedulable:
+            logger.info(f"{report.unschedulable} pods unschedulable: {dict(report.reasons)}")
+        return report
+
+
+def synthetic_pods(plan: DeploymentPlan, replicas: int = 100,
+                   cpu: float = 0.5, memory_gb: float = 1.0) -> List[PodSpec]:
+    """
+    Build a pod set for a plan: one spread deployment per pool.
+
+    Each pool's pods select the pool, tolerate its taints, request one GPU on
+    GPU pools, and use the plan's rack spread constraint when racks exist.
+    """
+    spread = None
+    if plan.rack_topology and plan.rack_topology[0].spread_constraints:
+        spread = dict(plan.rack_topology[0].spread_constraints[0])
+    specs = []
+    for pool in plan.cluster_config.node_pools:
+        specs.append(PodSpec(
+            name=f"{pool.name}-app",
+            cpu=cpu,
+            memory_gb=memory_gb,
+            gpu=1 if pool.labels.get('gpu') == 'true' else 0,
+            replicas=replicas,
+            node_selector={POOL_LABEL: pool.name},
+            tolerations=list(pool.taints),
+            spread=spread
+        ))
+    return specs
@@ -0,0 +1,10 @@
+"""
+Usage telemetry ingestion for sizing workloads from real usage
+"""
+
+from .sketch import KLLSketch
+from .ingest import IngestStats, Shard, UsageIngester, WorkloadUsage, ingest_shard, plan_shards
+
+__all__ = [
+    'KLLSketch', 'IngestStats', 'Shard', 'UsageIngester', 'WorkloadUsage', 'ingest_shard', 'plan_shards'
+]
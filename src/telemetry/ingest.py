@@ -0,0 +1,478 @@
+"""
+Streaming ingestion of per-pod usage exports
+
+Reads CPU/memory (and optionally GPU) usage samples from CSV or JSONL files
+and summarizes them per workload label with KLL sketches. Each sketch keeps
+a few hundred values per workload and per resource.
+
+Requirements describe a workload's total demand, so samples are summed
+across pods per (label, timestamp) before they reach the sketches. The
+quantiles are then taken over concurrent total usage, not over single
+pods. Timestamps are matched as written and ordered as numbers when they
+parse as numbers, otherwise as text (ISO 8601 sorts correctly). Exports
+are expected in time order, with all pods of a timestamp in one file. Once
+a newer timestamp arrives for a label, the older totals are complete and
+go into the sketches, so each shard only holds its first and latest
+timestamps open for the neighbouring shards to add to. Rows without a
+timestamp are taken to be whole-workload samples already (e.g. an export
+aggregated per label) and go straight to the sketches.
+
+Large files are split into byte ranges at line boundaries, and gzip files
+form one shard each. Shards are summarized in worker processes and their
+sketches are merged. The summaries turn into WorkloadRequirements at a
+chosen quantile (p95 by default), ready for Planner.create_plan.
+
+Recognized columns (CSV header or JSONL keys); the first present is used:
+
+    label    the label column given to the ingester ('workload' by default)
+    time     timestamp, time, ts (optional)
+    CPU      cpu, cpu_cores, cpu_millicores
+    memory   memory_gb, memory_gib, memory_mib, memory_bytes
+    GPU      gpu, gpu_count (optional)
+
+Rows without a label or with unparseable numbers are counted and skipped.
+"""
+
+import csv
+import gzip
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+from src.models import WorkloadRequirements, WorkloadType
+from .sketch import KLLSketch
+
+logger = logging.getLogger(__name__)
+
+CPU_COLUMNS = {'cpu': 1.0, 'cpu_cores': 1.0, 'cpu_millicores': 1e-3}
+MEMORY_COLUMNS = {'memory_gb': 1.0, 'memory_gib': 1.0, 'memory_mib': 1 / 1024, 'memory_bytes': 1 / 2 ** 30}
+GPU_COLUMNS = {'gpu': 1.0, 'gpu_count': 1.0}
+TIMESTAMP_COLUMNS = {'timestamp': 1.0, 'time': 1.0, 'ts': 1.0}
+
+_BATCH = 4096
+
+
+@dataclass(frozen=True)
+class Shard:
+    """A byte range of one input file; lines starting inside it belong to it"""
+    path: str
+    start: int = 0
+    end: Optional[int] = None  # None reads to the end of the file
+
+
+@dataclass
+class WorkloadUsage:
+    """
+    Usage sketches of one workload label.
+
+    open_totals holds per-timestamp sums that more pods may still add to:
+    the first timestamp seen (the previous shard may end with it), the
+    newest one, and any that arrived out of order since the newest was
+    first seen. Closed totals are batched into the sketches by flush();
+    close() closes every total and flushes.
+    """
+    label: str
+    cpu: KLLSketch
+    memory_gb: KLLSketch
+    gpu: KLLSketch
+    open_totals: Dict[str, list] = field(default_factory=dict)  # timestamp -> [cpu, memory, gpu]
+    head: Optional[str] = None  # first timestamp seen
+    watermark: Optional[tuple] = None  # order key of the newest timestamp seen
+    _closed: Tuple[list, list, list] = field(default_factory=lambda: ([], [], []), repr=False)
+
+    @classmethod
+    def empty(cls, label: str, k: int = 200) -> 'WorkloadUsage':
+        return cls(label, KLLSketch(k), KLLSketch(k), KLLSketch(k))
+
+    @property
+    def samples(self) -> int:
+        return self.cpu.count
+
+    def add_concurrent(self, timestamp: str, cpu: float, memory: float, gpu: Optional[float]) -> None:
+        """
+        Add one pod's sample to the workload's total at timestamp.
+
+        A timestamp newer than any seen so far closes the older totals,
+        except the first timestamp's.
+        """
+        totals = self.open_totals.get(timestamp)
+        if totals is not None:
+            totals[0] += cpu
+            totals[1] += memory
+            if gpu is not None:
+                totals[2] = gpu if totals[2] is None else totals[2] + gpu
+            return
+        self.open_totals[timestamp] = [cpu, memory, gpu]
+        key = _time_key(timestamp)
+        if self.head is None:
+            self.head, self.watermark = timestamp, key
+        elif key > self.watermark:
+            # Every other open total is at or behind the old watermark
+            self.watermark = key
+            self._retire([t for t in self.open_totals if t != timestamp and t != self.head])
+
+    def _retire(self, timestamps: List[str]) -> None:
+        cpu, memory, gpu = self._closed
+        for timestamp in timestamps:
+            totals = self.open_totals.pop(timestamp)
+            cpu.append(totals[0])
+            memory.append(totals[1])
+            if totals[2] is not None:
+                gpu.append(totals[2])
+        if len(cpu) >= _BATCH:
+            self.flush()
+
+    def flush(self) -> 'WorkloadUsage':
+        """Move closed per-timestamp totals into the sketches"""
+        cpu, memory, gpu = self._closed
+        if cpu:
+            self.cpu.update_many(cpu)
+            self.memory_gb.update_many(memory)
+            self.gpu.update_many(gpu)
+            for values in self._closed:
+                values.clear()
+        return self
+
+    def merge(self, other: 'WorkloadUsage') -> 'WorkloadUsage':
+        """Fold in another shard's usage; open totals stay open until close()"""
+        self.flush()
+        other.flush()
+        self.cpu.merge(other.cpu)
+        self.memory_gb.merge(other.memory_gb)
+        self.gpu.merge(other.gpu)
+        for timestamp, (cpu, memory, gpu) in other.open_totals.items():
+            totals = self.open_totals.setdefault(timestamp, [0.0, 0.0, None])
+            totals[0] += cpu
+            totals[1] += memory
+            if gpu is not None:
+                totals[2] = gpu if totals[2] is None else totals[2] + gpu
+        if self.head is None:
+            self.head = other.head
+        if other.watermark is not None and (self.watermark is None or other.watermark > self.watermark):
+            self.watermark = other.watermark
+        return self
+
+    def close(self) -> 'WorkloadUsage':
+        """Move every per-timestamp total into the sketches"""
+        self._retire(list(self.open_totals))
+        return self.flush()
+
+    def to_requirements(self, quantile: float = 0.95, headroom: float = 1.0,
+                        default_type: WorkloadType = WorkloadType.CUSTOM) -> WorkloadRequirements:
+        """
+        Size a workload at a usage quantile.
+
+        The quantiles are over the workload's total usage per timestamp.
+        CPU and memory are rounded up to whole cores and GB (at least 1).
+        GPUs are only required when the quantile of the GPU samples is
+        above zero. Labels that name a workload type keep that type.
+        """
+        self.close()
+        cpu = math.ceil(self.cpu.quantile(quantile) * headroom)
+        memory = math.ceil(self.memory_gb.quantile(quantile) * headroom)
+        gpus = math.ceil(self.gpu.quantile(quantile)) if self.gpu.count else 0
+        try:
+            workload_type = WorkloadType(self.label)
+        except ValueError:
+            workload_type = default_type
+        return WorkloadRequirements(
+            workload_type=workload_type,
+            cpu_cores=max(1, cpu),
+            memory_gb=max(1, memory),
+            gpu_required=gpus > 0,
+            gpu_count=gpus,
+            description=f"p{quantile * 100:g} of {self.samples} usage samples for '{self.label}'"
+        )
+
+
+@dataclass
+class IngestStats:
+    """Counters for an ingestion run"""
+    rows: int = 0
+    skipped: int = 0
+    shards: int = 0
+    bytes_read: int = 0
+    started: float = field(default_factory=time.perf_counter)
+    finished: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return end - self.started
+
+    def merge(self, other: 'IngestStats') -> None:
+        self.rows += other.rows
+        self.skipped += other.skipped
+        self.shards += other.shards
+        self.bytes_read += other.bytes_read
+
+    def summary(self) -> str:
+        rate = self.rows / self.elapsed if self.elapsed > 0 else 0.0
+        text = (f"{self.rows} samples from {self.shards} shards in {self.elapsed:.2f}s "
+                f"({rate:,.0f} samples/sec)")
+        if self.skipped:
+            text += f", {self.skipped} rows skipped"
+        return text
+
+
+def _time_key(timestamp: str) -> tuple:
+    """Order numeric timestamps as numbers and anything else as text"""
+    try:
+        return (0, float(timestamp))
+    except ValueError:
+        return (1, timestamp)
+
+
+def plan_shards(paths: Iterable[Path], shard_bytes: int = 64 * 2 ** 20) -> List[Shard]:
+    """Split input files into byte ranges of about shard_bytes each"""
+    shards = []
+    for path in paths:
+        path = str(path)
+        size = os.path.getsize(path)
+        if path.endswith('.gz') or size <= shard_bytes:
+            shards.append(Shard(path))
+            continue
+        for start in range(0, size, shard_bytes):
+            shards.append(Shard(path, start, min(start + shard_bytes, size)))
+    return shards
+
+
+def _open(path: str):
+    return gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')
+
+
+def _lines(shard: Shard, stats: IngestStats) -> Iterator[str]:
+    """Decoded lines starting within the shard, header line excluded for CSV"""
+    with _open(shard.path) as f:
+        position = shard.start
+        if shard.start:
+            # Back up one byte so a line starting exactly at the boundary is kept
+            f.seek(shard.start - 1)
+            position = shard.start - 1 + len(f.readline())
+        for line in f:
+            if shard.end is not None and position >= shard.end:
+                break
+            position += len(line)
+            stats.bytes_read += len(line)
+            yield line.decode('utf-8')
+
+
+def _column(names: Iterable[str], candidates: Dict[str, float], required: bool,
+            path: str) -> Tuple[Optional[str], float]:
+    """The first candidate column present and its unit scale"""
+    for name, scale in candidates.items():
+        if name in names:
+            return name, scale
+    if required:
+        raise ValueError(f"{path}: expected one of the columns {', '.join(candidates)}")
+    return None, 1.0
+
+
+class _Accumulator:
+    """Per-label value buffers flushed into sketches in batches"""
+
+    def __init__(self, k: int):
+        self.k = k
+        self.usage: Dict[str, WorkloadUsage] = {}
+        self._buffers: Dict[str, Tuple[list, list, list]] = {}
+
+    def add(self, label: str, cpu: float, memory: float, gpu: Optional[float]) -> None:
+        """Add a whole-workload sample"""
+        buffers = self._buffers.get(label)
+        if buffers is None:
+            buffers = self._buffers[label] = ([], [], [])
+        buffers[0].append(cpu)
+        buffers[1].append(memory)
+        if gpu is not None:
+            buffers[2].append(gpu)
+        if len(buffers[0]) >= _BATCH:
+            self._flush(label, buffers)
+
+    def add_concurrent(self, label: str, timestamp: str, cpu: float, memory: float,
+                       gpu: Optional[float]) -> None:
+        """Add one pod's sample to the label's total at timestamp"""
+        self._usage(label).add_concurrent(timestamp, cpu, memory, gpu)
+
+    def _usage(self, label: str) -> WorkloadUsage:
+        usage = self.usage.get(label)
+        if usage is None:
+            usage = self.usage[label] = WorkloadUsage.empty(label, self.k)
+        return usage
+
+    def _flush(self, label: str, buffers: Tuple[list, list, list]) -> None:
+        usage = self._usage(label)
+        usage.cpu.update_many(buffers[0])
+        usage.memory_gb.update_many(buffers[1])
+        usage.gpu.update_many(buffers[2])
+        for values in buffers:
+            values.clear()
+
+    def finish(self) -> Dict[str, WorkloadUsage]:
+        for label, buffers in self._buffers.items():
+            if buffers[0]:
+                self._flush(label, buffers)
+        for usage in self.usage.values():
+            usage.flush()
+        return self.usage
+
+
+def _is_csv(path: str) -> bool:
+    return path[:-3].endswith('.csv') if path.endswith('.gz') else path.endswith('.csv')
+
+
+def ingest_shard(shard: Shard, label_column: str = 'workload',
+                 k: int = 200) -> Tuple[Dict[str, WorkloadUsage], IngestStats]:
+    """
+    Summarize one shard.
+
+    Each label's first and latest timestamps are left open, since the
+    neighbouring shards may hold more pods of them. Close the usage (or
+    merge it into the other shards' usage first) before reading quantiles.
+
+    Raises:
+        ValueError: If a CSV header lacks the label, CPU or memory column
+    """
+    stats = IngestStats(shards=1)
+    accumulator = _Accumulator(k)
+    add, add_concurrent = accumulator.add, accumulator.add_concurrent
+
+    if _is_csv(shard.path):
+        with _open(shard.path) as f:
+            header = [name.strip().lower() for name in next(csv.reader([f.readline().decode('utf-8')]))]
+        if label_column not in header:
+            raise ValueError(f"{shard.path}: expected a '{label_column}' column")
+        label_col = header.index(label_column)
+        cpu_name, cpu_scale = _column(header, CPU_COLUMNS, True, shard.path)
+        mem_name, mem_scale = _column(header, MEMORY_COLUMNS, True, shard.path)
+        gpu_name, _ = _column(header, GPU_COLUMNS, False, shard.path)
+        time_name, _ = _column(header, TIMESTAMP_COLUMNS, False, shard.path)
+        cpu_col, mem_col = header.index(cpu_name), header.index(mem_name)
+        gpu_col = header.index(gpu_name) if gpu_name else None
+        time_col = header.index(time_name) if time_name else None
+
+        lines = _lines(shard, stats)
+        if shard.start == 0:
+            next(lines, None)
+        for row in csv.reader(lines):
+            if not row:
+                continue
+            stats.rows += 1
+            try:
+                label = row[label_col]
+                timestamp = row[time_col].strip() if time_col is not None else None
+                gpu = float(row[gpu_col]) if gpu_col is not None and row[gpu_col] else None
+                cpu, memory = float(row[cpu_col]) * cpu_scale, float(row[mem_col]) * mem_scale
+            except (IndexError, ValueError):
+                stats.skipped += 1
+                continue
+            if not label:
+                stats.skipped += 1
+                continue
+            if timestamp:
+                add_concurrent(label, timestamp, cpu, memory, gpu)
+            else:
+                add(label, cpu, memory, gpu)
+    else:
+        columns = None
+        for line in _lines(shard, stats):
+            if not line.strip():
+                continue
+            stats.rows += 1
+            try:
+                record = json.loads(line)
+            except ValueError:
+                stats.skipped += 1
+                continue
+            if columns is None and isinstance(record, dict):
+                # Column names come from the shard's first record
+                columns = (_column(record, CPU_COLUMNS, True, shard.path),
+                           _column(record, MEMORY_COLUMNS, True, shard.path),
+                           _column(record, GPU_COLUMNS, False, shard.path),
+                           _column(record, TIMESTAMP_COLUMNS, False, shard.path))
+            try:
+                (cpu_name, cpu_scale), (mem_name, mem_scale), (gpu_name, _), (time_name, _) = columns
+                label = record.get(label_column)
+                timestamp = record.get(time_name) if time_name else None
+                gpu = record.get(gpu_name) if gpu_name else None
+                cpu = float(record[cpu_name]) * cpu_scale
+                memory = float(record[mem_name]) * mem_scale
+                gpu = float(gpu) if gpu is not None else None
+            except (KeyError, TypeError, ValueError, AttributeError):
+                stats.skipped += 1
+                continue
+            if not label:
+                stats.skipped += 1
+                continue
+            if timestamp is not None and timestamp != '':
+                add_concurrent(str(label), str(timestamp), cpu, memory, gpu)
+            else:
+                add(str(label), cpu, memory, gpu)
+
+    return accumulator.finish(), stats
+
+
+def _ingest_shard(args) -> Tuple[Dict[str, WorkloadUsage], IngestStats]:
+    return ingest_shard(*args)
+
+
+class UsageIngester:
+    """
+    Summarizes usage exports per workload label.
+
+    Args:
+        label_column: Column or key holding the workload label
+        k: KLL sketch accuracy parameter
+        workers: Processes to summarize shards in (default: CPU count)
+        shard_bytes: Target shard size for splitting large files
+    """
+
+    def __init__(self, label_column: str = 'workload', k: int = 200, workers: Optional[int] = None,
+                 shard_bytes: int = 64 * 2 ** 20):
+        self.label_column = label_column
+        self.k = k
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_bytes = shard_bytes
+        self.stats = IngestStats()
+
+    def ingest(self, paths: Iterable[Path]) -> Dict[str, WorkloadUsage]:
+        """
+        Summarize every input file.
+
+        Returns:
+            Closed usage per workload label, sorted by label
+        """
+        self.stats = IngestStats()
+        shards = plan_shards(paths, self.shard_bytes)
+        jobs = [(shard, self.label_column, self.k) for shard in shards]
+        if self.workers > 1 and len(shards) > 1:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(shards))) as pool:
+                results = list(pool.map(_ingest_shard, jobs))
+        else:
+            results = [_ingest_shard(job) for job in jobs]
+
+        usage: Dict[str, WorkloadUsage] = {}
+        for shard_usage, shard_stats in results:
+            self.stats.merge(shard_stats)
+            for label, summary in shard_usage.items():
+                if label in usage:
+                    usage[label].merge(summary)
+                else:
+                    usage[label] = summary
+        for summary in usage.values():
+            summary.close()
+        self.stats.finished = time.perf_counter()
+        logger.info(f"Ingested usage of {len(usage)} workloads: {self.stats.summary()}")
+        return dict(sorted(usage.items()))
+
+    def requirements(self, paths: Iterable[Path], quantile: float = 0.95,
+                     headroom: float = 1.0) -> Dict[str, WorkloadRequirements]:
+        """Ingest the files and size each workload label at the quantile"""
+        return {
+            label: usage.to_requirements(quantile, headroom)
+            for label, usage in self.ingest(paths).items()
+        }
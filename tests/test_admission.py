@@ -0,0 +1,118 @@
+"""
+Unit tests for API admission control
+"""
+
+import threading
+import time
+import pytest
+from src.api.admission import AdmissionController, Rejected
+
+
+def test_per_client_limit_returns_429():
+    """Test a client over its concurrency limit is refused while others are admitted"""
+    admission = AdmissionController(per_client=2)
+    with admission.client_slot('a'), admission.client_slot('a'):
+        with pytest.raises(Rejected) as exc:
+            with admission.client_slot('a'):
+                pass
+        assert exc.value.status == 429
+        assert exc.value.retry_after >= 1
+        with admission.client_slot('b'):
+            pass
+    # Slots are released on exit
+    with admission.client_slot('a'):
+        assert admission.stats()['clients'] == 1
+    assert admission.stats()['clients'] == 0
+
+
+def test_full_queue_returns_503_immediately():
+    """Test requests beyond the running and queued capacity are refused without waiting"""
+    admission = AdmissionController(max_concurrent=1, max_queue=0, queue_timeout=5)
+    with admission.execution_slot():
+        start = time.perf_counter()
+        with pytest.raises(Rejected) as exc:
+            with admission.execution_slot():
+                pass
+        assert exc.value.status == 503
+        assert time.perf_counter() - start < 1
+
+
+def test_queued_request_runs_when_slot_frees():
+    """Test a queued request proceeds once a running one finishes, and times out otherwise"""
+    admission = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=5)
+    release = threading.Event()
+    ran = []
+
+    def hold():
+        with admission.execution_slot():
+            release.wait(5)
+
+    def queued():
+        with admission.execution_slot():
+            ran.append(1)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    while admission.stats()['running'] == 0:
+        time.sleep(0.001)
+    waiter = threading.Thread(target=queued)
+    waiter.start()
+    while admission.stats()['queued'] == 0:
+        time.sleep(0.001)
+
+    # Queue is full: the next request is refused
+    with pytest.raises(Rejected):
+        with admission.execution_slot():
+            pass
+
+    release.set()
+    holder.join()
+    waiter.join()
+    assert ran == [1]
+    assert admission.stats() == {'running': 0, 'queued': 0, 'clients': 0}
+
+    impatient = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=0.05)
+    with impatient.execution_slot():
+        with pytest.raises(Rejected) as exc:
+            with impatient.execution_slot():
+                pass
+        assert exc.value.status == 503
+        assert 'timed out' in exc.value.reason
+
+
+def test_identical_requests_from_one_client_share_without_429(monkeypatch):
+    """Test requests joining an in-flight computation are not charged a client slot"""
+    from src.api import app as api
+
+    release = threading.Event()
+    calls = []
+    plan_record = api.plan_record
+
+    def slow_plan_record(planner, data):
+        calls.append(1)
+        release.wait(5)
+        return plan_record(planner, data)
+
+    monkeypatch.setattr(api, 'plan_record', slow_plan_record)
+    body = {'cluster_name': 'c1', 'resource_group': 'rg', 'custom_location': 'cl',
+            'workload': {'workload_type': 'custom', 'cpu_cores': 8, 'memory_gb': 32}}
+    statuses = []
+
+    def post():
+        with api.app.test_client() as client:
+            response = client.post('/api/plan', json=body, headers={'X-Client-Id': 'one'})
+            statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=post) for _ in range(api.admission.per_client * 3)]
+    for t in threads:
+        t.start()
+    deadline = time.monotonic() + 5
+    while not calls and time.monotonic() < deadline:
+        time.sleep(0.001)
+    time.sleep(0.2)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert statuses == [200] * len(threads)
+    assert len(calls) == 1
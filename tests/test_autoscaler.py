@@ -0,0 +1,58 @@
+"""
+Unit tests for the autoscaler trace-replay simulator
+"""
+
+import pytest
+from src.catalog import CatalogService
+from src.models import NodePoolConfig, OSType
+from src.simulation import AutoscalerSimulator, AutoscalerSettings, DemandTrace
+from src.simulation.autoscaler import sliding_max
+
+
+def _pool(**kwargs):
+    # Standard_D8s_v5: 8 vCPUs, 32 GB
+    defaults = dict(name='pool', vm_size='Standard_D8s_v5', node_count=3, os_type=OSType.LINUX,
+                    enable_auto_scaling=True, min_count=1, max_count=4)
+    defaults.update(kwargs)
+    return NodePoolConfig(**defaults)
+
+
+def test_sliding_max_uses_time_window():
+    """Test the window covers [t - window, t] in timestamp units"""
+    assert sliding_max([1, 5, 2, 2, 2, 1], [0, 60, 120, 180, 240, 300], 120) == [1, 5, 5, 5, 2, 2]
+
+
+def test_scale_down_delay_and_unmet_demand():
+    """Test scale events, node-hours and capped demand"""
+    # 12 minute-level samples: idle, a 5-minute spike beyond max_count, idle again
+    cpu = [4] * 3 + [40] * 5 + [4] * 4
+    trace = DemandTrace.from_columns([i * 60 for i in range(12)], cpu, [8] * 12)
+    simulator = AutoscalerSimulator(CatalogService(), AutoscalerSettings(scale_down_delay=120))
+    result = simulator.simulate(trace, _pool())
+
+    assert result.peak_nodes == 4
+    assert result.scale_up_events == 1
+    assert result.scale_down_events == 1
+    # Nodes stay up for two more samples after the spike ends
+    assert result.node_hours == pytest.approx((3 * 1 + 7 * 4 + 2 * 1) / 60)
+    # 40 cores requested, 32 available for 5 minutes
+    assert result.unmet_cpu_core_hours == pytest.approx(8 * 5 / 60)
+    assert result.unmet_samples == 5
+    assert (result.recommended_min, result.recommended_max) == (1, 5)
+
+
+def test_fixed_pool_and_csv(tmp_path):
+    """Test non-autoscaling pools hold their size and ISO timestamps parse"""
+    path = tmp_path / 'trace.csv'
+    path.write_text(
+        "timestamp,cpu,memory_gb\n"
+        "2024-01-01T00:00:00,10,20\n"
+        "2024-01-01T00:01:00,30,20\n"
+    )
+    trace = DemandTrace.from_csv(path)
+    assert list(trace.timestamps)[1] - list(trace.timestamps)[0] == 60
+
+    result = AutoscalerSimulator(CatalogService()).simulate(trace, _pool(enable_auto_scaling=False))
+    assert result.peak_nodes == 3
+    assert result.scale_up_events == 0
+    assert result.unmet_samples == 1
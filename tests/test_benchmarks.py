@@ -0,0 +1,43 @@
+"""
+Unit tests for the benchmark suite
+"""
+
+import json
+from benchmarks.run import run_suite, compare, main
+from benchmarks.synthetic import synthetic_catalog, synthetic_workloads
+
+
+def test_synthetic_catalog_size():
+    """Test synthetic catalogs hold the requested number of SKUs"""
+    catalog = synthetic_catalog(50)
+    skus = catalog['vm_skus']['general_purpose'] + catalog['vm_skus']['gpu']
+    assert len(skus) == 50
+    assert len(list(synthetic_workloads(7))) == 7
+
+
+def test_run_suite_covers_every_stage():
+    """Test every stage is benchmarked"""
+    results = run_suite(sku_count=10, workload_count=5, repeat=1)
+    assert set(results) == {
+        'catalog_load', 'plan', 'validate', 'export_bicep', 'export_arm', 'export_terraform'
+    }
+    assert results['plan'].ops == 5
+    assert results['export_arm'].bytes > 0
+
+
+def test_compare_flags_regressions():
+    """Test regressions beyond the threshold are reported"""
+    baseline = {'plan': {'per_op_us': 100.0}, 'validate': {'per_op_us': 10.0}}
+    current = {'plan': {'per_op_us': 130.0}, 'validate': {'per_op_us': 11.0}}
+    regressions = compare(current, baseline, threshold=0.2)
+    assert len(regressions) == 1
+    assert regressions[0].startswith('plan')
+
+
+def test_main_writes_baseline_and_compares(tmp_path):
+    """Test baseline output can be compared against itself"""
+    baseline = tmp_path / 'baseline.json'
+    args = ['--skus', '10', '--workloads', '3', '--repeat', '1']
+    assert main(args + ['--output', str(baseline)]) == 0
+    assert 'plan' in json.loads(baseline.read_text())['results']
+    assert main(args + ['--compare', str(baseline), '--threshold', '100']) == 0
@@ -0,0 +1,84 @@
+"""
+Unit tests for the bulk JSONL plan/export pipeline
+"""
+
+import json
+import pytest
+from src.catalog import CatalogService
+from src.planner import Planner
+from src.cli.bulk import run_bulk_plan, run_bulk_export, iter_plans
+
+
+@pytest.fixture
+def workloads_file(tmp_path):
+    """Write a small JSONL file of workload records"""
+    path = tmp_path / 'workloads.jsonl'
+    records = [
+        {
+            'cluster_name': f'site-{i:03d}',
+            'resource_group': 'test-rg',
+            'custom_location': 'test-custom-location',
+            'workload': {'workload_type': 'general-purpose', 'cpu_cores': 8, 'memory_gb': 32}
+        }
+        for i in range(5)
+    ]
+    path.write_text('\n'.join(json.dumps(r) for r in records) + '\n')
+    return path
+
+
+def test_bulk_plan_writes_one_plan_per_line(workloads_file, tmp_path):
+    """Test bulk planning streams every record to the output"""
+    output = tmp_path / 'plans.jsonl'
+    stats = run_bulk_plan(workloads_file, output, Planner(CatalogService()))
+
+    lines = output.read_text().splitlines()
+    assert stats.records == 5
+    assert len(lines) == 5
+    assert stats.bytes_written == output.stat().st_size
+    assert json.loads(lines[0])['cluster_config']['cluster_name'] == 'site-000'
+
+
+def test_bulk_plan_reports_bad_records(tmp_path):
+    """Test malformed records are reported and skipped"""
+    path = tmp_path / 'bad.jsonl'
+    path.write_text(json.dumps({'workload_type': 'general-purpose'}) + '\n')
+    stats = run_bulk_plan(path, tmp_path / 'out.jsonl', Planner(CatalogService()))
+    assert stats.records == 0
+    assert len(stats.errors) == 1
+
+
+def test_bulk_export_writes_each_format(workloads_file, tmp_path):
+    """Test export renders every requested format per cluster"""
+    plans_file = tmp_path / 'plans.jsonl'
+    run_bulk_plan(workloads_file, plans_file, Planner(CatalogService()))
+
+    out_dir = tmp_path / 'out'
+    stats = run_bulk_export(iter_plans(plans_file), out_dir, ['bicep', 'arm', 'terraform'])
+
+    assert stats.records == 5
+    assert stats.files_written == 15
+    assert (out_dir / 'site-000' / 'main.bicep').exists()
+    assert (out_dir / 'site-004' / 'azuredeploy.json').exists()
+    assert (out_dir / 'site-002' / 'main.tf').exists()
+
+
+def test_bulk_export_rejects_unknown_format(tmp_path):
+    """Test unknown formats fail before anything is written"""
+    with pytest.raises(ValueError):
+        run_bulk_export([], tmp_path, ['yaml'])
+
+
+def test_bulk_export_skips_bad_records(workloads_file, tmp_path):
+    """Test a bad line is reported without aborting the export"""
+    mixed = tmp_path / 'mixed.jsonl'
+    lines = workloads_file.read_text().splitlines()
+    mixed.write_text('\n'.join([lines[0], '{not json', json.dumps({'cpu_cores': 8}), lines[1]]) + '\n')
+
+    errors = []
+    plans = iter_plans(mixed, lambda: Planner(CatalogService()), errors)
+    stats = run_bulk_export(plans, tmp_path / 'out', ['bicep'], errors=errors)
+    assert stats.records == 2
+    assert [error.split(':')[0] for error in stats.errors] == ['line 2', 'line 3']
+    assert '2 errors' in stats.summary()
+    with pytest.raises(ValueError):
+        list(iter_plans(mixed, lambda: Planner(CatalogService())))
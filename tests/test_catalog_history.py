@@ -0,0 +1,83 @@
+"""
+Unit tests for catalog version history
+"""
+
+import copy
+import pytest
+from src.catalog import CatalogService, CatalogHistory, HTTPCatalogSource
+from src.catalog.standin import StandInCatalogServer
+from src.catalog.history import catalog_digest, compute_delta, apply_delta
+from src.planner import Planner
+from src.models import WorkloadRequirements, WorkloadType
+
+
+def _versions(count):
+    """Generate successive catalogs differing in their Kubernetes versions"""
+    base = CatalogService().catalog_data
+    for i in range(count):
+        data = copy.deepcopy(base)
+        data['kubernetes_versions'] = [f'1.{30 + i}.0'] + data['kubernetes_versions']
+        data['metadata']['last_updated'] = f'2025-01-{i + 1:02d}T00:00:00'
+        yield data
+
+
+def test_delta_round_trip():
+    """Test applying a computed delta reproduces the new catalog"""
+    old, new = list(_versions(2))
+    del new['limits']['max_racks']
+    delta = compute_delta(old, new)
+    assert apply_delta(copy.deepcopy(old), delta) == new
+
+
+def test_version_id_ignores_refresh_metadata(tmp_path):
+    """Test timestamps and source validators do not create new versions"""
+    first, second = list(_versions(2))
+    stamped = copy.deepcopy(first)
+    stamped['metadata']['last_updated'] = '2026-01-01T00:00:00'
+    stamped['metadata']['sources'] = {'vm_skus': {'etag': '"abc"'}}
+    assert catalog_digest(stamped) == catalog_digest(first) != catalog_digest(second)
+
+    history = CatalogHistory(tmp_path / 'history')
+    assert history.append(first) == history.append(stamped)
+    assert len(history) == 1
+
+
+def test_history_loads_every_version(tmp_path):
+    """Test all versions load from checkpoints plus deltas, including after reopening"""
+    history = CatalogHistory(tmp_path / 'history', checkpoint_interval=4)
+    catalogs = list(_versions(10))
+    ids = [history.append(data) for data in catalogs]
+
+    assert history.append(catalogs[-1]) == ids[-1]
+    assert len(history) == 10
+    kinds = [v['kind'] for v in history.versions()]
+    assert kinds.count('full') == 3
+
+    reopened = CatalogHistory(tmp_path / 'history', checkpoint_interval=4)
+    for version_id, data in zip(ids, catalogs):
+        assert reopened.load(version_id) == data
+    with pytest.raises(KeyError):
+        reopened.load('0' * 16)
+
+
+def test_planner_uses_pinned_catalog_version(tmp_path):
+    """Test plans can be made against an older catalog after a refresh"""
+    catalog_path = tmp_path / 'skus.yaml'
+    catalog = CatalogService(str(catalog_path))
+    old_version = catalog.version_id
+
+    with StandInCatalogServer({'kubernetes_versions': ['1.99.0']}) as server:
+        catalog.refresh(HTTPCatalogSource(server.base_url))
+    assert catalog.version_id != old_version
+
+    planner = Planner(catalog)
+    workload = WorkloadRequirements(workload_type=WorkloadType.GENERAL_PURPOSE, cpu_cores=8)
+    kwargs = dict(workload=workload, cluster_name='c', resource_group='rg',
+                  location='eastus', custom_location='cl')
+
+    live = planner.create_plan(**kwargs)
+    pinned = planner.create_plan(catalog_version=old_version, **kwargs)
+
+    assert live.cluster_config.kubernetes_version == '1.99.0'
+    assert pinned.cluster_config.kubernetes_version != '1.99.0'
+    assert pinned.catalog_version == old_version
@@ -0,0 +1,89 @@
+"""
+Unit tests for the catalog refresh pipeline
+"""
+
+import shutil
+import time
+from pathlib import Path
+import pytest
+import yaml
+from src.catalog import CatalogService, HTTPCatalogSource
+from src.catalog.standin import StandInCatalogServer
+
+SECTIONS = {
+    'kubernetes_versions': ['1.32.6', '1.31.10'],
+    'os_images': {'linux': [{'name': 'Azure Linux 3.0', 'version': '3.0.20250101'}]},
+    'vm_skus': {'gpu': [{'name': 'Standard_NC8_A2', 'vcpus': 8, 'memory_gb': 16, 'gpu': True}]}
+}
+
+
+@pytest.fixture
+def catalog_copy(tmp_path):
+    """Copy the shipped catalog so refreshes do not touch the repo"""
+    path = tmp_path / 'skus.yaml'
+    shutil.copy(Path(__file__).parent.parent / 'catalog' / 'skus.yaml', path)
+    return path
+
+
+def test_refresh_merges_changed_sections(catalog_copy):
+    """Test fetched sections are merged and written to disk"""
+    with StandInCatalogServer(SECTIONS) as server:
+        catalog = CatalogService(str(catalog_copy), source=HTTPCatalogSource(server.base_url))
+        assert catalog.refresh() is True
+
+    assert catalog.get_kubernetes_versions() == ['1.32.6', '1.31.10']
+    # Categories missing from the source are kept
+    assert len(catalog.get_vm_skus('general_purpose')) > 0
+    assert catalog.get_vm_skus('gpu')[0]['name'] == 'Standard_NC8_A2'
+
+    saved = yaml.safe_load(catalog_copy.read_text())
+    assert saved['kubernetes_versions'] == ['1.32.6', '1.31.10']
+    assert list(catalog_copy.parent.glob('.skus.yaml.*')) == []
+
+
+def test_unchanged_sections_are_skipped(catalog_copy):
+    """Test conditional requests skip sections that did not change"""
+    with StandInCatalogServer(SECTIONS) as server:
+        catalog = CatalogService(str(catalog_copy), source=HTTPCatalogSource(server.base_url))
+        catalog.refresh()
+        server.update('kubernetes_versions', ['1.33.1', '1.32.6'])
+        catalog.refresh()
+
+    report = catalog.last_refresh_report
+    assert report.changed == ['kubernetes_versions']
+    assert sorted(report.unchanged) == ['os_images', 'vm_skus']
+    assert catalog.get_kubernetes_versions()[0] == '1.33.1'
+
+
+def test_noop_refresh_leaves_catalog_alone(catalog_copy):
+    """Test a refresh with nothing changed writes nothing and records no version"""
+    with StandInCatalogServer(SECTIONS) as server:
+        catalog = CatalogService(str(catalog_copy), source=HTTPCatalogSource(server.base_url))
+        catalog.refresh()
+        saved, versions = catalog_copy.read_text(), len(catalog.history)
+        assert catalog.refresh() is True
+        assert CatalogService(str(catalog_copy)).refresh() is True
+
+    assert catalog.last_refresh_report.changed == []
+    assert catalog_copy.read_text() == saved
+    assert len(catalog.history) == versions
+
+
+def test_refresh_time_bounded_by_slowest_section(catalog_copy):
+    """Test sections are fetched concurrently"""
+    delay = 0.3
+    with StandInCatalogServer(SECTIONS, delay=delay) as server:
+        catalog = CatalogService(str(catalog_copy), source=HTTPCatalogSource(server.base_url))
+        start = time.perf_counter()
+        catalog.refresh()
+        elapsed = time.perf_counter() - start
+
+    assert elapsed < delay * len(SECTIONS) * 0.8
+
+
+def test_refresh_fails_when_source_unreachable(catalog_copy):
+    """Test an unreachable source leaves the catalog untouched"""
+    before = catalog_copy.read_text()
+    catalog = CatalogService(str(catalog_copy), source=HTTPCatalogSource('http://127.0.0.1:9', timeout=1))
+    assert catalog.refresh() is False
+    assert catalog_copy.read_text() == before
@@ -0,0 +1,83 @@
+"""
+Unit tests for single-flight request coalescing
+"""
+
+import threading
+import time
+import pytest
+from src.api.coalesce import SingleFlight, canonical_key
+
+
+def test_canonical_key_ignores_key_order():
+    """Test bodies that differ only in key order share a key"""
+    a = canonical_key('/api/plan', {'cluster_name': 'c1', 'workload': {'cpu_cores': 8, 'memory_gb': 32}})
+    b = canonical_key('/api/plan', {'workload': {'memory_gb': 32, 'cpu_cores': 8}, 'cluster_name': 'c1'})
+    assert a == b
+    assert a != canonical_key('/api/export/bicep', {'cluster_name': 'c1'})
+
+
+def test_concurrent_calls_share_one_computation():
+    """Test callers arriving during a computation get its result without rerunning it"""
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return {'plan': 'p'}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do('k', compute))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    deadline = time.monotonic() + 5
+    while flight.in_flight() == 0 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert all(result == {'plan': 'p'} for result, _ in results)
+    assert sorted(shared for _, shared in results) == [False] + [True] * 7
+    assert flight.in_flight() == 0
+
+    # Nothing is cached once the computation finishes
+    flight.do('k', compute)
+    assert len(calls) == 2
+
+
+def test_errors_reach_every_waiter():
+    """Test an exception in the leader is raised in the callers that shared it"""
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise ValueError('bad workload')
+
+    errors = []
+
+    def call():
+        try:
+            flight.do('k', fail)
+        except ValueError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=call)
+    follower.start()
+    time.sleep(0.05)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert errors == ['bad workload', 'bad workload']
+    with pytest.raises(KeyError):
+        flight.do('k', lambda: {}['missing'])
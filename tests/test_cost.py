@@ -0,0 +1,95 @@
+"""
+Unit tests for the cost engine
+"""
+
+import json
+import pytest
+from src.catalog import CatalogService
+from src.planner import Planner, CostEngine, CostOptions
+from src.models import WorkloadRequirements, WorkloadType, plan_to_dict
+
+
+@pytest.fixture
+def catalog():
+    return CatalogService()
+
+
+@pytest.fixture
+def plan(catalog):
+    planner = Planner(catalog)
+    return planner.create_plan(
+        workload=WorkloadRequirements(workload_type=WorkloadType.GENERAL_PURPOSE, cpu_cores=8, memory_gb=32),
+        cluster_name='test-cluster',
+        resource_group='test-rg',
+        location='eastus',
+        custom_location='test-custom-location'
+    )
+
+
+def test_planner_populates_estimated_cost(plan):
+    """Test plans carry a compute cost estimate"""
+    assert plan.estimated_cost is not None
+    assert plan.estimated_cost > 0
+
+
+def test_plan_cost_matches_web_calculator_formulas(catalog, plan):
+    """Test compute, Defender, monitoring and extension pricing"""
+    engine = CostEngine(catalog)
+    options = CostOptions(
+        enable_defender=True, enable_azure_monitor=True, enable_prometheus=True,
+        extensions=['azure-monitor', 'defender-containers', 'video-indexer-arc']
+    )
+    breakdown = engine.plan_cost(plan, options)
+
+    vcores, nodes = engine.plan_usage(plan)
+    assert breakdown.compute == pytest.approx(vcores * 15)
+    assert breakdown.defender == pytest.approx(vcores * 6.87)
+    assert breakdown.monitoring == pytest.approx(30 + nodes * 10 + nodes * 5 * 2.76 + 20)
+    # Monitor and Defender are priced by formula, so only Video Indexer is added
+    assert breakdown.extensions == pytest.approx(800)
+    assert breakdown.annual == pytest.approx(breakdown.monthly * 12)
+
+
+def test_batch_pricing_matches_single_plan(catalog, plan):
+    """Test columnar pricing agrees with per-plan pricing"""
+    engine = CostEngine(catalog)
+    vcores, nodes = engine.usage_columns([plan_to_dict(plan)] * 1000)
+    batch = engine.price_batch(vcores, nodes, defender=[True] * 1000)
+
+    single = engine.plan_cost(plan, CostOptions(enable_defender=True))
+    assert len(batch) == 1000
+    assert batch.monthly[999] == pytest.approx(single.monthly)
+    assert batch.total_monthly == pytest.approx(single.monthly * 1000)
+
+    with pytest.raises(ValueError):
+        engine.price_batch([1, 2], [1])
+
+
+def test_cli_fleet_cost_prices_each_plans_extensions(tmp_path, catalog):
+    """Test the fleet total agrees with each plan's own estimated cost"""
+    from click.testing import CliRunner
+    from src.cli.main import cli
+
+    planner = Planner(catalog)
+    workload = WorkloadRequirements(workload_type=WorkloadType.GENERAL_PURPOSE, cpu_cores=8, memory_gb=32)
+    plans = [
+        planner.create_plan(workload=workload, cluster_name=f'site-{i}', resource_group='rg',
+                            location='eastus', custom_location='cl', extensions=extensions)
+        for i, extensions in enumerate([None, ['edge-rag-arc'], ['edge-rag-arc']])
+    ]
+    path = tmp_path / 'plans.jsonl'
+    path.write_text(''.join(json.dumps(plan_to_dict(plan)) + '\n' for plan in plans))
+
+    def total(*args):
+        result = CliRunner().invoke(cli, ['cost', '--input', str(path), *args])
+        assert result.exit_code == 0, result.output
+        line = next(line for line in result.output.splitlines() if line.strip().startswith('Total'))
+        return float(line.split()[1].replace(',', ''))
+
+    assert total() == pytest.approx(sum(plan.estimated_cost for plan in plans), abs=0.05)
+    # --extension adds to every plan, but plans already running edge-rag-arc are not charged twice
+    engine = CostEngine(catalog)
+    indexer = engine.extensions_cost(['video-indexer-arc'], CostOptions())
+    rag = engine.extensions_cost(['edge-rag-arc'], CostOptions())
+    assert total('--extension', 'video-indexer-arc', '--extension', 'edge-rag-arc') == \
+        pytest.approx(total() + 3 * indexer + rag, abs=0.05)
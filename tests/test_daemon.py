@@ -0,0 +1,47 @@
+"""
+Unit tests for the CLI planning daemon
+"""
+
+import threading
+import pytest
+from src.cli.daemon import PlanningDaemon, DaemonUnavailable, request
+from src.models import plan_from_dict
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    """Run a planning daemon on a temporary socket"""
+    server = PlanningDaemon(tmp_path / 'daemon.sock')
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_request_without_daemon_raises(tmp_path):
+    """Test clients can detect a missing daemon and fall back"""
+    with pytest.raises(DaemonUnavailable):
+        request('ping', socket_path=tmp_path / 'missing.sock')
+
+
+def test_daemon_plans_over_socket(daemon):
+    """Test plan requests round-trip through the daemon"""
+    response = request('plan', {
+        'workload': {'workload_type': 'general-purpose', 'cpu_cores': 8, 'memory_gb': 32},
+        'cluster_name': 'test-cluster',
+        'resource_group': 'test-rg',
+        'location': 'eastus',
+        'custom_location': 'test-custom-location'
+    }, socket_path=daemon.socket_path)
+
+    assert response['ok'] is True
+    plan = plan_from_dict(response['plan'])
+    assert plan.cluster_config.cluster_name == 'test-cluster'
+    assert len(plan.cluster_config.node_pools) > 0
+
+
+def test_daemon_reports_unknown_operation(daemon):
+    """Test unknown operations return an error response"""
+    response = request('bogus', socket_path=daemon.socket_path)
+    assert response['ok'] is False
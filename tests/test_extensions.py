@@ -0,0 +1,72 @@
+"""
+Unit tests for Arc extension resolution
+"""
+
+import pytest
+from src.catalog import CatalogService
+from src.planner import Planner, ExtensionResolver
+from src.models import WorkloadRequirements, WorkloadType
+
+
+def _plan(planner, extensions=None, cpu=8, memory=32):
+    return planner.create_plan(
+        workload=WorkloadRequirements(workload_type=WorkloadType.GENERAL_PURPOSE, cpu_cores=cpu, memory_gb=memory),
+        cluster_name='ext-cluster',
+        resource_group='test-rg',
+        location='eastus',
+        custom_location='test-custom-location',
+        extensions=extensions
+    )
+
+
+def test_resolver_orders_baseline_first():
+    """Test baseline extensions are installed before the ones that need them"""
+    resolver = ExtensionResolver.from_catalog(CatalogService())
+    resolved = resolver.resolve(['video-indexer-arc'])
+
+    assert resolved.order[-1] == 'video-indexer-arc'
+    assert set(resolved.order[:-1]) == {'azure-monitor', 'azure-policy', 'defender-containers'}
+    assert resolved.overhead.cluster_cpu > 4
+    assert resolver.resolve({'video-indexer-arc'}) is resolved
+
+
+def test_resolver_depends_on_and_errors():
+    """Test dependsOn ordering, cycles and unknown extensions"""
+    resolver = ExtensionResolver({
+        'base': {'requiredFor': ['all']},
+        'broker': {'requiredFor': ['broker']},
+        'app': {'requiredFor': ['app'], 'dependsOn': ['broker'],
+                'resources': {'per_node': {'cpu': 0.5}, 'per_cluster': {'memory_gb': 2}}}
+    })
+    resolved = resolver.resolve(['app'])
+    assert resolved.order == ('base', 'broker', 'app')
+    assert resolved.overhead.node_cpu == 0.5
+    assert resolved.overhead.cluster_memory_gb == 2
+
+    with pytest.raises(ValueError):
+        resolver.resolve(['missing'])
+
+    cyclic = ExtensionResolver({
+        'a': {'dependsOn': ['b']},
+        'b': {'dependsOn': ['a']}
+    })
+    with pytest.raises(ValueError, match='cycle'):
+        cyclic.resolve(['a'])
+
+
+def test_extension_overhead_increases_capacity():
+    """Test extension reservations feed SKU selection and node count"""
+    planner = Planner(CatalogService())
+    plain = _plan(planner)
+    with_extensions = _plan(planner, ['edge-rag-arc'])
+
+    assert plain.cluster_config.extensions == []
+    assert with_extensions.cluster_config.extensions[-1] == 'edge-rag-arc'
+
+    def sku(plan):
+        return next(s for s in planner.catalog.get_vm_skus('general_purpose')
+                    if s['name'] == plan.cluster_config.node_pools[0].vm_size)
+
+    assert sku(with_extensions)['vcpus'] >= 8 + 8
+    assert sku(with_extensions)['vcpus'] > sku(plain)['vcpus']
+    assert with_extensions.estimated_cost > plain.estimated_cost
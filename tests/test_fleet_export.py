@@ -0,0 +1,83 @@
+"""
+Unit tests for shape-deduplicated fleet export
+"""
+
+import copy
+import json
+import pytest
+from src.catalog import CatalogService
+from src.planner import Planner
+from src.models import WorkloadRequirements, WorkloadType
+from src.generator import FleetExporter, TerraformGenerator, BicepGenerator, shape_id
+from src.cli.bulk import run_bulk_export
+
+
+@pytest.fixture(scope='module')
+def fleet():
+    """Twenty sites of one shape and five with a larger primary pool"""
+    planner = Planner(CatalogService())
+    base = planner.create_plan(
+        workload=WorkloadRequirements(workload_type=WorkloadType.GENERAL_PURPOSE, cpu_cores=16, memory_gb=64),
+        cluster_name='site-base',
+        resource_group='rg',
+        location='eastus',
+        custom_location='cl'
+    )
+    plans = []
+    for i in range(25):
+        plan = copy.deepcopy(base)
+        plan.cluster_config.cluster_name = f"site-{i:03d}"
+        plan.cluster_config.resource_group = f"rg-{i:03d}"
+        plan.cluster_config.location = 'westus' if i % 2 else 'eastus'
+        if i >= 20:
+            plan.cluster_config.node_pools[0].node_count += 2
+        plans.append(plan)
+    return plans
+
+
+def test_shape_ignores_site_values(fleet):
+    """Test sites differing only in name, group and location share a shape"""
+    assert len({shape_id(p) for p in fleet[:20]}) == 1
+    assert shape_id(fleet[0]) != shape_id(fleet[20])
+
+
+def test_module_is_parameterized_by_site(fleet):
+    """Test shape templates carry no site values and parameter files supply them"""
+    plan = fleet[3]
+    module = TerraformGenerator().generate_module(plan)
+    assert 'site-003' not in module and 'rg-003' not in module
+    assert plan.cluster_config.kubernetes_version in module
+    tfvars = TerraformGenerator().generate_tfvars(plan)
+    assert 'cluster_name   = "site-003"' in tfvars
+    assert 'resource_group = "rg-003"' in tfvars
+
+    template = BicepGenerator().generate_module(plan)
+    assert 'param clusterName string\n' in template
+    params = BicepGenerator().generate_bicepparam(plan)
+    assert params.startswith("using '../main.bicep'")
+    assert "param clusterName = 'site-003'" in params
+
+
+def test_fleet_export_layout(fleet, tmp_path):
+    """Test one template per shape, one parameter file per site and a shape index"""
+    exporter = FleetExporter()
+    stats = exporter.export(fleet, tmp_path / 'fleet')
+
+    assert stats.records == 25
+    assert len(exporter.shapes) == 2
+    assert len(list((tmp_path / 'fleet').rglob('main.tf'))) == 2
+    assert len(list((tmp_path / 'fleet').rglob('*.tfvars'))) == 25
+    assert len(list((tmp_path / 'fleet').rglob('*.bicepparam'))) == 25
+    index = json.loads((tmp_path / 'fleet' / 'fleet.json').read_text())
+    assert sorted(len(shape['sites']) for shape in index['shapes'].values()) == [5, 20]
+
+    full = run_bulk_export(enumerate(fleet), tmp_path / 'full', ['bicep', 'terraform'])
+    assert stats.bytes_written * 3 < full.bytes_written
+
+
+def test_fleet_export_rejects_duplicates_and_arm(fleet):
+    """Test repeated cluster names and unsupported formats are refused"""
+    with pytest.raises(ValueError):
+        list(FleetExporter().render([fleet[0], fleet[0]]))
+    with pytest.raises(ValueError):
+        FleetExporter(['arm'])
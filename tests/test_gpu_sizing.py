@@ -0,0 +1,73 @@
+"""
+Unit tests for GPU pool sizing
+"""
+
+import pytest
+from src.catalog import CatalogService
+from src.planner import Planner
+from src.planner.gpu_sizing import GpuSizer, GpuSizingFactors, pods_per_gpu
+from src.models import WorkloadRequirements, WorkloadType
+
+GPU_SKUS = [
+    {'name': 'Standard_NC8_A2', 'vcpus': 8, 'memory_gb': 16, 'gpu': True, 'gpu_model': 'A2', 'gpu_count': 1},
+    {'name': 'Standard_NC16_A16', 'vcpus': 16, 'memory_gb': 64, 'gpu': True, 'gpu_model': 'A16', 'gpu_count': 2},
+    {'name': 'Standard_NC32_A16', 'vcpus': 32, 'memory_gb': 128, 'gpu': True, 'gpu_model': 'A16', 'gpu_count': 2},
+]
+
+
+def _workload(gpu_count, **kwargs):
+    return WorkloadRequirements(workload_type=WorkloadType.AI_INFERENCE, cpu_cores=8, memory_gb=32,
+                                gpu_required=True, gpu_count=gpu_count, **kwargs)
+
+
+def test_exclusive_gpus_pack_onto_multi_gpu_hosts():
+    """Test one pod per GPU picks the SKU needing the fewest, then smallest, nodes"""
+    sizing = GpuSizer().size(_workload(4), GPU_SKUS)
+    assert (sizing.vm_size, sizing.node_count, sizing.pods_per_node) == ('Standard_NC16_A16', 2, 2)
+    assert sizing.limited_by == 'gpu'
+    assert sizing.gpus == 4
+
+
+def test_sharing_modes_reduce_gpu_nodes():
+    """Test time-slicing and fractional sharing fit more pods per GPU"""
+    sizer = GpuSizer()
+    sliced = sizer.size(_workload(8, gpu_sharing='time-slicing', gpu_sharing_ratio=4), GPU_SKUS)
+    assert (sliced.vm_size, sliced.node_count, sliced.pods_per_node) == ('Standard_NC16_A16', 1, 8)
+
+    # Eight quarter-GPU pods per node would fit, but only two pods' CPU does
+    fractional = sizer.size(_workload(8, gpu_sharing='fractional', gpu_sharing_ratio=0.25, gpu_pod_cpu=6), GPU_SKUS)
+    assert (fractional.vm_size, fractional.node_count, fractional.limited_by) == ('Standard_NC32_A16', 2, 'cpu')
+
+    assert pods_per_gpu(_workload(1, gpu_sharing='fractional', gpu_sharing_ratio=0.1)) == 10
+    for kwargs in ({'gpu_sharing': 'time-slicing', 'gpu_sharing_ratio': 1.5},
+                   {'gpu_sharing': 'fractional', 'gpu_sharing_ratio': 2},
+                   {'gpu_sharing': 'fractional'},
+                   {'gpu_sharing': 'mps', 'gpu_sharing_ratio': 2}):
+        with pytest.raises(ValueError):
+            sizer.size(_workload(2, **kwargs), GPU_SKUS)
+
+
+def test_model_filter_and_node_reservations():
+    """Test a pinned GPU model, per-node reservations and pods that fit nowhere"""
+    sizer = GpuSizer(GpuSizingFactors(pod_cpu=2, pod_memory_gb=8))
+    pinned = sizer.size(_workload(3, gpu_model='A2'), GPU_SKUS)
+    assert (pinned.vm_size, pinned.node_count) == ('Standard_NC8_A2', 3)
+
+    # Reserving 7 cores per node leaves the A2 host no room for a 2-core pod
+    reserved = sizer.size(_workload(2), GPU_SKUS, node_cpu_reserved=7)
+    assert reserved.vm_size == 'Standard_NC16_A16'
+    with pytest.raises(ValueError, match='A2'):
+        sizer.size(_workload(2, gpu_model='A2'), GPU_SKUS, node_cpu_reserved=7)
+
+
+def test_planner_sizes_gpu_pool_with_sharing():
+    """Test the planner's GPU pool follows the sizing engine"""
+    planner = Planner(CatalogService())
+    plan = planner.create_plan(
+        workload=_workload(6, gpu_sharing='time-slicing', gpu_sharing_ratio=3),
+        cluster_name='gpu', resource_group='rg', location='eastus', custom_location='cl'
+    )
+    gpu_pool = plan.cluster_config.node_pools[1]
+    assert gpu_pool.name == 'gpupool'
+    assert (gpu_pool.vm_size, gpu_pool.node_count) == ('Standard_NC4as_T4_v3', 2)
+    assert plan.workload_requirements.gpu_sharing == 'time-slicing'
@@ -0,0 +1,87 @@
+"""
+Unit tests for IP address planning
+"""
+
+import ipaddress
+import time
+import pytest
+from src.models import ClusterConfig, NodePoolConfig, OSType, DeploymentPlan, WorkloadRequirements, WorkloadType
+from src.network import CIDRAllocator, AddressSpaceExhausted, IPDemand, allocate_fleet, cluster_ip_demand
+from src.generator import BicepGenerator, ARMGenerator, TerraformGenerator
+
+
+def _cluster(name='c1', plugin='azure', nodes=3, max_pods=30):
+    return ClusterConfig(
+        cluster_name=name, resource_group='rg', location='eastus', custom_location='cl',
+        kubernetes_version='1.31.10', control_plane_count=1, network_plugin=plugin,
+        node_pools=[NodePoolConfig(name='nodepool1', vm_size='Standard_D8s_v5', node_count=nodes,
+                                   os_type=OSType.LINUX, max_pods=max_pods)]
+    )
+
+
+def test_cluster_demand_by_plugin():
+    """Test Azure CNI puts pods in the node subnet and overlays get a pod CIDR"""
+    azure = cluster_ip_demand(_cluster(plugin='azure'))
+    # (3 nodes + 1 surge) * (1 + 30 pods) + control plane 1 + 2 extra + 5 reserved
+    assert azure.node_ips == 4 + 4 * 30 + 1 + 2 + 5
+    assert azure.node_prefix == 24
+    assert azure.pod_prefix is None
+
+    calico = cluster_ip_demand(_cluster(plugin='calico'))
+    assert calico.node_prefix == 28
+    assert calico.pod_ips == 4 * 32
+    assert calico.pod_prefix == 25
+
+
+def test_allocator_splits_and_reserves():
+    """Test aligned allocation, reservations and exhaustion"""
+    allocator = CIDRAllocator('10.0.0.0/24', reserved=['10.0.0.0/26'])
+    assert allocator.allocate(26) == '10.0.0.64/26'
+    assert allocator.allocate(25) == '10.0.0.128/25'
+    with pytest.raises(AddressSpaceExhausted):
+        allocator.allocate(28)
+    with pytest.raises(ValueError):
+        allocator.reserve('192.168.0.0/24')
+
+
+def test_fleet_allocation_is_disjoint_and_fast():
+    """Test tens of thousands of clusters get non-overlapping blocks quickly"""
+    demands = [
+        IPDemand(f"site-{i}", max_nodes=4, node_ips=40 if i % 3 else 200, pod_ips=512,
+                 node_prefix=26 if i % 3 else 24, pod_prefix=23)
+        for i in range(20000)
+    ]
+    start = time.perf_counter()
+    allocations = allocate_fleet(demands, '10.0.0.0/8', reserved=['10.0.0.0/16'])
+    assert time.perf_counter() - start < 5
+
+    networks = sorted(
+        (ipaddress.ip_network(cidr) for pair in allocations.values() for cidr in pair),
+        key=lambda n: int(n.network_address)
+    )
+    assert len(networks) == 40000
+    assert int(networks[0].network_address) >= int(ipaddress.ip_address('10.1.0.0'))
+    for before, after in zip(networks, networks[1:]):
+        assert int(before.broadcast_address) < int(after.network_address)
+
+
+def test_reservation_covering_supernet_exhausts_it():
+    """Test a reserved range containing the supernet leaves nothing to allocate"""
+    demand = cluster_ip_demand(_cluster(plugin='calico'))
+    with pytest.raises(AddressSpaceExhausted):
+        allocate_fleet([demand], '10.1.0.0/16', reserved=['10.0.0.0/8'])
+    with pytest.raises(AddressSpaceExhausted):
+        allocate_fleet([demand], '10.1.0.0/16', pod_supernet='10.2.0.0/16', reserved=['10.2.0.0/15'])
+
+
+def test_generators_emit_cidrs():
+    """Test allocated CIDRs show up in every template format"""
+    cluster = _cluster(plugin='calico')
+    cluster.node_cidr, cluster.pod_cidr = allocate_fleet([cluster_ip_demand(cluster)], '10.0.0.0/16')['c1']
+    plan = DeploymentPlan(cluster_config=cluster,
+                          workload_requirements=WorkloadRequirements(workload_type=WorkloadType.CUSTOM))
+
+    for generator in (BicepGenerator(), ARMGenerator(), TerraformGenerator()):
+        output = generator.generate(plan)
+        assert cluster.node_cidr in output
+        assert cluster.pod_cidr in output
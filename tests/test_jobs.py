@@ -0,0 +1,156 @@
+"""
+Unit tests for the persistent job queue and workers
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+import zipfile
+from pathlib import Path
+import pytest
+from src.catalog import CatalogService
+from src.planner import Planner
+from src.jobs import JobQueue, JobStatus, LeaseLost, WorkerPool, run_job, work
+
+
+def _records(count=3):
+    return [
+        {
+            'cluster_name': f'site-{i:03d}',
+            'resource_group': 'test-rg',
+            'custom_location': 'test-custom-location',
+            'workload': {'workload_type': 'general-purpose', 'cpu_cores': 8, 'memory_gb': 32}
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def planner():
+    return Planner(CatalogService())
+
+
+def test_submit_validates_payload(tmp_path):
+    """Test unknown kinds, empty record lists and unknown formats are refused"""
+    queue = JobQueue(tmp_path)
+    with pytest.raises(ValueError):
+        queue.submit('deploy', {'records': _records()})
+    with pytest.raises(ValueError):
+        queue.submit('plan', {'records': []})
+    with pytest.raises(ValueError):
+        queue.submit('export', {'records': _records(), 'formats': ['pulumi']})
+
+    job = queue.submit('plan', {'records': _records()})
+    assert job.status == JobStatus.QUEUED
+    assert job.total == 3
+    assert queue.list(JobStatus.QUEUED)[0].id == job.id
+
+
+def test_plan_job_writes_jsonl_result(tmp_path, planner):
+    """Test a worker plans every record, skips bad ones and stores the result on disk"""
+    queue = JobQueue(tmp_path)
+    records = _records() + [{'cluster_name': 'broken'}]
+    job = queue.submit('plan', {'records': records})
+
+    assert work(queue, 'w1', lambda: planner, drain=True) == 1
+    done = queue.get(job.id)
+    assert done.status == JobStatus.SUCCEEDED
+    assert done.progress == 4
+    assert len(done.errors) == 1 and done.errors[0].startswith('record 4')
+
+    lines = open(done.result_path).read().splitlines()
+    assert [json.loads(line)['cluster_config']['cluster_name'] for line in lines] == \
+        ['site-000', 'site-001', 'site-002']
+
+
+def test_export_job_writes_zip(tmp_path, planner):
+    """Test export jobs archive one directory of templates per cluster"""
+    queue = JobQueue(tmp_path)
+    job = queue.submit('export', {'records': _records(2), 'formats': ['bicep', 'terraform']})
+    work(queue, 'w1', lambda: planner, drain=True)
+
+    done = queue.get(job.id)
+    assert done.status == JobStatus.SUCCEEDED
+    with zipfile.ZipFile(done.result_path) as archive:
+        assert sorted(n for n in archive.namelist() if not n.endswith('/')) == [
+            'site-000/main.bicep', 'site-000/main.tf', 'site-001/main.bicep', 'site-001/main.tf'
+        ]
+    assert not list(queue.results_dir.glob('*.staging*'))
+
+
+def test_export_lease_is_renewed_while_archiving(tmp_path, planner, monkeypatch):
+    """Test an archive that outlasts the lease does not let another worker claim the job"""
+    from src.jobs import worker
+
+    queue = JobQueue(tmp_path, lease_seconds=0.3)
+    job = queue.submit('export', {'records': _records(1), 'formats': ['bicep']})
+    make_archive = worker.shutil.make_archive
+    stolen = []
+
+    def slow_make_archive(*args, **kwargs):
+        time.sleep(0.6)
+        stolen.append(queue.claim('thief'))
+        return make_archive(*args, **kwargs)
+
+    monkeypatch.setattr(worker.shutil, 'make_archive', slow_make_archive)
+    run_job(queue, queue.claim('w1'), 'w1', lambda: planner, heartbeat_interval=0.05)
+
+    assert stolen == [None]
+    assert queue.get(job.id).status == JobStatus.SUCCEEDED
+
+
+def test_expired_lease_is_recovered(tmp_path):
+    """Test a job whose worker died is reclaimed, and the dead worker cannot finish it"""
+    queue = JobQueue(tmp_path, lease_seconds=0.05, max_attempts=2)
+    job = queue.submit('plan', {'records': _records(1)})
+
+    assert queue.claim('dead').id == job.id
+    assert queue.claim('other') is None
+    time.sleep(0.1)
+
+    reclaimed = queue.claim('alive')
+    assert reclaimed.id == job.id
+    assert reclaimed.attempts == 2
+    with pytest.raises(LeaseLost):
+        queue.heartbeat(job.id, 'dead', 1, [])
+
+    # A job that keeps losing its worker eventually fails
+    time.sleep(0.1)
+    assert queue.claim('third') is None
+    failed = queue.get(job.id)
+    assert failed.status == JobStatus.FAILED
+    assert 'attempts' in failed.error
+
+
+def test_worker_pool_processes_jobs(tmp_path):
+    """Test worker processes pick up queued jobs from the shared directory"""
+    queue = JobQueue(tmp_path)
+    jobs = [queue.submit('plan', {'records': _records(2)}) for _ in range(3)]
+    pool = WorkerPool(tmp_path, processes=2, poll_interval=0.05)
+    pool.start()
+    try:
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline and not all(queue.get(j.id).finished for j in jobs):
+            time.sleep(0.05)
+    finally:
+        pool.stop()
+    assert all(queue.get(j.id).status == JobStatus.SUCCEEDED for j in jobs)
+    assert pool.alive == 0
+
+
+def test_api_opens_job_queue_on_first_use(tmp_path):
+    """Test importing the API creates no job directory until a job is queued"""
+    script = (
+        "import os\n"
+        "from src.api import app\n"
+        "assert not os.path.exists('jobs')\n"
+        "app.job_workers = 0\n"
+        "response = app.app.test_client().post('/api/jobs', json={'records': [{'cluster_name': 'site-1'}]})\n"
+        "assert response.status_code == 202, response.get_json()\n"
+        "assert os.path.exists(os.path.join('jobs', 'jobs.db'))\n"
+    )
+    env = {**os.environ, 'PYTHONPATH': str(Path(__file__).parent.parent)}
+    env.pop('AKSARC_JOBS_DIR', None)
+    subprocess.run([sys.executable, '-c', script], cwd=tmp_path, env=env, check=True)
@@ -0,0 +1,65 @@
+"""
+Unit tests for instrumentation and profiling hooks
+"""
+
+import pytest
+from src import metrics
+from src.catalog import CatalogService
+from src.planner import Planner
+from src.models import WorkloadRequirements, WorkloadType
+from src.generator import BicepGenerator
+
+
+@pytest.fixture
+def sink():
+    """Install an in-memory sink for the duration of a test"""
+    sink = metrics.InMemorySink()
+    metrics.set_sink(sink)
+    yield sink
+    metrics.set_sink(None)
+
+
+def test_timers_are_noops_without_sink():
+    """Test timers do nothing when instrumentation is disabled"""
+    metrics.set_sink(None)
+    with metrics.timer('unused') as t:
+        pass
+    assert t is metrics.timer('other')
+
+
+def test_planning_and_export_stages_recorded(sink):
+    """Test planner, generator and catalog stages are timed"""
+    planner = Planner(CatalogService())
+    plan = planner.create_plan(
+        workload=WorkloadRequirements(workload_type=WorkloadType.GENERAL_PURPOSE, cpu_cores=8),
+        cluster_name='test-cluster',
+        resource_group='test-rg',
+        location='eastus',
+        custom_location='test-custom-location',
+        rack_count=2
+    )
+    BicepGenerator().generate(plan)
+
+    snapshot = sink.snapshot()
+    for stage in ('catalog.load', 'planner.create_plan', 'planner.sku_selection',
+                  'planner.topology', 'planner.validation', 'generator.bicep'):
+        assert snapshot['timings'][stage]['count'] >= 1
+    assert snapshot['counters']['planner.plans'] == 1
+
+
+def test_prometheus_rendering(sink):
+    """Test the Prometheus text output"""
+    with metrics.timer('planner.validation'):
+        pass
+    metrics.increment('planner.plans', 3)
+    text = sink.to_prometheus()
+    assert 'aksarc_stage_seconds_count{stage="planner.validation"} 1' in text
+    assert 'aksarc_events_total{name="planner.plans"} 3' in text
+
+
+@pytest.mark.parametrize('mode', ['cprofile', 'sample'])
+def test_profile_modes_produce_report(mode):
+    """Test both profiling modes fill in a report"""
+    with metrics.profile(mode) as report:
+        sum(i * i for i in range(200000))
+    assert report.text
@@ -0,0 +1,98 @@
+"""
+Unit tests for multi-cluster partitioning
+"""
+
+import json
+import pytest
+from src.catalog import CatalogService
+from src.planner import Planner, ClusterPartitioner
+from src.planner.partitioner import split_evenly
+from src.models import WorkloadRequirements, WorkloadType
+
+
+@pytest.fixture
+def partitioner():
+    return ClusterPartitioner(Planner(CatalogService()))
+
+
+def _partition(partitioner, cpu, gpu_count=0, rack_count=None, environment=None):
+    return partitioner.partition(
+        workload=WorkloadRequirements(workload_type=WorkloadType.AI_INFERENCE, cpu_cores=cpu, memory_gb=cpu * 4,
+                                      gpu_required=gpu_count > 0, gpu_count=gpu_count),
+        cluster_name='big',
+        resource_group='rg',
+        location='eastus',
+        custom_location='cl',
+        rack_count=rack_count,
+        environment=environment
+    )
+
+
+def test_split_evenly():
+    """Test shares differ by at most one"""
+    assert split_evenly(10, 3) == [4, 3, 3]
+
+
+def test_small_workload_stays_single_cluster(partitioner):
+    """Test workloads within limits return the planner's plan unchanged"""
+    plans = _partition(partitioner, cpu=8)
+    assert len(plans) == 1
+    assert plans[0].cluster_config.cluster_name == 'big'
+
+
+def test_oversized_workload_uses_minimum_clusters(partitioner):
+    """Test limits are respected with the fewest clusters"""
+    limits = partitioner.catalog.get_limits()
+    # 40,000 cores on 32-core nodes plus 2,000 single-T4 nodes = 3,250 nodes
+    plans = _partition(partitioner, cpu=40000, gpu_count=2000, rack_count=4)
+    assert len(plans) == 4
+    assert [p.cluster_config.cluster_name for p in plans] == ['big-01', 'big-02', 'big-03', 'big-04']
+
+    total_cpu = 0
+    for plan in plans:
+        pools = plan.cluster_config.node_pools
+        assert plan.validation_result.is_valid
+        assert len(pools) <= limits['max_pools_per_cluster']
+        assert sum(p.node_count for p in pools) <= limits['max_nodes_per_cluster']
+        assert all(p.node_count <= limits['max_nodes_per_pool'] for p in pools)
+        # Pools are rack-balanced
+        assert all(p.node_count % 4 == 0 for p in pools)
+        total_cpu += sum(p.node_count * 32 for p in pools if not p.taints)
+    assert total_cpu >= 40000
+
+
+def test_single_cluster_resized_when_undersized(partitioner):
+    """Test a large workload within limits gets enough capacity in one cluster"""
+    plans = _partition(partitioner, cpu=2000)
+    assert len(plans) == 1
+    pools = plans[0].cluster_config.node_pools
+    assert sum(p.node_count * 32 for p in pools) >= 2000
+
+
+def test_environment_max_nodes_caps_each_cluster(partitioner):
+    """Test a pilot plan is split so no cluster exceeds the template's max_nodes"""
+    max_nodes = partitioner.catalog.get_environment_preset('pilot').max_nodes
+    plans = _partition(partitioner, cpu=3000, environment='pilot')
+    assert len(plans) > 1
+    for plan in plans:
+        pools = plan.cluster_config.node_pools
+        assert sum(p.node_count for p in pools) <= max_nodes
+        assert all(p.max_count is None or p.max_count <= max_nodes for p in pools)
+    assert sum(p.node_count * 32 for plan in plans for p in plan.cluster_config.node_pools) >= 3000
+
+
+def test_cli_plan_partition(tmp_path):
+    """Test plan --partition from the CLI writes one plan per cluster"""
+    from click.testing import CliRunner
+    from src.cli.main import cli
+
+    output = tmp_path / 'plans.jsonl'
+    result = CliRunner().invoke(cli, [
+        'plan', '--workload', 'ai-inference', '--cpu', '40000', '--memory', '160000',
+        '--cluster-name', 'big', '--resource-group', 'rg', '--custom-location', 'cl',
+        '--rack-count', '4', '--partition', '--no-daemon', '--output', str(output)
+    ])
+    assert result.exit_code == 0, result.output
+    plans = [json.loads(line) for line in output.read_text().splitlines()]
+    assert len(plans) > 1
+    assert plans[0]['cluster_config']['cluster_name'] == 'big-01'
@@ -0,0 +1,76 @@
+"""
+Unit tests for structural plan diffs
+"""
+
+import copy
+import json
+import pytest
+from src.catalog import CatalogService
+from src.planner import Planner, diff_plans, plan_hash_tree
+from src.planner.diff import diff_plan_files
+from src.models import WorkloadRequirements, WorkloadType, plan_to_dict
+
+
+@pytest.fixture
+def plan_dict():
+    """Create a serialized rack-aware plan"""
+    planner = Planner(CatalogService())
+    plan = planner.create_plan(
+        workload=WorkloadRequirements(
+            workload_type=WorkloadType.AI_INFERENCE, cpu_cores=16, memory_gb=64,
+            gpu_required=True, gpu_count=1
+        ),
+        cluster_name='site-001',
+        resource_group='test-rg',
+        location='eastus',
+        custom_location='test-custom-location',
+        rack_count=2
+    )
+    return plan_to_dict(plan)
+
+
+def test_identical_plans_have_equal_roots(plan_dict):
+    """Test identical plans hash equally and diff to nothing"""
+    other = copy.deepcopy(plan_dict)
+    assert plan_hash_tree(plan_dict).root == plan_hash_tree(other).root
+    assert diff_plans(plan_dict, other).is_empty
+
+
+def test_diff_reports_labels_taints_and_racks(plan_dict):
+    """Test changes are reported at label, taint and rack level"""
+    new = copy.deepcopy(plan_dict)
+    gpu_pool = new['cluster_config']['node_pools'][1]
+    gpu_pool['labels']['tier'] = 'premium'
+    gpu_pool['taints'] = []
+    new['rack_topology'][1]['fault_domain'] = 'fd-9'
+
+    old_tree, new_tree = plan_hash_tree(plan_dict), plan_hash_tree(new)
+    # The untouched system pool keeps its hash
+    assert old_tree.pools['nodepool1'] == new_tree.pools['nodepool1']
+
+    paths = {(c.path, c.kind) for c in diff_plans(plan_dict, new).changes}
+    assert ('node_pools[gpupool].labels.tier', 'added') in paths
+    assert ('node_pools[gpupool].taints', 'removed') in paths
+    assert ('racks[rack-2].fault_domain', 'changed') in paths
+    assert not any(path.startswith('node_pools[nodepool1]') for path, _ in paths)
+
+
+def test_diff_plan_files_pairs_by_cluster(plan_dict, tmp_path):
+    """Test file diffs classify clusters as changed/unchanged/added/removed"""
+    def variant(name, node_count):
+        data = copy.deepcopy(plan_dict)
+        data['cluster_config']['cluster_name'] = name
+        data['cluster_config']['node_pools'][0]['node_count'] = node_count
+        return json.dumps(data)
+
+    old = tmp_path / 'old.jsonl'
+    new = tmp_path / 'new.jsonl'
+    old.write_text('\n'.join([variant('a', 3), variant('b', 3), variant('c', 3)]) + '\n')
+    new.write_text('\n'.join([variant('a', 3), variant('b', 5), variant('d', 3)]) + '\n')
+
+    results = {name: (status, d) for name, status, d in diff_plan_files(old, new)}
+    assert results['a'][0] == 'unchanged'
+    assert results['b'][0] == 'changed'
+    assert results['b'][1].changes[0].path == 'node_pools[nodepool1].node_count'
+    assert results['c'][0] == 'removed'
+    assert results['d'][0] == 'added'
@@ -0,0 +1,110 @@
+"""
+Unit tests for precomputed plan tables
+"""
+
+import pytest
+from dataclasses import replace
+from src import metrics
+from src.catalog import CatalogService
+from src.planner import Planner, PlanLattice, PlanTable
+from src.models import WorkloadRequirements, WorkloadType, plan_to_dict
+
+
+@pytest.fixture
+def lattice():
+    return PlanLattice(
+        workload_types=['general-purpose', 'ai-inference'],
+        cpu_cores=[8, 32],
+        memory_gb=[32, 128],
+        gpu_required=[False, True],
+        gpu_count=[0, 2],
+        rack_count=[None, 3],
+        enable_rack_awareness=[True, False]
+    )
+
+
+@pytest.fixture
+def catalog():
+    return CatalogService()
+
+
+def _plan(planner, workload, **kwargs):
+    return planner.create_plan(
+        workload=workload,
+        cluster_name='site-042',
+        resource_group='rg-site-042',
+        location='westeurope',
+        custom_location='cl-site-042',
+        **kwargs
+    )
+
+
+def test_table_plans_match_full_planning(tmp_path, catalog, lattice):
+    """Test every lattice point serves exactly the plan full planning produces"""
+    table = PlanTable.build(catalog, lattice, tmp_path / 'table.bin')
+    assert len(table) == lattice.size() == 128
+    assert table.template_count < len(table)
+
+    full = Planner(catalog)
+    fast = Planner(catalog, PlanTable(tmp_path / 'table.bin'))
+    for workload_type, cpu, memory, gpu_required, gpu_count, racks, rack_aware in lattice.points():
+        workload = WorkloadRequirements(
+            workload_type=WorkloadType(workload_type), cpu_cores=cpu, memory_gb=memory,
+            gpu_required=gpu_required, gpu_count=gpu_count, storage_gb=500
+        )
+        kwargs = {'rack_count': racks, 'enable_rack_awareness': rack_aware}
+        assert plan_to_dict(_plan(fast, workload, **kwargs)) == plan_to_dict(_plan(full, workload, **kwargs))
+
+
+def test_off_lattice_requests_fall_back(tmp_path, catalog, lattice):
+    """Test requests off the lattice, with extensions or a stale catalog are planned in full"""
+    sink = metrics.InMemorySink()
+    metrics.set_sink(sink)
+    try:
+        planner = Planner(catalog, PlanTable.build(catalog, lattice, tmp_path / 'table.bin'))
+        on = WorkloadRequirements(workload_type=WorkloadType.GENERAL_PURPOSE, cpu_cores=8, memory_gb=32)
+        off = WorkloadRequirements(workload_type=WorkloadType.GENERAL_PURPOSE, cpu_cores=12, memory_gb=32)
+        _plan(planner, on)
+        plan = _plan(planner, off)
+        assert plan.workload_requirements is off
+        _plan(planner, on, environment='production')
+        assert planner.plan_table.lookup(replace(on, gpu_sharing='time-slicing'), 'c', 'rg', 'l', 'cl') is None
+        counters = sink.snapshot()['counters']
+        assert counters['planner.table_hits'] == 1
+        assert counters['planner.table_misses'] == 1
+
+        planner.plan_table.catalog_version = 'an-older-catalog'
+        _plan(planner, on)
+        assert sink.snapshot()['counters']['planner.table_stale'] == 1
+    finally:
+        metrics.set_sink(None)
+
+
+def test_table_plans_are_independent(tmp_path, catalog, lattice):
+    """Test modifying a served plan does not change later hits"""
+    planner = Planner(catalog, PlanTable.build(catalog, lattice, tmp_path / 'table.bin'))
+    workload = WorkloadRequirements(workload_type=WorkloadType.AI_INFERENCE, cpu_cores=32, memory_gb=128)
+    first = _plan(planner, workload, rack_count=3)
+    first.cluster_config.node_pools[0].labels['team'] = 'a'
+    first.validation_result.warnings.append('edited')
+    first.rack_topology[0].node_labels.clear()
+    second = _plan(planner, workload, rack_count=3)
+    assert 'team' not in second.cluster_config.node_pools[0].labels
+    assert 'edited' not in second.validation_result.warnings
+    assert second.rack_topology[0].node_labels
+
+
+def test_lattice_validation(tmp_path):
+    """Test invalid lattices and files are rejected"""
+    with pytest.raises(ValueError):
+        PlanLattice(cpu_cores=[0, 8])
+    with pytest.raises(ValueError):
+        PlanLattice.from_dict({'cores': [8]})
+    with pytest.raises(ValueError):
+        PlanLattice(workload_types=['mainframe'])
+    assert PlanLattice.from_dict({'cpu_cores': [16]}).memory_gb == PlanLattice().memory_gb
+
+    bogus = tmp_path / 'bogus.bin'
+    bogus.write_bytes(b'not a plan table')
+    with pytest.raises(ValueError):
+        PlanTable(bogus)
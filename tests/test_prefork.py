@@ -0,0 +1,104 @@
+"""
+Unit tests for catalog snapshots shared between pre-fork workers
+"""
+
+import copy
+import multiprocessing
+import os
+import signal
+import time
+from src.catalog import CatalogService
+from src.api.prefork import CatalogSnapshots, PreforkServer, SharedCatalog
+from src.jobs import JobQueue, JobStatus, WorkerPool
+
+
+def _refreshed(catalog: CatalogService):
+    data = copy.deepcopy(catalog.catalog_data)
+    data['kubernetes_versions'] = ['1.99.0']
+    data['vm_skus']['general_purpose'][0] = {**data['vm_skus']['general_purpose'][0], 'name': 'Standard_New_v9'}
+    return data
+
+
+def test_publish_and_load_round_trip(tmp_path):
+    """Test each publish bumps the generation and only the last two snapshots are kept"""
+    snapshots = CatalogSnapshots(tmp_path)
+    assert snapshots.generation == 0
+    for i in range(1, 4):
+        assert snapshots.publish({'kubernetes_versions': [f'1.{i}.0']}, {'p': i}) == i
+    assert snapshots.load(3) == ({'kubernetes_versions': ['1.3.0']}, {'p': 3})
+    assert sorted(p.name for p in tmp_path.glob('*.snap')) == ['catalog-2.snap', 'catalog-3.snap']
+
+    # A second handle on the same directory sees the same counter
+    assert CatalogSnapshots(tmp_path).generation == 3
+    snapshots.close()
+    assert tmp_path.exists()
+
+
+def test_shared_catalog_picks_up_refresh(tmp_path):
+    """Test a worker swaps in a published refresh and rebuilds its SKU index"""
+    master = CatalogService()
+    master.warm()
+    worker = CatalogService.from_data(copy.deepcopy(master.catalog_data), master.presets_data)
+    snapshots = CatalogSnapshots(tmp_path)
+    publisher = SharedCatalog(snapshots, master)
+    publisher.publish()
+    shared = SharedCatalog(snapshots, worker)
+    assert not shared.sync()
+    assert worker.get_vm_sku('Standard_New_v9') is None
+
+    master.replace_data(_refreshed(master), master.presets_data)
+    publisher.publish()
+    assert shared.sync()
+    assert worker.get_kubernetes_versions() == ['1.99.0']
+    assert worker.get_vm_sku('Standard_New_v9') is not None
+    assert worker.version_id == master.version_id
+    assert worker.get_environment_preset('production') is not None
+
+
+def _child(directory, ready, result):
+    catalog = CatalogService.from_data({'kubernetes_versions': []}, {})
+    snapshots = CatalogSnapshots(directory)
+    shared = SharedCatalog(snapshots, catalog)
+    ready.set()
+    while not shared.sync():
+        pass
+    result.put(catalog.get_kubernetes_versions())
+
+
+def test_refresh_reaches_forked_worker(tmp_path):
+    """Test a forked worker sees a generation published after it started"""
+    context = multiprocessing.get_context('fork')
+    ready, result = context.Event(), context.Queue()
+    snapshots = CatalogSnapshots(tmp_path)
+    child = context.Process(target=_child, args=(str(tmp_path), ready, result))
+    child.start()
+    try:
+        assert ready.wait(10)
+        snapshots.publish({'kubernetes_versions': ['1.31.10']}, {})
+        assert result.get(timeout=10) == ['1.31.10']
+    finally:
+        child.join(10)
+        if child.is_alive():
+            child.terminate()
+
+
+def test_master_forked_job_worker(tmp_path):
+    """Test a job worker forked by the master runs queued jobs and stops on SIGTERM"""
+    queue = JobQueue(tmp_path)
+    job = queue.submit('plan', {'records': [{
+        'cluster_name': 'site-001', 'resource_group': 'rg', 'custom_location': 'cl',
+        'workload': {'workload_type': 'general-purpose', 'cpu_cores': 8, 'memory_gb': 32}
+    }]})
+    server = PreforkServer(job_workers=1)
+    server._spawn_job_worker(0, WorkerPool(tmp_path, poll_interval=0.05))
+    (pid, kind), = server._children.items()
+    assert kind == ('jobs', 0)
+    try:
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline and not queue.get(job.id).finished:
+            time.sleep(0.05)
+        assert queue.get(job.id).status == JobStatus.SUCCEEDED
+    finally:
+        os.kill(pid, signal.SIGTERM)
+        _, status = os.waitpid(pid, 0)
+    assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
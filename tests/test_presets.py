@@ -0,0 +1,73 @@
+"""
+Unit tests for compiled environment and workload presets
+"""
+
+import dataclasses
+import pytest
+from src.catalog import CatalogService
+from src.planner import Planner
+from src.models import WorkloadRequirements, WorkloadType
+
+
+@pytest.fixture
+def planner():
+    return Planner(CatalogService())
+
+
+def _plan(planner, environment=None, cpu=8, memory=32, workload_type=WorkloadType.GENERAL_PURPOSE):
+    return planner.create_plan(
+        workload=WorkloadRequirements(workload_type=workload_type, cpu_cores=cpu, memory_gb=memory),
+        cluster_name='env-cluster',
+        resource_group='test-rg',
+        location='eastus',
+        custom_location='test-custom-location',
+        environment=environment
+    )
+
+
+def test_presets_compiled_at_load():
+    """Test templates and workload presets are frozen objects"""
+    catalog = CatalogService()
+    production = catalog.get_environment_preset('production')
+    assert production.control_plane_count == 3
+    assert production.max_nodes == 100
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        production.max_nodes = 5
+    with pytest.raises(TypeError):
+        catalog.environment_presets['custom'] = production
+    with pytest.raises(ValueError):
+        catalog.get_environment_preset('staging')
+
+    assert catalog.get_workload_preset('ai-inference').gpu_count == 1
+
+
+def test_environment_template_applied(planner):
+    """Test control plane count, node bounds and autoscaling come from the template"""
+    poc = _plan(planner, 'poc', cpu=16, memory=64)
+    pool = poc.cluster_config.node_pools[0]
+    assert poc.cluster_config.control_plane_count == 1
+    assert pool.node_count == 3
+    assert not pool.enable_auto_scaling
+    assert pool.max_count is None
+    assert any('at most 3' in w for w in poc.validation_result.warnings)
+
+    production = _plan(planner, 'production', cpu=4, memory=16)
+    pool = production.cluster_config.node_pools[0]
+    assert production.cluster_config.control_plane_count == 3
+    assert production.cluster_config.tags['environment'] == 'production'
+    assert (pool.min_count, pool.max_count) == (3, 100)
+
+
+def test_default_heuristics_without_template(planner):
+    """Test plans without a template keep the previous defaults"""
+    plan = _plan(planner, cpu=16, memory=64)
+    pool = plan.cluster_config.node_pools[0]
+    assert plan.cluster_config.control_plane_count == 3
+    assert pool.max_count == pool.node_count * 2
+
+
+def test_workload_preset_fills_missing_sizing(planner):
+    """Test a bare workload type picks up its preset sizing"""
+    plan = _plan(planner, cpu=0, memory=0, workload_type=WorkloadType.AI_INFERENCE)
+    assert plan.workload_requirements.cpu_cores == 16
+    assert plan.workload_requirements.gpu_required
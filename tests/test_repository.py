@@ -0,0 +1,142 @@
+"""
+Unit tests for the persistent plan repository
+"""
+
+import copy
+import os
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from src.catalog import CatalogService
+from src.planner import Planner
+from src.models import WorkloadRequirements, WorkloadType, plan_to_dict
+from src.repository import PlanRepository
+from src.repository.plans import version_filter
+
+
+@pytest.fixture(scope='module')
+def base_plan():
+    planner = Planner(CatalogService())
+    return planner.create_plan(
+        workload=WorkloadRequirements(workload_type=WorkloadType.GENERAL_PURPOSE, cpu_cores=16, memory_gb=64),
+        cluster_name='site-base',
+        resource_group='rg',
+        location='eastus',
+        custom_location='cl',
+        rack_count=2
+    )
+
+
+def _fleet(base_plan, count):
+    """Copies of a plan with alternating versions, SKUs and warnings"""
+    plans = []
+    for i in range(count):
+        plan = copy.deepcopy(base_plan)
+        plan.cluster_config.cluster_name = f"site-{i:05d}"
+        plan.cluster_config.kubernetes_version = '1.30.4' if i % 2 else '1.31.10'
+        if i % 3 == 0:
+            plan.cluster_config.node_pools[0].vm_size = 'Standard_NC8as_T4_v3'
+        plan.validation_result.warnings = ['Single rack deployment'] if i % 5 == 0 else []
+        plans.append(plan)
+    return plans
+
+
+def test_version_filter_patterns():
+    """Test patch wildcards match the minor version and full versions match exactly"""
+    assert version_filter('1.30.x') == ('kubernetes_minor', '1.30')
+    assert version_filter('1.30') == ('kubernetes_minor', '1.30')
+    assert version_filter('v1.30.4') == ('kubernetes_version', '1.30.4')
+
+
+def test_query_combines_filters(tmp_path, base_plan):
+    """Test SKU, version and warning filters narrow the fleet together"""
+    repo = PlanRepository(tmp_path / 'plans.db')
+    assert repo.save_many(_fleet(base_plan, 300), batch_size=64) == 300
+
+    expected = [f"site-{i:05d}" for i in range(300) if i % 2 and i % 3 == 0 and i % 5 == 0]
+    results = repo.query(vm_size='Standard_NC8as_T4_v3', kubernetes_version='1.30.x', has_warnings=True)
+    assert [r.cluster_name for r in results] == expected
+    assert all('Standard_NC8as_T4_v3' in r.vm_sizes and r.warning_count == 1 for r in results)
+    assert repo.count(vm_size='Standard_NC8as_T4_v3', kubernetes_version='1.30.x', has_warnings=True) == len(expected)
+
+    assert repo.count(message='single rack') == 60
+    assert repo.count(rack=base_plan.rack_topology[0].rack_id) == 300
+    assert repo.count(kubernetes_version='1.31.10') == 150
+    assert repo.sku_counts(kubernetes_version='1.30.4')['Standard_NC8as_T4_v3'] == 50
+
+
+def test_save_replaces_cluster_and_round_trips(tmp_path, base_plan):
+    """Test re-saving a cluster replaces its rows and stored plans rebuild losslessly"""
+    repo = PlanRepository(tmp_path / 'plans.db')
+    plan = _fleet(base_plan, 1)[0]
+    repo.save(plan)
+    updated = copy.deepcopy(plan)
+    updated.cluster_config.node_pools[0].vm_size = 'Standard_D8s_v5'
+    repo.save_many([plan, updated])
+
+    assert repo.count() == 1
+    assert repo.query()[0].vm_sizes == sorted({p.vm_size for p in updated.cluster_config.node_pools})
+    assert plan_to_dict(repo.get(plan.cluster_config.cluster_name)) == plan_to_dict(updated)
+    assert repo.delete(plan.cluster_config.cluster_name)
+    assert repo.get(plan.cluster_config.cluster_name) is None
+    assert repo.count(vm_size='Standard_D8s_v5') == 0
+
+
+def test_filters_use_indexes(tmp_path):
+    """Test the SKU and version filters are answered from secondary indexes"""
+    repo = PlanRepository(tmp_path / 'plans.db')
+    conn = repo._connect()
+    for filters in ({'vm_size': 'Standard_D8s_v5'}, {'kubernetes_version': '1.30.x'}):
+        where, params = repo._where(**filters)
+        detail = ' '.join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN SELECT id FROM plans p{where}", params))
+        assert 'INDEX' in detail and 'SCAN p' not in detail
+
+
+def test_filtered_pages_read_in_order_from_covering_index(tmp_path):
+    """Test plan-column filters page in cluster order without touching rows or sorting"""
+    repo = PlanRepository(tmp_path / 'plans.db')
+    conn = repo._connect()
+    for filters in ({'kubernetes_version': '1.30.x', 'has_warnings': True}, {'kubernetes_version': '1.30.4'},
+                    {'is_valid': True, 'has_warnings': False}, {'location': 'eastus'}):
+        where, params = repo._where(**filters)
+        detail = ' '.join(row[3] for row in conn.execute(
+            f"EXPLAIN QUERY PLAN SELECT id FROM plans p{where} ORDER BY p.cluster_name LIMIT 10", params))
+        assert 'COVERING INDEX' in detail and 'TEMP B-TREE' not in detail, detail
+
+
+def test_api_totals_and_rejects_conflicting_plans(tmp_path, base_plan, monkeypatch):
+    """Test the API counts only when needed and refuses plans the database rejects"""
+    from src.api import app as api
+
+    monkeypatch.setattr(api, 'plan_db', str(tmp_path / 'plans.db'))
+    monkeypatch.setattr(api, '_plan_repository', None)
+    client = api.app.test_client()
+    fleet = [plan_to_dict(plan) for plan in _fleet(base_plan, 5)]
+    assert client.post('/api/plans', json={'plans': fleet}).status_code == 201
+
+    assert client.get('/api/plans?limit=2').get_json()['total'] == 5
+    assert client.get('/api/plans?limit=2&offset=4').get_json()['total'] == 5
+    page = client.get('/api/plans?limit=2&total=false').get_json()
+    assert page['total'] is None and len(page['plans']) == 2
+
+    duplicate = copy.deepcopy(fleet[0])
+    duplicate['cluster_config']['node_pools'].append(duplicate['cluster_config']['node_pools'][0])
+    response = client.post('/api/plans', json={'plans': [duplicate]})
+    assert response.status_code == 400
+    assert 'Invalid plan' in response.get_json()['error']
+
+
+def test_api_opens_repository_on_first_use(tmp_path):
+    """Test importing the API creates no plan database until plans are queried"""
+    script = (
+        "import os\n"
+        "from src.api import app\n"
+        "assert os.listdir('.') == []\n"
+        "response = app.app.test_client().get('/api/plans')\n"
+        "assert response.get_json()['total'] == 0\n"
+        "assert os.path.exists('plans.db')\n"
+    )
+    env = {**os.environ, 'PYTHONPATH': str(Path(__file__).parent.parent)}
+    env.pop('AKSARC_PLAN_DB', None)
+    subprocess.run([sys.executable, '-c', script], cwd=tmp_path, env=env, check=True)
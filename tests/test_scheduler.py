@@ -0,0 +1,100 @@
+"""
+Unit tests for the pod scheduling simulator
+"""
+
+from src.catalog import CatalogService
+from src.planner import Planner
+from src.models import WorkloadRequirements, WorkloadType
+from src.simulation import SchedulingSimulator, PodSpec, SimNode, synthetic_pods
+from src.simulation.scheduler import (
+    HOSTNAME_LABEL, NO_MATCHING_NODE, INSUFFICIENT_RESOURCES, SPREAD_VIOLATION, tolerates
+)
+
+ZONE = 'topology.kubernetes.io/zone'
+
+
+def _nodes(count, zones=2, taints=(), cpu=4.0, memory=16.0):
+    return [
+        SimNode(name=f"n{i}", pool='pool', labels={'pool': 'pool', ZONE: f"fd-{i % zones + 1}",
+                                                   HOSTNAME_LABEL: f"n{i}"},
+                taints=tuple(taints), cpu=cpu, memory_gb=memory, gpu=0)
+        for i in range(count)
+    ]
+
+
+def test_tolerations_match_taints():
+    """Test toleration matching with omitted value and effect"""
+    taint = 'nvidia.com/gpu=present:NoSchedule'
+    assert tolerates([taint], taint)
+    assert tolerates(['nvidia.com/gpu'], taint)
+    assert not tolerates(['nvidia.com/gpu=absent'], taint)
+
+
+def test_taints_and_capacity():
+    """Test untolerated taints exclude nodes and capacity is consumed"""
+    tainted = SchedulingSimulator(_nodes(2, taints=['dedicated=db:NoSchedule']))
+    report = tainted.schedule([PodSpec('web', cpu=1, memory_gb=1, replicas=3)])
+    assert report.reasons[NO_MATCHING_NODE] == 3
+
+    sim = SchedulingSimulator(_nodes(2))
+    report = sim.schedule([PodSpec('web', cpu=1, memory_gb=1, replicas=10, tolerations=[])])
+    assert report.scheduled == 8
+    assert report.reasons[INSUFFICIENT_RESOURCES] == 2
+
+
+def test_pool_max_pods_limits_node():
+    """Test nodes take no more pods than their pool's max_pods"""
+    sim = SchedulingSimulator(_nodes(2, cpu=64.0, memory=256.0))
+    for node in sim.nodes:
+        node.max_pods = 30
+    report = sim.schedule([PodSpec('sidecar', cpu=0.1, memory_gb=0.1, replicas=70)])
+    assert report.scheduled == 60
+    assert report.reasons[INSUFFICIENT_RESOURCES] == 10
+
+    planner = Planner(CatalogService())
+    plan = planner.create_plan(
+        workload=WorkloadRequirements(workload_type=WorkloadType.GENERAL_PURPOSE, cpu_cores=8, memory_gb=32),
+        cluster_name='c', resource_group='rg', location='eastus', custom_location='cl'
+    )
+    sim = SchedulingSimulator.from_plan(plan, planner.catalog)
+    pools = {pool.name: pool.max_pods for pool in plan.cluster_config.node_pools}
+    assert all(node.max_pods == pools[node.pool] for node in sim.nodes)
+    sim.schedule([PodSpec('tiny', cpu=0.01, memory_gb=0.01, replicas=100000)])
+    assert max(node.pods for node in sim.nodes) <= max(pools.values())
+
+
+def test_spread_constraint_blocks_skew():
+    """Test DoNotSchedule spread stops placement once a domain is full"""
+    # fd-1 has one node with room for 1 pod, fd-2 has plenty
+    def nodes():
+        return [
+            SimNode('a', 'pool', {ZONE: 'fd-1', HOSTNAME_LABEL: 'a'}, (), cpu=1, memory_gb=4, gpu=0),
+            SimNode('b', 'pool', {ZONE: 'fd-2', HOSTNAME_LABEL: 'b'}, (), cpu=8, memory_gb=32, gpu=0),
+        ]
+    spread = {'maxSkew': '1', 'topologyKey': ZONE, 'whenUnsatisfiable': 'DoNotSchedule'}
+    report = SchedulingSimulator(nodes()).schedule([PodSpec('web', cpu=1, memory_gb=1, replicas=5, spread=spread)])
+    assert report.scheduled == 3
+    assert report.pods_by_domain['web'] == {'fd-1': 1, 'fd-2': 2}
+    assert report.reasons[SPREAD_VIOLATION] == 2
+
+    soft = dict(spread, whenUnsatisfiable='ScheduleAnyway')
+    report = SchedulingSimulator(nodes()).schedule([PodSpec('web', cpu=1, memory_gb=1, replicas=5, spread=soft)])
+    assert report.all_scheduled
+
+
+def test_planned_gpu_cluster_schedules():
+    """Test a planned GPU cluster accepts its synthetic pod set across racks"""
+    catalog = CatalogService()
+    plan = Planner(catalog).create_plan(
+        workload=WorkloadRequirements(workload_type=WorkloadType.AI_INFERENCE, cpu_cores=16,
+                                      memory_gb=64, gpu_required=True, gpu_count=2),
+        cluster_name='gpu-cluster', resource_group='rg', location='eastus',
+        custom_location='cl', rack_count=2
+    )
+    specs = synthetic_pods(plan, replicas=20, cpu=0.25, memory_gb=0.5)
+    report = SchedulingSimulator.from_plan(plan, catalog).schedule(specs)
+
+    # Only one T4 per GPU node, so GPU pods beyond the GPU count do not fit
+    assert report.unschedulable_by_spec['gpupool-app'] == 20 - 2
+    assert report.unschedulable_by_spec['nodepool1-app'] == 0
+    assert set(report.pods_by_domain['nodepool1-app']) == {'fd-1', 'fd-2'}
@@ -0,0 +1,86 @@
+"""
+Unit tests for manifest-based incremental export sync
+"""
+
+import copy
+import pytest
+from src.catalog import CatalogService
+from src.planner import Planner
+from src.models import WorkloadRequirements, WorkloadType
+from src.generator.sync import SyncWriter, MANIFEST_NAME
+from src.cli.bulk import run_bulk_export
+
+
+def _sync(out_dir, files, **kwargs):
+    with SyncWriter(out_dir, **kwargs) as writer:
+        for relative, content in files.items():
+            writer.write(relative, content)
+    return writer.stats
+
+
+def test_unchanged_files_keep_their_mtime(tmp_path):
+    """Test a second identical run writes nothing and leaves files untouched"""
+    files = {'a/main.bicep': 'one', 'b/main.tf': 'two'}
+    first = _sync(tmp_path, files)
+    assert (first.added, first.changed, first.unchanged) == (2, 0, 0)
+    mtime = (tmp_path / 'a/main.bicep').stat().st_mtime_ns
+
+    second = _sync(tmp_path, files)
+    assert (second.added, second.changed, second.unchanged, second.bytes_written) == (0, 0, 2, 0)
+    assert (tmp_path / 'a/main.bicep').stat().st_mtime_ns == mtime
+
+
+def test_changed_and_orphaned_files(tmp_path):
+    """Test changed files are replaced and files dropped from the export are removed"""
+    _sync(tmp_path, {'a/main.bicep': 'one', 'b/main.tf': 'two'})
+    (tmp_path / 'notes.txt').write_text('not ours')
+
+    stats = _sync(tmp_path, {'a/main.bicep': 'uno', 'c/main.tf': 'three'})
+    assert (stats.added, stats.changed, stats.removed) == (1, 1, 1)
+    assert (tmp_path / 'a/main.bicep').read_text() == 'uno'
+    assert not (tmp_path / 'b').exists()
+    assert (tmp_path / 'notes.txt').exists()
+    assert not list(tmp_path.rglob('*.tmp'))
+
+
+def test_hand_edited_file_is_restored(tmp_path):
+    """Test a file modified outside the export is detected and rewritten"""
+    _sync(tmp_path, {'a/main.tf': 'generated'})
+    (tmp_path / 'a/main.tf').write_text('edited!!!')
+    stats = _sync(tmp_path, {'a/main.tf': 'generated'})
+    assert stats.changed == 1
+    assert (tmp_path / 'a/main.tf').read_text() == 'generated'
+
+
+def test_failed_run_does_not_prune(tmp_path):
+    """Test an interrupted run keeps earlier outputs and a later run can still prune them"""
+    _sync(tmp_path, {'a/main.tf': '1', 'b/main.tf': '2'})
+    with pytest.raises(RuntimeError):
+        with SyncWriter(tmp_path) as writer:
+            writer.write('a/main.tf', '1')
+            raise RuntimeError('planner crashed')
+    assert (tmp_path / 'b/main.tf').exists()
+
+    stats = _sync(tmp_path, {'a/main.tf': '1'})
+    assert stats.removed == 1
+    assert (tmp_path / MANIFEST_NAME).exists()
+
+
+def test_bulk_export_sync(tmp_path):
+    """Test re-exporting the same plans rewrites nothing"""
+    planner = Planner(CatalogService())
+    plan = planner.create_plan(
+        workload=WorkloadRequirements(workload_type=WorkloadType.GENERAL_PURPOSE, cpu_cores=8, memory_gb=32),
+        cluster_name='site-a', resource_group='rg', location='eastus', custom_location='cl'
+    )
+    other = copy.deepcopy(plan)
+    other.cluster_config.cluster_name = 'site-b'
+
+    first = run_bulk_export(enumerate([plan, other]), tmp_path, ['bicep', 'terraform'], sync=True)
+    assert first.files_written == 4 and first.sync.added == 4
+
+    again = run_bulk_export(enumerate([plan]), tmp_path, ['bicep', 'terraform'], sync=True)
+    assert again.files_written == 0
+    assert (again.sync.unchanged, again.sync.removed) == (2, 2)
+    assert not (tmp_path / 'site-b').exists()
+    assert '2 removed' in again.summary()
@@ -0,0 +1,159 @@
+"""
+Unit tests for usage telemetry ingestion
+"""
+
+import bisect
+import gzip
+import json
+import random
+import pytest
+from src.catalog import CatalogService
+from src.models import WorkloadType
+from src.planner import Planner
+from src.telemetry import KLLSketch, UsageIngester, ingest_shard, plan_shards
+
+
+def _rank_error(values, estimate, q):
+    return abs(bisect.bisect_left(values, estimate) / len(values) - q)
+
+
+def test_kll_quantiles_in_constant_memory():
+    """Test sketch quantiles stay accurate while retaining a bounded number of items"""
+    rng = random.Random(7)
+    values = [rng.lognormvariate(0, 1) for _ in range(200000)]
+    sketch = KLLSketch()
+    for start in range(0, len(values), 1000):
+        sketch.update_many(values[start:start + 1000])
+
+    assert sketch.count == len(values)
+    assert len(sketch) < 1000
+    ordered = sorted(values)
+    for q in (0.5, 0.9, 0.95, 0.99):
+        assert _rank_error(ordered, sketch.quantile(q), q) < 0.02
+    assert sketch.quantiles([0, 1]) == [ordered[0], ordered[-1]]
+
+
+def test_kll_merge_matches_whole_stream():
+    """Test merged shard sketches estimate the same quantiles as the whole stream"""
+    rng = random.Random(11)
+    values = [rng.uniform(0, 100) for _ in range(100000)]
+    shards = [KLLSketch(seed=i) for i in range(6)]
+    for i, sketch in enumerate(shards):
+        sketch.update_many(values[i::6])
+    merged = shards[0]
+    for sketch in shards[1:]:
+        merged.merge(sketch)
+
+    assert merged.count == len(values)
+    assert len(merged) < 1000
+    assert _rank_error(sorted(values), merged.quantile(0.95), 0.95) < 0.02
+    with pytest.raises(ValueError):
+        KLLSketch().quantile(0.5)
+
+
+def _write_csv(path, rows, pods=1):
+    """Write rows as consecutive pods of successive timestamps"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('timestamp,pod,workload,cpu_millicores,memory_bytes,gpu\n')
+        for i, (workload, cpu, memory, gpu) in enumerate(rows):
+            f.write(f"{i // pods},pod-{i % pods},{workload},{cpu},{memory},{gpu}\n")
+
+
+def test_sharded_csv_is_read_exactly_once(tmp_path):
+    """Test byte-range shards cover every row once, including at line boundaries"""
+    rows = [('inference', 1000 * (i % 10 + 1), 2 ** 30 * (i % 4 + 1), 0) for i in range(5000)]
+    path = tmp_path / 'usage.csv'
+    _write_csv(path, rows)
+
+    shards = plan_shards([path], shard_bytes=997)
+    assert len(shards) > 50
+    total = 0
+    for shard in shards:
+        usage, stats = ingest_shard(shard)
+        assert stats.skipped == 0
+        total += sum(summary.close().samples for summary in usage.values())
+    assert total == len(rows)
+
+    ingester = UsageIngester(workers=2, shard_bytes=4096)
+    usage = ingester.ingest([path])
+    assert ingester.stats.rows == len(rows)
+    summary = usage['inference']
+    assert summary.cpu.quantiles([0, 1]) == [1.0, 10.0]
+    assert summary.memory_gb.quantile(1) == 4.0
+
+
+def test_pods_are_summed_per_timestamp_across_shards(tmp_path):
+    """Test quantiles are over each timestamp's total, with pods split across shards"""
+    rows = [('inference', 1000 * (i % 10 + 1), 2 ** 30 * (i % 4 + 1), 1) for i in range(5000)]
+    path = tmp_path / 'usage.csv'
+    _write_csv(path, rows, pods=5)
+
+    usage = UsageIngester(workers=2, shard_bytes=997).ingest([path])
+    summary = usage['inference']
+    assert summary.samples == 1000
+    # Five consecutive pods use 1-5 or 6-10 cores
+    assert summary.cpu.quantiles([0, 1]) == [15.0, 40.0]
+    assert summary.memory_gb.quantiles([0, 1]) == [11.0, 14.0]
+    assert summary.gpu.quantile(1) == 5.0
+
+
+def test_open_totals_stay_bounded_on_long_trace(tmp_path):
+    """Test a shard only keeps its first and latest timestamps open"""
+    rows = [('inference', 1000, 2 ** 30, 0) for _ in range(3 * 20000)]
+    path = tmp_path / 'usage.csv'
+    _write_csv(path, rows, pods=3)
+
+    usage, _ = ingest_shard(plan_shards([path])[0])
+    summary = usage['inference']
+    assert sorted(summary.open_totals) == ['0', '19999']
+    assert summary.samples == 20000 - 2
+    assert summary.close().cpu.quantiles([0, 1]) == [3.0, 3.0]
+
+    shards = plan_shards([path], shard_bytes=64 * 1024)
+    merged = UsageIngester(workers=1, shard_bytes=64 * 1024).ingest([path])['inference']
+    assert merged.samples == 20000
+    assert merged.cpu.quantiles([0, 1]) == [3.0, 3.0]
+    assert len(shards) > 10
+
+
+def test_requirements_ready_for_planner(tmp_path):
+    """Test labels become p95-sized requirements the planner accepts"""
+    rng = random.Random(5)
+    csv_path = tmp_path / 'usage.csv'
+    _write_csv(csv_path, [('ai-inference', rng.randint(1000, 10000), 2 ** 34, 1) for _ in range(7 * 300)], pods=7)
+    jsonl_path = tmp_path / 'usage.jsonl.gz'
+    with gzip.open(jsonl_path, 'wt', encoding='utf-8') as f:
+        for i in range(1000):
+            f.write(json.dumps({'workload': 'billing', 'cpu': 2.5, 'memory_gb': 6 + i % 3}) + '\n')
+        f.write('not json\n')
+        f.write(json.dumps({'cpu': 1, 'memory_gb': 1}) + '\n')
+
+    ingester = UsageIngester(workers=1)
+    requirements = ingester.requirements([csv_path, jsonl_path], quantile=0.95, headroom=1.2)
+    assert ingester.stats.skipped == 2
+
+    # Seven pods run at once, so the workload needs seven pods' worth
+    inference = requirements['ai-inference']
+    assert inference.workload_type == WorkloadType.AI_INFERENCE
+    assert 7 * 5.5 * 1.2 < inference.cpu_cores <= 7 * 10 * 1.2 + 1
+    assert inference.memory_gb == 135
+    assert inference.gpu_required and inference.gpu_count == 7
+
+    billing = requirements['billing']
+    assert billing.workload_type == WorkloadType.CUSTOM
+    assert (billing.cpu_cores, billing.memory_gb, billing.gpu_required) == (3, 10, False)
+    assert 'p95' in billing.description
+
+    plan = Planner(CatalogService()).create_plan(
+        workload=inference, cluster_name='inference', resource_group='rg',
+        location='eastus', custom_location='cl'
+    )
+    assert plan.workload_requirements.cpu_cores == inference.cpu_cores
+
+
+def test_missing_columns_are_rejected(tmp_path):
+    """Test inputs without CPU or memory columns fail clearly"""
+    path = tmp_path / 'usage.csv'
+    path.write_text('workload,cpu\nweb,1\n', encoding='utf-8')
+    with pytest.raises(ValueError, match='memory'):
+        UsageIngester(workers=1).ingest([path])
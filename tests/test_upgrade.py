@@ -0,0 +1,84 @@
+"""
+Unit tests for Kubernetes upgrade planning
+"""
+
+import pytest
+from src.catalog import CatalogService
+from src.planner import Planner, UpgradePlanner, VersionGraph
+from src.models import WorkloadRequirements, WorkloadType
+
+VERSIONS = ['1.31.10', '1.32.6', '1.32.5', '1.31.9', '1.30.14', '1.30.13']
+
+
+def test_shortest_paths_follow_minor_step_rule():
+    """Test paths advance at most one minor per hop and take the newest patch"""
+    graph = VersionGraph(VERSIONS)
+    assert graph.path('1.30.13', '1.32.6') == ['1.30.13', '1.31.10', '1.32.6']
+    assert graph.path('1.29.4', '1.32.6') == ['1.29.4', '1.30.14', '1.31.10', '1.32.6']
+    assert graph.path('1.30.13', '1.30.14') == ['1.30.13', '1.30.14']
+    assert graph.path('1.32.6', '1.32.6') == ['1.32.6']
+    # No 1.29 in the catalog, and downgrades are never planned
+    assert graph.path('1.28.1', '1.32.6') is None
+    assert graph.path('1.32.6', '1.31.10') is None
+
+    assert graph.path('1.30.13', '1.32.6') is graph.path('1.30.13', '1.32.6')
+    assert VersionGraph(VERSIONS, max_minor_step=2).path('1.30.13', '1.32.6') == ['1.30.13', '1.32.6']
+    with pytest.raises(ValueError):
+        graph.path('1.30.13', '1.33.0')
+    with pytest.raises(ValueError):
+        graph.path('latest', '1.32.6')
+
+
+@pytest.fixture
+def fleet():
+    planner = Planner(CatalogService())
+    workload = WorkloadRequirements(workload_type=WorkloadType.GENERAL_PURPOSE, cpu_cores=8, memory_gb=32)
+    sites = [('site-a', '1.30.13', 3, 'eastus'), ('site-b', '1.30.13', 3, 'eastus'),
+             ('site-c', '1.30.14', 3, 'westus'), ('site-d', '1.31.9', None, 'westus'),
+             ('site-e', '1.32.6', 2, 'westus'), ('site-f', '1.28.1', 2, 'westus')]
+    plans = []
+    for name, version, racks, location in sites:
+        plan = planner.create_plan(workload=workload, cluster_name=name, resource_group='rg',
+                                   location=location, custom_location='cl', rack_count=racks)
+        plan.cluster_config.kubernetes_version = version
+        plans.append(plan)
+    return plans
+
+
+def test_fleet_waves_respect_fault_domains(fleet):
+    """Test waves upgrade one fault domain per cluster and stay within the wave size"""
+    upgrades = UpgradePlanner(CatalogService.from_data({'kubernetes_versions': VERSIONS}, {}))
+    rollout = upgrades.plan_fleet(fleet, max_clusters_per_wave=2)
+
+    assert rollout.target == '1.32.6'
+    assert rollout.unreachable == {'site-f': '1.28.1'}
+    assert rollout.up_to_date == ['site-e']
+    # Three racked clusters with two hops over three domains, plus one single-hop cluster
+    assert sum(len(wave) for wave in rollout.waves) == 3 * 2 * 3 + 1
+    assert len(rollout.waves) == 10
+
+    seen = {}
+    for wave in rollout.waves:
+        assert len(wave) <= 2
+        assert len({step.cluster_name for step in wave}) == len(wave)
+        for step in wave:
+            seen.setdefault(step.cluster_name, []).append((step.to_version, step.fault_domain))
+    assert seen['site-a'] == [(v, f"fd-{i}") for v in ('1.31.10', '1.32.6') for i in (1, 2, 3)]
+    assert seen['site-d'] == [('1.32.6', 'cluster')]
+
+
+def test_fleet_location_cap_and_validation(fleet):
+    """Test the per-location cap and rejected inputs"""
+    upgrades = UpgradePlanner(CatalogService.from_data({'kubernetes_versions': VERSIONS}, {}))
+    rollout = upgrades.plan_fleet(fleet, target='1.31.10', max_clusters_per_wave=5, max_per_location=1)
+    locations = {plan.cluster_config.cluster_name: plan.cluster_config.location for plan in fleet}
+    for wave in rollout.waves:
+        in_wave = [locations[step.cluster_name] for step in wave]
+        assert len(in_wave) == len(set(in_wave))
+    assert rollout.paths['site-d'] == ['1.31.9', '1.31.10']
+    assert 'site-e' in rollout.unreachable
+
+    with pytest.raises(ValueError):
+        upgrades.plan_fleet(fleet, target='1.29.0')
+    with pytest.raises(ValueError):
+        upgrades.plan_fleet(fleet + fleet[:1])
@@ -0,0 +1,63 @@
+"""
+Unit tests for video analytics sizing
+"""
+
+import pytest
+from src.catalog import CatalogService
+from src.planner import Planner, VideoAnalyticsSizer, VideoSizingFactors
+from src.models import WorkloadRequirements, WorkloadType
+
+
+def test_factors_loaded_from_catalog_preset():
+    """Test sizing factors come from the video-analytics preset"""
+    catalog = CatalogService()
+    preset = catalog.get_workload_presets()['video-analytics']
+    sizer = VideoAnalyticsSizer.from_catalog(catalog)
+    assert sizer.factors.streams_per_gpu == preset['sizing']['streams_per_gpu']
+
+
+def test_batch_sizing_scales_with_cameras_and_fps():
+    """Test batch sizing returns one row per site and scales with load"""
+    sizer = VideoAnalyticsSizer(VideoSizingFactors())
+    batch = sizer.size_batch([8, 16, 16], [15, 15, 30], [30, 30, 30])
+
+    assert len(batch) == 3
+    assert batch.cpu_cores[1] > batch.cpu_cores[0]
+    assert batch.cpu_cores[2] > batch.cpu_cores[1]
+    assert batch.gpu_count == [1, 1, 2]
+    assert batch.storage_gb[2] > batch.storage_gb[1]
+
+
+def test_batch_sizing_rejects_mismatched_columns():
+    """Test columns must line up"""
+    sizer = VideoAnalyticsSizer()
+    with pytest.raises(ValueError):
+        sizer.size_batch([4, 8], [15])
+
+
+def test_planner_derives_requirements_from_cameras():
+    """Test video-analytics plans are sized from camera feeds"""
+    catalog = CatalogService()
+    planner = Planner(catalog)
+
+    workload = WorkloadRequirements(
+        workload_type=WorkloadType.VIDEO_ANALYTICS,
+        cameras=64,
+        fps=15,
+        retention_days=14
+    )
+
+    plan = planner.create_plan(
+        workload=workload,
+        cluster_name='store-001',
+        resource_group='test-rg',
+        location='eastus',
+        custom_location='test-custom-location'
+    )
+
+    sized = plan.workload_requirements
+    assert sized.cpu_cores > 0
+    assert sized.gpu_required is True
+    assert sized.gpu_count == 4
+    assert sized.storage_gb > 0
+    assert any(pool.name == 'gpupool' for pool in plan.cluster_config.node_pools)